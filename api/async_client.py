@@ -0,0 +1,287 @@
+"""
+Asyncio client for the backend REST API.
+
+AsyncDBDescClient mirrors the DBDescClient calls used by the path clients and the MCP
+server, on a pooled keep-alive httpx.AsyncClient. Every request of a client holds one
+of `max_concurrency` slots while in flight, so callers can fan out with asyncio.gather
+without flooding the backend. Failed requests are retried like the sync transport
+does: idempotent methods on connection errors and 502/503/504, any method on 503 or
+when the connection could not be opened.
+"""
+import asyncio
+import json
+import random
+from urllib.parse import quote
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import httpx
+
+from .client import APIClientError, IdCache
+from .transport import DEFAULT_TIMEOUT, RETRY_STATUSES
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+
+class AsyncDBDescClient:
+    def __init__(self, base_url: str = "http://backend:8000", pool_size: int = 10,
+                 max_concurrency: Optional[int] = None,
+                 timeout: Union[float, Tuple[float, float]] = DEFAULT_TIMEOUT,
+                 retries: int = 3, backoff_factor: float = 0.2, http: Optional[httpx.AsyncClient] = None,
+                 id_cache_ttl: float = 60.0):
+        self.base_url = base_url.rstrip("/")
+        self.ids = IdCache(id_cache_ttl)
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self._slots = asyncio.Semaphore(max_concurrency or pool_size)
+        self._owns_http = http is None
+        if http is None:
+            connect, read = timeout if isinstance(timeout, tuple) else (timeout, timeout)
+            limits = httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+            # No transport-level retries: _request retries failed connects too, so they are
+            # not retried twice over
+            http = httpx.AsyncClient(timeout=httpx.Timeout(read, connect=connect),
+                                     transport=httpx.AsyncHTTPTransport(limits=limits))
+        self.http = http
+
+    async def aclose(self):
+        """Close the pooled connections, unless the httpx client was passed in."""
+        if self._owns_http:
+            await self.http.aclose()
+
+    async def __aenter__(self) -> "AsyncDBDescClient":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    def _handle_response(self, resp: httpx.Response) -> Any:
+        if resp.is_error:
+            try:
+                detail = resp.json().get('detail', resp.text)
+            except Exception:
+                detail = resp.text
+            raise APIClientError(f"HTTP {resp.status_code}: {detail}")
+        try:
+            return resp.json()
+        except ValueError as e:
+            raise APIClientError(f"Non-JSON response: {resp.text}") from e
+
+    async def _request(self, method: str, path: str, **kwargs) -> Any:
+        attempt = 0
+        while True:
+            try:
+                async with self._slots:
+                    resp = await self.http.request(method, f"{self.base_url}{path}", **kwargs)
+            except httpx.TransportError as e:
+                # A request that never got a connection did not reach the server, whatever its method
+                never_sent = isinstance(e, (httpx.ConnectError, httpx.ConnectTimeout))
+                if (method not in IDEMPOTENT_METHODS and not never_sent) or attempt >= self.retries:
+                    raise
+            else:
+                retry = resp.status_code == 503 or (resp.status_code in RETRY_STATUSES and method in IDEMPOTENT_METHODS)
+                if not retry or attempt >= self.retries:
+                    return self._handle_response(resp)
+            await asyncio.sleep(self.backoff_factor * 2 ** attempt * (1 + random.random() / 2))
+            attempt += 1
+
+    async def resolve_ids(self, *names: str) -> int:
+        """Id of the cluster, database or table named by (cluster[, database[, table]]), from the cache when fresh."""
+        cached = self.ids.get(names)
+        if cached is not None:
+            return cached
+        path = '/'.join(quote(name, safe='') for name in names)
+        found = await self._request("GET", f"/ids/by-path/{path}")
+        ids = [found[key] for key in ("cluster_id", "database_id", "table_id")[:len(names)]]
+        self.ids.put(names, ids)
+        return ids[-1]
+
+    # --- Cluster / Database / Table ---
+    async def create_cluster(self, name: str) -> Dict[str, Any]:
+        """Create a new cluster."""
+        return await self._request("POST", "/clusters/", json={"name": name})
+
+    async def get_clusters(self) -> List[Dict[str, Any]]:
+        """List all clusters."""
+        return await self._request("GET", "/clusters/")
+
+    async def create_database(self, cluster_id: int, name: str) -> Dict[str, Any]:
+        """Create a database in a cluster by cluster ID."""
+        return await self._request("POST", f"/clusters/{cluster_id}/databases/", json={"name": name})
+
+    async def get_databases(self, cluster_id: int) -> List[Dict[str, Any]]:
+        """List all databases in a cluster by cluster ID."""
+        return await self._request("GET", f"/clusters/{cluster_id}/databases/")
+
+    async def create_table(self, database_id: int, name: str) -> Dict[str, Any]:
+        """Create a table in a database by database ID."""
+        return await self._request("POST", f"/databases/{database_id}/tables/", json={"name": name})
+
+    async def get_tables(self, database_id: int) -> List[Dict[str, Any]]:
+        """List all tables in a database by database ID."""
+        return await self._request("GET", f"/databases/{database_id}/tables/")
+
+    # --- Path-based helpers ---
+    async def create_database_by_path(self, path: str) -> Dict[str, Any]:
+        """Create a database by path (cluster/database)."""
+        parts = path.split('/')
+        if len(parts) != 2:
+            raise APIClientError(f"Invalid path format: '{path}'. Expected format: 'cluster/database'")
+        return await self._request("POST", f"/databases/by-path/{path}")
+
+    async def create_table_by_path(self, path: str) -> Dict[str, Any]:
+        """Create a table by path (cluster/database/table)."""
+        parts = path.split('/')
+        if len(parts) != 3:
+            raise APIClientError(f"Invalid path format: '{path}'. Expected format: 'cluster/database/table'")
+        try:
+            return await self._request("POST", f"/tables/by-path/{path}")
+        except APIClientError as e:
+            # Like DBDescClient.create_table_by_path, return an existing table instead of failing
+            if "already exists" not in str(e):
+                raise
+            return await self._request("GET", f"/tables/by-path/{path}")
+
+    async def create_field_by_path(self, path: str, meta: Optional[dict] = None) -> Dict[str, Any]:
+        """Create a field by path (cluster/database/table/field[/subfield...])."""
+        if len(path.split('/')) < 4:
+            raise APIClientError(f"Invalid path format: '{path}'. Expected format: 'cluster/database/table/field[/subfield...]'")
+        return await self._request("POST", f"/fields/by-path/{path}", json=meta if meta is not None else {})
+
+    async def create_fields_by_table_path(self, cluster: str, database: str, table: str,
+                                          fields: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Create many fields of a table in one transaction; fields are {"path" (relative to the table), "meta"} dicts."""
+        return await self._request("POST", f"/fields/by-table-path/{cluster}/{database}/{table}", json={'fields': fields})
+
+    async def list_field_paths_by_table_path(self, cluster: str, database: str, table: str) -> List[str]:
+        """List all field and subfield paths under the specified table."""
+        return (await self._request("GET", f"/fields/by-table-path/{cluster}/{database}/{table}")).get("paths", [])
+
+    async def list_field_paths_page(self, path: str = "", cursor: Optional[int] = None, limit: int = 1000,
+                                    max_bytes: Optional[int] = None, meta_filter: Optional[dict] = None) -> Dict[str, Any]:
+        """One page of the field paths under path: {"paths": [...], "next_cursor": int or None}."""
+        params: Dict[str, Any] = {'path': path, 'limit': limit}
+        if cursor is not None:
+            params['cursor'] = cursor
+        if max_bytes is not None:
+            params['max_bytes'] = max_bytes
+        if meta_filter:
+            params['filter'] = json.dumps(meta_filter)
+        return await self._request("GET", "/fields/paths/", params=params)
+
+    async def summarize_field_paths(self, path: str = "", meta_filter: Optional[dict] = None, sample: int = 20,
+                                    max_tables: int = 100) -> Dict[str, Any]:
+        """Field counts under path, in total and per table, with the first sample paths."""
+        params: Dict[str, Any] = {'path': path, 'sample': sample, 'max_tables': max_tables}
+        if meta_filter:
+            params['filter'] = json.dumps(meta_filter)
+        return await self._request("GET", "/fields/paths/summary", params=params)
+
+    async def list_database_paths_page(self, clusters: Optional[List[str]] = None, cursor: Optional[int] = None,
+                                       limit: int = 1000, max_bytes: Optional[int] = None) -> Dict[str, Any]:
+        """One page of cluster/database paths, optionally of some clusters only."""
+        params: Dict[str, Any] = {'limit': limit}
+        if clusters:
+            params['cluster'] = clusters
+        if cursor is not None:
+            params['cursor'] = cursor
+        if max_bytes is not None:
+            params['max_bytes'] = max_bytes
+        return await self._request("GET", "/databases/paths/", params=params)
+
+    async def delete_cluster_by_path(self, cluster_name: str) -> Any:
+        """Delete a cluster by name (path-based)."""
+        self.ids.forget((cluster_name,))
+        return await self._request("DELETE", f"/clusters/by-path/{cluster_name}")
+
+    async def delete_database_by_path(self, cluster: str, database: str) -> Any:
+        """Delete a database by path (cluster/database)."""
+        self.ids.forget((cluster, database))
+        return await self._request("DELETE", f"/databases/by-path/{cluster}/{database}")
+
+    async def delete_table_by_path(self, cluster: str, database: str, table: str) -> Any:
+        """Delete a table by path (cluster/database/table)."""
+        self.ids.forget((cluster, database, table))
+        return await self._request("DELETE", f"/tables/by-path/{cluster}/{database}/{table}")
+
+    async def delete_field_by_path(self, path: str) -> Any:
+        """Delete a field by path (cluster/database/table/field[/subfield...])."""
+        return await self._request("DELETE", f"/fields/by-path/{path}")
+
+    async def update_table_by_path(self, cluster: str, database: str, table: str, data: dict) -> Any:
+        """Update a table by path (cluster/database/table)."""
+        if 'name' in data:
+            self.ids.forget((cluster, database, table))
+        return await self._request("PATCH", f"/tables/by-path/{cluster}/{database}/{table}", json=data)
+
+    async def get_databases_by_cluster_name(self, cluster: str) -> List[dict]:
+        """Get all databases in a cluster by cluster name."""
+        return await self.get_databases(await self.resolve_ids(cluster))
+
+    async def get_tables_by_database_name(self, cluster: str, database: str) -> List[dict]:
+        """Get all tables in a database by cluster/database name."""
+        return await self.get_tables(await self.resolve_ids(cluster, database))
+
+    async def get_field_by_path(self, path: str) -> dict:
+        """Get all information about a field or subfield node given its path."""
+        return await self._request("GET", f"/fields/by-path/{path}")
+
+    async def get_field_meta_by_path(self, path: str) -> dict:
+        """Get the meta dictionary for a field by path."""
+        return await self._request("GET", f"/fields/by-path/{path}/meta")
+
+    async def resolve_field_paths(self, paths: List[str], include_meta: bool = False) -> List[Dict[str, Any]]:
+        """Resolve many field paths in one call; each result has found=False or id, parent_id, table_id (and meta)."""
+        data = await self._request("POST", "/fields/resolve", json={'paths': paths, 'include_meta': include_meta})
+        return data['results']
+
+    async def merge_field_meta_by_path(self, path: str, patch: dict) -> dict:
+        """Merge a patch into the meta of a field by path on the server (None values remove keys); returns the new meta."""
+        return await self._request("PATCH", f"/fields/by-path/{path}/meta", params={'mode': 'merge'}, json=patch)
+
+    async def batch_merge_field_meta(self, operations: List[Dict[str, Any]], return_meta: bool = False,
+                                     commit_every: int = 5000) -> Dict[str, Any]:
+        """Merge-patch many fields in one call; operations are {"path" or "id", "patch"} dicts."""
+        return await self._request("PATCH", "/fields/meta:batch", params={'commit_every': commit_every},
+                                   json={'operations': operations, 'return_meta': return_meta})
+
+    # --- Edges ---
+    async def get_equivalents(self, field_path: str) -> List[dict]:
+        """Get all equivalent fields (edges) for a field by path."""
+        return (await self._request("GET", f"/fields/{field_path}/equivalence/")).get('equivalents', [])
+
+    async def add_equivalence(self, from_path: str, to_path: str) -> dict:
+        """Add an equivalence edge between two fields by path."""
+        return await self._request("POST", "/equivalence/", params={'from_path': from_path, 'to_path': to_path})
+
+    async def remove_equivalence(self, from_path: str, to_path: str) -> dict:
+        """Remove an equivalence edge between two fields by path."""
+        return await self._request("DELETE", "/equivalence/", params={'from_path': from_path, 'to_path': to_path})
+
+    async def bulk_create_edges(self, edges: List[tuple], edge_type: Optional[str] = None, strict: bool = False) -> Dict[str, Any]:
+        """Create many edges in one transaction; edges are (from, to[, type]) with field ids or paths."""
+        body = {'type': edge_type, 'edges': [
+            {'from': edge[0], 'to': edge[1], 'type': edge[2] if len(edge) > 2 else None} for edge in edges
+        ]}
+        return await self._request("POST", "/edges/bulk", params={'strict': strict}, json=body)
+
+    async def get_shortest_path(self, from_path: str, to_path: str, edge_types: Optional[List[str]] = None,
+                                max_depth: Optional[int] = None, timeout_ms: Optional[int] = None) -> dict:
+        """Get the shortest chain of edges between two fields by path."""
+        params: Dict[str, Any] = {'from_path': from_path, 'to_path': to_path}
+        if edge_types:
+            params['edge_types'] = edge_types
+        if max_depth is not None:
+            params['max_depth'] = max_depth
+        if timeout_ms is not None:
+            params['timeout_ms'] = timeout_ms
+        return await self._request("GET", "/shortest-path/", params=params)
+
+    async def get_join_path(self, from_table: str, to_table: str, edge_types: Optional[List[str]] = None,
+                            max_hops: Optional[int] = None) -> dict:
+        """Plan the chain of table joins between two tables by path (cluster/database/table)."""
+        params: Dict[str, Any] = {'from_table': from_table, 'to_table': to_table}
+        if edge_types:
+            params['edge_types'] = edge_types
+        if max_hops is not None:
+            params['max_hops'] = max_hops
+        return await self._request("GET", "/join-path/", params=params)
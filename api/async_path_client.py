@@ -0,0 +1,276 @@
+import asyncio
+from typing import Any, Dict, List, Optional, Tuple, Union
+from .async_client import AsyncDBDescClient
+from .client import APIClientError
+from .path_client import RESOLVE_CHUNK, _edit_patch
+
+
+class AsyncPathClient:
+    """
+    Asyncio counterpart of PathClient. Operations that touch many clusters, tables or
+    fields issue their requests concurrently, bounded by the client's max_concurrency.
+    """
+
+    def __init__(self, base_url: str = "http://localhost:8000", client: Optional[AsyncDBDescClient] = None,
+                 **client_options):
+        """client_options (pool_size, max_concurrency, timeout, retries, backoff_factor) configure the AsyncDBDescClient."""
+        self.client = client or AsyncDBDescClient(base_url, **client_options)
+
+    async def aclose(self):
+        await self.client.aclose()
+
+    async def __aenter__(self) -> "AsyncPathClient":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    # --- Create ---
+    async def create_cluster(self, cluster_name: str) -> Dict[str, Any]:
+        """Create a cluster by name."""
+        return await self.client.create_cluster(cluster_name)
+
+    async def create_database(self, path: str) -> Dict[str, Any]:
+        """Create a database by path: cluster/database."""
+        return await self.client.create_database_by_path(path)
+
+    async def create_table(self, path: str) -> Dict[str, Any]:
+        """Create a table by path: cluster/database/table."""
+        return await self.client.create_table_by_path(path)
+
+    async def create_field(self, path: str, meta: Optional[dict] = None) -> Dict[str, Any]:
+        """Create a field by path: cluster/database/table/field[/subfield...]."""
+        return await self.client.create_field_by_path(path, meta)
+
+    async def create_fields(self, table_path: str, fields: Dict[str, Optional[dict]]) -> Dict[str, Any]:
+        """Create many fields of one table in one transaction (see PathClient.create_fields)."""
+        cluster, database, table = table_path.split("/", 2)
+        items = [{"path": path, "meta": meta if meta is not None else {}} for path, meta in fields.items()]
+        return await self.client.create_fields_by_table_path(cluster, database, table, items)
+
+    # --- Edit ---
+    async def edit_table_description(self, path: str, description: str) -> Any:
+        """Edit the description of a table by path."""
+        cluster, database, table = path.split("/", 2)
+        return await self.client.update_table_by_path(cluster, database, table, {"description": description})
+
+    async def edit_field_description(self, path: str, description: str) -> Any:
+        """Edit the description of a field by path."""
+        return await self._patch_field_meta(path, {"description": description})
+
+    async def edit_field_example(self, path: str, example: str) -> Any:
+        """Edit the example of a field by path."""
+        return await self._patch_field_meta(path, {"example": example})
+
+    async def edit_field_information(self, path: str, information: str) -> Any:
+        """Edit the information of a field by path."""
+        return await self._patch_field_meta(path, {"information": information})
+
+    async def edit_field_type(self, path: str, type_value: str) -> Any:
+        """Edit the type of a field by path."""
+        return await self._patch_field_meta(path, {"type": type_value})
+
+    async def add_field_metadata(self, path: str, metadata: Dict[str, Any]) -> Any:
+        """Add (merge) metadata to a field by path."""
+        return await self._patch_field_meta(path, metadata)
+
+    async def edit_field_metadata(self, path: str, metadata: Dict[str, Any]) -> Any:
+        """Overwrite only the provided keys in the field's metadata by path (nested objects are merged)."""
+        return await self._patch_field_meta(path, metadata)
+
+    async def remove_field_metadata(self, path: str, keys: List[str]) -> Any:
+        """Remove keys from the field's metadata by path ('type' cannot be removed)."""
+        return await self._patch_field_meta(path, {key: None for key in keys})
+
+    async def bulk_edit_metadata(self, edits: Dict[str, Dict[str, Any]], batch_size: int = 10000) -> Dict[str, Any]:
+        """Merge metadata into many fields at once ({path: metadata}); batches are sent concurrently."""
+        items = list(edits.items())
+        responses = await asyncio.gather(*[
+            self.client.batch_merge_field_meta([{"path": path, "patch": meta} for path, meta in items[start:start + batch_size]])
+            for start in range(0, len(items), batch_size)
+        ])
+        summary: Dict[str, Any] = {"updated": 0, "failed": {}}
+        for response in responses:
+            summary["updated"] += response["updated"]
+            for result in response["results"]:
+                if result["status"] != "ok":
+                    summary["failed"][result["path"]] = result.get("error", result["status"])
+        return summary
+
+    async def edit_fields(self, edits: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Apply many field edits in one transaction (see PathClient.edit_fields)."""
+        operations = [{"path": edit.get("path"), "patch": _edit_patch(edit)} for edit in edits]
+        if not operations:
+            return {"updated": 0, "failed": 0, "results": []}
+        response = await self.client.batch_merge_field_meta(operations, commit_every=len(operations))
+        for result in response["results"]:
+            result.pop("id", None)
+        return response
+
+    # --- Delete ---
+    async def delete_cluster(self, path: str) -> Any:
+        """Delete a cluster by name (path = cluster_name)."""
+        return await self.client.delete_cluster_by_path(path)
+
+    async def delete_database(self, path: str) -> Any:
+        """Delete a database by path (cluster/database)."""
+        cluster, database = path.split("/", 1)
+        return await self.client.delete_database_by_path(cluster, database)
+
+    async def delete_table(self, path: str) -> Any:
+        """Delete a table by path (cluster/database/table)."""
+        cluster, database, table = path.split("/", 2)
+        return await self.client.delete_table_by_path(cluster, database, table)
+
+    async def delete_field(self, path: str) -> Any:
+        """Delete a field by path (cluster/database/table/field[/subfield...])."""
+        return await self.client.delete_field_by_path(path)
+
+    # --- Get ---
+    async def get_field(self, path: str) -> Dict[str, Any]:
+        """Get all information of a field by path."""
+        return await self.client.get_field_by_path(path)
+
+    async def get_field_metadata(self, path: str, list_of_keys: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+        """Get metadata of a field by path. Optionally filter by keys."""
+        meta = await self.client.get_field_meta_by_path(path)
+        if meta is None:
+            return None
+        if list_of_keys is not None:
+            return {k: meta.get(k) for k in list_of_keys if k in meta}
+        return meta
+
+    async def get_fields(self, paths: List[str], include_meta: bool = True) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Get id, parent id, table id and meta of many fields by path; chunks are resolved concurrently."""
+        chunks = await asyncio.gather(*[
+            self.client.resolve_field_paths(paths[start:start + RESOLVE_CHUNK], include_meta=include_meta)
+            for start in range(0, len(paths), RESOLVE_CHUNK)
+        ])
+        return {r['path']: (r if r['found'] else None) for results in chunks for r in results}
+
+    async def gather_meta(self, paths: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Metadata of many fields by path ({path: meta}); missing paths map to None."""
+        fields = await self.get_fields(paths, include_meta=True)
+        return {path: (field['meta'] if field else None) for path, field in fields.items()}
+
+    async def get_connected_databases(self, db_path: str) -> List[str]:
+        """Given a database path (cluster/database), return all other databases connected to it by any edge."""
+        cluster, database = db_path.split("/", 1)
+        tables = await self.client.get_tables_by_database_name(cluster, database)
+        table_fields = await asyncio.gather(*[
+            self.client.list_field_paths_by_table_path(cluster, database, table['name']) for table in tables
+        ])
+        field_paths = [path for paths in table_fields for path in paths]
+        edges = await asyncio.gather(*[self.client.get_equivalents(path) for path in field_paths])
+        connected_databases = set()
+        for equivalents in edges:
+            for eq in equivalents:
+                eq_parts = eq['path'].split("/")
+                if len(eq_parts) >= 3:
+                    eq_db_path = f"{eq_parts[0]}/{eq_parts[1]}"
+                    if eq_db_path != db_path:
+                        connected_databases.add(eq_db_path)
+        return sorted(connected_databases)
+
+    # --- Edge ---
+    async def add_edge(self, path1: str, path2: str) -> Any:
+        """Add an edge between two fields by path."""
+        return await self.client.add_equivalence(path1, path2)
+
+    async def remove_edge(self, path1: str, path2: str) -> Any:
+        """Remove an edge between two fields by path (removes both directions)."""
+        return await self.client.remove_equivalence(path1, path2)
+
+    async def add_edges(self, pairs: List[Tuple[str, str]], edge_type: str = "equivalence") -> Dict[str, Any]:
+        """Add many edges between fields by path in one call; existing edges are skipped."""
+        return await self.client.bulk_create_edges(pairs, edge_type=edge_type)
+
+    async def get_edges(self, path: str) -> List[Dict[str, Any]]:
+        """Get all edges for a field by path."""
+        return await self.client.get_equivalents(path)
+
+    async def get_shortest_path(self, path1: str, path2: str, edge_types: Optional[List[str]] = None, max_depth: int = 6) -> Dict[str, Any]:
+        """Get the shortest chain of edges connecting two fields by path."""
+        return await self.client.get_shortest_path(path1, path2, edge_types=edge_types, max_depth=max_depth)
+
+    async def get_join_path(self, table_path1: str, table_path2: str, edge_types: Optional[List[str]] = None, max_hops: int = 6) -> Dict[str, Any]:
+        """Plan the joins between two tables by path, listing the field pairs joining each hop."""
+        return await self.client.get_join_path(table_path1, table_path2, edge_types=edge_types, max_hops=max_hops)
+
+    # --- List ---
+    async def list_clusters(self) -> List[str]:
+        """List all cluster names."""
+        return [c['name'] for c in await self.client.get_clusters()]
+
+    async def list_database(self, clusters: Optional[Union[str, List[str]]] = None) -> List[str]:
+        """List all database paths for given clusters (or all if None)."""
+        all_clusters = await self.client.get_clusters()
+        if clusters is None:
+            wanted = all_clusters
+        else:
+            names = [clusters] if isinstance(clusters, str) else clusters
+            by_name = {c['name']: c for c in all_clusters}
+            missing = [name for name in names if name not in by_name]
+            if missing:
+                raise APIClientError(f"Cluster '{missing[0]}' not found")
+            wanted = [by_name[name] for name in names]
+        dbs = await asyncio.gather(*[self.client.get_databases(c['id']) for c in wanted])
+        return [f"{c['name']}/{db['name']}" for c, cluster_dbs in zip(wanted, dbs) for db in cluster_dbs]
+
+    async def list_fields(self, path: str = "") -> List[str]:
+        """List all field paths derived from the input path; tables are listed concurrently."""
+        parts = path.split("/") if path else []
+        if len(parts) == 3:
+            return await self.client.list_field_paths_by_table_path(*parts)
+        tables = []
+        for db_path in await self.list_database():
+            cluster, database = db_path.split("/", 1)
+            tables.append((cluster, database))
+        # One get_tables per database, then one field listing per table, each level gathered
+        table_lists = await asyncio.gather(*[
+            self.client.get_tables_by_database_name(cluster, database) for cluster, database in tables
+        ])
+        table_paths = [(cluster, database, table['name'])
+                       for (cluster, database), db_tables in zip(tables, table_lists) for table in db_tables]
+        field_lists = await asyncio.gather(*[self.client.list_field_paths_by_table_path(*table) for table in table_paths])
+        all_fields = [field for fields in field_lists for field in fields]
+        return [f for f in all_fields if f.startswith(path)] if path else all_fields
+
+    async def get_hierarchy(self, path: str, filter: Optional[List[Tuple[str, Any]]] = None) -> List[str]:
+        """Return a list of all field paths derived from the input path, optionally filtered by metadata key-value pairs."""
+        all_fields = await self.list_fields(path)
+        if not filter:
+            return all_fields
+        metas = await self.gather_meta(all_fields)
+        return [fpath for fpath in all_fields
+                if metas.get(fpath) is not None and all(metas[fpath].get(k) == v for k, v in filter)]
+
+    async def list_fields_page(self, path: str = "", cursor: Optional[int] = None, limit: int = 1000,
+                               max_bytes: Optional[int] = None) -> Dict[str, Any]:
+        """One page of the field paths under path, paged on the server (see PathClient.list_fields_page)."""
+        return await self.client.list_field_paths_page(path, cursor=cursor, limit=limit, max_bytes=max_bytes)
+
+    async def get_hierarchy_page(self, path: str, filter: Optional[List[Tuple[str, Any]]] = None,
+                                 cursor: Optional[int] = None, limit: int = 1000,
+                                 max_bytes: Optional[int] = None) -> Dict[str, Any]:
+        """list_fields_page of the fields whose metadata has every filter key-value pair, filtered on the server."""
+        return await self.client.list_field_paths_page(path, cursor=cursor, limit=limit, max_bytes=max_bytes,
+                                                       meta_filter=dict(filter) if filter else None)
+
+    async def list_database_page(self, clusters: Optional[Union[str, List[str]]] = None, cursor: Optional[int] = None,
+                                 limit: int = 1000, max_bytes: Optional[int] = None) -> Dict[str, Any]:
+        """One page of the database paths of the given clusters (or all), paged like list_fields_page."""
+        if isinstance(clusters, str):
+            clusters = [clusters]
+        return await self.client.list_database_paths_page(clusters, cursor=cursor, limit=limit, max_bytes=max_bytes)
+
+    async def summarize_fields(self, path: str = "", filter: Optional[List[Tuple[str, Any]]] = None, sample: int = 20,
+                               max_tables: int = 100) -> Dict[str, Any]:
+        """Number of fields under path in total and per table, with the first sample paths, instead of every path."""
+        return await self.client.summarize_field_paths(path, meta_filter=dict(filter) if filter else None,
+                                                       sample=sample, max_tables=max_tables)
+
+    # --- Internal helpers ---
+    async def _patch_field_meta(self, path: str, meta: Dict[str, Any]) -> Any:
+        """Merge meta into the field's metadata by path in a single server-side update."""
+        return await self.client.merge_field_meta_by_path(path, meta)
@@ -1,13 +1,228 @@
+import json
+import threading
+import time
 import requests
-from typing import Any, Dict, List, Optional, Union
+from contextlib import contextmanager
+from urllib.parse import quote
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+from .transport import DEFAULT_TIMEOUT, HTTPTransport, shared_transport
 
 class APIClientError(Exception):
     """Custom exception for API client errors."""
     pass
 
+class BatchResult:
+    """Result of a call queued on a ClientBatch; available once the batch has been sent."""
+
+    def __init__(self, transform: Optional[Callable[[Any], Any]] = None):
+        self._transform = transform
+        self._value: Any = None
+        self.sent = False
+        self.status: Optional[int] = None
+        self.error: Optional[str] = None
+
+    def _resolve(self, item: Optional[Dict[str, Any]], committed: bool):
+        self.sent = True
+        if item is None:
+            self.error = "Not run: an earlier operation failed and the batch was rolled back"
+            return
+        self.status = item["status"]
+        if item["status"] >= 400:
+            self.error = item.get("error")
+        elif not committed:
+            self.error = "Rolled back: a later operation in the atomic batch failed"
+        else:
+            result = item.get("result")
+            self._value = self._transform(result) if self._transform else result
+
+    @property
+    def value(self) -> Any:
+        if not self.sent:
+            raise APIClientError("Batch has not been sent yet")
+        if self.error is not None:
+            raise APIClientError(f"HTTP {self.status}: {self.error}" if self.status else self.error)
+        return self._value
+
+
+class ClientBatch:
+    """
+    Queue of client calls sent together as one POST /batch. The methods mirror
+    DBDescClient's but return BatchResult placeholders.
+    """
+
+    def __init__(self, client: "DBDescClient", atomic: bool = False):
+        self.client = client
+        self.atomic = atomic
+        self.committed: Optional[bool] = None
+        self._operations: List[Dict[str, Any]] = []
+        self._results: List[BatchResult] = []
+
+    def _queue(self, op: str, args: Dict[str, Any], transform: Optional[Callable[[Any], Any]] = None) -> BatchResult:
+        result = BatchResult(transform)
+        self._operations.append({'op': op, 'args': args})
+        self._results.append(result)
+        return result
+
+    def create_database_by_path(self, path: str) -> BatchResult:
+        return self._queue('create_database', {'path': path})
+
+    def create_table_by_path(self, path: str) -> BatchResult:
+        return self._queue('create_table', {'path': path})
+
+    def create_field_by_path(self, path: str, meta: Optional[dict] = None) -> BatchResult:
+        return self._queue('create_field', {'path': path, 'meta': meta or {}})
+
+    def delete_field_by_path(self, path: str) -> BatchResult:
+        return self._queue('delete_field', {'path': path})
+
+    def get_field_by_path(self, path: str) -> BatchResult:
+        return self._queue('get_field', {'path': path})
+
+    def get_field_meta_by_path(self, path: str) -> BatchResult:
+        return self._queue('get_meta', {'path': path})
+
+    def patch_field_meta_by_path(self, path: str, meta: dict) -> BatchResult:
+        return self._queue('patch_meta', {'path': path, 'meta': meta})
+
+    def merge_field_meta_by_path(self, path: str, patch: dict) -> BatchResult:
+        return self._queue('patch_meta', {'path': path, 'meta': patch, 'mode': 'merge'})
+
+    def resolve_field_paths(self, paths: List[str], include_meta: bool = False) -> BatchResult:
+        return self._queue('resolve_fields', {'paths': paths, 'include_meta': include_meta}, lambda r: r['results'])
+
+    def get_equivalents(self, field_path: str) -> BatchResult:
+        return self._queue('get_equivalents', {'path': field_path}, lambda r: r.get('equivalents', []))
+
+    def add_equivalence(self, from_path: str, to_path: str) -> BatchResult:
+        return self._queue('add_equivalence', {'from_path': from_path, 'to_path': to_path})
+
+    def remove_equivalence(self, from_path: str, to_path: str) -> BatchResult:
+        return self._queue('remove_equivalence', {'from_path': from_path, 'to_path': to_path})
+
+    def get_possibly_equivalents(self, field_path: str) -> BatchResult:
+        return self._queue('get_possibly_equivalents', {'path': field_path}, lambda r: r.get('equivalents', []))
+
+    def add_possibly_equivalence(self, from_path: str, to_path: str) -> BatchResult:
+        return self._queue('add_possibly_equivalence', {'from_path': from_path, 'to_path': to_path})
+
+    def remove_possibly_equivalence(self, from_path: str, to_path: str) -> BatchResult:
+        return self._queue('remove_possibly_equivalence', {'from_path': from_path, 'to_path': to_path})
+
+    def add_lineage(self, from_path: str, to_path: str) -> BatchResult:
+        return self._queue('add_lineage', {'from_path': from_path, 'to_path': to_path})
+
+    def remove_lineage(self, from_path: str, to_path: str) -> BatchResult:
+        return self._queue('remove_lineage', {'from_path': from_path, 'to_path': to_path})
+
+    def flush(self) -> bool:
+        """Send the queued calls and fill in their results; raises APIClientError if an atomic batch was rolled back."""
+        if not self._operations:
+            return True
+        operations, results = self._operations, self._results
+        self._operations, self._results = [], []
+        resp = self.client.http.post(f"{self.client.base_url}/batch", json={'operations': operations, 'atomic': self.atomic})
+        data = self.client._handle_response(resp)
+        self.committed = data['committed']
+        items = data['results']
+        for index, result in enumerate(results):
+            result._resolve(items[index] if index < len(items) else None, self.committed)
+        if not self.committed:
+            failed = items[-1]
+            raise APIClientError(f"Batch rolled back: operation {failed['index']} ({failed['op']}) failed with "
+                                 f"HTTP {failed['status']}: {failed.get('error')}")
+        return True
+
+
+class IdCache:
+    """
+    Name to id cache for clusters, databases and tables, keyed by name tuples such as
+    (cluster, database). Entries expire after `ttl` seconds (0 disables caching); a client
+    drops the entries of what it renames or deletes itself, and the TTL bounds how long
+    changes made by other clients can go unnoticed.
+    """
+
+    def __init__(self, ttl: float = 60.0):
+        self.ttl = ttl
+        self._ids: Dict[Tuple[str, ...], Tuple[int, float]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple[str, ...]) -> Optional[int]:
+        with self._lock:
+            entry = self._ids.get(key)
+            if entry is None:
+                return None
+            if entry[1] <= time.monotonic():
+                del self._ids[key]
+                return None
+            return entry[0]
+
+    def put(self, key: Tuple[str, ...], ids: List[int]):
+        """Cache the ids of every level of key: ids[i] is the id of key[:i + 1]."""
+        if self.ttl <= 0:
+            return
+        expires = time.monotonic() + self.ttl
+        with self._lock:
+            for depth, obj_id in enumerate(ids, start=1):
+                self._ids[key[:depth]] = (obj_id, expires)
+
+    def forget(self, key: Tuple[str, ...]):
+        """Drop key and every key below it."""
+        with self._lock:
+            for cached in [k for k in self._ids if k[:len(key)] == key]:
+                del self._ids[cached]
+
+    def forget_id(self, depth: int, obj_id: int):
+        """Drop the entries for the object with this id at depth 1 (cluster), 2 (database) or 3 (table)."""
+        with self._lock:
+            keys = [k for k, (cached_id, _) in self._ids.items() if len(k) == depth and cached_id == obj_id]
+        for key in keys:
+            self.forget(key)
+
+    def clear(self):
+        with self._lock:
+            self._ids.clear()
+
+
 class DBDescClient:
-    def __init__(self, base_url: str = "http://backend:8000"):
+    """
+    Client for the backend REST API. Calls go through a pooled keep-alive transport with
+    timeouts and retries: pass `transport` to share one between clients, or the pool and
+    retry settings to get a dedicated one. Cluster, database and table ids looked up by
+    name are cached for `id_cache_ttl` seconds.
+    """
+
+    def __init__(self, base_url: str = "http://backend:8000", transport: Optional[HTTPTransport] = None,
+                 pool_size: int = 10, timeout: Union[float, Tuple[float, float]] = DEFAULT_TIMEOUT,
+                 retries: int = 3, backoff_factor: float = 0.2, id_cache_ttl: float = 60.0):
         self.base_url = base_url.rstrip("/")
+        self.ids = IdCache(id_cache_ttl)
+        self._owns_transport = transport is None
+        self.http = transport or HTTPTransport(pool_size=pool_size, timeout=timeout, retries=retries,
+                                               backoff_factor=backoff_factor)
+
+    def close(self):
+        """Close the pooled connections, unless the transport was passed in and may be shared."""
+        if self._owns_transport:
+            self.http.close()
+
+    @contextmanager
+    def batch(self, atomic: bool = False) -> Iterator[ClientBatch]:
+        """Queue calls on the yielded batch and send them as one request when the block exits."""
+        queued = ClientBatch(self, atomic=atomic)
+        yield queued
+        queued.flush()
+
+    def resolve_ids(self, *names: str) -> int:
+        """Id of the cluster, database or table named by (cluster[, database[, table]]), from the cache when fresh."""
+        cached = self.ids.get(names)
+        if cached is not None:
+            return cached
+        path = '/'.join(quote(name, safe='') for name in names)
+        resp = self.http.get(f"{self.base_url}/ids/by-path/{path}")
+        found = self._handle_response(resp)
+        ids = [found[key] for key in ("cluster_id", "database_id", "table_id")[:len(names)]]
+        self.ids.put(names, ids)
+        return ids[-1]
 
     def _handle_response(self, resp: requests.Response) -> Any:
         try:
@@ -25,83 +240,71 @@ class DBDescClient:
     # --- Cluster ---
     def create_cluster(self, name: str) -> Dict[str, Any]:
         """Create a new cluster."""
-        resp = requests.post(f"{self.base_url}/clusters/", json={"name": name})
+        resp = self.http.post(f"{self.base_url}/clusters/", json={"name": name})
         return self._handle_response(resp)
 
     def get_clusters(self) -> List[Dict[str, Any]]:
         """List all clusters."""
-        resp = requests.get(f"{self.base_url}/clusters/")
+        resp = self.http.get(f"{self.base_url}/clusters/")
         return self._handle_response(resp)
 
     def delete_cluster(self, cluster_id: int) -> Any:
         """Delete a cluster by ID."""
-        resp = requests.delete(f"{self.base_url}/clusters/{cluster_id}")
+        self.ids.forget_id(1, cluster_id)
+        resp = self.http.delete(f"{self.base_url}/clusters/{cluster_id}")
         return self._handle_response(resp)
 
     def update_cluster(self, cluster_id: int, name: str) -> Any:
         """Update a cluster's name by ID."""
-        clusters = self.get_clusters()
-        cluster_name = next((c['name'] for c in clusters if c['id'] == cluster_id), None)
-        if not cluster_name:
-            raise APIClientError(f"Cluster with ID {cluster_id} not found")
-        resp = requests.patch(f"{self.base_url}/clusters/by-path/{cluster_name}", json={"name": name})
+        self.ids.forget_id(1, cluster_id)
+        resp = self.http.patch(f"{self.base_url}/clusters/{cluster_id}", json={"name": name})
         return self._handle_response(resp)
 
     # --- Database ---
     def create_database(self, cluster_id: int, name: str) -> Dict[str, Any]:
         """Create a database in a cluster by cluster ID."""
-        resp = requests.post(f"{self.base_url}/clusters/{cluster_id}/databases/", json={"name": name})
+        resp = self.http.post(f"{self.base_url}/clusters/{cluster_id}/databases/", json={"name": name})
         return self._handle_response(resp)
 
     def get_databases(self, cluster_id: int) -> List[Dict[str, Any]]:
         """List all databases in a cluster by cluster ID."""
-        resp = requests.get(f"{self.base_url}/clusters/{cluster_id}/databases/")
+        resp = self.http.get(f"{self.base_url}/clusters/{cluster_id}/databases/")
         return self._handle_response(resp)
 
     def delete_database(self, database_id: int) -> Any:
         """Delete a database by ID."""
-        resp = requests.delete(f"{self.base_url}/databases/{database_id}")
+        self.ids.forget_id(2, database_id)
+        resp = self.http.delete(f"{self.base_url}/databases/{database_id}")
         return self._handle_response(resp)
 
     def update_database(self, database_id: int, name: str) -> Any:
         """Update a database's name by ID."""
-        clusters = self.get_clusters()
-        for c in clusters:
-            dbs = self.get_databases(c['id'])
-            for db in dbs:
-                if db['id'] == database_id:
-                    resp = requests.patch(f"{self.base_url}/databases/by-path/{c['name']}/{db['name']}", json={"name": name})
-                    return self._handle_response(resp)
-        raise APIClientError(f"Database with ID {database_id} not found")
+        self.ids.forget_id(2, database_id)
+        resp = self.http.patch(f"{self.base_url}/databases/{database_id}", json={"name": name})
+        return self._handle_response(resp)
 
     # --- Table ---
     def create_table(self, database_id: int, name: str) -> Dict[str, Any]:
         """Create a table in a database by database ID."""
-        resp = requests.post(f"{self.base_url}/databases/{database_id}/tables/", json={"name": name})
+        resp = self.http.post(f"{self.base_url}/databases/{database_id}/tables/", json={"name": name})
         return self._handle_response(resp)
 
     def get_tables(self, database_id: int) -> List[Dict[str, Any]]:
         """List all tables in a database by database ID."""
-        resp = requests.get(f"{self.base_url}/databases/{database_id}/tables/")
+        resp = self.http.get(f"{self.base_url}/databases/{database_id}/tables/")
         return self._handle_response(resp)
 
     def delete_table(self, table_id: int) -> Any:
         """Delete a table by ID."""
-        resp = requests.delete(f"{self.base_url}/tables/{table_id}")
+        self.ids.forget_id(3, table_id)
+        resp = self.http.delete(f"{self.base_url}/tables/{table_id}")
         return self._handle_response(resp)
 
     def update_table(self, table_id: int, name: str) -> Any:
         """Update a table's name by ID."""
-        clusters = self.get_clusters()
-        for c in clusters:
-            dbs = self.get_databases(c['id'])
-            for db in dbs:
-                tables = self.get_tables(db['id'])
-                for table in tables:
-                    if table['id'] == table_id:
-                        resp = requests.patch(f"{self.base_url}/tables/by-path/{c['name']}/{db['name']}/{table['name']}", json={"name": name})
-                        return self._handle_response(resp)
-        raise APIClientError(f"Table with ID {table_id} not found")
+        self.ids.forget_id(3, table_id)
+        resp = self.http.patch(f"{self.base_url}/tables/{table_id}", json={"name": name})
+        return self._handle_response(resp)
 
     # --- Field ---
     def create_field(self, table_id: int, name: str, parent_id: Optional[int] = None, meta: Optional[dict] = None) -> Dict[str, Any]:
@@ -111,39 +314,125 @@ class DBDescClient:
             data["parent_id"] = parent_id
         if meta is not None:
             data["meta"] = meta
-        resp = requests.post(f"{self.base_url}/tables/{table_id}/fields/", json=data)
+        resp = self.http.post(f"{self.base_url}/tables/{table_id}/fields/", json=data)
         return self._handle_response(resp)
 
     def get_fields(self, table_id: int) -> List[Dict[str, Any]]:
         """List all fields in a table by table ID."""
-        resp = requests.get(f"{self.base_url}/tables/{table_id}/fields/")
+        resp = self.http.get(f"{self.base_url}/tables/{table_id}/fields/")
         return self._handle_response(resp)
 
     def delete_field(self, field_id: int) -> Any:
         """Delete a field by ID."""
-        resp = requests.delete(f"{self.base_url}/fields/{field_id}")
+        resp = self.http.delete(f"{self.base_url}/fields/{field_id}")
         return self._handle_response(resp)
 
     def update_field_meta(self, field_id: int, meta: dict) -> Any:
         """Update a field's meta by field ID."""
-        resp = requests.patch(f"{self.base_url}/fields/{field_id}/meta", json=meta)
+        resp = self.http.patch(f"{self.base_url}/fields/{field_id}/meta", json=meta)
         return self._handle_response(resp)
 
     # --- Edge ---
     def create_edge(self, from_field_id: int, to_field_id: int, type: str) -> Dict[str, Any]:
         """Create an edge between two fields."""
         data = {"from_field_id": from_field_id, "to_field_id": to_field_id, "type": type}
-        resp = requests.post(f"{self.base_url}/edges/", json=data)
+        resp = self.http.post(f"{self.base_url}/edges/", json=data)
+        return self._handle_response(resp)
+
+    def get_edge_types(self) -> List[Dict[str, Any]]:
+        """List the registered edge types with their codes and direction."""
+        resp = self.http.get(f"{self.base_url}/edge-types/")
+        return self._handle_response(resp)
+
+    def create_edge_type(self, name: str, directed: bool = True) -> Dict[str, Any]:
+        """Register an edge type; undirected types are stored once per field pair."""
+        resp = self.http.post(f"{self.base_url}/edge-types/", json={'name': name, 'directed': directed})
+        return self._handle_response(resp)
+
+    def bulk_create_edges(self, edges: List[tuple], edge_type: Optional[str] = None, strict: bool = False) -> Dict[str, Any]:
+        """Create many edges in one transaction; edges are (from, to[, type]) with field ids or paths."""
+        body = {'type': edge_type, 'edges': [
+            {'from': edge[0], 'to': edge[1], 'type': edge[2] if len(edge) > 2 else None} for edge in edges
+        ]}
+        resp = self.http.post(f"{self.base_url}/edges/bulk", params={'strict': strict}, json=body)
+        return self._handle_response(resp)
+
+    def bulk_create_edges_csv(self, data: Union[str, bytes, Any], edge_type: Optional[str] = None,
+                              strict: bool = False) -> Dict[str, Any]:
+        """Create edges from CSV text or an open file with a from,to[,type] header."""
+        params: Dict[str, Any] = {'strict': strict}
+        if edge_type:
+            params['type'] = edge_type
+        resp = self.http.post(f"{self.base_url}/edges/bulk", params=params, data=data,
+                              headers={'Content-Type': 'text/csv'})
         return self._handle_response(resp)
 
     def get_edges(self, field_id: int) -> List[Dict[str, Any]]:
         """List all edges connected to a field by field ID."""
-        resp = requests.get(f"{self.base_url}/fields/{field_id}/edges/")
+        resp = self.http.get(f"{self.base_url}/fields/{field_id}/edges/")
         return self._handle_response(resp)
 
     def delete_edge(self, edge_id: int) -> Any:
         """Delete an edge by edge ID."""
-        resp = requests.delete(f"{self.base_url}/edges/{edge_id}")
+        resp = self.http.delete(f"{self.base_url}/edges/{edge_id}")
+        return self._handle_response(resp)
+
+    # --- Aggregated graphs ---
+    def get_database_graph(self, database_id: int, min_weight: int = 1, edge_types: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Get the table-to-table relationship graph of a database by database ID."""
+        params: Dict[str, Any] = {'min_weight': min_weight}
+        if edge_types:
+            params['edge_types'] = edge_types
+        resp = self.http.get(f"{self.base_url}/databases/{database_id}/graph/", params=params)
+        return self._handle_response(resp)
+
+    def get_cluster_graph(self, cluster_id: int, min_weight: int = 1, edge_types: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Get the database-to-database relationship graph of a cluster by cluster ID."""
+        params: Dict[str, Any] = {'min_weight': min_weight}
+        if edge_types:
+            params['edge_types'] = edge_types
+        resp = self.http.get(f"{self.base_url}/clusters/{cluster_id}/graph/", params=params)
+        return self._handle_response(resp)
+
+    def get_tables_graph(self, table_ids: Optional[List[int]] = None, seed_table_id: Optional[int] = None,
+                         radius: int = 1, max_tables: int = 50) -> Dict[str, Any]:
+        """Get one merged graph for several tables, or for the neighborhood of a seed table."""
+        params: Dict[str, Any] = {'radius': radius, 'max_tables': max_tables}
+        if table_ids:
+            params['table_ids'] = table_ids
+        if seed_table_id is not None:
+            params['seed_table_id'] = seed_table_id
+        resp = self.http.get(f"{self.base_url}/tables/graph/", params=params)
+        return self._handle_response(resp)
+
+    def get_table_graph(self, table_id: int, parent_id: Optional[int] = None, depth: Optional[int] = None,
+                        format: str = "json") -> Dict[str, Any]:
+        """Get the graph of a table, optionally only the subtree below parent_id and/or as parallel arrays (format="columnar")."""
+        params: Dict[str, Any] = {'format': format}
+        if parent_id is not None:
+            params['parent_id'] = parent_id
+        if depth is not None:
+            params['depth'] = depth
+        resp = self.http.get(f"{self.base_url}/tables/{table_id}/graph/", params=params)
+        return self._handle_response(resp)
+
+    def iter_table_graph(self, table_id: int, parent_id: Optional[int] = None, depth: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """Stream the graph of a table record by record (NDJSON) without loading the whole response."""
+        params: Dict[str, Any] = {'format': 'ndjson'}
+        if parent_id is not None:
+            params['parent_id'] = parent_id
+        if depth is not None:
+            params['depth'] = depth
+        with self.http.get(f"{self.base_url}/tables/{table_id}/graph/", params=params, stream=True) as resp:
+            if not resp.ok:
+                self._handle_response(resp)
+            for line in resp.iter_lines():
+                if line:
+                    yield json.loads(line)
+
+    def get_table_graph_delta(self, table_id: int, since: int) -> Dict[str, Any]:
+        """Get the changes to a table's graph since a revision (full=True carries the whole graph instead)."""
+        resp = self.http.get(f"{self.base_url}/tables/{table_id}/graph/delta", params={'since': since})
         return self._handle_response(resp)
 
     # --- Path-based helpers ---
@@ -152,28 +441,19 @@ class DBDescClient:
         parts = path.split('/')
         if len(parts) != 2:
             raise APIClientError(f"Invalid path format: '{path}'. Expected format: 'cluster/database'")
-        cluster_name, database_name = parts
-        clusters = self.get_clusters()
-        cluster = next((c for c in clusters if c['name'] == cluster_name), None)
-        if not cluster:
-            raise APIClientError(f"Cluster '{cluster_name}' does not exist.")
-        return self.create_database(cluster['id'], database_name)
+        resp = self.http.post(f"{self.base_url}/databases/by-path/{path}")
+        return self._handle_response(resp)
 
     def create_table_by_path(self, path: str) -> Dict[str, Any]:
         """Create a table by path (cluster/database/table)."""
         parts = path.split('/')
         if len(parts) != 3:
             raise APIClientError(f"Invalid path format: '{path}'. Expected format: 'cluster/database/table'")
-        cluster_name, database_name, table_name = parts
-        clusters = self.get_clusters()
-        cluster = next((c for c in clusters if c['name'] == cluster_name), None)
-        if not cluster:
-            raise APIClientError(f"Cluster '{cluster_name}' does not exist.")
-        databases = self.get_databases(cluster['id'])
-        database = next((db for db in databases if db['name'] == database_name), None)
-        if not database:
-            raise APIClientError(f"Database '{database_name}' does not exist in cluster '{cluster_name}'.")
-        return self.create_table(database['id'], table_name)
+        resp = self.http.post(f"{self.base_url}/tables/by-path/{path}")
+        if resp.status_code == 400 and "already exists" in resp.text:
+            # Creating an existing table returns it, as create_table does
+            resp = self.http.get(f"{self.base_url}/tables/by-path/{path}")
+        return self._handle_response(resp)
 
     def create_field_by_path(self, path: str, meta: Optional[dict] = None) -> Dict[str, Any]:
         """Create a field by path (cluster/database/table/field[/subfield...])."""
@@ -181,19 +461,60 @@ class DBDescClient:
         if len(parts) < 4:
             raise APIClientError(f"Invalid path format: '{path}'. Expected format: 'cluster/database/table/field[/subfield...]'")
         data = meta if meta is not None else {}
-        resp = requests.post(f"{self.base_url}/fields/by-path/{path}", json=data)
+        resp = self.http.post(f"{self.base_url}/fields/by-path/{path}", json=data)
+        return self._handle_response(resp)
+
+    def create_fields_by_table_path(self, cluster: str, database: str, table: str,
+                                    fields: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Create many fields of a table in one transaction; fields are {"path" (relative to the table), "meta"} dicts."""
+        resp = self.http.post(f"{self.base_url}/fields/by-table-path/{cluster}/{database}/{table}", json={'fields': fields})
         return self._handle_response(resp)
 
     def list_field_paths_by_table_path(self, cluster: str, database: str, table: str) -> List[str]:
         """List all field and subfield paths under the specified table."""
-        resp = requests.get(f"{self.base_url}/fields/by-table-path/{cluster}/{database}/{table}")
+        resp = self.http.get(f"{self.base_url}/fields/by-table-path/{cluster}/{database}/{table}")
         return self._handle_response(resp).get("paths", [])
 
+    def list_field_paths_page(self, path: str = "", cursor: Optional[int] = None, limit: int = 1000,
+                              max_bytes: Optional[int] = None, meta_filter: Optional[dict] = None) -> Dict[str, Any]:
+        """One page of the field paths under path: {"paths": [...], "next_cursor": int or None}."""
+        params: Dict[str, Any] = {'path': path, 'limit': limit}
+        if cursor is not None:
+            params['cursor'] = cursor
+        if max_bytes is not None:
+            params['max_bytes'] = max_bytes
+        if meta_filter:
+            params['filter'] = json.dumps(meta_filter)
+        resp = self.http.get(f"{self.base_url}/fields/paths/", params=params)
+        return self._handle_response(resp)
+
+    def summarize_field_paths(self, path: str = "", meta_filter: Optional[dict] = None, sample: int = 20,
+                              max_tables: int = 100) -> Dict[str, Any]:
+        """Field counts under path, in total and per table, with the first sample paths."""
+        params: Dict[str, Any] = {'path': path, 'sample': sample, 'max_tables': max_tables}
+        if meta_filter:
+            params['filter'] = json.dumps(meta_filter)
+        resp = self.http.get(f"{self.base_url}/fields/paths/summary", params=params)
+        return self._handle_response(resp)
+
+    def list_database_paths_page(self, clusters: Optional[List[str]] = None, cursor: Optional[int] = None,
+                                 limit: int = 1000, max_bytes: Optional[int] = None) -> Dict[str, Any]:
+        """One page of cluster/database paths, optionally of some clusters only."""
+        params: Dict[str, Any] = {'limit': limit}
+        if clusters:
+            params['cluster'] = clusters
+        if cursor is not None:
+            params['cursor'] = cursor
+        if max_bytes is not None:
+            params['max_bytes'] = max_bytes
+        resp = self.http.get(f"{self.base_url}/databases/paths/", params=params)
+        return self._handle_response(resp)
+
     def list_field_paths_with_empty_description_by_table_path(self, cluster: str, database: str, table: str) -> List[str]:
         """
         List all field and subfield paths under the specified table where the description is empty or missing.
         """
-        resp = requests.get(f"{self.base_url}/fields/by-table-path/{cluster}/{database}/{table}/empty-description")
+        resp = self.http.get(f"{self.base_url}/fields/by-table-path/{cluster}/{database}/{table}/empty-description")
         resp.raise_for_status()
         return resp.json().get("paths", [])
 
@@ -201,84 +522,93 @@ class DBDescClient:
         """
         List all field and subfield paths under the specified table where the 'type' in meta is missing or empty.
         """
-        resp = requests.get(f"{self.base_url}/fields/by-table-path/{cluster}/{database}/{table}/missing-type")
+        resp = self.http.get(f"{self.base_url}/fields/by-table-path/{cluster}/{database}/{table}/missing-type")
         resp.raise_for_status()
         return resp.json().get("paths", [])
 
     # --- Path-based DELETE ---
     def delete_cluster_by_path(self, cluster_name: str) -> Any:
         """Delete a cluster by name (path-based)."""
-        resp = requests.delete(f"{self.base_url}/clusters/by-path/{cluster_name}")
+        self.ids.forget((cluster_name,))
+        resp = self.http.delete(f"{self.base_url}/clusters/by-path/{cluster_name}")
         return self._handle_response(resp)
 
     def delete_database_by_path(self, cluster: str, database: str) -> Any:
         """Delete a database by path (cluster/database)."""
-        resp = requests.delete(f"{self.base_url}/databases/by-path/{cluster}/{database}")
+        self.ids.forget((cluster, database))
+        resp = self.http.delete(f"{self.base_url}/databases/by-path/{cluster}/{database}")
         return self._handle_response(resp)
 
     def delete_table_by_path(self, cluster: str, database: str, table: str) -> Any:
         """Delete a table by path (cluster/database/table)."""
-        resp = requests.delete(f"{self.base_url}/tables/by-path/{cluster}/{database}/{table}")
+        self.ids.forget((cluster, database, table))
+        resp = self.http.delete(f"{self.base_url}/tables/by-path/{cluster}/{database}/{table}")
         return self._handle_response(resp)
 
     def delete_field_by_path(self, path: str) -> Any:
         """Delete a field by path (cluster/database/table/field[/subfield...])."""
-        resp = requests.delete(f"{self.base_url}/fields/by-path/{path}")
+        resp = self.http.delete(f"{self.base_url}/fields/by-path/{path}")
         return self._handle_response(resp)
 
     # --- Path-based UPDATE ---
     def update_table_by_path(self, cluster: str, database: str, table: str, data: dict) -> Any:
         """Update a table by path (cluster/database/table)."""
-        resp = requests.patch(f"{self.base_url}/tables/by-path/{cluster}/{database}/{table}", json=data)
+        if 'name' in data:
+            self.ids.forget((cluster, database, table))
+        resp = self.http.patch(f"{self.base_url}/tables/by-path/{cluster}/{database}/{table}", json=data)
         return self._handle_response(resp)
 
     # --- Path-based GET helpers ---
     def get_tables_by_database_name(self, cluster: str, database: str) -> List[dict]:
         """Get all tables in a database by cluster/database name."""
-        # Find database ID by name
-        clusters = self.get_clusters()
-        cluster_obj = next((c for c in clusters if c['name'] == cluster), None)
-        if not cluster_obj:
-            raise APIClientError(f"Cluster '{cluster}' not found")
-        dbs = self.get_databases(cluster_obj['id'])
-        db_obj = next((db for db in dbs if db['name'] == database), None)
-        if not db_obj:
-            raise APIClientError(f"Database '{database}' not found in cluster '{cluster}'")
-        return self.get_tables(db_obj['id'])
+        return self.get_tables(self.resolve_ids(cluster, database))
 
     def get_databases_by_cluster_name(self, cluster: str) -> List[dict]:
         """Get all databases in a cluster by cluster name."""
-        clusters = self.get_clusters()
-        cluster_obj = next((c for c in clusters if c['name'] == cluster), None)
-        if not cluster_obj:
-            raise APIClientError(f"Cluster '{cluster}' not found")
-        return self.get_databases(cluster_obj['id'])
+        return self.get_databases(self.resolve_ids(cluster))
 
     def get_field_by_path(self, path: str) -> dict:
         """Get all information about a field or subfield node given its path (cluster/database/table/field[/subfield...])."""
-        resp = requests.get(f"{self.base_url}/fields/by-path/{path}")
+        resp = self.http.get(f"{self.base_url}/fields/by-path/{path}")
         return self._handle_response(resp)
 
     def get_field_meta_by_path(self, path: str) -> dict:
         """Get the meta dictionary for a field by path."""
-        resp = requests.get(f"{self.base_url}/fields/by-path/{path}/meta")
+        resp = self.http.get(f"{self.base_url}/fields/by-path/{path}/meta")
         return self._handle_response(resp)
 
+    def resolve_field_paths(self, paths: List[str], include_meta: bool = False) -> List[Dict[str, Any]]:
+        """Resolve many field paths in one call; each result has found=False or id, parent_id, table_id (and meta)."""
+        resp = self.http.post(f"{self.base_url}/fields/resolve", json={'paths': paths, 'include_meta': include_meta})
+        return self._handle_response(resp)['results']
+
     def patch_field_meta_by_path(self, path: str, meta: dict) -> dict:
         """Patch (update) the meta dictionary for a field by path."""
-        resp = requests.patch(f"{self.base_url}/fields/by-path/{path}/meta", json=meta)
+        resp = self.http.patch(f"{self.base_url}/fields/by-path/{path}/meta", json=meta)
+        return self._handle_response(resp)
+
+    def merge_field_meta_by_path(self, path: str, patch: dict) -> dict:
+        """Merge a patch into the meta of a field by path on the server (None values remove keys); returns the new meta."""
+        resp = self.http.patch(f"{self.base_url}/fields/by-path/{path}/meta", params={'mode': 'merge'}, json=patch)
+        return self._handle_response(resp)
+
+    def batch_merge_field_meta(self, operations: List[Dict[str, Any]], return_meta: bool = False,
+                               commit_every: int = 5000) -> Dict[str, Any]:
+        """Merge-patch many fields in one call; operations are {"path" or "id", "patch"} dicts."""
+        resp = self.http.patch(f"{self.base_url}/fields/meta:batch", params={'commit_every': commit_every},
+                               json={'operations': operations, 'return_meta': return_meta})
         return self._handle_response(resp)
 
     # --- Edge/Equivalence helpers ---
     def get_equivalents(self, field_path: str) -> List[dict]:
         """Get all equivalent fields (edges) for a field by path."""
-        resp = requests.get(f"{self.base_url}/fields/{field_path}/equivalence/")
+        resp = self.http.get(f"{self.base_url}/fields/{field_path}/equivalence/")
         data = self._handle_response(resp)
         return data.get('equivalents', [])
 
     def add_equivalence(self, from_path: str, to_path: str) -> dict:
         """Add an equivalence edge between two fields by path."""
-        resp = requests.post(f"{self.base_url}/equivalence/", params={
+        resp = self.http.post(f"{self.base_url}/equivalence/", params={
             'from_path': from_path,
             'to_path': to_path
         })
@@ -286,16 +616,71 @@ class DBDescClient:
 
     def remove_equivalence(self, from_path: str, to_path: str) -> dict:
         """Remove an equivalence edge between two fields by path."""
-        resp = requests.delete(f"{self.base_url}/equivalence/", params={
+        resp = self.http.delete(f"{self.base_url}/equivalence/", params={
             'from_path': from_path,
             'to_path': to_path
         })
         return self._handle_response(resp)
 
+    # --- Lineage ---
+    def add_lineage(self, from_path: str, to_path: str) -> dict:
+        """Record that to_path is derived from from_path; raises APIClientError (409) if it would create a cycle."""
+        resp = self.http.post(f"{self.base_url}/lineage/", params={'from_path': from_path, 'to_path': to_path})
+        return self._handle_response(resp)
+
+    def remove_lineage(self, from_path: str, to_path: str) -> dict:
+        """Remove the lineage edge from from_path to to_path."""
+        resp = self.http.delete(f"{self.base_url}/lineage/", params={'from_path': from_path, 'to_path': to_path})
+        return self._handle_response(resp)
+
+    def get_lineage(self, field_path: str, direction: str = 'downstream', max_depth: Optional[int] = None,
+                    limit: Optional[int] = None, include_paths: bool = True) -> dict:
+        """Fields upstream or downstream of a field; nodes carry their depth when max_depth is given."""
+        params: Dict[str, Any] = {'include_paths': include_paths}
+        if max_depth is not None:
+            params['max_depth'] = max_depth
+        if limit is not None:
+            params['limit'] = limit
+        resp = self.http.get(f"{self.base_url}/fields/{field_path}/lineage/{direction}", params=params)
+        return self._handle_response(resp)
+
+    def get_lineage_order(self, path: Optional[str] = None, direction: str = 'downstream',
+                          include_paths: bool = True) -> dict:
+        """Topological order of the lineage graph (or of one field's lineage), grouped into levels."""
+        params: Dict[str, Any] = {'direction': direction, 'include_paths': include_paths}
+        if path is not None:
+            params['path'] = path
+        resp = self.http.get(f"{self.base_url}/lineage/order", params=params)
+        return self._handle_response(resp)
+
+    def get_shortest_path(self, from_path: str, to_path: str, edge_types: Optional[List[str]] = None,
+                          max_depth: Optional[int] = None, timeout_ms: Optional[int] = None) -> dict:
+        """Get the shortest chain of edges between two fields by path."""
+        params: Dict[str, Any] = {'from_path': from_path, 'to_path': to_path}
+        if edge_types:
+            params['edge_types'] = edge_types
+        if max_depth is not None:
+            params['max_depth'] = max_depth
+        if timeout_ms is not None:
+            params['timeout_ms'] = timeout_ms
+        resp = self.http.get(f"{self.base_url}/shortest-path/", params=params)
+        return self._handle_response(resp)
+
+    def get_join_path(self, from_table: str, to_table: str, edge_types: Optional[List[str]] = None,
+                      max_hops: Optional[int] = None) -> dict:
+        """Plan the chain of table joins between two tables by path (cluster/database/table)."""
+        params: Dict[str, Any] = {'from_table': from_table, 'to_table': to_table}
+        if edge_types:
+            params['edge_types'] = edge_types
+        if max_hops is not None:
+            params['max_hops'] = max_hops
+        resp = self.http.get(f"{self.base_url}/join-path/", params=params)
+        return self._handle_response(resp)
+
 BASE_URL = 'http://localhost:8000'
 
 def add_equivalence(from_path: str, to_path: str):
-    r = requests.post(f'{BASE_URL}/equivalence/', params={
+    r = shared_transport().post(f'{BASE_URL}/equivalence/', params={
         'from_path': from_path,
         'to_path': to_path
     })
@@ -303,7 +688,7 @@ def add_equivalence(from_path: str, to_path: str):
     return r.json()
 
 def remove_equivalence(from_path: str, to_path: str):
-    r = requests.delete(f'{BASE_URL}/equivalence/', params={
+    r = shared_transport().delete(f'{BASE_URL}/equivalence/', params={
         'from_path': from_path,
         'to_path': to_path
     })
@@ -311,13 +696,12 @@ def remove_equivalence(from_path: str, to_path: str):
     return r.json()
 
 def list_equivalents(field_path: str):
-    r = requests.get(f'{BASE_URL}/fields/{field_path}/equivalence/')
+    r = shared_transport().get(f'{BASE_URL}/fields/{field_path}/equivalence/')
     r.raise_for_status()
     return r.json()['equivalents']
 
 def add_possibly_equivalence(from_path: str, to_path: str):
-    import requests
-    r = requests.post(f'{BASE_URL}/possibly-equivalence/', params={
+    r = shared_transport().post(f'{BASE_URL}/possibly-equivalence/', params={
         'from_path': from_path,
         'to_path': to_path
     })
@@ -326,8 +710,7 @@ def add_possibly_equivalence(from_path: str, to_path: str):
     return r.json()
 
 def remove_possibly_equivalence(from_path: str, to_path: str):
-    import requests
-    r = requests.delete(f'{BASE_URL}/possibly-equivalence/', params={
+    r = shared_transport().delete(f'{BASE_URL}/possibly-equivalence/', params={
         'from_path': from_path,
         'to_path': to_path
     })
@@ -340,7 +723,7 @@ API_URL = 'http://localhost:8000'
 NOT_FOUND = '__NOT_FOUND__'
 
 def list_clusters():
-    resp = requests.get(f'{API_URL}/clusters/')
+    resp = shared_transport().get(f'{API_URL}/clusters/')
     resp.raise_for_status()
     return resp.json()
 
@@ -353,7 +736,7 @@ def list_databases(cluster_id=None):
             dbs = list_databases(c['id'])  # Use cluster ID
             all_dbs.extend(dbs)
         return all_dbs
-    resp = requests.get(f'{API_URL}/clusters/{cluster_id}/databases/')
+    resp = shared_transport().get(f'{API_URL}/clusters/{cluster_id}/databases/')
     resp.raise_for_status()
     return resp.json()
 
@@ -366,7 +749,7 @@ def list_tables(database_id=None):
             tables = list_tables(db['id'])  # Use database ID
             all_tables.extend(tables)
         return all_tables
-    resp = requests.get(f'{API_URL}/databases/{database_id}/tables/')
+    resp = shared_transport().get(f'{API_URL}/databases/{database_id}/tables/')
     resp.raise_for_status()
     return resp.json()
 
@@ -379,7 +762,7 @@ def list_fields(table_id=None):
             fields = list_fields(t['id'])  # Use table ID
             all_fields.extend(fields)
         return all_fields
-    resp = requests.get(f'{API_URL}/tables/{table_id}/fields/')
+    resp = shared_transport().get(f'{API_URL}/tables/{table_id}/fields/')
     resp.raise_for_status()
     return resp.json()
 
@@ -408,7 +791,7 @@ def edit_by_path(path: str, data: dict):
     # Field: 'cluster/database/table/field' or 'cluster/database/table/field/subfield/...'
     url = f"{API_URL}/fields/by-path/{path}/meta"
     
-    resp = requests.patch(url, json=data)
+    resp = shared_transport().patch(url, json=data)
     resp.raise_for_status()
     return resp.json()
 
@@ -446,13 +829,13 @@ def rename_by_path(path: str, new_name: str):
             f"Expected formats: 'cluster', 'cluster/database', or 'cluster/database/table'"
         )
     
-    resp = requests.patch(url, json={"name": new_name})
+    resp = shared_transport().patch(url, json={"name": new_name})
     resp.raise_for_status()
     return resp.json()
 
 def get_cluster_by_path(cluster: str):
     url = f"{API_URL}/clusters/"
-    resp = requests.get(url)
+    resp = shared_transport().get(url)
     if not resp.ok:
         return NOT_FOUND
     clusters = resp.json()
@@ -463,7 +846,7 @@ def get_cluster_by_path(cluster: str):
 
 def get_database_by_path(cluster: str, database: str):
     url = f"{API_URL}/clusters/{cluster}/databases/"
-    resp = requests.get(url)
+    resp = shared_transport().get(url)
     if not resp.ok:
         return NOT_FOUND
     dbs = resp.json()
@@ -474,7 +857,7 @@ def get_database_by_path(cluster: str, database: str):
 
 def get_table_by_path(cluster: str, database: str, table: str):
     url = f"{API_URL}/clusters/{cluster}/databases/"
-    resp = requests.get(url)
+    resp = shared_transport().get(url)
     if not resp.ok:
         return NOT_FOUND
     dbs = resp.json()
@@ -486,7 +869,7 @@ def get_table_by_path(cluster: str, database: str, table: str):
     if db_id is None:
         return NOT_FOUND
     url = f"{API_URL}/databases/{db_id}/tables/"
-    resp = requests.get(url)
+    resp = shared_transport().get(url)
     if not resp.ok:
         return NOT_FOUND
     tables = resp.json()
@@ -497,7 +880,7 @@ def get_table_by_path(cluster: str, database: str, table: str):
 
 def get_field_by_path(cluster: str, database: str, table: str, *field_path: str):
     url = f"{API_URL}/clusters/{cluster}/databases/"
-    resp = requests.get(url)
+    resp = shared_transport().get(url)
     if not resp.ok:
         return NOT_FOUND
     dbs = resp.json()
@@ -509,7 +892,7 @@ def get_field_by_path(cluster: str, database: str, table: str, *field_path: str)
     if db_id is None:
         return NOT_FOUND
     url = f"{API_URL}/databases/{db_id}/tables/"
-    resp = requests.get(url)
+    resp = shared_transport().get(url)
     if not resp.ok:
         return NOT_FOUND
     tables = resp.json()
@@ -524,7 +907,7 @@ def get_field_by_path(cluster: str, database: str, table: str, *field_path: str)
     parent_id = None
     for idx, fname in enumerate(field_path):
         url = f"{API_URL}/tables/{table_id}/fields/"
-        resp = requests.get(url)
+        resp = shared_transport().get(url)
         if not resp.ok:
             return NOT_FOUND
         fields = resp.json()
@@ -539,8 +922,7 @@ def get_field_by_path(cluster: str, database: str, table: str, *field_path: str)
     return found
 
 def create_field_by_path(path: str, data: dict):
-    import requests
-    r = requests.post(f'{BASE_URL}/fields/by-path/{path}', json=data)
+    r = shared_transport().post(f'{BASE_URL}/fields/by-path/{path}', json=data)
     if not r.ok:
         raise Exception(f'Failed to create field: {r.text}')
     return r.json()
@@ -568,7 +950,7 @@ def print_hierarchy_by_path(path: str, indent: int = 0):
         print(" " * indent + f"📦 Cluster: {cluster_name}")
         
         # Get cluster
-        clusters = requests.get(f"{API_URL}/clusters/").json()
+        clusters = shared_transport().get(f"{API_URL}/clusters/").json()
         cluster = None
         for c in clusters:
             if c['name'] == cluster_name:
@@ -580,7 +962,7 @@ def print_hierarchy_by_path(path: str, indent: int = 0):
             return
         
         # Get databases
-        databases = requests.get(f"{API_URL}/clusters/{cluster['id']}/databases/").json()
+        databases = shared_transport().get(f"{API_URL}/clusters/{cluster['id']}/databases/").json()
         if not databases:
             print(" " * (indent + 2) + "📭 No databases found")
             return
@@ -589,7 +971,7 @@ def print_hierarchy_by_path(path: str, indent: int = 0):
             print(" " * (indent + 2) + f"🗄️ Database: {db['name']}")
             
             # Get tables
-            tables = requests.get(f"{API_URL}/databases/{db['id']}/tables/").json()
+            tables = shared_transport().get(f"{API_URL}/databases/{db['id']}/tables/").json()
             if not tables:
                 print(" " * (indent + 4) + "📭 No tables found")
                 continue
@@ -598,7 +980,7 @@ def print_hierarchy_by_path(path: str, indent: int = 0):
                 print(" " * (indent + 4) + f"📋 Table: {table['name']}")
                 
                 # Get fields
-                fields = requests.get(f"{API_URL}/tables/{table['id']}/fields/").json()
+                fields = shared_transport().get(f"{API_URL}/tables/{table['id']}/fields/").json()
                 if not fields:
                     print(" " * (indent + 6) + "📭 No fields found")
                     continue
@@ -612,7 +994,7 @@ def print_hierarchy_by_path(path: str, indent: int = 0):
         print(" " * indent + f"🗄️ Database: {database_name} (in cluster: {cluster_name})")
         
         # Get database
-        clusters = requests.get(f"{API_URL}/clusters/").json()
+        clusters = shared_transport().get(f"{API_URL}/clusters/").json()
         cluster = None
         for c in clusters:
             if c['name'] == cluster_name:
@@ -623,7 +1005,7 @@ def print_hierarchy_by_path(path: str, indent: int = 0):
             print(" " * (indent + 2) + "❌ Cluster not found")
             return
         
-        databases = requests.get(f"{API_URL}/clusters/{cluster['id']}/databases/").json()
+        databases = shared_transport().get(f"{API_URL}/clusters/{cluster['id']}/databases/").json()
         database = None
         for db in databases:
             if db['name'] == database_name:
@@ -635,7 +1017,7 @@ def print_hierarchy_by_path(path: str, indent: int = 0):
             return
         
         # Get tables
-        tables = requests.get(f"{API_URL}/databases/{database['id']}/tables/").json()
+        tables = shared_transport().get(f"{API_URL}/databases/{database['id']}/tables/").json()
         if not tables:
             print(" " * (indent + 2) + "📭 No tables found")
             return
@@ -644,7 +1026,7 @@ def print_hierarchy_by_path(path: str, indent: int = 0):
             print(" " * (indent + 2) + f"📋 Table: {table['name']}")
             
             # Get fields
-            fields = requests.get(f"{API_URL}/tables/{table['id']}/fields/").json()
+            fields = shared_transport().get(f"{API_URL}/tables/{table['id']}/fields/").json()
             if not fields:
                 print(" " * (indent + 4) + "📭 No fields found")
                 continue
@@ -658,7 +1040,7 @@ def print_hierarchy_by_path(path: str, indent: int = 0):
         print(" " * indent + f"📋 Table: {table_name} (in database: {database_name}, cluster: {cluster_name})")
         
         # Get table
-        clusters = requests.get(f"{API_URL}/clusters/").json()
+        clusters = shared_transport().get(f"{API_URL}/clusters/").json()
         cluster = None
         for c in clusters:
             if c['name'] == cluster_name:
@@ -669,7 +1051,7 @@ def print_hierarchy_by_path(path: str, indent: int = 0):
             print(" " * (indent + 2) + "❌ Cluster not found")
             return
         
-        databases = requests.get(f"{API_URL}/clusters/{cluster['id']}/databases/").json()
+        databases = shared_transport().get(f"{API_URL}/clusters/{cluster['id']}/databases/").json()
         database = None
         for db in databases:
             if db['name'] == database_name:
@@ -680,7 +1062,7 @@ def print_hierarchy_by_path(path: str, indent: int = 0):
             print(" " * (indent + 2) + "❌ Database not found")
             return
         
-        tables = requests.get(f"{API_URL}/databases/{database['id']}/tables/").json()
+        tables = shared_transport().get(f"{API_URL}/databases/{database['id']}/tables/").json()
         table = None
         for t in tables:
             if t['name'] == table_name:
@@ -692,7 +1074,7 @@ def print_hierarchy_by_path(path: str, indent: int = 0):
             return
         
         # Get fields
-        fields = requests.get(f"{API_URL}/tables/{table['id']}/fields/").json()
+        fields = shared_transport().get(f"{API_URL}/tables/{table['id']}/fields/").json()
         if not fields:
             print(" " * (indent + 2) + "📭 No fields found")
             return
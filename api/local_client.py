@@ -0,0 +1,301 @@
+"""
+In-process client for jobs running on the host that holds the SQLite file.
+
+LocalDBDescClient implements the DBDescClient calls made by PathClient by running the
+backend's route handlers on a session of its own, so results and errors have the same
+shape as over HTTP without the request and JSON round trips. LocalPathClient is a
+PathClient on top of it; `with client.batch(): ...` runs every call in the block in
+one transaction. AsyncLocalPathClient gives LocalPathClient the interface of
+AsyncPathClient for code on an event loop, such as the MCP tools served by the backend.
+
+Writes made here bump the catalog revision marker, so a backend serving the same file
+drops its graph caches and edge type registry on its next request.
+"""
+import asyncio
+import functools
+import inspect
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.params import Body, Param
+
+from backend import routers, schemas
+from backend.database import SessionLocal, atomic_session, init_db
+from .client import APIClientError
+from .path_client import PathClient
+
+
+def _fill_defaults(handler: Callable, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    """Add the declared defaults of query and body parameters that were not passed, as FastAPI would."""
+    for name, param in inspect.signature(handler).parameters.items():
+        default = param.default
+        if name not in kwargs and isinstance(default, (Param, Body)) and not default.is_required():
+            kwargs[name] = default.default
+    return kwargs
+
+
+class LocalDBDescClient:
+    """DBDescClient calls served in-process through the backend route handlers."""
+
+    def __init__(self, init: bool = True):
+        """With init, create or migrate the schema and load the edge type registry, as the backend does on startup."""
+        if init:
+            init_db()
+        self._scope = threading.local()
+
+    def close(self):
+        pass
+
+    @contextmanager
+    def transaction(self) -> Iterator["LocalDBDescClient"]:
+        """
+        Run the calls made in this block, on this thread, in one transaction: committed
+        when the block exits, rolled back if it raises. Calls that fail inside the block
+        only roll back their own changes. Nested blocks join the outer one.
+        """
+        if getattr(self._scope, "session", None) is not None:
+            yield self
+            return
+        with atomic_session() as session:
+            self._scope.session = session
+            try:
+                yield self
+            finally:
+                self._scope.session = None
+
+    def _call(self, handler: Callable, *args, model: Any = None, **kwargs) -> Any:
+        """Run a route handler on the scope's session (or a new one) and encode its result like the route."""
+        session = getattr(self._scope, "session", None)
+        owned = session is None
+        if owned:
+            session = SessionLocal()
+        try:
+            value = handler(*args, db=session, **_fill_defaults(handler, kwargs))
+            if model is None:
+                return jsonable_encoder(value)
+            if isinstance(value, list):
+                return [model.model_validate(item).model_dump() for item in value]
+            return model.model_validate(value).model_dump()
+        except HTTPException as e:
+            # In a transaction scope this only releases the failed call's savepoint
+            session.rollback()
+            raise APIClientError(f"HTTP {e.status_code}: {e.detail}") from e
+        finally:
+            if owned:
+                session.close()
+
+    # --- Cluster / Database / Table ---
+    def create_cluster(self, name: str) -> Dict[str, Any]:
+        """Create a new cluster."""
+        return self._call(routers.create_cluster, schemas.ClusterCreate(name=name), model=schemas.ClusterRead)
+
+    def get_clusters(self) -> List[Dict[str, Any]]:
+        """List all clusters."""
+        return self._call(routers.read_clusters, model=schemas.ClusterRead)
+
+    def get_databases(self, cluster_id: int) -> List[Dict[str, Any]]:
+        """List all databases in a cluster by cluster ID."""
+        return self._call(routers.read_databases, cluster_id, model=schemas.DatabaseRead)
+
+    def get_tables(self, database_id: int) -> List[Dict[str, Any]]:
+        """List all tables in a database by database ID."""
+        return self._call(routers.read_tables, database_id, model=schemas.TableRead)
+
+    def resolve_ids(self, *names: str) -> int:
+        """Id of the cluster, database or table named by (cluster[, database[, table]])."""
+        found = self._call(routers.get_ids_by_path, '/'.join(names))
+        return found[("cluster_id", "database_id", "table_id")[len(names) - 1]]
+
+    # --- Path-based helpers ---
+    def create_database_by_path(self, path: str) -> Dict[str, Any]:
+        """Create a database by path (cluster/database)."""
+        parts = path.split('/')
+        if len(parts) != 2:
+            raise APIClientError(f"Invalid path format: '{path}'. Expected format: 'cluster/database'")
+        return self._call(routers.create_database_by_path, *parts, model=schemas.DatabaseRead)
+
+    def create_table_by_path(self, path: str) -> Dict[str, Any]:
+        """Create a table by path (cluster/database/table)."""
+        parts = path.split('/')
+        if len(parts) != 3:
+            raise APIClientError(f"Invalid path format: '{path}'. Expected format: 'cluster/database/table'")
+        try:
+            return self._call(routers.create_table_by_path, *parts, model=schemas.TableRead)
+        except APIClientError as e:
+            # Creating an existing table returns it, as DBDescClient does
+            if "already exists" not in str(e):
+                raise
+            return self._call(routers.get_table_by_path, *parts, model=schemas.TableRead)
+
+    def create_field_by_path(self, path: str, meta: Optional[dict] = None) -> Dict[str, Any]:
+        """Create a field by path (cluster/database/table/field[/subfield...])."""
+        if len(path.split('/')) < 4:
+            raise APIClientError(f"Invalid path format: '{path}'. Expected format: 'cluster/database/table/field[/subfield...]'")
+        return self._call(routers.create_field_by_path, path, meta if meta is not None else {})
+
+    def create_fields_by_table_path(self, cluster: str, database: str, table: str,
+                                    fields: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Create many fields of a table in one transaction; fields are {"path" (relative to the table), "meta"} dicts."""
+        request = schemas.FieldBatchCreateRequest(fields=fields)
+        return self._call(routers.create_fields_by_table_path, cluster, database, table, request)
+
+    def list_field_paths_by_table_path(self, cluster: str, database: str, table: str) -> List[str]:
+        """List all field and subfield paths under the specified table."""
+        return self._call(routers.list_fields_by_table_path, cluster, database, table).get("paths", [])
+
+    def list_field_paths_page(self, path: str = "", cursor: Optional[int] = None, limit: int = 1000,
+                              max_bytes: Optional[int] = None, meta_filter: Optional[dict] = None) -> Dict[str, Any]:
+        """One page of the field paths under path: {"paths": [...], "next_cursor": int or None}."""
+        return self._call(routers.list_field_paths, path=path, filter=json.dumps(meta_filter) if meta_filter else None,
+                          cursor=cursor, limit=limit, max_bytes=max_bytes)
+
+    def summarize_field_paths(self, path: str = "", meta_filter: Optional[dict] = None, sample: int = 20,
+                              max_tables: int = 100) -> Dict[str, Any]:
+        """Field counts under path, in total and per table, with the first sample paths."""
+        return self._call(routers.summarize_field_paths, path=path,
+                          filter=json.dumps(meta_filter) if meta_filter else None, sample=sample, max_tables=max_tables)
+
+    def list_database_paths_page(self, clusters: Optional[List[str]] = None, cursor: Optional[int] = None,
+                                 limit: int = 1000, max_bytes: Optional[int] = None) -> Dict[str, Any]:
+        """One page of cluster/database paths, optionally of some clusters only."""
+        return self._call(routers.list_database_paths, cluster=clusters or None, cursor=cursor, limit=limit,
+                          max_bytes=max_bytes)
+
+    def delete_cluster_by_path(self, cluster_name: str) -> Any:
+        """Delete a cluster by name (path-based)."""
+        return self._call(routers.delete_cluster_by_path, cluster_name)
+
+    def delete_database_by_path(self, cluster: str, database: str) -> Any:
+        """Delete a database by path (cluster/database)."""
+        return self._call(routers.delete_database_by_path, cluster, database)
+
+    def delete_table_by_path(self, cluster: str, database: str, table: str) -> Any:
+        """Delete a table by path (cluster/database/table)."""
+        return self._call(routers.delete_table_by_path, cluster, database, table)
+
+    def delete_field_by_path(self, path: str) -> Any:
+        """Delete a field by path (cluster/database/table/field[/subfield...])."""
+        return self._call(routers.delete_field_by_path, path)
+
+    def update_table_by_path(self, cluster: str, database: str, table: str, data: dict) -> Any:
+        """Update a table by path (cluster/database/table)."""
+        return self._call(routers.update_table_by_path, cluster, database, table, data, model=schemas.TableRead)
+
+    def get_databases_by_cluster_name(self, cluster: str) -> List[dict]:
+        """Get all databases in a cluster by cluster name."""
+        return self.get_databases(self.resolve_ids(cluster))
+
+    def get_tables_by_database_name(self, cluster: str, database: str) -> List[dict]:
+        """Get all tables in a database by cluster/database name."""
+        return self.get_tables(self.resolve_ids(cluster, database))
+
+    def get_field_by_path(self, path: str) -> dict:
+        """Get all information about a field or subfield node given its path."""
+        return self._call(routers.get_field_by_path, path, model=schemas.FieldRead)
+
+    def get_field_meta_by_path(self, path: str) -> dict:
+        """Get the meta dictionary for a field by path."""
+        return self._call(routers.get_field_meta_by_path, path)
+
+    def resolve_field_paths(self, paths: List[str], include_meta: bool = False) -> List[Dict[str, Any]]:
+        """Resolve many field paths in one call; each result has found=False or id, parent_id, table_id (and meta)."""
+        request = schemas.FieldResolveRequest(paths=paths, include_meta=include_meta)
+        return self._call(routers.resolve_fields, request)['results']
+
+    def merge_field_meta_by_path(self, path: str, patch: dict) -> dict:
+        """Merge a patch into the meta of a field by path (None values remove keys); returns the new meta."""
+        return self._call(routers.update_field_meta_by_path, path, patch, mode="merge")
+
+    def batch_merge_field_meta(self, operations: List[Dict[str, Any]], return_meta: bool = False,
+                               commit_every: int = 5000) -> Dict[str, Any]:
+        """Merge-patch many fields in one call; operations are {"path" or "id", "patch"} dicts."""
+        request = schemas.FieldMetaBatchRequest(operations=operations, return_meta=return_meta)
+        return self._call(routers.batch_update_field_meta, request, commit_every=commit_every)
+
+    # --- Edges ---
+    def get_equivalents(self, field_path: str) -> List[dict]:
+        """Get all equivalent fields (edges) for a field by path."""
+        return self._call(routers.get_equivalent_fields, field_path).get('equivalents', [])
+
+    def add_equivalence(self, from_path: str, to_path: str) -> dict:
+        """Add an equivalence edge between two fields by path."""
+        return self._call(routers.add_equivalence_edge, from_path, to_path)
+
+    def remove_equivalence(self, from_path: str, to_path: str) -> dict:
+        """Remove an equivalence edge between two fields by path."""
+        return self._call(routers.remove_equivalence_edge, from_path, to_path)
+
+    def bulk_create_edges(self, edges: List[tuple], edge_type: Optional[str] = None, strict: bool = False) -> Dict[str, Any]:
+        """Create many edges in one transaction; edges are (from, to[, type]) with field ids or paths."""
+        body = {'type': edge_type, 'edges': [
+            {'from': edge[0], 'to': edge[1], 'type': edge[2] if len(edge) > 2 else None} for edge in edges
+        ]}
+        return self._call(routers._load_edges, body=json.dumps(body).encode(), content_type="application/json",
+                          edge_type=edge_type, strict=strict)
+
+    def get_shortest_path(self, from_path: str, to_path: str, edge_types: Optional[List[str]] = None,
+                          max_depth: Optional[int] = None, timeout_ms: Optional[int] = None) -> dict:
+        """Get the shortest chain of edges between two fields by path."""
+        options = {k: v for k, v in (('max_depth', max_depth), ('timeout_ms', timeout_ms)) if v is not None}
+        return self._call(routers.get_shortest_path, from_path, to_path, edge_types=edge_types or None, **options)
+
+    def get_join_path(self, from_table: str, to_table: str, edge_types: Optional[List[str]] = None,
+                      max_hops: Optional[int] = None) -> dict:
+        """Plan the chain of table joins between two tables by path (cluster/database/table)."""
+        options: Dict[str, Any] = {'max_hops': max_hops} if max_hops is not None else {}
+        if edge_types:
+            options['edge_types'] = edge_types
+        return self._call(routers.get_join_path, from_table, to_table, **options)
+
+
+class LocalPathClient(PathClient):
+    """
+    PathClient that works on the local SQLite file in-process instead of calling the
+    backend over HTTP. Methods take the same arguments and return the same shapes.
+    """
+
+    def __init__(self, client: Optional[LocalDBDescClient] = None):
+        self.client = client or LocalDBDescClient()
+        # Calls run in-process under the GIL, and a batch() transaction is bound to its thread
+        self.concurrency = 1
+
+    def batch(self):
+        """Context manager running every call in the block in one transaction (see LocalDBDescClient.transaction)."""
+        return self.client.transaction()
+
+
+class AsyncLocalPathClient:
+    """
+    AsyncPathClient interface over a LocalPathClient: each call runs in one of max_workers
+    threads of its own, so the event loop keeps serving while it waits on SQLite and calls
+    made through another instance never queue behind these.
+    """
+
+    def __init__(self, path_client: Optional[LocalPathClient] = None, max_workers: int = 4):
+        self.path_client = path_client or LocalPathClient()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="local-path-client")
+
+    def __getattr__(self, name: str) -> Any:
+        method = getattr(self.path_client, name)
+        if not callable(method):
+            return method
+
+        @functools.wraps(method)
+        async def call(*args, **kwargs):
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, functools.partial(method, *args, **kwargs))
+        return call
+
+    async def aclose(self):
+        self._executor.shutdown(wait=False)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
@@ -1,125 +1,310 @@
 import sys, os
 sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import asyncio
+import functools
+from contextlib import contextmanager
 from fastmcp import FastMCP
-from api.path_client import PathClient
+from fastmcp.exceptions import ToolError
+from api.async_path_client import AsyncPathClient
+from api.tool_cache import ToolCache
 from typing import Any, Dict, Optional, List, Tuple
-import asyncio
 
-# Initialize the PathClient (connects to FastAPI backend)
-client = PathClient(base_url="http://backend:8000")
+# Initialize the AsyncPathClient (connects to FastAPI backend); tools await it on the server's event loop
+client = AsyncPathClient(base_url="http://backend:8000")
+# Tools that fan out into many requests get their own connections, so they cannot starve the others
+bulk_client = AsyncPathClient(base_url="http://backend:8000", pool_size=16)
+
+# Expensive tools: name -> (calls running at once, seconds before the call fails, waiting included)
+TOOL_LIMITS = {
+    "list_fields": (4, 30.0),
+    "get_hierarchy": (4, 30.0),
+    "get_connected_databases": (2, 60.0),
+}
+
+# Listing tools return pages of at most MAX_PAGE_ITEMS paths (PAGE_ITEMS unless asked) and
+# about MAX_PAGE_BYTES of JSON, so one call cannot flood the agent's context
+PAGE_ITEMS = 200
+MAX_PAGE_ITEMS = 2000
+MAX_PAGE_BYTES = 32_000
+# Summaries list the counts of the first SUMMARY_TABLES tables and the first SUMMARY_PATHS paths
+SUMMARY_TABLES = 50
+SUMMARY_PATHS = 20
+
+# Items per call of the bulk tools
+MAX_BULK_ITEMS = 5000
+
+def _check_bulk_size(items):
+    if len(items) > MAX_BULK_ITEMS:
+        raise ToolError(f"At most {MAX_BULK_ITEMS} items per call; split the work into several calls")
+
+# Results of the read tools for the same arguments, dropped by the mutations made here
+cache = ToolCache(max_entries=2048, ttl=30.0)
+
+async def _cached(key: tuple, path: str, fetch) -> Any:
+    """Result of the read tool call key (tool name first) from the cache, or from await fetch()."""
+    found, value = cache.get(key)
+    if found:
+        return value
+    generation = cache.generation
+    value = await fetch()
+    cache.put(key, path, value, generation)
+    return value
+
+@contextmanager
+def _mutation(*paths: str, structural: bool = False, edges: bool = False):
+    """Drop the cached results a mutation of paths may change once it is done, even if it failed part way."""
+    try:
+        yield
+    finally:
+        for path in paths:
+            cache.invalidate(path, structural=structural)
+        if edges:
+            cache.invalidate_tool("get_edges")
+
+def _page_limit(limit: int) -> int:
+    return max(1, min(limit, MAX_PAGE_ITEMS))
+
+def limited(func):
+    """
+    Run the tool under its TOOL_LIMITS entry: a per-tool semaphore and a timeout. A call
+    that times out keeps running to completion and holds its slot until then, since the
+    work it started (a request, a worker thread) is not stopped by giving up on it.
+    """
+    concurrency, timeout = TOOL_LIMITS[func.__name__]
+    slots = asyncio.Semaphore(concurrency)
+
+    def finished(task):
+        slots.release()
+        if not task.cancelled():
+            # Retrieved so the error of a call nobody waits for any more is not logged as unhandled
+            task.exception()
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        try:
+            async with asyncio.timeout(timeout):
+                await slots.acquire()
+                task = asyncio.ensure_future(func(*args, **kwargs))
+                task.add_done_callback(finished)
+                return await asyncio.shield(task)
+        except TimeoutError:
+            raise ToolError(f"{func.__name__} did not finish within {timeout:g}s; try a narrower path")
+    return wrapper
 
 # Create the FastMCP server
 mcp = FastMCP("DBDesc MCP Bridge")
 
-def _run_sync(func, *args, **kwargs):
-    loop = asyncio.get_event_loop()
-    return loop.run_in_executor(None, lambda: func(*args, **kwargs))
+def serve_in_process(path: str = "/"):
+    """
+    Point the tools at the crud layer of the calling process instead of the backend over
+    HTTP, and return the MCP app for the backend to mount (see backend/main.py).
+    """
+    from api.local_client import AsyncLocalPathClient, LocalDBDescClient, LocalPathClient
+    global client, bulk_client
+    # The backend creates the schema on startup; calls then share its engine and graph caches
+    local = LocalPathClient(LocalDBDescClient(init=False))
+    # Separate threads for the expensive tools, one per slot of TOOL_LIMITS, so they
+    # cannot hold up the cheap ones
+    client = AsyncLocalPathClient(local, max_workers=4)
+    bulk_client = AsyncLocalPathClient(local, max_workers=sum(slots for slots, _ in TOOL_LIMITS.values()))
+    return mcp.http_app(path=path)
 
 # --- Create ---
 @mcp.tool()
 async def create_cluster(cluster_name: str) -> Any:
-    return client.create_cluster(cluster_name)
+    with _mutation(cluster_name, structural=True):
+        return await client.create_cluster(cluster_name)
 
 @mcp.tool()
 async def create_database(path: str) -> Any:
-    return client.create_database(path)
+    with _mutation(path, structural=True):
+        return await client.create_database(path)
 
 @mcp.tool()
 async def create_table(path: str) -> Any:
-    return client.create_table(path)
+    with _mutation(path, structural=True):
+        return await client.create_table(path)
 
 @mcp.tool()
 async def create_field(path: str, meta: Optional[Dict] = None) -> Any:
-    return client.create_field(path, meta=meta)
+    with _mutation(path, structural=True):
+        return await client.create_field(path, meta=meta)
 
 # --- Edit ---
 @mcp.tool()
 async def edit_table_description(path: str, description: str) -> Any:
-    return client.edit_table_description(path, description)
+    with _mutation(path):
+        return await client.edit_table_description(path, description)
 
 @mcp.tool()
 async def edit_field_description(path: str, description: str) -> Any:
-    return client.edit_field_description(path, description)
+    with _mutation(path):
+        return await client.edit_field_description(path, description)
 
 @mcp.tool()
 async def edit_field_example(path: str, example: str) -> Any:
-    return client.edit_field_example(path, example)
+    with _mutation(path):
+        return await client.edit_field_example(path, example)
 
 @mcp.tool()
 async def edit_field_information(path: str, information: str) -> Any:
-    return client.edit_field_information(path, information)
+    with _mutation(path):
+        return await client.edit_field_information(path, information)
 
 @mcp.tool()
 async def add_field_metadata(path: str, metadata: Dict) -> Any:
-    return client.add_field_metadata(path, metadata)
+    with _mutation(path):
+        return await client.add_field_metadata(path, metadata)
 
 @mcp.tool()
 async def edit_field_metadata(path: str, metadata: Dict) -> Any:
-    return client.edit_field_metadata(path, metadata)
+    with _mutation(path):
+        return await client.edit_field_metadata(path, metadata)
+
+@mcp.tool()
+async def remove_field_metadata(path: str, keys: List[str]) -> Any:
+    with _mutation(path):
+        return await client.remove_field_metadata(path, keys)
+
+@mcp.tool()
+async def bulk_edit_metadata(edits: Dict[str, Dict]) -> Any:
+    with _mutation(*edits):
+        return await client.bulk_edit_metadata(edits)
 
 @mcp.tool()
 async def edit_field_type(path: str, type_value: str) -> Any:
-    return client.edit_field_type(path, type_value)
+    with _mutation(path):
+        return await client.edit_field_type(path, type_value)
 
 # --- Delete ---
 @mcp.tool()
 async def delete_cluster(path: str) -> Any:
-    return client.delete_cluster(path)
+    with _mutation(path, structural=True, edges=True):
+        return await client.delete_cluster(path)
 
 @mcp.tool()
 async def delete_database(path: str) -> Any:
-    return client.delete_database(path)
+    with _mutation(path, structural=True, edges=True):
+        return await client.delete_database(path)
 
 @mcp.tool()
 async def delete_table(path: str) -> Any:
-    return client.delete_table(path)
+    with _mutation(path, structural=True, edges=True):
+        return await client.delete_table(path)
 
 @mcp.tool()
 async def delete_field(path: str) -> Any:
-    return client.delete_field(path)
+    with _mutation(path, structural=True, edges=True):
+        return await client.delete_field(path)
 
 # --- Get ---
 @mcp.tool()
 async def get_field(path: str) -> Any:
-    return client.get_field(path)
+    return await client.get_field(path)
 
 @mcp.tool()
 async def get_field_metadata(path: str, list_of_keys: Optional[List[str]] = None) -> Any:
-    return client.get_field_metadata(path, list_of_keys)
+    key = ("get_field_metadata", path, tuple(list_of_keys) if list_of_keys is not None else None)
+    return await _cached(key, path, lambda: client.get_field_metadata(path, list_of_keys))
 
 # --- Edge ---
 @mcp.tool()
 async def add_edge(path1: str, path2: str) -> Any:
-    return client.add_edge(path1, path2)
+    with _mutation(edges=True):
+        return await client.add_edge(path1, path2)
 
 @mcp.tool()
 async def remove_edge(path1: str, path2: str) -> Any:
-    return client.remove_edge(path1, path2)
+    with _mutation(edges=True):
+        return await client.remove_edge(path1, path2)
 
 @mcp.tool()
 async def get_edges(path: str) -> Any:
-    return client.get_edges(path)
+    return await _cached(("get_edges", path), path, lambda: client.get_edges(path))
+
+@mcp.tool()
+async def get_shortest_path(path1: str, path2: str, edge_types: Optional[List[str]] = None, max_depth: int = 6) -> Any:
+    return await client.get_shortest_path(path1, path2, edge_types, max_depth)
+
+@mcp.tool()
+async def get_join_path(table_path1: str, table_path2: str, edge_types: Optional[List[str]] = None, max_hops: int = 6) -> Any:
+    return await client.get_join_path(table_path1, table_path2, edge_types, max_hops)
+
+# --- Bulk: one tool call and one server-side transaction for many items, with a result per item ---
+@mcp.tool()
+async def bulk_create_fields(table_path: str, fields: Dict[str, Optional[Dict]]) -> Any:
+    """
+    Create many fields of the table cluster/database/table: {path relative to the table
+    (field or field/subfield): meta with a 'type'}, parents before their subfields.
+    """
+    _check_bulk_size(fields)
+    with _mutation(table_path, structural=True):
+        return await client.create_fields(table_path, fields)
+
+@mcp.tool()
+async def bulk_edit_fields(edits: List[Dict[str, Any]]) -> Any:
+    """
+    Edit many fields: each edit is {"path", and any of "description", "type", "example",
+    "information", "metadata" (other keys to merge)}.
+    """
+    _check_bulk_size(edits)
+    with _mutation(*[edit["path"] for edit in edits if edit.get("path")]):
+        return await client.edit_fields(edits)
+
+@mcp.tool()
+async def bulk_add_edges(edges: List[Tuple[str, str]], edge_type: str = "equivalence") -> Any:
+    """Add many edges between two field paths; edges that already exist count as ok."""
+    _check_bulk_size(edges)
+    with _mutation(edges=True):
+        report = await client.add_edges(edges, edge_type=edge_type)
+    errors = {error["index"]: error["error"] for error in report["errors"]}
+    results = [{"index": i, "status": "error", "error": errors[i]} if i in errors else {"index": i, "status": "ok"}
+               for i in range(len(edges))]
+    return {"inserted": report["inserted"], "existing": report["existing"], "failed": len(errors), "results": results}
 
 # --- List ---
 @mcp.tool()
 async def list_clusters() -> Any:
-    return client.list_clusters()
+    return await _cached(("list_clusters",), "", client.list_clusters)
 
 @mcp.tool()
-async def list_database(clusters: Optional[str] = None) -> Any:
-    return client.list_database(clusters)
+async def list_database(clusters: Optional[str] = None, cursor: Optional[int] = None, limit: int = PAGE_ITEMS) -> Any:
+    """Database paths, a page at a time: pass next_cursor back as cursor until it is null."""
+    limit = _page_limit(limit)
+    return await _cached(("list_database", clusters, cursor, limit), clusters or "",
+                         lambda: client.list_database_page(clusters, cursor=cursor, limit=limit, max_bytes=MAX_PAGE_BYTES))
 
 @mcp.tool()
-async def list_fields(path: str = "") -> Any:
-    return client.list_fields(path)
+@limited
+async def list_fields(path: str = "", cursor: Optional[int] = None, limit: int = PAGE_ITEMS, summary: bool = False) -> Any:
+    """
+    Field paths under path, a page at a time: pass next_cursor back as cursor until it is
+    null. With summary, field counts in total and per table and the first few paths instead.
+    """
+    if summary:
+        return await bulk_client.summarize_fields(path, sample=SUMMARY_PATHS, max_tables=SUMMARY_TABLES)
+    return await bulk_client.list_fields_page(path, cursor=cursor, limit=_page_limit(limit), max_bytes=MAX_PAGE_BYTES)
 
 @mcp.tool()
-async def get_hierarchy(path: str, filter: Optional[List[Tuple[str, Any]]] = None) -> Any:
-    return client.get_hierarchy(path, filter)
+@limited
+async def get_hierarchy(path: str, filter: Optional[List[Tuple[str, Any]]] = None, cursor: Optional[int] = None,
+                        limit: int = PAGE_ITEMS, summary: bool = False) -> Any:
+    """list_fields for the fields whose metadata has every (key, value) pair of filter."""
+    if summary:
+        return await bulk_client.summarize_fields(path, filter, sample=SUMMARY_PATHS, max_tables=SUMMARY_TABLES)
+    return await bulk_client.get_hierarchy_page(path, filter, cursor=cursor, limit=_page_limit(limit),
+                                                max_bytes=MAX_PAGE_BYTES)
 
 @mcp.tool()
+@limited
 async def get_connected_databases(db_path: str) -> Any:
-    return client.get_connected_databases(db_path)
+    return await bulk_client.get_connected_databases(db_path)
+
+# --- Cache ---
+@mcp.tool()
+async def cache_stats() -> Any:
+    """Size, hit and miss counts of the bridge's cache of read tool results."""
+    return cache.stats()
 
 if __name__ == "__main__":
     # Run the MCP server with HTTP transport on port 8088
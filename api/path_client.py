@@ -1,10 +1,38 @@
 import re
-from typing import Any, Dict, List, Optional, Tuple, Union
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, TypeVar, Union
 from .client import DBDescClient, APIClientError
+from .transport import HTTPTransport
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# Paths per resolve call when metadata is fetched for many fields (the server accepts up to 10000)
+RESOLVE_CHUNK = 1000
+
+# Keys of an edit_fields edit that set the metadata key of the same name
+FIELD_EDIT_KEYS = ("description", "type", "example", "information")
+
+
+def _edit_patch(edit: Dict[str, Any]) -> Dict[str, Any]:
+    """Metadata patch of a PathClient.edit_fields edit."""
+    patch = dict(edit.get("metadata") or {})
+    patch.update({key: edit[key] for key in FIELD_EDIT_KEYS if key in edit})
+    return patch
+
 
 class PathClient:
-    def __init__(self, base_url: str = "http://localhost:8000"):
-        self.client = DBDescClient(base_url)
+    def __init__(self, base_url: str = "http://localhost:8000", transport: Optional[HTTPTransport] = None,
+                 concurrency: int = 1, **client_options):
+        """
+        Methods that need many independent requests (listings, get_hierarchy filters,
+        get_connected_databases) send up to `concurrency` of them at a time; 1 (the
+        default) sends them one by one, which is fastest against a single backend worker.
+        client_options (pool_size, timeout, retries, backoff_factor, id_cache_ttl)
+        configure the DBDescClient.
+        """
+        self.client = DBDescClient(base_url, transport=transport, **client_options)
+        self.concurrency = concurrency
 
     # --- Create ---
     def create_cluster(self, cluster_name: str) -> Dict[str, Any]:
@@ -23,6 +51,15 @@ class PathClient:
         """Create a field by path: cluster/database/table/field[/subfield...]."""
         return self.client.create_field_by_path(path, meta)
 
+    def create_fields(self, table_path: str, fields: Dict[str, Optional[dict]]) -> Dict[str, Any]:
+        """
+        Create many fields of one table ({path relative to the table: meta}, parents before
+        their subfields) in one transaction; returns counts and a status per field.
+        """
+        cluster, database, table = table_path.split("/", 2)
+        items = [{"path": path, "meta": meta if meta is not None else {}} for path, meta in fields.items()]
+        return self.client.create_fields_by_table_path(cluster, database, table, items)
+
     # --- Edit ---
     def edit_table_description(self, path: str, description: str) -> Any:
         """Edit the description of a table by path."""
@@ -47,19 +84,42 @@ class PathClient:
 
     def add_field_metadata(self, path: str, metadata: Dict[str, Any]) -> Any:
         """Add (merge) metadata to a field by path."""
-        current = self.get_field_metadata(path)
-        if current is None:
-            current = {}
-        merged = {**current, **metadata}
-        return self._patch_field_meta(path, merged)
+        return self._patch_field_meta(path, metadata)
 
     def edit_field_metadata(self, path: str, metadata: Dict[str, Any]) -> Any:
-        """Overwrite only the provided keys in the field's metadata by path."""
-        current = self.get_field_metadata(path)
-        if current is None:
-            current = {}
-        updated = {**current, **metadata}
-        return self._patch_field_meta(path, updated)
+        """Overwrite only the provided keys in the field's metadata by path (nested objects are merged)."""
+        return self._patch_field_meta(path, metadata)
+
+    def remove_field_metadata(self, path: str, keys: List[str]) -> Any:
+        """Remove keys from the field's metadata by path ('type' cannot be removed)."""
+        return self._patch_field_meta(path, {key: None for key in keys})
+
+    def bulk_edit_metadata(self, edits: Dict[str, Dict[str, Any]], batch_size: int = 10000) -> Dict[str, Any]:
+        """Merge metadata into many fields at once ({path: metadata}); returns counts and the paths that failed."""
+        items = list(edits.items())
+        summary: Dict[str, Any] = {"updated": 0, "failed": {}}
+        for start in range(0, len(items), batch_size):
+            batch = items[start:start + batch_size]
+            response = self.client.batch_merge_field_meta([{"path": path, "patch": meta} for path, meta in batch])
+            summary["updated"] += response["updated"]
+            for result in response["results"]:
+                if result["status"] != "ok":
+                    summary["failed"][result["path"]] = result.get("error", result["status"])
+        return summary
+
+    def edit_fields(self, edits: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Apply many field edits in one transaction. Each edit is {"path", and any of
+        "description", "type", "example", "information", "metadata"}, merged into the field's
+        metadata; returns counts and a status per edit, in order.
+        """
+        operations = [{"path": edit.get("path"), "patch": _edit_patch(edit)} for edit in edits]
+        if not operations:
+            return {"updated": 0, "failed": 0, "results": []}
+        response = self.client.batch_merge_field_meta(operations, commit_every=len(operations))
+        for result in response["results"]:
+            result.pop("id", None)
+        return response
 
     # --- Delete ---
     def delete_cluster(self, path: str) -> Any:
@@ -94,26 +154,29 @@ class PathClient:
             return {k: meta.get(k) for k in list_of_keys if k in meta}
         return meta
 
+    def get_fields(self, paths: List[str], include_meta: bool = True) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Get id, parent id, table id and meta of many fields by path at once; missing paths map to None."""
+        results = self.client.resolve_field_paths(paths, include_meta=include_meta)
+        return {r['path']: (r if r['found'] else None) for r in results}
+
     def get_connected_databases(self, db_path: str) -> List[str]:
         """Given a database path (cluster/database), return all other databases connected to it by any edge."""
         cluster, database = db_path.split("/", 1)
         # Get all tables in this database
         tables = self.client.get_tables_by_database_name(cluster, database)
+        table_fields = self._map(lambda table: self.client.list_field_paths_by_table_path(cluster, database, table['name']), tables)
+        field_paths = [field_path for field_paths in table_fields for field_path in field_paths]
         connected_databases = set()
-        for table in tables:
-            table_path = f"{cluster}/{database}/{table['name']}"
-            field_paths = self.client.list_field_paths_by_table_path(cluster, database, table['name'])
-            for field_path in field_paths:
-                # Get all edges for this field
-                equivalents = self.client.get_equivalents(field_path)
-                for eq in equivalents:
-                    eq_path = eq['path']
-                    # eq_path: cluster2/database2/table2/field...
-                    eq_parts = eq_path.split("/")
-                    if len(eq_parts) >= 3:
-                        eq_db_path = f"{eq_parts[0]}/{eq_parts[1]}"
-                        if eq_db_path != db_path:
-                            connected_databases.add(eq_db_path)
+        # Get all edges of every field
+        for equivalents in self._map(self.client.get_equivalents, field_paths):
+            for eq in equivalents:
+                eq_path = eq['path']
+                # eq_path: cluster2/database2/table2/field...
+                eq_parts = eq_path.split("/")
+                if len(eq_parts) >= 3:
+                    eq_db_path = f"{eq_parts[0]}/{eq_parts[1]}"
+                    if eq_db_path != db_path:
+                        connected_databases.add(eq_db_path)
         return sorted(connected_databases)
 
     # --- Edge ---
@@ -125,10 +188,22 @@ class PathClient:
         """Remove an edge between two fields by path (removes both directions)."""
         return self.client.remove_equivalence(path1, path2)
 
+    def add_edges(self, pairs: List[Tuple[str, str]], edge_type: str = "equivalence") -> Dict[str, Any]:
+        """Add many edges between fields by path in one call; existing edges are skipped."""
+        return self.client.bulk_create_edges(pairs, edge_type=edge_type)
+
     def get_edges(self, path: str) -> List[Dict[str, Any]]:
         """Get all edges for a field by path."""
         return self.client.get_equivalents(path)
 
+    def get_shortest_path(self, path1: str, path2: str, edge_types: Optional[List[str]] = None, max_depth: int = 6) -> Dict[str, Any]:
+        """Get the shortest chain of edges connecting two fields by path."""
+        return self.client.get_shortest_path(path1, path2, edge_types=edge_types, max_depth=max_depth)
+
+    def get_join_path(self, table_path1: str, table_path2: str, edge_types: Optional[List[str]] = None, max_hops: int = 6) -> Dict[str, Any]:
+        """Plan the joins between two tables by path, listing the field pairs joining each hop."""
+        return self.client.get_join_path(table_path1, table_path2, edge_types=edge_types, max_hops=max_hops)
+
     # --- List ---
     def list_clusters(self) -> List[str]:
         """List all cluster names."""
@@ -144,8 +219,7 @@ class PathClient:
             clusters_list = [clusters]
         else:
             clusters_list = clusters
-        for cluster in clusters_list:
-            dbs = self.client.get_databases_by_cluster_name(cluster)
+        for cluster, dbs in zip(clusters_list, self._map(self.client.get_databases_by_cluster_name, clusters_list)):
             for db in dbs:
                 result.append(f"{cluster}/{db['name']}")
         return result
@@ -153,16 +227,13 @@ class PathClient:
     def list_fields(self, path: str = "") -> List[str]:
         """List all field paths derived from the input path."""
         if not path:
-            # List all fields in all tables
-            clusters = self.list_clusters()
-            result = []
-            for cluster in clusters:
-                dbs = self.client.get_databases_by_cluster_name(cluster)
-                for db in dbs:
-                    tables = self.client.get_tables_by_database_name(cluster, db['name'])
-                    for table in tables:
-                        result.extend(self.client.list_field_paths_by_table_path(cluster, db['name'], table['name']))
-            return result
+            # List all fields in all tables, one level of the hierarchy at a time
+            databases = [db_path.split("/", 1) for db_path in self.list_database()]
+            db_tables = self._map(lambda db: self.client.get_tables_by_database_name(*db), databases)
+            tables = [(cluster, database, table['name'])
+                      for (cluster, database), db_table_list in zip(databases, db_tables) for table in db_table_list]
+            table_fields = self._map(lambda table: self.client.list_field_paths_by_table_path(*table), tables)
+            return [field_path for field_paths in table_fields for field_path in field_paths]
         else:
             parts = path.split("/")
             if len(parts) == 3:
@@ -177,21 +248,63 @@ class PathClient:
         all_fields = self.list_fields(path)
         if not filter:
             return all_fields
+        chunks = [all_fields[start:start + RESOLVE_CHUNK] for start in range(0, len(all_fields), RESOLVE_CHUNK)]
+        fields = {}
+        for chunk_fields in self._map(self.get_fields, chunks):
+            fields.update(chunk_fields)
         filtered = []
         for fpath in all_fields:
-            meta = self.get_field_metadata(fpath)
+            meta = fields[fpath]['meta'] if fields.get(fpath) else None
             if meta is None:
                 continue
             if all(meta.get(k) == v for k, v in filter):
                 filtered.append(fpath)
         return filtered
 
+    def list_fields_page(self, path: str = "", cursor: Optional[int] = None, limit: int = 1000,
+                         max_bytes: Optional[int] = None) -> Dict[str, Any]:
+        """
+        One page of the field paths under path (whole components: cluster[/database[/table[/field...]]]),
+        paged on the server: {"paths": [...], "next_cursor": ...}; pass next_cursor back as cursor
+        until it is None.
+        """
+        return self.client.list_field_paths_page(path, cursor=cursor, limit=limit, max_bytes=max_bytes)
+
+    def get_hierarchy_page(self, path: str, filter: Optional[List[Tuple[str, Any]]] = None, cursor: Optional[int] = None,
+                           limit: int = 1000, max_bytes: Optional[int] = None) -> Dict[str, Any]:
+        """list_fields_page of the fields whose metadata has every filter key-value pair, filtered on the server."""
+        return self.client.list_field_paths_page(path, cursor=cursor, limit=limit, max_bytes=max_bytes,
+                                                 meta_filter=dict(filter) if filter else None)
+
+    def list_database_page(self, clusters: Optional[Union[str, List[str]]] = None, cursor: Optional[int] = None,
+                           limit: int = 1000, max_bytes: Optional[int] = None) -> Dict[str, Any]:
+        """One page of the database paths of the given clusters (or all), paged like list_fields_page."""
+        if isinstance(clusters, str):
+            clusters = [clusters]
+        return self.client.list_database_paths_page(clusters, cursor=cursor, limit=limit, max_bytes=max_bytes)
+
+    def summarize_fields(self, path: str = "", filter: Optional[List[Tuple[str, Any]]] = None, sample: int = 20,
+                         max_tables: int = 100) -> Dict[str, Any]:
+        """Number of fields under path in total and per table, with the first sample paths, instead of every path."""
+        return self.client.summarize_field_paths(path, meta_filter=dict(filter) if filter else None, sample=sample,
+                                                 max_tables=max_tables)
+
     # --- Internal helpers ---
+    def _map(self, func: Callable[[T], R], items: Iterable[T]) -> List[R]:
+        """
+        func over items on up to `concurrency` threads, with results in input order. The
+        first error, in input order, is raised once the calls already running finish;
+        calls not yet started are cancelled.
+        """
+        items = list(items)
+        if self.concurrency <= 1 or len(items) <= 1:
+            return [func(item) for item in items]
+        pool = ThreadPoolExecutor(max_workers=min(self.concurrency, len(items)))
+        try:
+            return list(pool.map(func, items))
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+
     def _patch_field_meta(self, path: str, meta: Dict[str, Any]) -> Any:
-        """Patch (update) the meta of a field by path, always including the current meta (if any) to ensure required keys like 'type' are present."""
-        current = self.get_field_metadata(path)
-        if current is not None:
-            merged = {**current, **meta}
-        else:
-            merged = meta
-        return self.client.patch_field_meta_by_path(path, merged) 
\ No newline at end of file
+        """Merge meta into the field's metadata by path in a single server-side update."""
+        return self.client.merge_field_meta_by_path(path, meta)
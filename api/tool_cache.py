@@ -0,0 +1,93 @@
+"""
+Response cache for the read tools of the MCP bridge.
+
+Entries are tool results keyed by the tool name and its arguments, each tagged with the
+catalog path it describes ("" for the whole catalog). The cache is a size-bounded LRU
+with a TTL per entry; mutations made through the bridge drop the entries they may have
+changed right away, and the TTL bounds how long changes made by other clients go unseen.
+"""
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Tuple
+
+
+def _ancestors(path: str):
+    """path's ancestors, nearest first, ending with the catalog root ""."""
+    while path:
+        path = path.rpartition("/")[0]
+        yield path
+
+
+class ToolCache:
+    """LRU of tool results with a TTL; used from the bridge's event loop only, so it takes no locks."""
+
+    def __init__(self, max_entries: int = 2048, ttl: float = 30.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[Tuple[Hashable, ...], Tuple[float, str, Any]]" = OrderedDict()
+        # Bumped by every invalidation, so results fetched across one are not stored
+        self.generation = 0
+        self.hits = self.misses = self.evictions = self.expirations = self.invalidations = 0
+
+    def get(self, key: Tuple[Hashable, ...]) -> Tuple[bool, Any]:
+        """(True, value) for a fresh entry, (False, None) otherwise."""
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] <= time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return False, None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return True, entry[2]
+
+    def put(self, key: Tuple[Hashable, ...], path: str, value: Any, generation: int):
+        """Store value for key, unless the cache was invalidated since `generation` was read (before fetching it)."""
+        if generation != self.generation or self.max_entries <= 0 or self.ttl <= 0:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, path, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, path: str, structural: bool = False) -> int:
+        """
+        Drop the entries of path and of everything under it; a structural change (create,
+        delete) also drops those of its ancestors, whose listings it changes.
+        """
+        paths = {path, *_ancestors(path)} if structural else {path}
+        prefix = path + "/"
+        stale = [key for key, (_, entry_path, _) in self._entries.items()
+                 if entry_path in paths or entry_path.startswith(prefix) or not path]
+        return self._drop(stale)
+
+    def invalidate_tool(self, tool: str) -> int:
+        """Drop every entry of one tool."""
+        return self._drop([key for key in self._entries if key[0] == tool])
+
+    def clear(self):
+        self._drop(list(self._entries))
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else None,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
+
+    def _drop(self, keys) -> int:
+        for key in keys:
+            del self._entries[key]
+        self.generation += 1
+        self.invalidations += len(keys)
+        return len(keys)
@@ -0,0 +1,97 @@
+"""
+Pooled HTTP transport for the API clients.
+
+A `requests.Session` keeps connections to the backend alive between calls, so bulk
+scripts stop paying a TCP handshake per request. The transport also applies default
+timeouts and retries transient failures with exponential backoff.
+"""
+import threading
+from typing import Optional, Tuple, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+DEFAULT_TIMEOUT = (3.05, 60.0)  # (connect, read) seconds
+# Statuses a proxy or an overloaded backend answers before doing any work
+RETRY_STATUSES = (502, 503, 504)
+
+
+class _Retry(Retry):
+    """
+    urllib3 retry policy that also retries non-idempotent methods on 503: the backend
+    answers 503 only when SQLite was locked before the request committed anything, and
+    rolls it back.
+    """
+
+    def is_retry(self, method: str, status_code: int, has_retry_after: bool = False) -> bool:
+        if status_code == 503 and self.status_forcelist and status_code in self.status_forcelist:
+            return True
+        return super().is_retry(method, status_code, has_retry_after)
+
+
+class HTTPTransport:
+    """
+    Keep-alive connection pool with timeouts and retries.
+
+    Idempotent methods (GET, PUT, DELETE, ...) are retried on connection errors, read
+    timeouts and 502/503/504. POST and PATCH are retried only when the request never
+    reached the server or was rejected with 503.
+    """
+
+    def __init__(self, pool_size: int = 10, timeout: Union[float, Tuple[float, float]] = DEFAULT_TIMEOUT,
+                 retries: int = 3, backoff_factor: float = 0.2):
+        self.timeout = timeout
+        self.session = requests.Session()
+        retry = _Retry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            status=retries,
+            status_forcelist=RETRY_STATUSES if retries else None,
+            backoff_factor=backoff_factor,
+            backoff_jitter=backoff_factor / 2,
+            # Retry-After only says how long a human should wait; back off on our own schedule
+            respect_retry_after_header=False,
+            # Hand the last response back so callers see the server's error detail
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        kwargs.setdefault("timeout", self.timeout)
+        return self.session.request(method, url, **kwargs)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def put(self, url: str, **kwargs) -> requests.Response:
+        return self.request("PUT", url, **kwargs)
+
+    def patch(self, url: str, **kwargs) -> requests.Response:
+        return self.request("PATCH", url, **kwargs)
+
+    def delete(self, url: str, **kwargs) -> requests.Response:
+        return self.request("DELETE", url, **kwargs)
+
+    def close(self):
+        self.session.close()
+
+
+_shared: Optional[HTTPTransport] = None
+_shared_lock = threading.Lock()
+
+
+def shared_transport() -> HTTPTransport:
+    """Process-wide transport used by clients created without one and by the module-level helpers."""
+    global _shared
+    if _shared is None:
+        with _shared_lock:
+            if _shared is None:
+                _shared = HTTPTransport()
+    return _shared
@@ -1,17 +1,45 @@
-from sqlalchemy.orm import Session
+import json
+from sqlalchemy.orm import Session, aliased
 from . import models, schemas
-from typing import List, Optional
-from sqlalchemy import and_, or_
+from .edge_types import registry as edge_type_registry, type_condition
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import and_, or_, func, select, tuple_
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+def _insert_or_get(db: Session, model, values: dict, conflict: tuple, where=None,
+                   table_ids: Optional[List[int]] = None, commit: bool = True) -> tuple:
+    """
+    (row, inserted) for the `model` row matching `values` on its unique `conflict` columns,
+    committed unless commit is False (the caller then commits and marks the graph changed).
+    A new row takes a single INSERT ... ON CONFLICT DO NOTHING RETURNING id, which
+    stays correct when concurrent requests create the same row, and is not read back: it has
+    no children yet, so it is built from the inserted values.
+    """
+    from .graph import mark_changed
+    table = model.__table__
+    row = db.connection().execute(
+        sqlite_insert(table).values(**values)
+        .on_conflict_do_nothing(index_elements=list(conflict), index_where=where)
+        .returning(table.c.id)
+    ).first()
+    if row is not None:
+        if commit:
+            mark_changed(db, table_ids=table_ids or [])
+            db.commit()
+        return model(id=row[0], **values), True
+    if commit:
+        # End the write transaction the INSERT opened before loading, so the row is not expired by the commit
+        db.commit()
+    match = [getattr(model, name) == values[name] for name in conflict]
+    if where is not None:
+        match.append(where)
+    return db.query(model).filter(*match).one(), False
+
+def get_or_create_cluster(db: Session, cluster: schemas.ClusterCreate) -> Tuple[models.Cluster, bool]:
+    return _insert_or_get(db, models.Cluster, {"name": cluster.name}, ("name",))
 
 def create_cluster(db: Session, cluster: schemas.ClusterCreate) -> models.Cluster:
-    existing = db.query(models.Cluster).filter(models.Cluster.name == cluster.name).first()
-    if existing is not None:
-        return existing
-    db_cluster = models.Cluster(name=cluster.name)
-    db.add(db_cluster)
-    db.commit()
-    db.refresh(db_cluster)
-    return db_cluster
+    return get_or_create_cluster(db, cluster)[0]
 
 def get_clusters(db: Session) -> List[models.Cluster]:
     from sqlalchemy.orm import joinedload
@@ -19,15 +47,12 @@ def get_clusters(db: Session) -> List[models.Cluster]:
         joinedload(models.Cluster.databases).joinedload(models.Database.tables)
     ).all()
 
+def get_or_create_database(db: Session, cluster_id: int, database: schemas.DatabaseCreate) -> Tuple[models.Database, bool]:
+    values = {"name": database.name, "cluster_id": cluster_id}
+    return _insert_or_get(db, models.Database, values, ("cluster_id", "name"))
+
 def create_database(db: Session, cluster_id: int, database: schemas.DatabaseCreate) -> models.Database:
-    existing = db.query(models.Database).filter(models.Database.name == database.name, models.Database.cluster_id == cluster_id).first()
-    if existing is not None:
-        return existing
-    db_database = models.Database(name=database.name, cluster_id=cluster_id)
-    db.add(db_database)
-    db.commit()
-    db.refresh(db_database)
-    return db_database
+    return get_or_create_database(db, cluster_id, database)[0]
 
 def get_databases(db: Session, cluster_id: int) -> List[models.Database]:
     from sqlalchemy.orm import joinedload
@@ -35,15 +60,12 @@ def get_databases(db: Session, cluster_id: int) -> List[models.Database]:
         joinedload(models.Database.tables)
     ).filter(models.Database.cluster_id == cluster_id).all()
 
+def get_or_create_table(db: Session, database_id: int, table: schemas.TableCreate) -> Tuple[models.Table, bool]:
+    values = {"name": table.name, "database_id": database_id}
+    return _insert_or_get(db, models.Table, values, ("database_id", "name"))
+
 def create_table(db: Session, database_id: int, table: schemas.TableCreate) -> models.Table:
-    existing = db.query(models.Table).filter(models.Table.name == table.name, models.Table.database_id == database_id).first()
-    if existing is not None:
-        return existing
-    db_table = models.Table(name=table.name, database_id=database_id)
-    db.add(db_table)
-    db.commit()
-    db.refresh(db_table)
-    return db_table
+    return get_or_create_table(db, database_id, table)[0]
 
 def get_tables(db: Session, database_id: int) -> List[models.Table]:
     from sqlalchemy.orm import joinedload
@@ -51,30 +73,145 @@ def get_tables(db: Session, database_id: int) -> List[models.Table]:
         joinedload(models.Table.fields)
     ).filter(models.Table.database_id == database_id).all()
 
-def create_field(db: Session, table_id: int, field: schemas.FieldCreate) -> models.Field:
-    existing = db.query(models.Field).filter(
-        models.Field.name == field.name,
-        models.Field.table_id == table_id,
-        models.Field.parent_id == field.parent_id
-    ).first()
-    if existing is not None:
-        return existing
-    db_field = models.Field(name=field.name, table_id=table_id, parent_id=field.parent_id, meta=field.meta)
-    db.add(db_field)
+def get_or_create_field(db: Session, table_id: int, field: schemas.FieldCreate,
+                        commit: bool = True) -> Tuple[models.Field, bool]:
+    """The field named field.name under its parent, created with field.meta if missing; an existing field keeps its meta."""
+    values = {"name": field.name, "table_id": table_id, "parent_id": field.parent_id, "meta": field.meta}
+    if field.parent_id is None:
+        conflict, where = ("table_id", "name"), models.Field.parent_id.is_(None)
+    else:
+        conflict, where = ("table_id", "parent_id", "name"), None
+    return _insert_or_get(db, models.Field, values, conflict, where, table_ids=[table_id], commit=commit)
+
+def create_fields_in_table(db: Session, table_id: int, items: List[dict]) -> List[dict]:
+    """
+    Create many fields of one table from {"path" (relative to the table), "meta"} items, in
+    one transaction. A subfield's parent may be created earlier in the same list; existing
+    fields keep their meta. Returns one status per item, in order: "created" or "exists"
+    (with the id), "not_found" (missing parent) or "invalid" (with an error message).
+    """
+    from .graph import mark_changed
+    ids: Dict[str, Optional[int]] = {}
+
+    def field_id(names: List[str]) -> Optional[int]:
+        key = '/'.join(names)
+        if key not in ids:
+            parent_id = field_id(names[:-1]) if len(names) > 1 else None
+            if len(names) > 1 and parent_id is None:
+                return None
+            parent = models.Field.parent_id.is_(None) if parent_id is None else models.Field.parent_id == parent_id
+            row = db.query(models.Field.id).filter(models.Field.table_id == table_id, parent,
+                                                   models.Field.name == names[-1]).first()
+            ids[key] = row[0] if row else None
+        return ids[key]
+
+    results = []
+    created = 0
+    for index, item in enumerate(items):
+        names = str(item.get("path") or "").split('/')
+        meta = item.get("meta")
+        result = {"index": index, "path": item.get("path")}
+        parent_id = field_id(names[:-1]) if len(names) > 1 and all(names) else None
+        if not all(names):
+            result.update(status="invalid", error="path must be field[/subfield...] under the table")
+        elif not isinstance(meta, dict) or 'type' not in meta:
+            result.update(status="invalid", error="meta must contain a 'type' key")
+        elif len(names) > 1 and parent_id is None:
+            result.update(status="not_found", error=f"Parent field '{'/'.join(names[:-1])}' not found")
+        else:
+            field, inserted = get_or_create_field(
+                db, table_id, schemas.FieldCreate(name=names[-1], parent_id=parent_id, meta=meta), commit=False)
+            ids['/'.join(names)] = field.id
+            created += inserted
+            result.update(status="created" if inserted else "exists", id=field.id)
+        results.append(result)
+    if created:
+        mark_changed(db, table_ids=[table_id])
     db.commit()
-    db.refresh(db_field)
-    return db_field
+    return results
+
+def create_field(db: Session, table_id: int, field: schemas.FieldCreate) -> models.Field:
+    return get_or_create_field(db, table_id, field)[0]
 
 def get_fields(db: Session, table_id: int, parent_id: Optional[int] = None) -> List[models.Field]:
     from sqlalchemy.orm import joinedload
     return db.query(models.Field).options(joinedload(models.Field.subfields)).filter(models.Field.table_id == table_id, models.Field.parent_id == parent_id).all()
 
-def create_edge(db: Session, edge: schemas.EdgeCreate) -> models.Edge:
-    db_edge = models.Edge(from_field_id=edge.from_field_id, to_field_id=edge.to_field_id, type=edge.type)
-    db.add(db_edge)
+def _canonical_edge(directed: bool, from_field_id: int, to_field_id: int) -> tuple:
+    """Undirected edges are stored once per pair, from the smaller field id to the larger."""
+    if not directed and from_field_id > to_field_id:
+        return to_field_id, from_field_id
+    return from_field_id, to_field_id
+
+LINEAGE_EDGE_TYPE = "lineage"
+
+# Takes the type code, not the name
+_INSERT_EDGE_SQL = (
+    "INSERT INTO edges (type, from_field_id, to_field_id) VALUES (?, ?, ?) "
+    "ON CONFLICT (from_field_id, type, to_field_id) DO NOTHING"
+)
+
+def _insert_edges(db: Session, rows: List[tuple]) -> List[tuple]:
+    """Insert (type code, from, to) rows, one statement per chunk, skipping existing edges; returns the rows inserted."""
+    conn = db.connection()
+    inserted = []
+    for chunk in _chunks(rows):
+        values = ", ".join(["(?, ?, ?)"] * len(chunk))
+        inserted.extend(tuple(row) for row in conn.exec_driver_sql(
+            f"INSERT INTO edges (type, from_field_id, to_field_id) VALUES {values} "
+            "ON CONFLICT (from_field_id, type, to_field_id) DO NOTHING RETURNING type, from_field_id, to_field_id",
+            tuple(value for row in chunk for value in row),
+        ))
+    return inserted
+
+def _ensure_edge(db: Session, edge_type: str, from_field_id: int, to_field_id: int) -> models.Edge:
+    """Insert an edge unless it already exists (in either direction for undirected types) and return it."""
+    from .graph import record_edges
+    code, directed = edge_type_registry.ensure(db, edge_type)
+    from_field_id, to_field_id = _canonical_edge(directed, from_field_id, to_field_id)
+    result = db.connection().exec_driver_sql(_INSERT_EDGE_SQL, (code, from_field_id, to_field_id))
+    if result.rowcount:
+        if edge_type == LINEAGE_EDGE_TYPE:
+            _check_lineage(db, [(from_field_id, to_field_id)])
+        record_edges(db, added=[(edge_type, from_field_id, to_field_id)])
     db.commit()
-    db.refresh(db_edge)
-    return db_edge
+    return db.query(models.Edge).filter(
+        models.Edge.type == edge_type,
+        models.Edge.from_field_id == from_field_id,
+        models.Edge.to_field_id == to_field_id
+    ).one()
+
+def _check_lineage(db: Session, edges: List[tuple]):
+    """Roll back lineage edges just written if they closed a cycle (raises LineageCycleError)."""
+    from .lineage import check_new_edges
+    try:
+        check_new_edges(db, edges)
+    except ValueError:
+        db.rollback()
+        raise
+
+def _find_edge(db: Session, edge_type: str, from_field_id: int, to_field_id: int) -> Optional[models.Edge]:
+    from_field_id, to_field_id = _canonical_edge(edge_type_registry.is_directed(edge_type), from_field_id, to_field_id)
+    return db.query(models.Edge).filter(
+        models.Edge.type == edge_type,
+        models.Edge.from_field_id == from_field_id,
+        models.Edge.to_field_id == to_field_id
+    ).first()
+
+def get_edge_types() -> List[dict]:
+    return edge_type_registry.types()
+
+def create_edge_type(db: Session, edge_type: schemas.EdgeTypeCreate) -> dict:
+    """Register an edge type; registering an existing one is a no-op unless its direction differs."""
+    code, directed = edge_type_registry.ensure(db, edge_type.name, edge_type.directed)
+    if directed != edge_type.directed:
+        db.rollback()
+        raise ValueError(f"Edge type '{edge_type.name}' is already registered as {'directed' if directed else 'undirected'}")
+    db.commit()
+    return {"id": code, "name": edge_type.name, "directed": directed}
+
+def create_edge(db: Session, edge: schemas.EdgeCreate) -> models.Edge:
+    return _ensure_edge(db, edge.type, edge.from_field_id, edge.to_field_id)
 
 def get_edges(db: Session, field_id: int) -> List[models.Edge]:
     return db.query(models.Edge).filter((models.Edge.from_field_id == field_id) | (models.Edge.to_field_id == field_id)).all()
@@ -87,32 +224,64 @@ def delete_edge(db: Session, edge_id: int) -> bool:
     db.commit()
     return True
 
-def create_equivalence_edge(db: Session, from_field_id: int, to_field_id: int) -> models.Edge:
-    # Prevent duplicate equivalence edges (bidirectional)
-    existing = db.query(models.Edge).filter(
-        or_(
-            and_(models.Edge.from_field_id == from_field_id, models.Edge.to_field_id == to_field_id),
-            and_(models.Edge.from_field_id == to_field_id, models.Edge.to_field_id == from_field_id)
-        ),
-        models.Edge.type == "equivalence"
-    ).first()
-    if existing is not None:
-        return existing
-    db_edge = models.Edge(from_field_id=from_field_id, to_field_id=to_field_id, type="equivalence")
-    db.add(db_edge)
+def bulk_create_edges(db: Session, edges: List[tuple], default_type: Optional[str] = None,
+                      strict: bool = False) -> Dict[str, object]:
+    """
+    Insert many (from, to, type) edges in one transaction. Endpoints are field ids or
+    field paths; existing edges are skipped by the unique edge index. Invalid rows are
+    reported by index and skipped, or abort the whole load when strict.
+    """
+    from .graph import record_edges
+    errors = []
+    paths = sorted({endpoint for edge in edges for endpoint in edge[:2] if isinstance(endpoint, str)})
+    path_ids = {r["path"]: r["id"] for r in resolve_field_paths(db, paths) if r["found"]} if paths else {}
+    ids = {endpoint for edge in edges for endpoint in edge[:2] if isinstance(endpoint, int)}
+    known_ids = set()
+    for chunk in _chunks(sorted(ids)):
+        known_ids.update(row[0] for row in db.query(models.Field.id).filter(models.Field.id.in_(chunk)))
+    types = {}
+    rows = []
+    for index, (from_ref, to_ref, edge_type) in enumerate(edges):
+        edge_type = edge_type or default_type
+        if not edge_type:
+            errors.append({"index": index, "error": "Missing edge type"})
+            continue
+        if edge_type not in types:
+            types[edge_type] = edge_type_registry.ensure(db, edge_type)
+        code, directed = types[edge_type]
+        resolved = []
+        for ref in (from_ref, to_ref):
+            field_id = path_ids.get(ref) if isinstance(ref, str) else (ref if ref in known_ids else None)
+            if field_id is None:
+                errors.append({"index": index, "error": f"Field not found: {ref}"})
+                break
+            resolved.append(field_id)
+        else:
+            rows.append((code, *_canonical_edge(directed, *resolved)))
+    if strict and errors:
+        db.rollback()
+        return {"received": len(edges), "inserted": 0, "existing": 0, "errors": errors}
+    inserted = 0
+    if rows:
+        # Rows in (from, type, to) order append to the unique index instead of splitting pages at random
+        rows.sort(key=lambda row: (row[1], row[0], row[2]))
+        added = _insert_edges(db, rows)
+        inserted = len(added)
+        if added:
+            # Types registered by this load are not in the registry until it commits
+            names = {code: name for name, (code, _) in types.items()}
+            lineage_code = edge_type_registry.code(LINEAGE_EDGE_TYPE)
+            _check_lineage(db, [(a, b) for code, a, b in added if code == lineage_code])
+            record_edges(db, added=[(names[code], a, b) for code, a, b in added])
     db.commit()
-    db.refresh(db_edge)
-    return db_edge
+    return {"received": len(edges), "inserted": inserted, "existing": len(rows) - inserted, "errors": errors}
+
+def create_equivalence_edge(db: Session, from_field_id: int, to_field_id: int) -> models.Edge:
+    return _ensure_edge(db, "equivalence", from_field_id, to_field_id)
 
 
 def delete_equivalence_edge(db: Session, from_field_id: int, to_field_id: int) -> bool:
-    edge = db.query(models.Edge).filter(
-        or_(
-            and_(models.Edge.from_field_id == from_field_id, models.Edge.to_field_id == to_field_id),
-            and_(models.Edge.from_field_id == to_field_id, models.Edge.to_field_id == from_field_id)
-        ),
-        models.Edge.type == "equivalence"
-    ).first()
+    edge = _find_edge(db, "equivalence", from_field_id, to_field_id)
     if edge is None:
         return False
     db.delete(edge)
@@ -124,7 +293,7 @@ def get_equivalent_fields(db: Session, field_id: int) -> list:
     # Find all fields equivalent to the given field_id
     edges = db.query(models.Edge).filter(
         or_(models.Edge.from_field_id == field_id, models.Edge.to_field_id == field_id),
-        models.Edge.type == "equivalence"
+        type_condition(models.Edge.type, ["equivalence"])
     ).all()
     equivalents = []
     for edge in edges:
@@ -135,30 +304,21 @@ def get_equivalent_fields(db: Session, field_id: int) -> list:
     return equivalents
 
 def create_possibly_equivalence_edge(db: Session, from_field_id: int, to_field_id: int) -> models.Edge:
-    # Prevent duplicate possibly equivalence edges (bidirectional)
-    existing = db.query(models.Edge).filter(
-        or_(
-            and_(models.Edge.from_field_id == from_field_id, models.Edge.to_field_id == to_field_id),
-            and_(models.Edge.from_field_id == to_field_id, models.Edge.to_field_id == from_field_id)
-        ),
-        models.Edge.type == "possibly_equivalence"
-    ).first()
-    if existing is not None:
-        return existing
-    db_edge = models.Edge(from_field_id=from_field_id, to_field_id=to_field_id, type="possibly_equivalence")
-    db.add(db_edge)
-    db.commit()
-    db.refresh(db_edge)
-    return db_edge
+    return _ensure_edge(db, "possibly_equivalence", from_field_id, to_field_id)
 
 def delete_possibly_equivalence_edge(db: Session, from_field_id: int, to_field_id: int) -> bool:
-    edge = db.query(models.Edge).filter(
-        or_(
-            and_(models.Edge.from_field_id == from_field_id, models.Edge.to_field_id == to_field_id),
-            and_(models.Edge.from_field_id == to_field_id, models.Edge.to_field_id == from_field_id)
-        ),
-        models.Edge.type == "possibly_equivalence"
-    ).first()
+    edge = _find_edge(db, "possibly_equivalence", from_field_id, to_field_id)
+    if edge is None:
+        return False
+    db.delete(edge)
+    db.commit()
+    return True
+
+def create_lineage_edge(db: Session, upstream_field_id: int, downstream_field_id: int) -> models.Edge:
+    return _ensure_edge(db, LINEAGE_EDGE_TYPE, upstream_field_id, downstream_field_id)
+
+def delete_lineage_edge(db: Session, upstream_field_id: int, downstream_field_id: int) -> bool:
+    edge = _find_edge(db, LINEAGE_EDGE_TYPE, upstream_field_id, downstream_field_id)
     if edge is None:
         return False
     db.delete(edge)
@@ -169,7 +329,7 @@ def get_possibly_equivalent_fields(db: Session, field_id: int) -> list:
     # Find all fields possibly equivalent to the given field_id
     edges = db.query(models.Edge).filter(
         or_(models.Edge.from_field_id == field_id, models.Edge.to_field_id == field_id),
-        models.Edge.type == "possibly_equivalence"
+        type_condition(models.Edge.type, ["possibly_equivalence"])
     ).all()
     equivalents = []
     for edge in edges:
@@ -210,6 +370,155 @@ def get_field_id_by_path(db: Session, cluster: str, database: str, table: str, *
     
     return last_field_obj.id if last_field_obj else None
 
+def resolve_field_paths(db: Session, paths: List[str], include_meta: bool = False) -> List[dict]:
+    """
+    Resolve many field paths at once, in input order. Tables are looked up in one join
+    and fields one query per path depth, shared by all paths with a common prefix.
+    Unresolvable paths are returned with found=False.
+    """
+    split = {path: path.split('/') for path in dict.fromkeys(paths)}
+    table_keys = list({tuple(parts[:3]) for parts in split.values() if len(parts) >= 4})
+    table_ids: Dict[tuple, int] = {}
+    for chunk in _chunks(table_keys, 300):
+        for tid, cname, dname, tname in db.query(
+            models.Table.id, models.Cluster.name, models.Database.name, models.Table.name
+        ).join(
+            models.Database, models.Table.database_id == models.Database.id
+        ).join(
+            models.Cluster, models.Database.cluster_id == models.Cluster.id
+        ).filter(tuple_(models.Cluster.name, models.Database.name, models.Table.name).in_(chunk)).order_by(models.Table.id):
+            table_ids.setdefault((cname, dname, tname), tid)
+
+    # Walk all paths down one level at a time; state maps path -> (table_id, parent_id)
+    state = {path: (table_ids[tuple(parts[:3])], None) for path, parts in split.items()
+             if len(parts) >= 4 and tuple(parts[:3]) in table_ids}
+    resolved: Dict[str, tuple] = {}
+    level = 3
+    while state:
+        roots = {(tid, split[path][level]) for path, (tid, parent_id) in state.items() if parent_id is None}
+        children = {(parent_id, split[path][level]) for path, (_, parent_id) in state.items() if parent_id is not None}
+        # Separate IN lists (and no ORDER BY) keep the (table_id, parent_id, name) index usable;
+        # sorted chunks keep their cross product small, exact pairs are checked below and
+        # duplicates resolve to the lowest id
+        found: Dict[tuple, int] = {}
+        for chunk in _chunks(sorted(roots), 400):
+            for fid, tid, name in db.query(models.Field.id, models.Field.table_id, models.Field.name).filter(
+                    models.Field.table_id.in_({tid for tid, _ in chunk}),
+                    models.Field.parent_id.is_(None),
+                    models.Field.name.in_({name for _, name in chunk})):
+                if (tid, name) in roots:
+                    found[(tid, None, name)] = min(fid, found.get((tid, None, name), fid))
+        for chunk in _chunks(sorted(children), 400):
+            for fid, tid, parent_id, name in db.query(
+                models.Field.id, models.Field.table_id, models.Field.parent_id, models.Field.name
+            ).filter(
+                models.Field.parent_id.in_({parent_id for parent_id, _ in chunk}),
+                models.Field.name.in_({name for _, name in chunk})
+            ):
+                if (parent_id, name) in children:
+                    found[(tid, parent_id, name)] = min(fid, found.get((tid, parent_id, name), fid))
+        next_state = {}
+        for path, (tid, parent_id) in state.items():
+            parts = split[path]
+            fid = found.get((tid, parent_id, parts[level]))
+            if fid is None:
+                continue
+            if level == len(parts) - 1:
+                resolved[path] = (fid, parent_id, tid)
+            else:
+                next_state[path] = (tid, fid)
+        state = next_state
+        level += 1
+
+    metas: Dict[int, dict] = {}
+    if include_meta:
+        for chunk in _chunks([row[0] for row in resolved.values()]):
+            metas.update(db.query(models.Field.id, models.Field.meta).filter(models.Field.id.in_(chunk)).all())
+    result = []
+    for path in paths:
+        row = resolved.get(path)
+        if row is None:
+            result.append({"path": path, "found": False})
+            continue
+        item = {"path": path, "found": True, "id": row[0], "parent_id": row[1], "table_id": row[2]}
+        if include_meta:
+            item["meta"] = metas.get(row[0]) or {}
+        result.append(item)
+    return result
+
+# RFC 7396 merge of :patch into a field's meta, skipped if the result would lose 'type'
+_MERGE_META_SQL = (
+    "UPDATE fields SET meta = json_patch(COALESCE(meta, '{}'), :patch) "
+    "WHERE id = :id AND json_type(json_patch(COALESCE(meta, '{}'), :patch), '$.type') IS NOT NULL "
+    "RETURNING meta, table_id"
+)
+
+def merge_field_meta(db: Session, field_id: int, patch: dict) -> Optional[dict]:
+    """
+    Apply an RFC 7396 merge patch to a field's meta inside SQLite (json_patch): nested
+    objects are merged and null values remove keys. The read-modify-write happens in a
+    single statement, so concurrent patches to different keys do not overwrite each
+    other. Returns the new meta, or None if the field does not exist; raises ValueError
+    if the patch would remove 'type'.
+    """
+    from .graph import mark_changed
+    row = db.connection().exec_driver_sql(_MERGE_META_SQL, {"patch": json.dumps(patch), "id": field_id}).first()
+    if row is None:
+        exists = db.query(models.Field.id).filter(models.Field.id == field_id).first() is not None
+        db.rollback()
+        if exists:
+            raise ValueError("meta must contain a 'type' key")
+        return None
+    mark_changed(db, table_ids=[row[1]])
+    db.commit()
+    return json.loads(row[0])
+
+def batch_merge_field_meta(db: Session, operations: List[dict], commit_every: int = 5000,
+                           return_meta: bool = False) -> List[dict]:
+    """
+    Apply many merge patches, each addressed by "path" or "id". Paths are resolved up
+    front in one set-based pass; patches are applied in one transaction per
+    `commit_every` operations. Returns one status per operation, in order:
+    "ok", "not_found" or "invalid" (with an error message).
+    """
+    from .graph import mark_changed
+    paths = [op["path"] for op in operations if op.get("id") is None and op.get("path")]
+    resolved = {r["path"]: r["id"] for r in resolve_field_paths(db, paths) if r["found"]}
+    results = []
+    tables = set()
+    pending = 0
+    conn = db.connection()
+    for index, op in enumerate(operations):
+        field_id = op.get("id") if op.get("id") is not None else resolved.get(op.get("path"))
+        result = {"index": index, "path": op.get("path"), "id": field_id}
+        if field_id is None:
+            result["status"] = "not_found"
+        elif not isinstance(op.get("patch"), dict):
+            result.update(status="invalid", error="patch must be a dictionary")
+        else:
+            row = conn.exec_driver_sql(_MERGE_META_SQL, {"patch": json.dumps(op["patch"]), "id": field_id}).first()
+            if row is None:
+                if db.query(models.Field.id).filter(models.Field.id == field_id).first() is None:
+                    result["status"] = "not_found"
+                else:
+                    result.update(status="invalid", error="meta must contain a 'type' key")
+            else:
+                result["status"] = "ok"
+                if return_meta:
+                    result["meta"] = json.loads(row[0])
+                tables.add(row[1])
+                pending += 1
+        results.append(result)
+        if pending >= commit_every:
+            mark_changed(db, table_ids=list(tables))
+            db.commit()
+            conn = db.connection()
+            tables, pending = set(), 0
+    if pending:
+        mark_changed(db, table_ids=list(tables))
+        db.commit()
+    return results
+
 def get_field_path_by_id(db: Session, field_id: int) -> str:
     # Walk up the parent chain to build the path
     field = db.query(models.Field).filter(models.Field.id == field_id).first()
@@ -236,6 +545,75 @@ def get_field_path_by_id(db: Session, field_id: int) -> str:
         return '/'.join([str(getattr(database, 'name', '')), str(getattr(table, 'name', ''))] + names)
     return '/'.join([str(getattr(cluster, 'name', '')), str(getattr(database, 'name', '')), str(getattr(table, 'name', ''))] + names)
 
+def get_field_paths_by_ids(db: Session, field_ids) -> Dict[int, str]:
+    """
+    Resolve many field ids to their full paths at once.
+    Walks the parent chain one level per query instead of one field per query.
+    """
+    rows: Dict[int, tuple] = {}
+    pending = set(field_ids)
+    while pending:
+        next_pending = set()
+        for chunk in _chunks(list(pending)):
+            for fid, name, parent_id, table_id in db.query(
+                models.Field.id, models.Field.name, models.Field.parent_id, models.Field.table_id
+            ).filter(models.Field.id.in_(chunk)):
+                rows[fid] = (name, parent_id, table_id)
+                if parent_id is not None and parent_id not in rows:
+                    next_pending.add(parent_id)
+        pending = next_pending - set(rows)
+
+    table_ids = {table_id for _, _, table_id in rows.values() if table_id is not None}
+    prefixes: Dict[int, List[str]] = {}
+    for chunk in _chunks(list(table_ids)):
+        for tid, tname, dname, cname in db.query(
+            models.Table.id, models.Table.name, models.Database.name, models.Cluster.name
+        ).outerjoin(
+            models.Database, models.Table.database_id == models.Database.id
+        ).outerjoin(
+            models.Cluster, models.Database.cluster_id == models.Cluster.id
+        ).filter(models.Table.id.in_(chunk)):
+            # Same fallbacks as get_field_path_by_id when a level is missing
+            prefixes[tid] = [n for n in (cname if dname is not None else None, dname, tname) if n is not None]
+
+    names_cache: Dict[int, List[str]] = {}
+
+    def _names(fid: int) -> List[str]:
+        if fid in names_cache:
+            return names_cache[fid]
+        name, parent_id, _ = rows[fid]
+        names = (_names(parent_id) if parent_id in rows else []) + [name]
+        names_cache[fid] = names
+        return names
+
+    paths = {}
+    for fid in field_ids:
+        if fid not in rows:
+            paths[fid] = ''
+            continue
+        table_id = rows[fid][2]
+        paths[fid] = '/'.join(prefixes.get(table_id, []) + _names(fid))
+    return paths
+
+def _chunks(items: list, size: int = 500):
+    # Keep IN (...) lists well below SQLite's bound-parameter limit
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+def get_container_ids_by_path(db: Session, cluster: str, database: Optional[str] = None,
+                              table: Optional[str] = None) -> Optional[Tuple[int, Optional[int], Optional[int]]]:
+    """
+    (cluster_id, database_id, table_id) of a cluster[/database[/table]] path in one query;
+    None if the cluster is missing, and None for each level below the first missing one.
+    """
+    query = db.query(models.Cluster.id, models.Database.id, models.Table.id).outerjoin(
+        models.Database, and_(models.Database.cluster_id == models.Cluster.id, models.Database.name == database)
+    ).outerjoin(
+        models.Table, and_(models.Table.database_id == models.Database.id, models.Table.name == table)
+    ).filter(models.Cluster.name == cluster)
+    row = query.first()
+    return tuple(row) if row else None
+
 def get_cluster_id_by_path(db: Session, cluster: str) -> Optional[int]:
     cluster_obj = db.query(models.Cluster).filter(models.Cluster.name == cluster).first()
     return getattr(cluster_obj, 'id', None) if cluster_obj else None
@@ -308,153 +686,397 @@ def get_table_graph_data(db: Session, table_id: int) -> dict:
     Get graph data for a table including all fields and their edges.
     Returns a dictionary with nodes and edges for graph visualization.
     """
-    from sqlalchemy.orm import joinedload
-    
-    # Get the table with all fields and subfields
-    table = db.query(models.Table).options(
-        joinedload(models.Table.fields).joinedload(models.Field.subfields)
-    ).filter(models.Table.id == table_id).first()
-    
-    if not table:
-        return {"nodes": [], "edges": []}
-    
-    # Get cluster and database info
-    database = db.query(models.Database).filter(models.Database.id == table.database_id).first()
-    if not database:
-        return {"nodes": [], "edges": []}
-    
-    cluster = db.query(models.Cluster).filter(models.Cluster.id == database.cluster_id).first()
-    if not cluster:
+    data = get_tables_graph_data(db, [table_id])
+    if not data["tables"]:
         return {"nodes": [], "edges": []}
-    
-    # Create the cluster.database.table node
-    table_node_id = -1  # Use negative ID to distinguish from field IDs
-    table_node_name = f"{cluster.name}.{database.name}.{table.name}"
-    table_node_path = f"{cluster.name}/{database.name}/{table.name}"
-    
-    # Get all fields for this table (including subfields)
-    all_fields = db.query(models.Field).filter(models.Field.table_id == table_id).all()
-    field_ids = [f.id for f in all_fields]
-    
-    # Get all edges that involve any field in this table
-    edges = db.query(models.Edge).options(
-        joinedload(models.Edge.from_field),
-        joinedload(models.Edge.to_field)
-    ).filter(
-        or_(
-            models.Edge.from_field_id.in_(field_ids),
-            models.Edge.to_field_id.in_(field_ids)
-        )
-    ).all()
-    
-    # Build nodes list - start with the table node
-    nodes = [{
-        "id": table_node_id,
-        "name": table_node_name,
-        "path": table_node_path,
-        "parent_id": None,
-        "meta": {"type": "table", "description": f"Table {table.name} in database {database.name} of cluster {cluster.name}"}
-    }]
-    
-    # Add field nodes
+    return {
+        "table": data["table"],
+        "nodes": data["nodes"],
+        "edges": data["edges"],
+        "external_connections": data["external_connections"],
+    }
+
+def table_node_id(table_id: int, primary: bool = False) -> int:
+    """Graph node id of a table: -1 for the primary table, -(table_id + 1) for the others."""
+    return -1 if primary else -(table_id + 1)
+
+def get_tables_graph_data(db: Session, table_ids: List[int]) -> dict:
+    """
+    Get one merged graph for several tables; the first table is the primary one.
+    Nodes are deduplicated, edges between the given tables are drawn inline and edges
+    leaving the set are reported in external_connections. The number of queries does
+    not depend on the number of tables or fields.
+    """
+    table_ids = list(dict.fromkeys(table_ids))
+    info = _table_info(db, table_ids)
+    ordered = [tid for tid in table_ids if tid in info]
+    result = {"table": None, "tables": [], "nodes": [], "edges": [], "external_connections": []}
+    if not ordered:
+        return result
+    node_ids = {tid: table_node_id(tid, primary=(i == 0)) for i, tid in enumerate(ordered)}
+
+    all_fields = []
+    for chunk in _chunks(ordered):
+        all_fields.extend(db.query(models.Field).filter(models.Field.table_id.in_(chunk)).order_by(models.Field.id).all())
+    fields_by_id = {f.id: f for f in all_fields}
+
+    paths: Dict[int, str] = {}
+
+    def _path(field) -> str:
+        if field.id not in paths:
+            parent = fields_by_id.get(field.parent_id) if field.parent_id is not None else None
+            prefix = _path(parent) if parent is not None else info[field.table_id]["path"]
+            paths[field.id] = f"{prefix}/{field.name}"
+        return paths[field.id]
+
+    primary = info[ordered[0]]
+    result["table"] = {"id": ordered[0], "name": primary["name"]}
+    for tid in ordered:
+        t = info[tid]
+        result["tables"].append({"id": tid, "name": t["name"], "path": t["path"], "node_id": node_ids[tid]})
+        result["nodes"].append({
+            "id": node_ids[tid],
+            "name": f"{t['cluster']}.{t['database']}.{t['name']}",
+            "path": t["path"],
+            "parent_id": None,
+            "meta": {"type": "table", "description": f"Table {t['name']} in database {t['database']} of cluster {t['cluster']}"}
+        })
     for field in all_fields:
-        # Get the full path for the field
-        path = get_field_path_by_id(db, field.id)
-        nodes.append({
+        result["nodes"].append({
             "id": field.id,
             "name": field.name,
-            "path": path,
-            "parent_id": field.parent_id if field.parent_id else table_node_id,  # Connect root fields to table node
+            "path": _path(field),
+            "parent_id": field.parent_id if field.parent_id else node_ids[field.table_id],  # Connect root fields to table node
             "meta": field.meta or {}
         })
-    
-    # Build edges list
-    edge_list = []
-    
-    # Add edges from table node to root fields (fields without parent)
+
+    # Edges from table nodes to root fields, then field hierarchy
     for field in all_fields:
         if field.parent_id is None:
-            edge_list.append({
+            result["edges"].append({
                 "id": f"table_field_{field.id}",
-                "from": table_node_id,
+                "from": node_ids[field.table_id],
                 "to": field.id,
-                "from_path": table_node_path,
-                "to_path": get_field_path_by_id(db, field.id),
+                "from_path": info[field.table_id]["path"],
+                "to_path": _path(field),
                 "type": "contains"
             })
-    
-    # Add edges for field hierarchy (fields to their subfields)
     for field in all_fields:
         if field.parent_id is not None:
-            edge_list.append({
+            parent = fields_by_id.get(field.parent_id)
+            result["edges"].append({
                 "id": f"field_subfield_{field.id}",
                 "from": field.parent_id,
                 "to": field.id,
-                "from_path": get_field_path_by_id(db, field.parent_id),
-                "to_path": get_field_path_by_id(db, field.id),
+                "from_path": _path(parent) if parent is not None else get_field_path_by_id(db, field.parent_id),
+                "to_path": _path(field),
                 "type": "contains"
             })
-    
-    # Track external table connections
-    external_connections = []
-    
-    # Add existing equivalence and possibly equivalence edges
-    for edge in edges:
-        # Get the full paths for both fields using the relationship objects
-        from_field = edge.from_field
-        to_field = edge.to_field
-        if from_field and to_field:
-            # Only add edges where both fields belong to the current table
-            if from_field.table_id == table_id and to_field.table_id == table_id:
-                from_path = get_field_path_by_id(db, from_field.id)
-                to_path = get_field_path_by_id(db, to_field.id)
-                edge_list.append({
-                    "id": edge.id,
-                    "from": from_field.id,
-                    "to": to_field.id,
-                    "from_path": from_path,
-                    "to_path": to_path,
-                    "type": edge.type
-                })
+
+    # All edges touching the tables, one query per direction
+    edge_rows = {}
+    field_ids = list(fields_by_id)
+    for chunk in _chunks(field_ids):
+        for column in (models.Edge.from_field_id, models.Edge.to_field_id):
+            for row in db.query(
+                models.Edge.id, models.Edge.from_field_id, models.Edge.to_field_id, models.Edge.type
+            ).filter(column.in_(chunk)):
+                edge_rows[row[0]] = row
+    external_field_ids = {
+        fid for _, from_id, to_id, _ in edge_rows.values() for fid in (from_id, to_id) if fid not in fields_by_id
+    }
+    external_table_of: Dict[int, int] = {}
+    for chunk in _chunks(list(external_field_ids)):
+        external_table_of.update(
+            db.query(models.Field.id, models.Field.table_id).filter(models.Field.id.in_(chunk)).all()
+        )
+    info.update(_table_info(db, set(external_table_of.values()) - set(info)))
+
+    def _table_ref(tid: Optional[int]) -> dict:
+        t = info.get(tid)
+        if t is None:
+            return {"id": tid, "name": "Unknown", "database": "Unknown", "cluster": "Unknown", "path": "Unknown"}
+        return {"id": tid, "name": t["name"], "database": t["database"], "cluster": t["cluster"], "path": t["path"]}
+
+    for edge_id, from_id, to_id in sorted((r[0], r[1], r[2]) for r in edge_rows.values()):
+        edge_type = edge_rows[edge_id][3]
+        from_field = fields_by_id.get(from_id)
+        to_field = fields_by_id.get(to_id)
+        if from_field is not None and to_field is not None:
+            result["edges"].append({
+                "id": edge_id,
+                "from": from_id,
+                "to": to_id,
+                "from_path": _path(from_field),
+                "to_path": _path(to_field),
+                "type": edge_type
+            })
+        elif (from_field is not None or from_id in external_table_of) and (to_field is not None or to_id in external_table_of):
+            from_table_id = from_field.table_id if from_field is not None else external_table_of[from_id]
+            to_table_id = to_field.table_id if to_field is not None else external_table_of[to_id]
+            result["external_connections"].append({
+                "edge_id": edge_id,
+                "from_field_id": from_id,
+                "to_field_id": to_id,
+                "from_table": _table_ref(from_table_id),
+                "to_table": _table_ref(to_table_id),
+                "type": edge_type
+            })
+    return result
+
+def _table_info(db: Session, table_ids) -> Dict[int, dict]:
+    """Names and path of each table that belongs to an existing database and cluster."""
+    info = {}
+    for chunk in _chunks(list(table_ids)):
+        for tid, tname, dname, cname in db.query(
+            models.Table.id, models.Table.name, models.Database.name, models.Cluster.name
+        ).join(
+            models.Database, models.Table.database_id == models.Database.id
+        ).join(
+            models.Cluster, models.Database.cluster_id == models.Cluster.id
+        ).filter(models.Table.id.in_(chunk)):
+            info[tid] = {"name": tname, "database": dname, "cluster": cname, "path": f"{cname}/{dname}/{tname}"}
+    return info
+
+def iter_table_graph_records(db: Session, table_id: int, parent_id: Optional[int] = None,
+                             depth: Optional[int] = None, page_size: int = 500):
+    """
+    Yield the graph of a table as a stream of records, level by level from the table
+    (or from field parent_id) downwards, stopping after `depth` levels if given.
+    The first record has kind "table"; the rest have kind "node", "edge" or "external"
+    and use the same fields as get_table_graph_data. When depth is given, nodes carry
+    child_count so clients can expand them later. An edge between two fields of the
+    table comes once both have their node record; edges to fields of the streamed
+    subtree below the depth cutoff are left for the request that expands them. Only
+    the paths of two levels and the ids of emitted fields and edges are held in memory.
+    """
+    info = _table_info(db, [table_id])
+    if table_id not in info:
+        return
+    table = info[table_id]
+    table_node = table_node_id(table_id, primary=True)
+    yield {"kind": "table", "id": table_id, "name": table["name"], "path": table["path"]}
+    if parent_id is None:
+        yield {
+            "kind": "node",
+            "id": table_node,
+            "name": f"{table['cluster']}.{table['database']}.{table['name']}",
+            "path": table["path"],
+            "parent_id": None,
+            "meta": {"type": "table", "description": f"Table {table['name']} in database {table['database']} of cluster {table['cluster']}"}
+        }
+        parent_paths: Dict[Optional[int], str] = {None: table["path"]}
+    else:
+        owner = db.query(models.Field.table_id).filter(models.Field.id == parent_id).scalar()
+        if owner != table_id:
+            return
+        parent_paths = {parent_id: get_field_paths_by_ids(db, [parent_id])[parent_id]}
+
+    root_path = next(iter(parent_paths.values()))
+    emitted_nodes, emitted_edges = set(), set()
+    level = 0
+    while parent_paths and (depth is None or level < depth):
+        level_paths: Dict[Optional[int], str] = {}
+        for chunk in _chunks(list(parent_paths), page_size):
+            query = db.query(models.Field).filter(models.Field.table_id == table_id)
+            if chunk == [None]:
+                query = query.filter(models.Field.parent_id.is_(None))
             else:
-                # Track external connections
-                from_table = db.query(models.Table).filter(models.Table.id == from_field.table_id).first()
-                to_table = db.query(models.Table).filter(models.Table.id == to_field.table_id).first()
-                from_db = db.query(models.Database).filter(models.Database.id == from_table.database_id).first() if from_table else None
-                to_db = db.query(models.Database).filter(models.Database.id == to_table.database_id).first() if to_table else None
-                from_cluster = db.query(models.Cluster).filter(models.Cluster.id == from_db.cluster_id).first() if from_db else None
-                to_cluster = db.query(models.Cluster).filter(models.Cluster.id == to_db.cluster_id).first() if to_db else None
-                
-                external_connections.append({
-                    "edge_id": edge.id,
-                    "from_field_id": from_field.id,
-                    "to_field_id": to_field.id,
-                    "from_table": {
-                        "id": from_field.table_id,
-                        "name": from_table.name if from_table else "Unknown",
-                        "database": from_db.name if from_db else "Unknown",
-                        "cluster": from_cluster.name if from_cluster else "Unknown",
-                        "path": f"{from_cluster.name}/{from_db.name}/{from_table.name}" if all([from_cluster, from_db, from_table]) else "Unknown"
-                    },
-                    "to_table": {
-                        "id": to_field.table_id,
-                        "name": to_table.name if to_table else "Unknown",
-                        "database": to_db.name if to_db else "Unknown",
-                        "cluster": to_cluster.name if to_cluster else "Unknown",
-                        "path": f"{to_cluster.name}/{to_db.name}/{to_table.name}" if all([to_cluster, to_db, to_table]) else "Unknown"
-                    },
-                    "type": edge.type
-                })
-    
-    return {
-        "table": {
-            "id": table.id,
-            "name": table.name
-        },
-        "nodes": nodes,
-        "edges": edge_list,
-        "external_connections": external_connections
-    } 
+                query = query.filter(models.Field.parent_id.in_(chunk))
+            fields = query.order_by(models.Field.id).all()
+            for page in _chunks(fields, page_size):
+                ids = [f.id for f in page]
+                child_counts = {}
+                if depth is not None:
+                    child_counts = dict(db.query(models.Field.parent_id, func.count(models.Field.id)).filter(
+                        models.Field.parent_id.in_(ids)).group_by(models.Field.parent_id).all())
+                for field in page:
+                    path = f"{parent_paths[field.parent_id]}/{field.name}"
+                    level_paths[field.id] = path
+                    node = {
+                        "kind": "node",
+                        "id": field.id,
+                        "name": field.name,
+                        "path": path,
+                        "parent_id": field.parent_id if field.parent_id else table_node,
+                        "meta": field.meta or {}
+                    }
+                    if depth is not None:
+                        node["child_count"] = child_counts.get(field.id, 0)
+                    yield node
+                    yield {
+                        "kind": "edge",
+                        "id": f"field_subfield_{field.id}" if field.parent_id else f"table_field_{field.id}",
+                        "from": field.parent_id if field.parent_id else table_node,
+                        "to": field.id,
+                        "from_path": parent_paths[field.parent_id],
+                        "to_path": path,
+                        "type": "contains"
+                    }
+                emitted_nodes.update(ids)
+                yield from _relation_records(db, table_id, info, level_paths, ids, emitted_edges, emitted_nodes, root_path)
+        parent_paths = level_paths
+        level += 1
+
+def _relation_records(db: Session, table_id: int, info: Dict[int, dict], known_paths: Dict[Optional[int], str],
+                      field_ids: List[int], emitted_edges: set, emitted_nodes: set, root_path: str):
+    """
+    Edge and external records for the not yet emitted edges touching field_ids. Edges to
+    fields under root_path (the streamed subtree) that have no node record yet are held
+    back until those fields are streamed.
+    """
+    rows = {}
+    for column in (models.Edge.from_field_id, models.Edge.to_field_id):
+        for row in db.query(
+            models.Edge.id, models.Edge.from_field_id, models.Edge.to_field_id, models.Edge.type
+        ).filter(column.in_(field_ids)):
+            if row[0] not in emitted_edges:
+                rows[row[0]] = row
+    if not rows:
+        return
+    endpoint_ids = {fid for _, from_id, to_id, _ in rows.values() for fid in (from_id, to_id)}
+    table_of: Dict[int, int] = {}
+    for chunk in _chunks(list(endpoint_ids)):
+        table_of.update(db.query(models.Field.id, models.Field.table_id).filter(models.Field.id.in_(chunk)).all())
+    missing = [fid for fid, tid in table_of.items() if tid == table_id and fid not in known_paths]
+    paths = get_field_paths_by_ids(db, missing) if missing else {}
+    info.update(_table_info(db, set(table_of.values()) - set(info)))
+
+    def _table_ref(tid: Optional[int]) -> dict:
+        t = info.get(tid)
+        if t is None:
+            return {"id": tid, "name": "Unknown", "database": "Unknown", "cluster": "Unknown", "path": "Unknown"}
+        return {"id": tid, "name": t["name"], "database": t["database"], "cluster": t["cluster"], "path": t["path"]}
+
+    for edge_id in sorted(rows):
+        _, from_id, to_id, edge_type = rows[edge_id]
+        if from_id not in table_of or to_id not in table_of:
+            continue
+        if table_of[from_id] == table_id and table_of[to_id] == table_id:
+            from_path = known_paths.get(from_id) or paths.get(from_id)
+            to_path = known_paths.get(to_id) or paths.get(to_id)
+            if any(fid not in emitted_nodes and (path or "").startswith(root_path + "/")
+                   for fid, path in ((from_id, from_path), (to_id, to_path))):
+                continue
+            emitted_edges.add(edge_id)
+            yield {
+                "kind": "edge",
+                "id": edge_id,
+                "from": from_id,
+                "to": to_id,
+                "from_path": from_path,
+                "to_path": to_path,
+                "type": edge_type
+            }
+        else:
+            emitted_edges.add(edge_id)
+            yield {
+                "kind": "external",
+                "edge_id": edge_id,
+                "from_field_id": from_id,
+                "to_field_id": to_id,
+                "from_table": _table_ref(table_of[from_id]),
+                "to_table": _table_ref(table_of[to_id]),
+                "type": edge_type
+            }
+
+def get_table_subtree_graph_data(db: Session, table_id: int, parent_id: Optional[int] = None,
+                                 depth: Optional[int] = 1) -> dict:
+    """
+    Get one page of a table graph: the fields below parent_id (or the root fields)
+    down to `depth` levels, in the same shape as get_table_graph_data.
+    """
+    result = {"table": None, "nodes": [], "edges": [], "external_connections": []}
+    for record in iter_table_graph_records(db, table_id, parent_id=parent_id, depth=depth):
+        kind = record.pop("kind")
+        if kind == "table":
+            result["table"] = {"id": record["id"], "name": record["name"]}
+        elif kind == "node":
+            result["nodes"].append(record)
+        elif kind == "edge":
+            result["edges"].append(record)
+        else:
+            result["external_connections"].append(record)
+    return result
+
+def get_table_graph_columns(db: Session, table_id: int, parent_id: Optional[int] = None,
+                            depth: Optional[int] = None) -> dict:
+    """
+    Get a table graph as parallel arrays instead of one dict per node and edge.
+    Node and edge types are dictionary-encoded as indexes into node_types/edge_types,
+    external connections point at the other table's id (see external_tables), and
+    paths and meta are left out; they can be fetched per field on demand.
+    """
+    result = {
+        "table": None,
+        "node_types": [],
+        "edge_types": [],
+        "nodes": {"id": [], "parent_id": [], "name": [], "type": []},
+        "edges": {"id": [], "from": [], "to": [], "type": []},
+        "external_connections": {"edge_id": [], "from_field_id": [], "to_field_id": [], "table_id": [], "type": []},
+        "external_tables": {},
+    }
+    if depth is not None:
+        result["nodes"]["child_count"] = []
+    codes: Dict[str, Dict[str, int]] = {"node_types": {}, "edge_types": {}}
+
+    def _code(kind: str, value) -> int:
+        value = str(value) if value is not None else ""
+        if value not in codes[kind]:
+            codes[kind][value] = len(result[kind])
+            result[kind].append(value)
+        return codes[kind][value]
+
+    for record in iter_table_graph_records(db, table_id, parent_id=parent_id, depth=depth):
+        kind = record["kind"]
+        if kind == "table":
+            result["table"] = {"id": record["id"], "name": record["name"], "path": record["path"]}
+        elif kind == "node":
+            nodes = result["nodes"]
+            nodes["id"].append(record["id"])
+            nodes["parent_id"].append(record["parent_id"])
+            nodes["name"].append(record["name"])
+            nodes["type"].append(_code("node_types", record["meta"].get("type")))
+            if depth is not None:
+                nodes["child_count"].append(record["child_count"])
+        elif kind == "edge":
+            edges = result["edges"]
+            edges["id"].append(record["id"])
+            edges["from"].append(record["from"])
+            edges["to"].append(record["to"])
+            edges["type"].append(_code("edge_types", record["type"]))
+        else:
+            external = result["external_connections"]
+            other = record["to_table"] if record["from_table"]["id"] == table_id else record["from_table"]
+            external["edge_id"].append(record["edge_id"])
+            external["from_field_id"].append(record["from_field_id"])
+            external["to_field_id"].append(record["to_field_id"])
+            external["table_id"].append(other["id"])
+            result["external_tables"][other["id"]] = other["path"]
+            external["type"].append(_code("edge_types", record["type"]))
+    return result
+
+def get_table_layout_inputs(db: Session, table_id: int) -> Optional[tuple]:
+    """
+    Containment tree and inline edges of a table as plain lists for the layout worker:
+    (node ids, parent ids, (from_id, to_id) pairs), with the table node first.
+    """
+    if db.query(models.Table.id).filter(models.Table.id == table_id).first() is None:
+        return None
+    table_node = table_node_id(table_id, primary=True)
+    ids, parents = [table_node], [None]
+    for fid, parent_id in db.query(models.Field.id, models.Field.parent_id).filter(
+            models.Field.table_id == table_id).order_by(models.Field.id):
+        ids.append(fid)
+        parents.append(parent_id if parent_id is not None else table_node)
+    from_field = aliased(models.Field)
+    to_field = aliased(models.Field)
+    links = db.query(models.Edge.from_field_id, models.Edge.to_field_id).join(
+        from_field, models.Edge.from_field_id == from_field.id
+    ).join(
+        to_field, models.Edge.to_field_id == to_field.id
+    ).filter(from_field.table_id == table_id, to_field.table_id == table_id).all()
+    return ids, parents, [tuple(link) for link in links]
 
 def list_field_paths_by_table_path(db, cluster: str, database: str, table: str) -> list:
     """
@@ -466,12 +1088,9 @@ def list_field_paths_by_table_path(db, cluster: str, database: str, table: str)
     table_id = get_table_id_by_path(db, cluster, database, table)
     if table_id is None:
         return []
-    all_fields = db.query(models.Field).filter(models.Field.table_id == table_id).all()
-    paths = []
-    for field in all_fields:
-        path = get_field_path_by_id(db, field.id)
-        paths.append(path)
-    return paths 
+    field_ids = [row[0] for row in db.query(models.Field.id).filter(models.Field.table_id == table_id).all()]
+    paths = get_field_paths_by_ids(db, field_ids)
+    return [paths[field_id] for field_id in field_ids]
 
 def list_field_paths_with_empty_description_by_table_path(db, cluster: str, database: str, table: str) -> list:
     """
@@ -505,4 +1124,119 @@ def list_field_paths_without_type_by_table_path(db, cluster: str, database: str,
         if t is None or (isinstance(t, str) and t.strip() == ""):
             path = get_field_path_by_id(db, field.id)
             paths.append(path)
-    return paths 
\ No newline at end of file
+    return paths
+
+def _meta_equals(key: str, value):
+    """
+    SQL condition for meta[key] == value. The key is matched as a bound parameter against
+    json_each() rows rather than spliced into a JSON path, so keys with quotes or dots work.
+    """
+    entry = func.json_each(models.Field.meta).table_valued("key", "value", "type")
+
+    def has(condition):
+        return select(entry.c.key).where(entry.c.key == key, condition).exists()
+
+    if value is None:
+        # A missing key counts as null, as json_extract() has it
+        return ~has(entry.c.type != 'null')
+    if isinstance(value, bool):
+        return has(entry.c.type == ('true' if value else 'false'))
+    if isinstance(value, (list, dict)):
+        # Arrays and objects come back as minified JSON text
+        return has(entry.c.value == json.dumps(value, separators=(',', ':')))
+    return has(entry.c.value == value)
+
+def _scoped_fields(db: Session, columns: list, cluster_id: Optional[int] = None, database_id: Optional[int] = None,
+                   table_id: Optional[int] = None, field_id: Optional[int] = None, meta_filter: Optional[dict] = None):
+    """
+    Query of columns over the fields under the most specific of the given containers (the
+    field itself and its subfields for field_id) whose meta has every meta_filter pair.
+    """
+    query = db.query(*columns).select_from(models.Field)
+    if table_id is not None:
+        query = query.filter(models.Field.table_id == table_id)
+    elif database_id is not None:
+        query = query.join(models.Table, models.Field.table_id == models.Table.id).filter(
+            models.Table.database_id == database_id)
+    elif cluster_id is not None:
+        query = query.join(models.Table, models.Field.table_id == models.Table.id).join(
+            models.Database, models.Table.database_id == models.Database.id).filter(
+            models.Database.cluster_id == cluster_id)
+    if field_id is not None:
+        subtree = select(models.Field.id).where(models.Field.id == field_id).cte("subtree", recursive=True)
+        subtree = subtree.union_all(select(models.Field.id).where(models.Field.parent_id == subtree.c.id))
+        query = query.filter(models.Field.id.in_(select(subtree.c.id)))
+    if meta_filter:
+        query = query.filter(func.json_type(models.Field.meta) == 'object')
+        for key, value in meta_filter.items():
+            query = query.filter(_meta_equals(key, value))
+    return query
+
+def _page(rows: list, limit: int, max_bytes: Optional[int], path_of) -> Tuple[List[str], Optional[int]]:
+    """
+    Paths of up to limit of rows (fetched as limit + 1 to tell whether more follow), cut
+    short once their JSON would pass max_bytes, and the id to resume after, if any.
+    """
+    more = len(rows) > limit
+    paths, size, last_id = [], 2, None
+    for row in rows[:limit]:
+        path = path_of(row)
+        size += len(json.dumps(path)) + 1
+        if paths and max_bytes is not None and size > max_bytes:
+            more = True
+            break
+        paths.append(path)
+        last_id = row[0]
+    return paths, (last_id if more else None)
+
+def list_field_paths_page(db: Session, after: Optional[int] = None, limit: int = 1000,
+                          max_bytes: Optional[int] = None, **scope) -> Tuple[List[str], Optional[int]]:
+    """
+    One page of the field paths in a scope (see _scoped_fields), in id order: fields with
+    an id above after, at most limit of them and about max_bytes of JSON. Returns the
+    paths and the cursor of the next page (None on the last one).
+    """
+    query = _scoped_fields(db, [models.Field.id], **scope)
+    if after is not None:
+        query = query.filter(models.Field.id > after)
+    rows = query.order_by(models.Field.id).limit(limit + 1).all()
+    paths = get_field_paths_by_ids(db, [row[0] for row in rows[:limit]])
+    return _page(rows, limit, max_bytes, lambda row: paths[row[0]])
+
+def list_database_paths_page(db: Session, clusters: Optional[List[str]] = None, after: Optional[int] = None,
+                             limit: int = 1000, max_bytes: Optional[int] = None) -> Tuple[List[str], Optional[int]]:
+    """One page of cluster/database paths, optionally of some clusters only; same paging as list_field_paths_page."""
+    query = db.query(models.Database.id, models.Cluster.name, models.Database.name).join(
+        models.Cluster, models.Database.cluster_id == models.Cluster.id)
+    if clusters:
+        query = query.filter(models.Cluster.name.in_(clusters))
+    if after is not None:
+        query = query.filter(models.Database.id > after)
+    rows = query.order_by(models.Database.id).limit(limit + 1).all()
+    return _page(rows, limit, max_bytes, lambda row: f"{row[1]}/{row[2]}")
+
+def summarize_field_paths(db: Session, sample: int = 20, max_tables: int = 100, **scope) -> dict:
+    """
+    Field count of a scope (see _scoped_fields) in total and per table (the first
+    max_tables tables by id), with the first sample field paths.
+    """
+    counts = _scoped_fields(db, [models.Field.table_id, func.count(models.Field.id)], **scope).group_by(
+        models.Field.table_id).order_by(models.Field.table_id).all()
+    shown = counts[:max_tables]
+    table_paths = {}
+    for chunk in _chunks([table_id for table_id, _ in shown]):
+        for tid, cname, dname, tname in db.query(
+            models.Table.id, models.Cluster.name, models.Database.name, models.Table.name
+        ).join(
+            models.Database, models.Table.database_id == models.Database.id
+        ).join(
+            models.Cluster, models.Database.cluster_id == models.Cluster.id
+        ).filter(models.Table.id.in_(chunk)):
+            table_paths[tid] = f"{cname}/{dname}/{tname}"
+    paths, _ = list_field_paths_page(db, limit=sample, **scope) if sample else ([], None)
+    return {
+        "total": sum(count for _, count in counts),
+        "table_count": len(counts),
+        "tables": [{"path": table_paths.get(tid, ''), "fields": count} for tid, count in shown],
+        "paths": paths,
+    }
@@ -1,6 +1,8 @@
-from sqlalchemy import create_engine, text
+from contextlib import contextmanager
+from sqlalchemy import create_engine, event, text
 from sqlalchemy.orm import sessionmaker
 from backend.models import Base
+from backend.edge_types import registry as edge_type_registry
 
 DATABASE_URL = "sqlite:///./data/dbdesc.db"
 
@@ -19,8 +21,155 @@ engine = create_engine(
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+@event.listens_for(SessionLocal, "after_commit")
+def _note_commit(session):
+    # Lets a failed request tell whether it already committed part of its work
+    session.info["committed"] = True
+
+@contextmanager
+def atomic_session():
+    """
+    Session for running code that commits as it goes as one unit: its commits only
+    release savepoints of an outer transaction, which is committed when the block
+    exits normally and rolled back if it raises.
+    """
+    from . import graph
+    connection = engine.connect()
+    transaction = connection.begin()
+    # pysqlite only opens a transaction before DML; without an explicit BEGIN the first
+    # savepoint would become the outer transaction and its release would commit
+    connection.exec_driver_sql("BEGIN")
+    session = SessionLocal(bind=connection, join_transaction_mode="create_savepoint")
+    graph.defer_changes(session)
+    try:
+        yield session
+        session.commit()
+        transaction.commit()
+        graph.finish_deferred(session, committed=True)
+    except BaseException:
+        transaction.rollback()
+        graph.finish_deferred(session, committed=False)
+        # Edge types registered by a released savepoint were rolled back with it
+        edge_type_registry.load(connection)
+        raise
+    finally:
+        session.close()
+        connection.close()
+
+def _set_aside_legacy_edges(conn):
+    """
+    Rename an edges table that still stores type names as text (created before edge
+    type codes) to edges_legacy, dropping its indexes so create_all can rebuild them.
+    """
+    columns = {row[1]: row[2] for row in conn.exec_driver_sql("PRAGMA table_info(edges)")}
+    if not columns or columns.get("type", "").upper() == "INTEGER":
+        return
+    indexes = conn.exec_driver_sql(
+        "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'edges' AND sql IS NOT NULL"
+    ).all()
+    for (name,) in indexes:
+        conn.exec_driver_sql(f'DROP INDEX "{name}"')
+    conn.exec_driver_sql("ALTER TABLE edges RENAME TO edges_legacy")
+
+def _migrate_legacy_edges(conn):
+    """Copy edges_legacy into the new edges table: type names become codes, undirected pairs (min, max), duplicates dropped."""
+    if not conn.exec_driver_sql("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'edges_legacy'").first():
+        return
+    names = [tuple(row) for row in conn.exec_driver_sql("SELECT DISTINCT type FROM edges_legacy")]
+    if names:
+        conn.exec_driver_sql("INSERT INTO edge_types (name, directed) VALUES (?, 1) ON CONFLICT (name) DO NOTHING", names)
+    conn.exec_driver_sql("""
+        INSERT OR IGNORE INTO edges (id, type, from_field_id, to_field_id)
+        SELECT e.id, t.id,
+               CASE WHEN NOT t.directed AND e.from_field_id > e.to_field_id THEN e.to_field_id ELSE e.from_field_id END,
+               CASE WHEN NOT t.directed AND e.from_field_id > e.to_field_id THEN e.from_field_id ELSE e.to_field_id END
+        FROM edges_legacy e JOIN edge_types t ON t.name = e.type
+        ORDER BY e.id
+    """)
+    conn.exec_driver_sql("DROP TABLE edges_legacy")
+
+# Children whose names must be unique under their parent: (table, parent column, child table, child column)
+_UNIQUE_NAME_LEVELS = (
+    ("databases", "cluster_id", "tables", "database_id"),
+    ("tables", "database_id", "fields", "table_id"),
+)
+_UNIQUE_NAME_INDEXES = ("uq_database_cluster_name", "uq_table_database_name", "uq_field_table_root_name")
+
+def _merge_into(conn, table: str, key: tuple) -> int:
+    """Fill temp table `merged` with (duplicate id, id of the oldest row with the same `key` columns)."""
+    conn.exec_driver_sql("DELETE FROM merged")
+    columns = ", ".join(key)
+    same = " AND ".join(f"t.{column} IS k.{column}" for column in key)
+    return conn.exec_driver_sql(f"""
+        INSERT INTO merged (old, new)
+        SELECT t.id, k.keep FROM {table} t
+        JOIN (SELECT {columns}, MIN(id) AS keep FROM {table} GROUP BY {columns} HAVING COUNT(*) > 1) k
+          ON {same} AND t.id != k.keep
+    """).rowcount
+
+def _merge_duplicate_names(conn):
+    """
+    Merge databases, tables and fields that share a name under the same parent, which
+    databases created before their unique indexes can hold, into the oldest of them so
+    the indexes can be built. Children are moved over (and merged in turn), and edges of
+    merged fields are repointed, dropping the ones that become duplicates.
+    """
+    present = {name for (name,) in conn.exec_driver_sql("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    if present.issuperset(_UNIQUE_NAME_INDEXES):
+        return
+    conn.exec_driver_sql("CREATE TEMP TABLE IF NOT EXISTS merged (old INTEGER PRIMARY KEY, new INTEGER NOT NULL)")
+    moved = "(SELECT new FROM merged WHERE old = {column})"
+    for table, parent_column, child_table, child_column in _UNIQUE_NAME_LEVELS:
+        if _merge_into(conn, table, (parent_column, "name")):
+            conn.exec_driver_sql(f"UPDATE {child_table} SET {child_column} = {moved.format(column=child_column)} "
+                                 f"WHERE {child_column} IN (SELECT old FROM merged)")
+            conn.exec_driver_sql(f"DELETE FROM {table} WHERE id IN (SELECT old FROM merged)")
+    # Subfields of a merged field are merged into the kept field's subfield of the same name
+    # when it has one; this walks down one level per statement
+    undirected = "type IN (SELECT id FROM edge_types WHERE NOT directed)"
+    if _merge_into(conn, "fields", ("table_id", "parent_id", "name")):
+        while conn.exec_driver_sql("""
+            INSERT OR IGNORE INTO merged (old, new)
+            SELECT c.id, k.id FROM merged m
+            JOIN fields c ON c.parent_id = m.old
+            JOIN fields k ON k.parent_id = m.new AND k.name = c.name
+        """).rowcount:
+            pass
+        conn.exec_driver_sql(f"UPDATE fields SET parent_id = {moved.format(column='parent_id')} "
+                             "WHERE parent_id IN (SELECT old FROM merged) AND id NOT IN (SELECT old FROM merged)")
+        # Edges between fields merged into one would become self loops
+        conn.exec_driver_sql(f"""
+            DELETE FROM edges WHERE (from_field_id IN (SELECT old FROM merged) OR to_field_id IN (SELECT old FROM merged))
+              AND COALESCE({moved.format(column='from_field_id')}, from_field_id) = COALESCE({moved.format(column='to_field_id')}, to_field_id)
+        """)
+        for column in ("from_field_id", "to_field_id"):
+            conn.exec_driver_sql(f"UPDATE OR IGNORE edges SET {column} = {moved.format(column=column)} "
+                                 f"WHERE {column} IN (SELECT old FROM merged)")
+        conn.exec_driver_sql("DELETE FROM edges WHERE from_field_id IN (SELECT old FROM merged) "
+                             "OR to_field_id IN (SELECT old FROM merged)")
+        conn.exec_driver_sql(f"UPDATE OR IGNORE edges SET from_field_id = to_field_id, to_field_id = from_field_id "
+                             f"WHERE from_field_id > to_field_id AND {undirected}")
+        conn.exec_driver_sql(f"DELETE FROM edges WHERE from_field_id > to_field_id AND {undirected}")
+        conn.exec_driver_sql("DELETE FROM fields WHERE id IN (SELECT old FROM merged)")
+    conn.exec_driver_sql("DROP TABLE merged")
+
+def _create_missing_indexes(conn):
+    """create_all() skips tables that already exist, so add indexes introduced since they were created."""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=conn, checkfirst=True)
+    # Superseded by the unique (parent, name) indexes
+    conn.exec_driver_sql("DROP INDEX IF EXISTS idx_database_cluster_id")
+    conn.exec_driver_sql("DROP INDEX IF EXISTS idx_table_database_id")
+
 def init_db():
-    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        _set_aside_legacy_edges(conn)
+        Base.metadata.create_all(bind=conn)
+        _migrate_legacy_edges(conn)
+        _merge_duplicate_names(conn)
+        _create_missing_indexes(conn)
+        edge_type_registry.load(conn)
     
     # Enable WAL mode and other SQLite optimizations
     with engine.connect() as conn:
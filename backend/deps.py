@@ -1,4 +1,5 @@
 from .database import SessionLocal
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import Session
 from fastapi import Depends
 
@@ -6,5 +7,10 @@ def get_db():
     db = SessionLocal()
     try:
         yield db
+    except OperationalError as exc:
+        # Requests that commit as they go (non-atomic batches, chunked edits) cannot be
+        # replayed safely once part of them is in; the busy handler needs to know
+        exc.committed = db.info.get("committed", False)
+        raise
     finally:
         db.close() 
\ No newline at end of file
@@ -0,0 +1,106 @@
+"""
+Registered edge types.
+
+Edges store a small integer code for their type instead of its name. `registry` maps
+between the two in process memory, so queries and API responses keep using names, and
+knows which types are directed. The graph module reloads it when another process sharing
+the database commits, which covers types registered there. Undirected types are stored
+once per pair as (min field id, max field id).
+"""
+import threading
+from typing import Dict, Iterable, List, Tuple
+
+from sqlalchemy import event, literal_column
+from sqlalchemy.orm import Session
+
+# (code, name, directed) present in every database. Codes are fixed so the per-type
+# partial indexes on edges can name them.
+BUILTIN_EDGE_TYPES = (
+    (1, "equivalence", False),
+    (2, "possibly_equivalence", False),
+    (3, "lineage", True),
+)
+# Code bound for names that are not registered; no edge has it, so filters on it match nothing
+UNKNOWN_CODE = -1
+
+
+class EdgeTypeRegistry:
+    """Name <-> code map of the committed edge types, replaced wholesale on every change."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._codes: Dict[str, int] = {}
+        self._names: Dict[int, str] = {}
+        self._directed: Dict[str, bool] = {}
+        self._replace(BUILTIN_EDGE_TYPES)
+
+    def _replace(self, rows: Iterable[tuple], keep: bool = False):
+        with self._lock:
+            codes = dict(self._codes) if keep else {}
+            directed = dict(self._directed) if keep else {}
+            for code, name, is_directed in rows:
+                codes[name] = code
+                directed[name] = bool(is_directed)
+            self._codes, self._directed = codes, directed
+            self._names = {code: name for name, code in codes.items()}
+
+    def load(self, conn):
+        """Reload the registry from the edge_types table."""
+        self._replace(conn.exec_driver_sql("SELECT id, name, directed FROM edge_types").all())
+
+    def code(self, name: str) -> int:
+        return self._codes.get(name, UNKNOWN_CODE)
+
+    def name(self, code: int) -> str:
+        return self._names.get(code, str(code))
+
+    def is_directed(self, name: str) -> bool:
+        # Types registered on the fly are directed, matching how edges behaved before types had a direction
+        return self._directed.get(name, True)
+
+    def types(self) -> List[dict]:
+        return [{"id": code, "name": name, "directed": self._directed[name]} for name, code in sorted(self._codes.items(), key=lambda item: item[1])]
+
+    def ensure(self, db: Session, name: str, directed: bool = True) -> Tuple[int, bool]:
+        """
+        (code, directed) of an edge type, registering it in the session's transaction if it
+        is new. The registry only learns about it once that transaction commits.
+        """
+        code = self._codes.get(name)
+        if code is not None:
+            return code, self._directed[name]
+        pending = db.info.setdefault("edge_types_pending", {})
+        if name not in pending:
+            conn = db.connection()
+            conn.exec_driver_sql(
+                "INSERT INTO edge_types (name, directed) VALUES (?, ?) ON CONFLICT (name) DO NOTHING", (name, directed)
+            )
+            code, is_directed = conn.exec_driver_sql("SELECT id, directed FROM edge_types WHERE name = ?", (name,)).one()
+            pending[name] = (code, bool(is_directed))
+        return pending[name]
+
+
+registry = EdgeTypeRegistry()
+
+
+def type_condition(column, names: Iterable[str]):
+    """
+    Filter `column` (Edge.type) on type names with the codes inlined in the SQL, so SQLite
+    can match the per-type partial indexes, which a bound parameter would not.
+    """
+    codes = sorted({registry.code(name) for name in names})
+    if len(codes) == 1:
+        return column == literal_column(str(codes[0]))
+    return column.in_([literal_column(str(code)) for code in codes])
+
+
+@event.listens_for(Session, "after_commit")
+def _promote_pending(session):
+    pending = session.info.pop("edge_types_pending", None)
+    if pending:
+        registry._replace([(code, name, directed) for name, (code, directed) in pending.items()], keep=True)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_pending(session, previous_transaction):
+    session.info.pop("edge_types_pending", None)
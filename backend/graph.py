@@ -0,0 +1,789 @@
+"""
+Graph algorithms over the `edges` table.
+
+Caches in this module live in process memory. They are kept current by the
+session hooks at the bottom of the file, which bump a global revision after
+every commit that touches the catalog. Commits also bump the row of the
+catalog_revision table, and every transaction compares it with the value this
+process last saw, so writes made by other processes sharing the file drop the
+caches too.
+"""
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set
+
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session, aliased
+
+from . import models
+from .crud import _chunks, get_field_paths_by_ids, get_table_graph_data
+from .edge_types import registry as edge_type_registry, type_condition
+
+_revision = 0
+_revision_lock = threading.Lock()
+# Revision at which the fields or edges of each table last changed; changes that cannot
+# be attributed to tables raise the floor for all of them
+_table_revisions: Dict[int, int] = {}
+_table_revision_floor = 0
+# catalog_revision value the caches reflect; None until the first transaction reads it
+_marker: Optional[int] = None
+
+
+def current_revision() -> int:
+    """Revision of the catalog as seen by this process; increases on every committed change."""
+    return _revision
+
+
+def table_revision(table_id: int) -> int:
+    """Revision at which the fields or edges of a table (including edges to other tables) last changed."""
+    return max(_table_revisions.get(table_id, 0), _table_revision_floor)
+
+
+def _sync_marker(connection):
+    """Drop every cache and reload the edge type registry if another process committed since the last check."""
+    global _revision, _table_revision_floor, _marker
+    marker = connection.exec_driver_sql("SELECT revision FROM catalog_revision").scalar()
+    if marker == _marker:
+        return
+    table_graph.invalidate()
+    edge_type_registry.load(connection)
+    with _revision_lock:
+        _revision += 1
+        _table_revision_floor = _revision
+        _marker = marker
+
+
+def sync_external_changes(db: Session):
+    """Make the caches reflect changes committed by other processes before reading them."""
+    if db.in_transaction():
+        _sync_marker(db.connection())
+    else:
+        # Beginning the transaction runs the check
+        db.connection()
+
+
+def _edge_neighbors(db: Session, frontier: Set[int], edge_types: Optional[List[str]] = None) -> list:
+    """
+    Return (node, neighbor, edge_id, edge_type) for every edge touching the frontier.
+    Edges are treated as undirected; one query per direction per chunk.
+    """
+    rows = []
+    for chunk in _chunks(list(frontier)):
+        for column, other in (
+            (models.Edge.from_field_id, models.Edge.to_field_id),
+            (models.Edge.to_field_id, models.Edge.from_field_id),
+        ):
+            query = db.query(column, other, models.Edge.id, models.Edge.type).filter(column.in_(chunk))
+            if edge_types:
+                query = query.filter(type_condition(models.Edge.type, edge_types))
+            rows.extend(query.all())
+    return rows
+
+
+def shortest_field_path(db: Session, source_id: int, target_id: int, edge_types: Optional[List[str]] = None,
+                        max_depth: int = 6, time_budget: float = 2.0) -> dict:
+    """
+    Find the shortest chain of edges between two fields with a bidirectional BFS.
+    Each step expands the smaller frontier with one set-based query, so the number of
+    queries grows with the path length rather than with the number of visited fields.
+    """
+    deadline = time.monotonic() + time_budget
+    # node -> (previous node, edge id, edge type) for each search direction
+    parents_fwd: Dict[int, Optional[tuple]] = {source_id: None}
+    parents_bwd: Dict[int, Optional[tuple]] = {target_id: None}
+    frontier_fwd, frontier_bwd = {source_id}, {target_id}
+    depth = 0
+    meeting = source_id if source_id == target_id else None
+    timed_out = False
+
+    while meeting is None and frontier_fwd and frontier_bwd and depth < max_depth:
+        if time.monotonic() > deadline:
+            timed_out = True
+            break
+        forward = len(frontier_fwd) <= len(frontier_bwd)
+        frontier, parents, other = (
+            (frontier_fwd, parents_fwd, parents_bwd) if forward else (frontier_bwd, parents_bwd, parents_fwd)
+        )
+        next_frontier = set()
+        for node, neighbor, edge_id, edge_type in _edge_neighbors(db, frontier, edge_types):
+            if neighbor in parents:
+                continue
+            parents[neighbor] = (node, edge_id, edge_type)
+            next_frontier.add(neighbor)
+            if neighbor in other:
+                meeting = neighbor
+                break
+        if forward:
+            frontier_fwd = next_frontier
+        else:
+            frontier_bwd = next_frontier
+        depth += 1
+
+    result = {
+        "found": meeting is not None,
+        "length": None,
+        "nodes": [],
+        "edges": [],
+        "visited": len(parents_fwd) + len(parents_bwd),
+        "timed_out": timed_out,
+    }
+    if meeting is None:
+        return result
+
+    # Stitch both halves together: source ... meeting ... target
+    steps = []
+    node = meeting
+    while parents_fwd[node] is not None:
+        prev, edge_id, edge_type = parents_fwd[node]
+        steps.append((prev, node, edge_id, edge_type))
+        node = prev
+    steps.reverse()
+    node = meeting
+    while parents_bwd[node] is not None:
+        nxt, edge_id, edge_type = parents_bwd[node]
+        steps.append((node, nxt, edge_id, edge_type))
+        node = nxt
+
+    node_ids = [source_id] + [step[1] for step in steps]
+    paths = get_field_paths_by_ids(db, node_ids)
+    result["length"] = len(steps)
+    result["nodes"] = [{"id": fid, "path": paths[fid]} for fid in node_ids]
+    result["edges"] = [
+        {
+            "id": edge_id,
+            "from": from_id,
+            "to": to_id,
+            "from_path": paths[from_id],
+            "to_path": paths[to_id],
+            "type": edge_type,
+        }
+        for from_id, to_id, edge_id, edge_type in steps
+    ]
+    return result
+
+
+class TableGraph:
+    """
+    Table-level graph aggregated from field edges.
+    For every edge type it keeps table -> neighbor table -> number of field edges.
+    Built once with a single aggregate query and updated incrementally on edge mutations.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._links: Optional[Dict[str, Dict[int, Dict[int, int]]]] = None
+        # Bumped on every change so a build racing with a commit is not cached stale
+        self._generation = 0
+
+    def invalidate(self):
+        with self._lock:
+            self._links = None
+            self._generation += 1
+
+    def _ensure(self, db: Session) -> Dict[str, Dict[int, Dict[int, int]]]:
+        sync_external_changes(db)
+        links = self._links
+        if links is not None:
+            return links
+        generation = self._generation
+        from_field, to_field = aliased(models.Field), aliased(models.Field)
+        rows = db.query(
+            models.Edge.type, from_field.table_id, to_field.table_id
+        ).join(
+            from_field, models.Edge.from_field_id == from_field.id
+        ).join(
+            to_field, models.Edge.to_field_id == to_field.id
+        ).filter(from_field.table_id != to_field.table_id).all()
+        links = {}
+        for edge_type, a, b in rows:
+            _add_link(links, edge_type, a, b, 1)
+        with self._lock:
+            if self._links is None and self._generation == generation:
+                self._links = links
+            return self._links if self._links is not None else links
+
+    def apply(self, added: list, removed: list):
+        """Apply committed edge changes given as (type, from_table_id, to_table_id)."""
+        with self._lock:
+            self._generation += 1
+            if self._links is None:
+                return
+            for edge_type, a, b in added:
+                if a != b:
+                    _add_link(self._links, edge_type, a, b, 1)
+            for edge_type, a, b in removed:
+                if a != b:
+                    _add_link(self._links, edge_type, a, b, -1)
+
+    def neighbors(self, db: Session, table_id: int, edge_types: Optional[List[str]] = None) -> Dict[int, int]:
+        """Return neighbor table id -> number of connecting field edges."""
+        links = self._ensure(db)
+        result: Dict[int, int] = {}
+        for edge_type in (edge_types or list(links)):
+            for other, count in links.get(edge_type, {}).get(table_id, {}).items():
+                result[other] = result.get(other, 0) + count
+        return result
+
+    def shortest_path(self, db: Session, source: int, target: int, edge_types: Optional[List[str]] = None,
+                      max_hops: int = 6) -> Optional[List[int]]:
+        """Bidirectional BFS over the cached adjacency; returns the table ids on the path."""
+        if source == target:
+            return [source]
+        links = self._ensure(db)
+        type_links = [links[t] for t in (edge_types or list(links)) if t in links]
+        parents_fwd: Dict[int, Optional[int]] = {source: None}
+        parents_bwd: Dict[int, Optional[int]] = {target: None}
+        frontier_fwd, frontier_bwd = [source], [target]
+        for _ in range(max_hops):
+            if not frontier_fwd or not frontier_bwd:
+                return None
+            forward = len(frontier_fwd) <= len(frontier_bwd)
+            frontier, parents, other = (
+                (frontier_fwd, parents_fwd, parents_bwd) if forward else (frontier_bwd, parents_bwd, parents_fwd)
+            )
+            next_frontier = []
+            meeting = None
+            for node in frontier:
+                for adjacency in type_links:
+                    for neighbor in adjacency.get(node, ()):
+                        if neighbor in parents:
+                            continue
+                        parents[neighbor] = node
+                        next_frontier.append(neighbor)
+                        if neighbor in other:
+                            meeting = neighbor
+                            break
+                    if meeting is not None:
+                        break
+                if meeting is not None:
+                    break
+            if meeting is not None:
+                path = [meeting]
+                while parents_fwd[path[-1]] is not None:
+                    path.append(parents_fwd[path[-1]])
+                path.reverse()
+                while parents_bwd[path[-1]] is not None:
+                    path.append(parents_bwd[path[-1]])
+                return path
+            if forward:
+                frontier_fwd = next_frontier
+            else:
+                frontier_bwd = next_frontier
+        return None
+
+    def neighborhood(self, db: Session, seed: int, radius: int, edge_types: Optional[List[str]] = None,
+                     max_tables: Optional[int] = None) -> List[int]:
+        """Tables within `radius` hops of the seed table, nearest first, seed included."""
+        links = self._ensure(db)
+        type_links = [links[t] for t in (edge_types or list(links)) if t in links]
+        seen = {seed: None}
+        frontier = [seed]
+        for _ in range(radius):
+            next_frontier = []
+            for node in frontier:
+                for adjacency in type_links:
+                    for neighbor in sorted(adjacency.get(node, ())):
+                        if neighbor not in seen:
+                            seen[neighbor] = None
+                            next_frontier.append(neighbor)
+            frontier = next_frontier
+        tables = list(seen)
+        return tables[:max_tables] if max_tables else tables
+
+
+def _add_link(links: dict, edge_type: str, a: int, b: int, delta: int):
+    by_table = links.setdefault(edge_type, {})
+    for x, y in ((a, b), (b, a)):
+        neighbors = by_table.setdefault(x, {})
+        count = neighbors.get(y, 0) + delta
+        if count > 0:
+            neighbors[y] = count
+        else:
+            neighbors.pop(y, None)
+            if not neighbors:
+                by_table.pop(x, None)
+
+
+table_graph = TableGraph()
+
+
+def _table_paths(db: Session, table_ids) -> Dict[int, str]:
+    paths = {}
+    for chunk in _chunks(list(table_ids)):
+        for tid, tname, dname, cname in db.query(
+            models.Table.id, models.Table.name, models.Database.name, models.Cluster.name
+        ).join(
+            models.Database, models.Table.database_id == models.Database.id
+        ).join(
+            models.Cluster, models.Database.cluster_id == models.Cluster.id
+        ).filter(models.Table.id.in_(chunk)):
+            paths[tid] = f"{cname}/{dname}/{tname}"
+    return paths
+
+
+def plan_join_path(db: Session, from_table_id: int, to_table_id: int, edge_types: Optional[List[str]] = None,
+                   max_hops: int = 6) -> dict:
+    """
+    Find the shortest sequence of tables linking two tables and the field pairs joining each hop.
+    The search runs on the cached table graph; only the hops on the answer touch the database.
+    """
+    table_ids = table_graph.shortest_path(db, from_table_id, to_table_id, edge_types, max_hops)
+    if table_ids is None:
+        return {"found": False, "hops": None, "tables": [], "joins": []}
+    paths = _table_paths(db, table_ids)
+    from_field, to_field = aliased(models.Field), aliased(models.Field)
+    joins = []
+    hop_edges = []
+    for a, b in zip(table_ids, table_ids[1:]):
+        pairs = []
+        # One query per edge direction, each driven by the fields index of the hop's source table
+        for near_column, far_column in (
+            (models.Edge.from_field_id, models.Edge.to_field_id),
+            (models.Edge.to_field_id, models.Edge.from_field_id),
+        ):
+            query = db.query(models.Edge.id, models.Edge.type, near_column, far_column).join(
+                from_field, near_column == from_field.id
+            ).join(
+                to_field, far_column == to_field.id
+            ).filter(from_field.table_id == a, to_field.table_id == b)
+            if edge_types:
+                query = query.filter(type_condition(models.Edge.type, edge_types))
+            pairs.extend(query.all())
+        hop_edges.append(pairs)
+    field_paths = get_field_paths_by_ids(db, {fid for pairs in hop_edges for _, _, f1, f2 in pairs for fid in (f1, f2)})
+    for (a, b), pairs in zip(zip(table_ids, table_ids[1:]), hop_edges):
+        joins.append({
+            "from_table": paths.get(a),
+            "to_table": paths.get(b),
+            "pairs": [
+                {"edge_id": edge_id, "type": edge_type, "from_path": field_paths[f1], "to_path": field_paths[f2]}
+                for edge_id, edge_type, f1, f2 in pairs
+            ],
+        })
+    return {
+        "found": True,
+        "hops": len(table_ids) - 1,
+        "tables": [{"id": tid, "path": paths.get(tid)} for tid in table_ids],
+        "joins": joins,
+    }
+
+
+class RevisionCache:
+    """Small LRU of computed results that are only valid for the revision they were built at."""
+
+    def __init__(self, maxsize: int = 256):
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self.maxsize = maxsize
+
+    def get(self, key: tuple, revision: Optional[int] = None):
+        """Cached value for key if it was built at `revision` (default: the current revision)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != (_revision if revision is None else revision):
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key: tuple, revision: int, value):
+        with self._lock:
+            self._entries[key] = (revision, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+
+aggregate_cache = RevisionCache()
+# Keyed by table; entries are checked against table_revision() rather than the global revision
+layout_cache = RevisionCache(maxsize=64)
+
+
+def _aggregate_links(db: Session, level: str, scope_id: int, edge_types: Optional[List[str]] = None) -> Dict[tuple, Dict[str, int]]:
+    """
+    Count field edges between pairs of tables (level="table", scoped to a database) or
+    pairs of databases (level="database", scoped to a cluster) with GROUP BY queries.
+    Returns {(a, b): {edge_type: count}} with a < b; links inside one node are skipped.
+    """
+    f1, f2 = aliased(models.Field), aliased(models.Field)
+    t1, t2 = aliased(models.Table), aliased(models.Table)
+    if level == "table":
+        key1, key2 = f1.table_id, f2.table_id
+        scope1, scope2 = t1.database_id, t2.database_id
+    else:
+        key1, key2 = t1.database_id, t2.database_id
+        d1, d2 = aliased(models.Database), aliased(models.Database)
+        scope1, scope2 = d1.cluster_id, d2.cluster_id
+    base = db.query(key1, key2, models.Edge.type, func.count(models.Edge.id)).join(
+        f1, models.Edge.from_field_id == f1.id
+    ).join(
+        f2, models.Edge.to_field_id == f2.id
+    ).join(
+        t1, f1.table_id == t1.id
+    ).join(
+        t2, f2.table_id == t2.id
+    )
+    if level != "table":
+        base = base.join(d1, t1.database_id == d1.id).join(d2, t2.database_id == d2.id)
+    base = base.filter(key1 != key2)
+    if edge_types:
+        base = base.filter(type_condition(models.Edge.type, edge_types))
+    links: Dict[tuple, Dict[str, int]] = {}
+    # Two queries instead of an OR so each side can be driven by its scope index
+    for query in (base.filter(scope1 == scope_id), base.filter(scope2 == scope_id, scope1 != scope_id)):
+        for a, b, edge_type, count in query.group_by(key1, key2, models.Edge.type):
+            counts = links.setdefault((min(a, b), max(a, b)), {})
+            counts[edge_type] = counts.get(edge_type, 0) + count
+    return links
+
+
+def _links_payload(links: Dict[tuple, Dict[str, int]], min_weight: int) -> list:
+    payload = []
+    for (a, b), counts in sorted(links.items()):
+        weight = sum(counts.values())
+        if weight >= min_weight:
+            payload.append({"source": a, "target": b, "weight": weight, "counts": counts})
+    return payload
+
+
+def get_database_graph_data(db: Session, database_id: int, min_weight: int = 1,
+                            edge_types: Optional[List[str]] = None) -> Optional[dict]:
+    """
+    Table -> table relationship graph for one database, cached per revision. Every table
+    of the database is a node, except that with min_weight above 1 only tables that keep
+    a link are listed.
+    """
+    sync_external_changes(db)
+    key = ("database", database_id, min_weight, tuple(sorted(edge_types or ())))
+    cached = aggregate_cache.get(key)
+    if cached is not None:
+        return cached
+    revision = _revision
+    database = db.query(models.Database).filter(models.Database.id == database_id).first()
+    if database is None:
+        return None
+    links = _links_payload(_aggregate_links(db, "table", database_id, edge_types), min_weight)
+    own_tables = [tid for (tid,) in db.query(models.Table.id).filter(models.Table.database_id == database_id)]
+    table_ids = {link[end] for link in links for end in ("source", "target")}
+    if min_weight <= 1:
+        table_ids |= set(own_tables)
+    paths = _table_paths(db, table_ids)
+    own = set(own_tables)
+    result = {
+        "database": {"id": database.id, "name": database.name},
+        "revision": revision,
+        "nodes": [
+            {"id": tid, "name": paths.get(tid, "").rsplit("/", 1)[-1], "path": paths.get(tid), "external": tid not in own}
+            for tid in sorted(table_ids)
+        ],
+        "links": links,
+    }
+    aggregate_cache.put(key, revision, result)
+    return result
+
+
+def get_cluster_graph_data(db: Session, cluster_id: int, min_weight: int = 1,
+                           edge_types: Optional[List[str]] = None) -> Optional[dict]:
+    """
+    Database -> database relationship graph for one cluster, cached per revision. Every
+    database of the cluster is a node, except that with min_weight above 1 only databases
+    that keep a link are listed.
+    """
+    sync_external_changes(db)
+    key = ("cluster", cluster_id, min_weight, tuple(sorted(edge_types or ())))
+    cached = aggregate_cache.get(key)
+    if cached is not None:
+        return cached
+    revision = _revision
+    cluster = db.query(models.Cluster).filter(models.Cluster.id == cluster_id).first()
+    if cluster is None:
+        return None
+    links = _links_payload(_aggregate_links(db, "database", cluster_id, edge_types), min_weight)
+    database_ids = {link[end] for link in links for end in ("source", "target")}
+    query = db.query(models.Database.id, models.Database.name, models.Cluster.name).join(
+        models.Cluster, models.Database.cluster_id == models.Cluster.id
+    )
+    linked = models.Database.id.in_(database_ids)
+    rows = query.filter((models.Database.cluster_id == cluster_id) | linked if min_weight <= 1 else linked).all()
+    result = {
+        "cluster": {"id": cluster.id, "name": cluster.name},
+        "revision": revision,
+        "nodes": [
+            {"id": did, "name": dname, "path": f"{cname}/{dname}", "external": cname != cluster.name}
+            for did, dname, cname in sorted(rows)
+        ],
+        "links": links,
+    }
+    aggregate_cache.put(key, revision, result)
+    return result
+
+
+# Parts of a table graph that deltas are computed for, with the key identifying their items
+_SNAPSHOT_PARTS = (("nodes", "id"), ("edges", "id"), ("external_connections", "edge_id"))
+
+
+def _digest(data: dict) -> Dict[str, Dict[int, int]]:
+    """Per part of a table graph, item key -> hash of the item: enough to diff against, far smaller than the graph."""
+    return {
+        part: {item[key]: hash(json.dumps(item, sort_keys=True, default=str)) for item in data[part]}
+        for part, key in _SNAPSHOT_PARTS
+    }
+
+
+class SnapshotStore:
+    """
+    LRU of digests of table graphs as they were served at a given revision, so later
+    requests can be answered with the difference instead of the whole graph. Bounded by
+    the number of snapshots and by the number of items they hold in total.
+    """
+
+    def __init__(self, maxsize: int = 64, max_items: int = 1_000_000):
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[tuple, Optional[dict]]" = OrderedDict()
+        self.maxsize = maxsize
+        self.max_items = max_items
+        self._items = 0
+
+    @staticmethod
+    def _size(digest: Optional[dict]) -> int:
+        return sum(len(hashes) for hashes in digest.values()) if digest else 0
+
+    def get(self, table_id: int, revision: int) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get((table_id, revision))
+            if entry is not None:
+                self._entries.move_to_end((table_id, revision))
+            return entry
+
+    def put(self, table_id: int, revision: int, digest: dict):
+        key = (table_id, revision)
+        with self._lock:
+            if key in self._entries:
+                existing = self._entries.pop(key)
+                self._items -= self._size(existing)
+                if existing != digest:
+                    # Two different graphs were served under one revision (a commit raced the
+                    # revision bump); neither can be diffed against safely.
+                    digest = None
+            self._entries[key] = digest
+            self._items += self._size(digest)
+            while len(self._entries) > self.maxsize or (self._items > self.max_items and len(self._entries) > 1):
+                _, evicted = self._entries.popitem(last=False)
+                self._items -= self._size(evicted)
+
+
+graph_snapshots = SnapshotStore()
+
+
+def _snapshot(db: Session, table_id: int) -> Optional[tuple]:
+    """(graph, revision, digest) of a table, remembered for deltas; None if the table does not exist."""
+    sync_external_changes(db)
+    revision = _revision
+    data = get_table_graph_data(db, table_id)
+    if data.get("table") is None:
+        return None
+    digest = _digest(data)
+    graph_snapshots.put(table_id, revision, digest)
+    return data, revision, digest
+
+
+def table_graph_snapshot(db: Session, table_id: int) -> Optional[dict]:
+    """Build the graph of a table, tag it with the current revision and remember it for deltas."""
+    snapshot = _snapshot(db, table_id)
+    if snapshot is None:
+        return None
+    data, revision, _ = snapshot
+    return {**data, "revision": revision}
+
+
+def _diff(old: Dict[int, int], new: Dict[int, int], items: list, key: str) -> dict:
+    return {
+        "added": [item for item in items if item[key] not in old],
+        "removed": [k for k in old if k not in new],
+        "changed": [item for item in items if item[key] in old and old[item[key]] != new[item[key]]],
+    }
+
+
+def table_graph_delta(db: Session, table_id: int, since: int) -> Optional[dict]:
+    """
+    Difference between the table graph served at revision `since` and the current one.
+    Falls back to the full graph (full=True) when that snapshot is no longer held.
+    Returns None if the table does not exist.
+    """
+    previous = graph_snapshots.get(table_id, since)
+    snapshot = _snapshot(db, table_id)
+    if snapshot is None:
+        return None
+    current, revision, digest = snapshot
+    if previous is None:
+        return {"table_id": table_id, "since": since, "revision": revision, "full": True, "graph": current}
+    return {
+        "table_id": table_id,
+        "since": since,
+        "revision": revision,
+        "full": False,
+        **{part: _diff(previous[part], digest[part], current[part], key) for part, key in _SNAPSHOT_PARTS},
+    }
+
+
+# --- Session hooks keeping the caches current ---
+
+def _no_changes() -> dict:
+    # marker_from/marker: catalog_revision before and after the commits these changes were part of
+    return {"dirty": False, "rebuild": False, "added": [], "removed": [], "tables": set(), "marker_from": None, "marker": None}
+
+
+def _pending(session: Session) -> dict:
+    return session.info.setdefault("graph_changes", _no_changes())
+
+
+def _edge_tables(session: Session, edges: list, changes: dict) -> list:
+    """Map (type, from_field_id, to_field_id) edges to (type, from_table_id, to_table_id)."""
+    field_ids = {fid for _, from_id, to_id in edges for fid in (from_id, to_id)}
+    table_of = {}
+    conn = session.connection()
+    for chunk in _chunks(list(field_ids)):
+        table_of.update(conn.execute(
+            select(models.Field.id, models.Field.table_id).where(models.Field.id.in_(chunk))
+        ).all())
+    result = []
+    for edge_type, from_id, to_id in edges:
+        if from_id not in table_of or to_id not in table_of:
+            changes["rebuild"] = True
+            continue
+        result.append((edge_type, table_of[from_id], table_of[to_id]))
+    return result
+
+
+@event.listens_for(Session, "after_flush")
+def _track_flush(session, flush_context):
+    catalog = (models.Cluster, models.Database, models.Table, models.Field, models.Edge)
+    touched = [obj for obj in list(session.new) + list(session.dirty) + list(session.deleted) if isinstance(obj, catalog)]
+    if not touched:
+        return
+    changes = _pending(session)
+    changes["dirty"] = True
+    new_edges = [(obj.type, obj.from_field_id, obj.to_field_id) for obj in session.new if isinstance(obj, models.Edge)]
+    deleted_edges = [(obj.type, obj.from_field_id, obj.to_field_id) for obj in session.deleted if isinstance(obj, models.Edge)]
+    if any(isinstance(obj, models.Edge) for obj in session.dirty) or \
+            any(isinstance(obj, (models.Field, models.Table)) for obj in session.deleted):
+        changes["rebuild"] = True
+    if new_edges:
+        changes["added"].extend(_edge_tables(session, new_edges, changes))
+    if deleted_edges:
+        changes["removed"].extend(_edge_tables(session, deleted_edges, changes))
+    changes["tables"].update(obj.table_id for obj in touched if isinstance(obj, models.Field))
+    changes["tables"].update(table for _, a, b in changes["added"] + changes["removed"] for table in (a, b))
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_bulk(orm_execute_state):
+    # Query.delete()/update() bypass the unit of work, so fall back to a full rebuild
+    if orm_execute_state.is_delete or orm_execute_state.is_update or orm_execute_state.is_insert:
+        changes = _pending(orm_execute_state.session)
+        changes["dirty"] = True
+        changes["rebuild"] = True
+
+
+def mark_changed(session: Session, table_ids: Optional[List[int]] = None):
+    """
+    Record a catalog change made with raw SQL so caches are refreshed on commit.
+    Pass the affected tables when the change leaves edges alone to avoid a full rebuild.
+    """
+    changes = _pending(session)
+    changes["dirty"] = True
+    if table_ids is None:
+        changes["rebuild"] = True
+    else:
+        changes["tables"].update(table_ids)
+
+
+def record_edges(session: Session, added: list = (), removed: list = ()):
+    """Record (type, from_field_id, to_field_id) edges inserted or deleted with raw SQL, applied on commit."""
+    changes = _pending(session)
+    changes["dirty"] = True
+    for edges, key in ((added, "added"), (removed, "removed")):
+        if edges:
+            links = _edge_tables(session, list(edges), changes)
+            changes[key].extend(links)
+            changes["tables"].update(table for _, a, b in links for table in (a, b))
+
+
+def _apply_changes(changes: dict):
+    global _revision, _table_revision_floor, _marker
+    if changes["rebuild"]:
+        table_graph.invalidate()
+    else:
+        table_graph.apply(changes["added"], changes["removed"])
+    with _revision_lock:
+        _revision += 1
+        if changes["rebuild"]:
+            _table_revision_floor = _revision
+        else:
+            for table_id in changes["tables"]:
+                _table_revisions[table_id] = _revision
+        # Only follow the marker when nothing else committed since the last check; otherwise
+        # the next transaction sees it moved and drops the caches
+        if changes["marker"] is not None and changes["marker_from"] == _marker:
+            _marker = changes["marker"]
+
+
+def defer_changes(session: Session):
+    """
+    Hold the changes committed by a session until finish_deferred(), for sessions whose
+    commits only release savepoints of an outer transaction that may still roll back.
+    """
+    session.info["graph_deferred"] = _no_changes()
+
+
+def finish_deferred(session: Session, committed: bool):
+    """Apply the changes held by defer_changes() once the outer transaction committed, or drop them."""
+    deferred = session.info.pop("graph_deferred", None)
+    if committed and deferred and deferred["dirty"]:
+        _apply_changes(deferred)
+
+
+@event.listens_for(Session, "after_begin")
+def _check_marker(session, transaction, connection):
+    _sync_marker(connection)
+
+
+@event.listens_for(Session, "before_commit")
+def _bump_marker(session):
+    # Flush first so the changes of the final flush are known
+    session.flush()
+    changes = session.info.get("graph_changes")
+    if not (changes and changes["dirty"]) and not session.info.get("edge_types_pending"):
+        return
+    # Registering an edge type alone has to move the marker too, for other processes' registries
+    changes = _pending(session)
+    changes["dirty"] = True
+    conn = session.connection()
+    conn.exec_driver_sql("UPDATE catalog_revision SET revision = revision + 1")
+    changes["marker"] = conn.exec_driver_sql("SELECT revision FROM catalog_revision").scalar()
+    changes["marker_from"] = changes["marker"] - 1
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_commit(session):
+    changes = session.info.pop("graph_changes", None)
+    if not changes or not changes["dirty"]:
+        return
+    deferred = session.info.get("graph_deferred")
+    if deferred is not None:
+        deferred["dirty"] = True
+        deferred["rebuild"] = deferred["rebuild"] or changes["rebuild"]
+        deferred["added"].extend(changes["added"])
+        deferred["removed"].extend(changes["removed"])
+        deferred["tables"].update(changes["tables"])
+        if deferred["marker_from"] is None:
+            deferred["marker_from"] = changes["marker_from"]
+        deferred["marker"] = changes["marker"]
+        return
+    _apply_changes(changes)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_rollback(session, previous_transaction):
+    session.info.pop("graph_changes", None)
@@ -0,0 +1,185 @@
+"""
+Precomputed node coordinates for table graphs.
+
+The layout functions only take and return plain lists so they can run in a
+worker process; `layout_pool` owns that process and the routes submit work to
+it instead of computing layouts on request threads.
+"""
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import Dict, List, Optional
+
+import numpy as np
+
+LAYOUT_WORKERS = 1
+# Force-directed layout is O(n^2) per iteration; larger graphs fall back to the tree layout
+FORCE_MAX_NODES = 1500
+FORCE_ITERATIONS = 150
+
+
+def _levels(parent: np.ndarray) -> List[np.ndarray]:
+    """Node indexes grouped by depth, starting with the roots."""
+    levels = []
+    frontier = np.flatnonzero(parent < 0)
+    seen = np.zeros(len(parent), dtype=bool)
+    while len(frontier):
+        seen[frontier] = True
+        levels.append(frontier)
+        frontier = np.flatnonzero(np.isin(parent, frontier) & ~seen)
+    return levels
+
+
+def _subtree_sizes(parent: np.ndarray, levels: List[np.ndarray]) -> np.ndarray:
+    sizes = np.ones(len(parent), dtype=np.int64)
+    for level in reversed(levels[1:]):
+        np.add.at(sizes, parent[level], sizes[level])
+    return sizes
+
+
+def tree_layout(parent: np.ndarray, levels: List[np.ndarray]):
+    """
+    Layered tree layout: y is the depth and each leaf gets one unit of width,
+    with parents centred over the span of their leaves.
+    """
+    n = len(parent)
+    width = np.zeros(n, dtype=np.float64)
+    for level in reversed(levels):
+        width[level] = np.maximum(width[level], 1.0)
+        children = level[parent[level] >= 0]
+        np.add.at(width, parent[children], width[children])
+    start = np.zeros(n, dtype=np.float64)
+    depth = np.zeros(n, dtype=np.int64)
+    for d, level in enumerate(levels):
+        depth[level] = d
+        # Siblings are placed side by side in index order inside their parent's span
+        order = level[np.lexsort((level, parent[level]))]
+        owners = parent[order]
+        before = np.cumsum(width[order]) - width[order]
+        first = np.r_[True, owners[1:] != owners[:-1]]
+        group_base = np.maximum.accumulate(np.where(first, before, 0.0))
+        start[order] = np.where(owners >= 0, start[np.maximum(owners, 0)], 0.0) + before - group_base
+    return start + width / 2, depth.astype(np.float64)
+
+
+def force_layout(x: np.ndarray, y: np.ndarray, links: np.ndarray, iterations: int = FORCE_ITERATIONS):
+    """Fruchterman-Reingold refinement of an initial layout, vectorized over all node pairs."""
+    x = x.astype(np.float32)
+    y = y.astype(np.float32) * 2
+    n = len(x)
+    k = float(np.sqrt((np.ptp(x) + 1) * (np.ptp(y) + 1) / n))
+    temperature = max(float(np.ptp(x)), 1.0) / 10
+    for _ in range(iterations):
+        dx = x[:, None] - x[None, :]
+        dy = y[:, None] - y[None, :]
+        # Repulsion k^2/d along the unit vector, i.e. delta * k^2 / d^2
+        repulsion = (k * k) / np.maximum(dx * dx + dy * dy, 1e-4)
+        move_x = (dx * repulsion).sum(axis=1)
+        move_y = (dy * repulsion).sum(axis=1)
+        if len(links):
+            lx = x[links[:, 0]] - x[links[:, 1]]
+            ly = y[links[:, 0]] - y[links[:, 1]]
+            attraction = np.sqrt(lx * lx + ly * ly) / k
+            np.add.at(move_x, links[:, 0], -lx * attraction)
+            np.add.at(move_x, links[:, 1], lx * attraction)
+            np.add.at(move_y, links[:, 0], -ly * attraction)
+            np.add.at(move_y, links[:, 1], ly * attraction)
+        length = np.maximum(np.sqrt(move_x * move_x + move_y * move_y), 0.01)
+        step = np.minimum(length, temperature) / length
+        x += move_x * step
+        y += move_y * step
+        temperature *= 0.97
+    return x, y
+
+
+def compute_layout(ids: List[int], parents: List[Optional[int]], links: List[tuple], mode: str = "tree",
+                   lod: Optional[int] = None, max_nodes: Optional[int] = None) -> Dict[str, object]:
+    """
+    Lay out one table graph. `ids`/`parents` describe the containment tree (parent None
+    for the table node), `links` are extra (from_id, to_id) edges used by the force layout.
+    Fields deeper than `lod` levels are collapsed into their visible ancestor; with
+    max_nodes the deepest level of detail that fits is picked instead.
+    """
+    index = {node_id: i for i, node_id in enumerate(ids)}
+    parent = np.array([index.get(p, -1) if p is not None else -1 for p in parents], dtype=np.int64)
+    levels = _levels(parent)
+    sizes = _subtree_sizes(parent, levels)
+    max_depth = len(levels) - 1
+    if lod is None and max_nodes is not None:
+        counts = np.cumsum([len(level) for level in levels])
+        lod = max(int(np.searchsorted(counts, max_nodes, side="right")) - 1, 1)
+    if lod is not None and lod < max_depth:
+        visible = np.concatenate(levels[:lod + 1])
+        visible.sort()
+        remap = np.full(len(parent), -1, dtype=np.int64)
+        remap[visible] = np.arange(len(visible))
+        # Map every hidden node to its ancestor on the last visible level
+        representative = np.arange(len(parent))
+        for level in levels[lod + 1:]:
+            representative[level] = representative[parent[level]]
+        collapsed = np.where(np.isin(visible, levels[lod]), sizes[visible] - 1, 0)
+        parent = np.where(parent[visible] >= 0, remap[np.maximum(parent[visible], 0)], -1)
+        levels = [remap[level] for level in levels[:lod + 1]]
+        link_index = [(remap[representative[index[a]]], remap[representative[index[b]]])
+                      for a, b in links if a in index and b in index]
+        node_ids = [ids[i] for i in visible]
+    else:
+        lod = max_depth
+        collapsed = np.zeros(len(parent), dtype=np.int64)
+        link_index = [(index[a], index[b]) for a, b in links if a in index and b in index]
+        node_ids = list(ids)
+    x, y = tree_layout(parent, levels)
+    if mode == "force" and len(node_ids) <= FORCE_MAX_NODES:
+        tree_links = [(i, int(p)) for i, p in enumerate(parent) if p >= 0]
+        pairs = np.array([(a, b) for a, b in tree_links + link_index if a != b], dtype=np.int64).reshape(-1, 2)
+        x, y = force_layout(x, y, pairs)
+    else:
+        mode = "tree"
+    return {
+        "mode": mode,
+        "lod": int(lod),
+        "max_depth": int(max_depth),
+        "hidden": int(len(ids) - len(node_ids)),
+        "nodes": {
+            "id": node_ids,
+            "x": np.round(x.astype(np.float64), 3).tolist(),
+            "y": np.round(y.astype(np.float64), 3).tolist(),
+            "collapsed_count": collapsed.tolist(),
+        },
+    }
+
+
+class LayoutPool:
+    """Lazily started worker process for layouts, with concurrent requests for the same key sharing one job."""
+
+    def __init__(self, workers: int = LAYOUT_WORKERS):
+        self.workers = workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._inflight: Dict[tuple, Future] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, key: tuple, *args) -> Future:
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                return future
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=get_context("spawn"))
+            future = self._executor.submit(compute_layout, *args)
+            self._inflight[key] = future
+        future.add_done_callback(lambda _: self._forget(key, future))
+        return future
+
+    def _forget(self, key: tuple, future: Future):
+        with self._lock:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+
+layout_pool = LayoutPool()
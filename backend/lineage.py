@@ -0,0 +1,236 @@
+"""
+Directed lineage between fields.
+
+A lineage edge goes from an upstream field to a field derived from it, stored as an
+`Edge` of type `lineage`. The lineage graph is kept acyclic: inserts check, with a
+walk downstream of the new edges only, that they do not close a cycle. Traversals are
+recursive CTEs over the per-type lineage indexes.
+"""
+import json
+from itertools import chain
+from typing import Dict, List, Optional
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from .crud import LINEAGE_EDGE_TYPE, get_field_paths_by_ids
+from .edge_types import registry
+
+DIRECTIONS = ("downstream", "upstream")
+# Up to this many new edges are checked one by one; larger loads check their combined closure
+SINGLE_CHECK_EDGES = 16
+
+
+class LineageCycleError(ValueError):
+    """Raised when new lineage edges would make the lineage graph cyclic; `cycle` lists field ids in order."""
+
+    def __init__(self, cycle: List[int]):
+        self.cycle = cycle
+        super().__init__("Lineage edges would create a cycle")
+
+
+def _walk_sql(direction: str, seed: str, with_depth: bool = False) -> str:
+    """
+    Recursive CTE `walk` of the fields reachable from `seed` (a SELECT of ids). The walk
+    table drives the join (CROSS JOIN) so each step is an index lookup per field, and the
+    type code is inlined so the lineage indexes apply.
+    """
+    near, far = ("from_field_id", "to_field_id") if direction == "downstream" else ("to_field_id", "from_field_id")
+    code = registry.code(LINEAGE_EDGE_TYPE)
+    if with_depth:
+        return f"""
+            WITH RECURSIVE walk(id, depth) AS (
+                SELECT id, 0 FROM ({seed})
+                UNION
+                SELECT e.{far}, w.depth + 1 FROM walk w CROSS JOIN edges e ON e.{near} = w.id AND e.type = {code}
+                WHERE w.depth < :max_depth
+            )"""
+    return f"""
+        WITH RECURSIVE walk(id) AS (
+            SELECT id FROM ({seed})
+            UNION
+            SELECT e.{far} FROM walk w CROSS JOIN edges e ON e.{near} = w.id AND e.type = {code}
+        )"""
+
+
+def _walk_edges_sql(direction: str, seed: str) -> str:
+    """(from, to) lineage edges among the fields reachable from `seed`, in their stored direction."""
+    near = "from_field_id" if direction == "downstream" else "to_field_id"
+    code = registry.code(LINEAGE_EDGE_TYPE)
+    return _walk_sql(direction, seed) + f"""
+        SELECT e.from_field_id, e.to_field_id FROM walk w CROSS JOIN edges e ON e.{near} = w.id AND e.type = {code}"""
+
+
+def _edge_array(rows) -> np.ndarray:
+    """(n, 2) int64 array of (from, to) rows; np.array over Row objects is orders of magnitude slower."""
+    return np.fromiter(chain.from_iterable(rows), dtype=np.int64).reshape(-1, 2)
+
+
+def _reaches(db: Session, source: int, target: int) -> bool:
+    sql = _walk_sql("downstream", "SELECT :source AS id") + " SELECT 1 FROM walk WHERE id = :target LIMIT 1"
+    return db.connection().exec_driver_sql(sql, {"source": source, "target": target}).first() is not None
+
+
+def _shortest_path(db: Session, source: int, target: int) -> List[int]:
+    """Field ids on a shortest downstream path from source to target (used to report cycles)."""
+    code = registry.code(LINEAGE_EDGE_TYPE)
+    parents: Dict[int, Optional[int]] = {source: None}
+    frontier = [source]
+    while frontier and target not in parents:
+        rows = db.connection().exec_driver_sql(
+            f"SELECT from_field_id, to_field_id FROM edges WHERE type = {code} "
+            f"AND from_field_id IN (SELECT value FROM json_each(:ids))", {"ids": json.dumps(frontier)}
+        ).all()
+        frontier = []
+        for parent, child in rows:
+            if child not in parents:
+                parents[child] = parent
+                frontier.append(child)
+    if target not in parents:
+        return []
+    path = [target]
+    while parents[path[-1]] is not None:
+        path.append(parents[path[-1]])
+    return path[::-1]
+
+
+def _levels(edges: np.ndarray, nodes: np.ndarray = np.empty(0, dtype=np.int64)):
+    """
+    Kahn's algorithm one level at a time: level k holds the nodes whose longest path from
+    a source has k edges. Returns (node ids, level per node, node ids left on cycles).
+    """
+    ids = np.unique(np.concatenate([edges.ravel(), nodes]))
+    src = np.searchsorted(ids, edges[:, 0])
+    dst = np.searchsorted(ids, edges[:, 1])
+    order = np.argsort(src, kind="stable")
+    children = dst[order]
+    starts = np.searchsorted(src[order], np.arange(len(ids) + 1))
+    indegree = np.bincount(dst, minlength=len(ids))
+    level = np.full(len(ids), -1, dtype=np.int64)
+    frontier = np.flatnonzero(indegree == 0)
+    depth = 0
+    while len(frontier):
+        level[frontier] = depth
+        counts = starts[frontier + 1] - starts[frontier]
+        if not counts.sum():
+            break
+        # Children of the whole frontier as one gather over the CSR rows
+        offsets = np.repeat(starts[frontier] - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+        reached, hits = np.unique(children[offsets], return_counts=True)
+        indegree[reached] -= hits
+        frontier = reached[indegree[reached] == 0]
+        depth += 1
+    return ids, level, ids[level < 0]
+
+
+def _find_cycle(edges: np.ndarray, remaining: np.ndarray) -> List[int]:
+    """One cycle among the nodes Kahn's algorithm could not order; each of them has a remaining predecessor."""
+    left = set(remaining.tolist())
+    predecessor = {}
+    for a, b in edges.tolist():
+        if a in left and b in left:
+            predecessor[b] = a
+    node, seen = remaining[0].item(), []
+    while node not in seen:
+        seen.append(node)
+        node = predecessor[node]
+    cycle = seen[seen.index(node):]
+    return cycle[::-1]
+
+
+def check_new_edges(db: Session, edges: List[tuple]):
+    """
+    Raise LineageCycleError if the given (upstream, downstream) edges, already written in
+    this transaction, closed a cycle. Only the fields downstream of the new edges are visited.
+    """
+    if not edges:
+        return
+    if len(edges) <= SINGLE_CHECK_EDGES:
+        for upstream, downstream in edges:
+            if upstream == downstream:
+                raise LineageCycleError([upstream])
+            if _reaches(db, downstream, upstream):
+                raise LineageCycleError(_shortest_path(db, downstream, upstream))
+        return
+    # Every new cycle runs through a new edge, so it lies in the closure of the new targets
+    seed = "SELECT value AS id FROM json_each(:targets)"
+    closure_edges = _edge_array(db.connection().exec_driver_sql(
+        _walk_edges_sql("downstream", seed), {"targets": json.dumps(sorted({b for _, b in edges}))}
+    ))
+    if not len(closure_edges):
+        return
+    _, _, remaining = _levels(closure_edges)
+    if len(remaining):
+        raise LineageCycleError(_find_cycle(closure_edges, remaining))
+
+
+def traverse(db: Session, field_id: int, direction: str = "downstream", max_depth: Optional[int] = None,
+             limit: int = 10000, include_paths: bool = True) -> dict:
+    """
+    Fields upstream or downstream of a field. With max_depth each node carries its
+    shortest distance; without it the whole closure is returned, without distances,
+    since tracking them over every path can blow up on wide DAGs.
+    """
+    conn = db.connection()
+    if max_depth is not None:
+        sql = _walk_sql(direction, "SELECT :start AS id", with_depth=True) + """
+            SELECT id, MIN(depth) FROM walk WHERE id != :start GROUP BY id ORDER BY 2, 1 LIMIT :limit"""
+        rows = conn.exec_driver_sql(sql, {"start": field_id, "max_depth": max_depth, "limit": limit + 1}).all()
+    else:
+        sql = _walk_sql(direction, "SELECT :start AS id") + " SELECT id, NULL FROM walk WHERE id != :start LIMIT :limit"
+        rows = conn.exec_driver_sql(sql, {"start": field_id, "limit": limit + 1}).all()
+    truncated = len(rows) > limit
+    rows = rows[:limit]
+    paths = get_field_paths_by_ids(db, [field_id] + [row[0] for row in rows]) if include_paths else {}
+    nodes = []
+    for node_id, depth in rows:
+        node = {"id": node_id, "depth": depth}
+        if include_paths:
+            node["path"] = paths.get(node_id)
+        nodes.append(node)
+    return {
+        "field": {"id": field_id, "path": paths.get(field_id)},
+        "direction": direction,
+        "max_depth": max_depth,
+        "count": len(nodes),
+        "truncated": truncated,
+        "nodes": nodes,
+    }
+
+
+def topological_order(db: Session, field_id: Optional[int] = None, direction: str = "downstream",
+                      include_paths: bool = True) -> dict:
+    """
+    Lineage in dependency order, grouped into levels that can be processed in parallel:
+    every field comes after all of its upstream fields. Scoped to the fields downstream
+    (or upstream) of field_id, including it, or the whole lineage graph.
+    """
+    conn = db.connection()
+    if field_id is None:
+        rows = conn.exec_driver_sql(
+            f"SELECT from_field_id, to_field_id FROM edges WHERE type = {registry.code(LINEAGE_EDGE_TYPE)}"
+        )
+    else:
+        rows = conn.exec_driver_sql(_walk_edges_sql(direction, "SELECT :start AS id"), {"start": field_id})
+    edges = _edge_array(rows)
+    nodes = np.array([field_id] if field_id is not None else [], dtype=np.int64)
+    ids, level, remaining = _levels(edges, nodes)
+    if len(remaining):
+        # Only possible for edges written around the cycle checks, e.g. by raw SQL
+        raise LineageCycleError(_find_cycle(edges, remaining))
+    order = np.lexsort((ids, level))
+    ordered_ids, ordered_levels = ids[order].tolist(), level[order].tolist()
+    paths = get_field_paths_by_ids(db, ordered_ids) if include_paths else {}
+    result_nodes = []
+    for node_id, node_level in zip(ordered_ids, ordered_levels):
+        node = {"id": node_id, "level": node_level}
+        if include_paths:
+            node["path"] = paths.get(node_id)
+        result_nodes.append(node)
+    return {
+        "field_id": field_id,
+        "direction": direction,
+        "count": len(result_nodes),
+        "levels": (ordered_levels[-1] + 1) if ordered_levels else 0,
+        "nodes": result_nodes,
+    }
@@ -1,9 +1,29 @@
-from fastapi import FastAPI
+import os
+from contextlib import asynccontextmanager, nullcontext
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from sqlalchemy.exc import OperationalError
 from .database import init_db
+from .layout import layout_pool
 from .routers import router
 
-app = FastAPI()
+# DBDESC_MCP_IN_PROCESS=1 serves the MCP tools from this process at /mcp/, calling the crud
+# layer directly instead of going through the api/mcp_server.py bridge over HTTP
+mcp_app = None
+if os.environ.get("DBDESC_MCP_IN_PROCESS") == "1":
+    from api.mcp_server import serve_in_process
+    mcp_app = serve_in_process()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    init_db()
+    # Mounted apps get no lifespan of their own: run the MCP session manager's here
+    async with (mcp_app.lifespan(mcp_app) if mcp_app else nullcontext()):
+        yield
+    layout_pool.shutdown()
+
+app = FastAPI(lifespan=lifespan)
 
 # Enable CORS for all origins (for development)
 app.add_middleware(
@@ -14,11 +34,23 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-@app.on_event("startup")
-def on_startup():
-    init_db()
-
 app.include_router(router)
+if mcp_app:
+    app.mount("/mcp", mcp_app)
+
+@app.exception_handler(OperationalError)
+async def database_busy(request: Request, exc: OperationalError):
+    # SQLite gave up on a lock it could not wait for (or after its busy timeout). The open
+    # transaction is rolled back when the request's session closes, so clients may retry
+    # unless the request had already committed part of its work
+    if "locked" in str(exc.orig) or "busy" in str(exc.orig):
+        if getattr(exc, "committed", False):
+            return JSONResponse(status_code=500, content={
+                "detail": "Database is busy; the request was interrupted after committing part of its changes, "
+                          "check what was applied before sending it again"})
+        return JSONResponse(status_code=503, content={"detail": "Database is busy, retry the request"},
+                            headers={"Retry-After": "1"})
+    raise exc
 
 @app.get("/")
 def read_root():
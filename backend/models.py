@@ -1,5 +1,6 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, JSON, Index
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, JSON, Index, TypeDecorator, event, text
 from sqlalchemy.orm import relationship, declarative_base
+from .edge_types import BUILTIN_EDGE_TYPES, registry as edge_type_registry
 
 Base = declarative_base()
 
@@ -17,8 +18,8 @@ class Database(Base):
     cluster = relationship('Cluster', back_populates='databases')
     tables = relationship('Table', back_populates='database', cascade="all, delete-orphan")
     
-    # Index for faster lookups by cluster_id
-    __table_args__ = (Index('idx_database_cluster_id', 'cluster_id'),)
+    # One database per name in a cluster; also serves lookups by cluster_id
+    __table_args__ = (Index('uq_database_cluster_name', 'cluster_id', 'name', unique=True),)
 
 class Table(Base):
     __tablename__ = 'tables'
@@ -28,8 +29,8 @@ class Table(Base):
     database = relationship('Database', back_populates='tables')
     fields = relationship('Field', back_populates='table', cascade="all, delete-orphan")
     
-    # Index for faster lookups by database_id
-    __table_args__ = (Index('idx_table_database_id', 'database_id'),)
+    # One table per name in a database; also serves lookups by database_id
+    __table_args__ = (Index('uq_table_database_name', 'database_id', 'name', unique=True),)
 
 class Field(Base):
     __tablename__ = 'fields'
@@ -49,21 +50,67 @@ class Field(Base):
         Index('idx_field_table_parent_name', 'table_id', 'parent_id', 'name'),
         # Unique constraint to prevent duplicate fields with same name, table, and parent
         Index('uq_field_table_parent_name_unique', 'table_id', 'parent_id', 'name', unique=True),
+        # SQLite treats NULLs as distinct in unique indexes, so root fields need their own
+        Index('uq_field_table_root_name', 'table_id', 'name', unique=True, sqlite_where=text('parent_id IS NULL')),
     )
 
+class EdgeType(Base):
+    __tablename__ = 'edge_types'
+    id = Column(Integer, primary_key=True)
+    name = Column(String, unique=True, nullable=False)
+    # Undirected types are stored once per pair as (min field id, max field id)
+    directed = Column(Boolean, nullable=False, default=True)
+
+@event.listens_for(EdgeType.__table__, "after_create")
+def _seed_edge_types(target, connection, **kw):
+    connection.execute(target.insert(), [{"id": code, "name": name, "directed": directed} for code, name, directed in BUILTIN_EDGE_TYPES])
+
+class EdgeTypeCode(TypeDecorator):
+    """Edge type name in Python, its registered integer code in the database."""
+    impl = Integer
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None or isinstance(value, int):
+            return value
+        return edge_type_registry.code(value)
+
+    def process_literal_param(self, value, dialect):
+        return self.process_bind_param(value, dialect)
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else edge_type_registry.name(value)
+
 class Edge(Base):
     __tablename__ = 'edges'
     id = Column(Integer, primary_key=True)
     from_field_id = Column(Integer, ForeignKey('fields.id'))
     to_field_id = Column(Integer, ForeignKey('fields.id'))
-    type = Column(String, nullable=False)  # e.g., 'parent', 'similarity', 'custom'
+    type = Column(EdgeTypeCode, nullable=False)  # registered edge type, e.g. 'equivalence', 'lineage'
     from_field = relationship('Field', foreign_keys=[from_field_id])
     to_field = relationship('Field', foreign_keys=[to_field_id])
     
     # Indexes for faster edge lookups
     __table_args__ = (
-        Index('idx_edge_from_field_id', 'from_field_id'),
         Index('idx_edge_to_field_id', 'to_field_id'),
-        Index('idx_edge_type', 'type'),
-        Index('idx_edge_from_to_type', 'from_field_id', 'to_field_id', 'type'),
-    ) 
\ No newline at end of file
+        # One row per edge, so inserts can dedupe with ON CONFLICT DO NOTHING; the leading
+        # (from, type) columns keep lookups out of a field, typed or not, on one index
+        Index('uq_edge_from_type_to', 'from_field_id', 'type', 'to_field_id', unique=True),
+        # Lookups into a field for one builtin type only touch that type's index pages. The
+        # type column makes them covering, which is what gets SQLite to pick them over
+        # idx_edge_to_field_id without ANALYZE statistics
+        *[
+            Index(f'idx_edge_{name}_to', 'to_field_id', 'from_field_id', 'type', sqlite_where=text(f'type = {code}'))
+            for code, name, _ in BUILTIN_EDGE_TYPES
+        ],
+    )
+
+class CatalogRevision(Base):
+    """Single row counting committed catalog changes, so processes sharing the file notice each other's writes."""
+    __tablename__ = 'catalog_revision'
+    id = Column(Integer, primary_key=True)
+    revision = Column(Integer, nullable=False, default=0)
+
+@event.listens_for(CatalogRevision.__table__, "after_create")
+def _seed_catalog_revision(target, connection, **kw):
+    connection.execute(target.insert(), [{"id": 1, "revision": 0}])
@@ -1,12 +1,36 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, Body
+import asyncio
+import csv
+import io
+import json
+from fastapi import APIRouter, Depends, HTTPException, Query, Body, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from . import crud, schemas, deps
+from . import crud, schemas, deps, graph, layout, lineage
 from typing import List, Optional, Dict, Any
+from .database import atomic_session
 from .crud import get_field_id_by_path, get_field_path_by_id, get_cluster_id_by_path, get_database_id_by_path, get_table_id_by_path
 from sqlalchemy.exc import IntegrityError
 
 router = APIRouter()
 
+MAX_BATCH_ITEMS = 10000
+MAX_META_BATCH = 50000
+MAX_EDGE_BULK = 1000000
+MAX_PAGE_ITEMS = 10000
+
+META_MODE_QUERY = Query("replace", pattern="^(replace|merge)$",
+                        description="replace the whole meta, or merge the body into it (RFC 7396: null removes a key)")
+DELTA_TABLE_QUERY = Query(None, description="Also return the graph delta of this table (requires since)")
+SINCE_QUERY = Query(None, description="Graph revision the caller currently holds for delta_table_id")
+
+def _with_graph_delta(db: Session, payload: dict, delta_table_id: Optional[int], since: Optional[int]) -> dict:
+    """Add the graph delta of delta_table_id to a mutation response when the caller asked for one."""
+    if delta_table_id is not None and since is not None:
+        payload["graph_delta"] = graph.table_graph_delta(db, delta_table_id, since)
+    return payload
+
 # Cluster endpoints
 @router.post("/clusters/", response_model=schemas.ClusterRead)
 def create_cluster(cluster: schemas.ClusterCreate, db: Session = Depends(deps.get_db)):
@@ -37,28 +61,75 @@ def read_tables(database_id: int, db: Session = Depends(deps.get_db)):
 # Field endpoints
 @router.post("/tables/{table_id}/fields/", response_model=schemas.FieldRead)
 def create_field(table_id: int, field: schemas.FieldCreate, db: Session = Depends(deps.get_db)):
-    try:
-        return crud.create_field(db, table_id, field)
-    except IntegrityError:
-        db.rollback()
-        # Try to fetch the existing field and return it
-        existing = db.query(crud.models.Field).filter(
-            crud.models.Field.name == field.name,
-            crud.models.Field.table_id == table_id,
-            crud.models.Field.parent_id == field.parent_id
-        ).first()
-        if existing:
-            return existing
-        raise HTTPException(status_code=409, detail="Field already exists at this path (concurrent creation)")
+    return crud.create_field(db, table_id, field)
 
 @router.get("/tables/{table_id}/fields/", response_model=List[schemas.FieldRead])
 def read_fields(table_id: int, db: Session = Depends(deps.get_db)):
     return crud.get_fields(db, table_id)
 
 # Edge endpoints
+@router.get("/edge-types/", response_model=List[schemas.EdgeTypeRead])
+def read_edge_types():
+    return crud.get_edge_types()
+
+@router.post("/edge-types/", response_model=schemas.EdgeTypeRead)
+def create_edge_type(edge_type: schemas.EdgeTypeCreate, db: Session = Depends(deps.get_db)):
+    """Register an edge type. Types used without registering first are directed."""
+    try:
+        return crud.create_edge_type(db, edge_type)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
 @router.post("/edges/", response_model=schemas.EdgeRead)
 def create_edge(edge: schemas.EdgeCreate, db: Session = Depends(deps.get_db)):
-    return crud.create_edge(db, edge)
+    try:
+        return crud.create_edge(db, edge)
+    except lineage.LineageCycleError as e:
+        raise _lineage_conflict(db, e)
+
+def _edge_ref(value: str):
+    value = value.strip()
+    return int(value) if value.isdigit() else value
+
+def _parse_edges(body: bytes, content_type: str) -> List[tuple]:
+    """(from, to, type) rows from a JSON EdgeBulkRequest or a CSV with a from,to[,type] header."""
+    if "csv" in content_type:
+        reader = csv.DictReader(io.StringIO(body.decode("utf-8-sig")))
+        if not reader.fieldnames or not {"from", "to"} <= set(reader.fieldnames):
+            raise HTTPException(status_code=400, detail="CSV needs a header with 'from' and 'to' columns (and optionally 'type')")
+        return [(_edge_ref(row["from"] or ""), _edge_ref(row["to"] or ""), (row.get("type") or "").strip() or None)
+                for row in reader]
+    try:
+        request = schemas.EdgeBulkRequest.model_validate_json(body)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return [(edge.from_, edge.to, edge.type or request.type) for edge in request.edges]
+
+def _load_edges(db: Session, body: bytes, content_type: str, edge_type: Optional[str], strict: bool) -> dict:
+    edges = _parse_edges(body, content_type)
+    if len(edges) > MAX_EDGE_BULK:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_EDGE_BULK} edges per request")
+    try:
+        report = crud.bulk_create_edges(db, edges, default_type=edge_type, strict=strict)
+    except lineage.LineageCycleError as e:
+        raise _lineage_conflict(db, e)
+    if strict and report["errors"]:
+        raise HTTPException(status_code=400, detail={"message": "Invalid edges, nothing was inserted", "errors": report["errors"]})
+    return report
+
+@router.post("/edges/bulk")
+async def bulk_create_edges(
+    request: Request,
+    edge_type: Optional[str] = Query(None, alias="type", description="Edge type for rows that do not name one"),
+    strict: bool = Query(False, description="Insert nothing if any row is invalid"),
+    db: Session = Depends(deps.get_db)):
+    """
+    Load many edges in one transaction, as JSON ({"type", "edges": [{"from", "to", "type"}]})
+    or as CSV (text/csv with a from,to[,type] header). Endpoints are field ids or paths;
+    edges that already exist are skipped.
+    """
+    body = await request.body()
+    return await run_in_threadpool(_load_edges, db, body, request.headers.get("content-type", ""), edge_type, strict)
 
 @router.get("/fields/{field_id}/edges/", response_model=List[schemas.EdgeRead])
 def read_edges(field_id: int, db: Session = Depends(deps.get_db)):
@@ -74,7 +145,16 @@ def delete_edge(edge_id: int, db: Session = Depends(deps.get_db)):
 from fastapi import Body
 
 @router.patch("/fields/{field_id}/meta", response_model=schemas.FieldRead)
-def update_field_meta(field_id: int, meta: Dict[str, Any] = Body(...), db: Session = Depends(deps.get_db)):
+def update_field_meta(field_id: int, meta: Dict[str, Any] = Body(...), mode: str = META_MODE_QUERY,
+                      db: Session = Depends(deps.get_db)):
+    if mode == "merge":
+        try:
+            merged = crud.merge_field_meta(db, field_id, meta)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        if merged is None:
+            raise HTTPException(status_code=404, detail="Field not found")
+        return db.query(crud.models.Field).filter(crud.models.Field.id == field_id).first()
     field = db.query(crud.models.Field).filter(crud.models.Field.id == field_id).first()
     if not field:
         raise HTTPException(status_code=404, detail="Field not found")
@@ -90,62 +170,67 @@ def update_cluster_by_path(cluster_path: str, data: dict = Body(...), db: Sessio
     cluster_id = get_cluster_id_by_path(db, cluster_path)
     if cluster_id is None:
         raise HTTPException(status_code=404, detail="Cluster not found for path")
-    cluster = db.query(crud.models.Cluster).filter(crud.models.Cluster.id == cluster_id).first()
-    if not cluster:
-        raise HTTPException(status_code=404, detail="Cluster not found")
-    if 'name' in data:
-        cluster.name = data['name']
-    db.commit()
-    db.refresh(cluster)
-    return cluster
+    return _rename(db, crud.models.Cluster, cluster_id, data, "Cluster")
 
 @router.patch("/databases/by-path/{cluster}/{database}", response_model=schemas.DatabaseRead)
 def update_database_by_path(cluster: str, database: str, data: dict = Body(...), db: Session = Depends(deps.get_db)):
     db_id = get_database_id_by_path(db, cluster, database)
     if db_id is None:
         raise HTTPException(status_code=404, detail="Database not found for path")
-    db_obj = db.query(crud.models.Database).filter(crud.models.Database.id == db_id).first()
-    if not db_obj:
-        raise HTTPException(status_code=404, detail="Database not found")
-    if 'name' in data:
-        db_obj.name = data['name']
-    db.commit()
-    db.refresh(db_obj)
-    return db_obj
+    return _rename(db, crud.models.Database, db_id, data, "Database")
 
 @router.patch("/tables/by-path/{cluster}/{database}/{table}", response_model=schemas.TableRead)
 def update_table_by_path(cluster: str, database: str, table: str, data: dict = Body(...), db: Session = Depends(deps.get_db)):
     table_id = get_table_id_by_path(db, cluster, database, table)
     if table_id is None:
         raise HTTPException(status_code=404, detail="Table not found for path")
-    table_obj = db.query(crud.models.Table).filter(crud.models.Table.id == table_id).first()
-    if not table_obj:
-        raise HTTPException(status_code=404, detail="Table not found")
-    if 'name' in data:
-        table_obj.name = data['name']
-    db.commit()
-    db.refresh(table_obj)
-    return table_obj
+    return _rename(db, crud.models.Table, table_id, data, "Table")
+
+@router.patch("/fields/meta:batch")
+def batch_update_field_meta(
+    request: schemas.FieldMetaBatchRequest,
+    commit_every: int = Query(5000, ge=1, description="Commit after this many updates; smaller batches run in one transaction"),
+    db: Session = Depends(deps.get_db)):
+    """Merge-patch the meta of many fields (by path or id) and report a status per operation."""
+    if len(request.operations) > MAX_META_BATCH:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_META_BATCH} operations per request")
+    results = crud.batch_merge_field_meta(db, [op.model_dump() for op in request.operations],
+                                          commit_every=commit_every, return_meta=request.return_meta)
+    updated = sum(1 for r in results if r["status"] == "ok")
+    return {"updated": updated, "failed": len(results) - updated, "results": results}
 
 @router.patch("/fields/by-path/{field_path:path}/meta", response_model=None)
-def update_field_meta_by_path(field_path: str, meta: dict = Body(...), db: Session = Depends(deps.get_db)):
+def update_field_meta_by_path(field_path: str, meta: dict = Body(...), mode: str = META_MODE_QUERY,
+                              delta_table_id: Optional[int] = DELTA_TABLE_QUERY, since: Optional[int] = SINCE_QUERY,
+                              db: Session = Depends(deps.get_db)):
     parts = field_path.split('/')
     if len(parts) < 4:
         raise HTTPException(status_code=400, detail="Field path must include at least cluster/database/table/field")
     field_id = get_field_id_by_path(db, *parts)
     if field_id is None:
         raise HTTPException(status_code=404, detail="Field not found for path")
-    field = db.query(crud.models.Field).filter(crud.models.Field.id == field_id).first()
-    if not field:
-        raise HTTPException(status_code=404, detail="Field not found")
     if not isinstance(meta, dict):
         raise HTTPException(status_code=400, detail="meta must be a dictionary")
-    if 'type' not in meta:
-        raise HTTPException(status_code=400, detail="meta must contain a 'type' key")
-    field.meta = meta  # type: ignore
-    db.commit()
-    db.refresh(field)
-    return field.meta
+    if mode == "merge":
+        try:
+            result = crud.merge_field_meta(db, field_id, meta)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        if result is None:
+            raise HTTPException(status_code=404, detail="Field not found")
+    else:
+        field = db.query(crud.models.Field).filter(crud.models.Field.id == field_id).first()
+        if not field:
+            raise HTTPException(status_code=404, detail="Field not found")
+        if 'type' not in meta:
+            raise HTTPException(status_code=400, detail="meta must contain a 'type' key")
+        field.meta = meta  # type: ignore
+        db.commit()
+        db.refresh(field)
+        result = field.meta
+    if delta_table_id is not None and since is not None:
+        return _with_graph_delta(db, {"meta": result}, delta_table_id, since)
+    return result
 
 @router.get("/fields/by-path/{field_path:path}/meta")
 def get_field_meta_by_path(field_path: str, db: Session = Depends(deps.get_db)):
@@ -165,6 +250,8 @@ def get_field_meta_by_path(field_path: str, db: Session = Depends(deps.get_db)):
 def add_equivalence_edge(
     from_path: str = Query(..., description="Path to source field, e.g. cluster/db/table/field[/subfield...]"),
     to_path: str = Query(..., description="Path to target field, e.g. cluster/db/table/field[/subfield...]") ,
+    delta_table_id: Optional[int] = DELTA_TABLE_QUERY,
+    since: Optional[int] = SINCE_QUERY,
     db: Session = Depends(deps.get_db)):
     from_parts = from_path.split('/')
     to_parts = to_path.split('/')
@@ -173,12 +260,14 @@ def add_equivalence_edge(
     if from_id is None or to_id is None:
         raise HTTPException(status_code=404, detail="Field not found for one or both paths")
     edge = crud.create_equivalence_edge(db, from_id, to_id)
-    return {"success": True, "edge_id": edge.id}
+    return _with_graph_delta(db, {"success": True, "edge_id": edge.id}, delta_table_id, since)
 
 @router.delete("/equivalence/")
 def remove_equivalence_edge(
     from_path: str = Query(..., description="Path to source field, e.g. cluster/db/table/field[/subfield...]"),
     to_path: str = Query(..., description="Path to target field, e.g. cluster/db/table/field[/subfield...]") ,
+    delta_table_id: Optional[int] = DELTA_TABLE_QUERY,
+    since: Optional[int] = SINCE_QUERY,
     db: Session = Depends(deps.get_db)):
     from_parts = from_path.split('/')
     to_parts = to_path.split('/')
@@ -188,7 +277,7 @@ def remove_equivalence_edge(
         raise HTTPException(status_code=404, detail="Field not found for one or both paths")
     crud.delete_equivalence_edge(db, from_id, to_id)
     # Always return success, even if the edge did not exist (idempotent)
-    return {"success": True}
+    return _with_graph_delta(db, {"success": True}, delta_table_id, since)
 
 @router.get("/fields/{field_path:path}/equivalence/")
 def get_equivalent_fields(field_path: str, db: Session = Depends(deps.get_db)):
@@ -205,10 +294,52 @@ def get_equivalent_fields(field_path: str, db: Session = Depends(deps.get_db)):
     ]
     return {"equivalents": equivalent_nodes}
 
+def _field_id_by_path(db: Session, path: str) -> Optional[int]:
+    """Id of the field at a cluster/database/table/field[/subfield...] path; 400 if the path cannot name a field."""
+    parts = path.split('/')
+    if len(parts) < 4 or not all(parts):
+        raise HTTPException(status_code=400, detail="Field path must include at least cluster/database/table/field")
+    return get_field_id_by_path(db, *parts)
+
+@router.get("/shortest-path/")
+def get_shortest_path(
+    from_path: str = Query(..., description="Path to source field, e.g. cluster/db/table/field[/subfield...]"),
+    to_path: str = Query(..., description="Path to target field, e.g. cluster/db/table/field[/subfield...]"),
+    edge_types: Optional[List[str]] = Query(None, description="Only follow edges of these types (default: all)"),
+    max_depth: int = Query(6, ge=1, le=20, description="Maximum number of edges in the path"),
+    timeout_ms: int = Query(2000, ge=1, le=30000, description="Time budget for the search"),
+    db: Session = Depends(deps.get_db)):
+    """Return the shortest chain of edges between two fields."""
+    from_id = _field_id_by_path(db, from_path)
+    to_id = _field_id_by_path(db, to_path)
+    if from_id is None or to_id is None:
+        raise HTTPException(status_code=404, detail="Field not found for one or both paths")
+    return graph.shortest_field_path(db, from_id, to_id, edge_types=edge_types, max_depth=max_depth, time_budget=timeout_ms / 1000)
+
+@router.get("/join-path/")
+def get_join_path(
+    from_table: str = Query(..., description="Path to source table, e.g. cluster/db/table"),
+    to_table: str = Query(..., description="Path to target table, e.g. cluster/db/table"),
+    edge_types: List[str] = Query(["equivalence"], description="Edge types that can be used to join tables"),
+    max_hops: int = Query(6, ge=1, le=20, description="Maximum number of joins"),
+    db: Session = Depends(deps.get_db)):
+    """Plan the shortest chain of table joins between two tables, with the field pairs for each join."""
+    from_parts = from_table.split('/')
+    to_parts = to_table.split('/')
+    if len(from_parts) != 3 or len(to_parts) != 3:
+        raise HTTPException(status_code=400, detail="Table paths must be cluster/database/table")
+    from_id = get_table_id_by_path(db, *from_parts)
+    to_id = get_table_id_by_path(db, *to_parts)
+    if from_id is None or to_id is None:
+        raise HTTPException(status_code=404, detail="Table not found for one or both paths")
+    return graph.plan_join_path(db, from_id, to_id, edge_types=edge_types, max_hops=max_hops)
+
 @router.post("/possibly-equivalence/")
 def add_possibly_equivalence_edge(
     from_path: str = Query(..., description="Path to source field, e.g. cluster/db/table/field[/subfield...]") ,
     to_path: str = Query(..., description="Path to target field, e.g. cluster/db/table/field[/subfield...]") ,
+    delta_table_id: Optional[int] = DELTA_TABLE_QUERY,
+    since: Optional[int] = SINCE_QUERY,
     db: Session = Depends(deps.get_db)):
     from_parts = from_path.split('/')
     to_parts = to_path.split('/')
@@ -217,12 +348,14 @@ def add_possibly_equivalence_edge(
     if from_id is None or to_id is None:
         raise HTTPException(status_code=404, detail="Field not found for one or both paths")
     edge = crud.create_possibly_equivalence_edge(db, from_id, to_id)
-    return {"success": True, "edge_id": edge.id}
+    return _with_graph_delta(db, {"success": True, "edge_id": edge.id}, delta_table_id, since)
 
 @router.delete("/possibly-equivalence/")
 def remove_possibly_equivalence_edge(
     from_path: str = Query(..., description="Path to source field, e.g. cluster/db/table/field[/subfield...]") ,
     to_path: str = Query(..., description="Path to target field, e.g. cluster/db/table/field[/subfield...]") ,
+    delta_table_id: Optional[int] = DELTA_TABLE_QUERY,
+    since: Optional[int] = SINCE_QUERY,
     db: Session = Depends(deps.get_db)):
     from_parts = from_path.split('/')
     to_parts = to_path.split('/')
@@ -233,7 +366,7 @@ def remove_possibly_equivalence_edge(
     success = crud.delete_possibly_equivalence_edge(db, from_id, to_id)
     if not success:
         raise HTTPException(status_code=404, detail="Possibly equivalence edge not found")
-    return {"success": True}
+    return _with_graph_delta(db, {"success": True}, delta_table_id, since)
 
 @router.get("/fields/{field_path:path}/possibly-equivalence/")
 def get_possibly_equivalent_fields(field_path: str, db: Session = Depends(deps.get_db)):
@@ -250,8 +383,74 @@ def get_possibly_equivalent_fields(field_path: str, db: Session = Depends(deps.g
     ]
     return {"equivalents": equivalent_nodes}
 
+def _lineage_conflict(db: Session, error: lineage.LineageCycleError) -> HTTPException:
+    paths = crud.get_field_paths_by_ids(db, error.cycle)
+    return HTTPException(status_code=409, detail={"message": str(error), "cycle": [paths.get(fid) for fid in error.cycle]})
+
+@router.post("/lineage/")
+def add_lineage_edge(
+    from_path: str = Query(..., description="Path to the upstream field, e.g. cluster/db/table/field[/subfield...]"),
+    to_path: str = Query(..., description="Path to the field derived from it"),
+    delta_table_id: Optional[int] = DELTA_TABLE_QUERY,
+    since: Optional[int] = SINCE_QUERY,
+    db: Session = Depends(deps.get_db)):
+    """Record that to_path is derived from from_path. Rejected with 409 if it would create a cycle."""
+    from_id = _field_id_by_path(db, from_path)
+    to_id = _field_id_by_path(db, to_path)
+    if from_id is None or to_id is None:
+        raise HTTPException(status_code=404, detail="Field not found for one or both paths")
+    try:
+        edge = crud.create_lineage_edge(db, from_id, to_id)
+    except lineage.LineageCycleError as e:
+        raise _lineage_conflict(db, e)
+    return _with_graph_delta(db, {"success": True, "edge_id": edge.id}, delta_table_id, since)
+
+@router.delete("/lineage/")
+def remove_lineage_edge(
+    from_path: str = Query(..., description="Path to the upstream field, e.g. cluster/db/table/field[/subfield...]"),
+    to_path: str = Query(..., description="Path to the field derived from it"),
+    delta_table_id: Optional[int] = DELTA_TABLE_QUERY,
+    since: Optional[int] = SINCE_QUERY,
+    db: Session = Depends(deps.get_db)):
+    from_id = _field_id_by_path(db, from_path)
+    to_id = _field_id_by_path(db, to_path)
+    if from_id is None or to_id is None:
+        raise HTTPException(status_code=404, detail="Field not found for one or both paths")
+    if not crud.delete_lineage_edge(db, from_id, to_id):
+        raise HTTPException(status_code=404, detail="Lineage edge not found")
+    return _with_graph_delta(db, {"success": True}, delta_table_id, since)
+
+@router.get("/lineage/order")
+def get_lineage_order(
+    path: Optional[str] = Query(None, description="Only order the fields downstream (or upstream) of this field, including it"),
+    direction: str = Query("downstream", pattern="^(downstream|upstream)$"),
+    include_paths: bool = Query(True, description="Resolve field paths (slower for very large results)"),
+    db: Session = Depends(deps.get_db)):
+    """
+    Topological order of the lineage graph for scheduling backfills: every field comes
+    after its upstream fields, and fields on the same level can be processed in parallel.
+    """
+    field_id = None
+    if path is not None:
+        field_id = _field_id_by_path(db, path)
+        if field_id is None:
+            raise HTTPException(status_code=404, detail="Field not found for path")
+    try:
+        return lineage.topological_order(db, field_id, direction, include_paths=include_paths)
+    except lineage.LineageCycleError as e:
+        raise _lineage_conflict(db, e)
+
+@router.post("/fields/resolve")
+def resolve_fields(request: schemas.FieldResolveRequest, db: Session = Depends(deps.get_db)):
+    """Resolve many field paths to id, parent id, table id and optionally meta, in input order."""
+    if len(request.paths) > MAX_BATCH_ITEMS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_ITEMS} paths per request")
+    return {"results": crud.resolve_field_paths(db, request.paths, include_meta=request.include_meta)}
+
 @router.post("/fields/by-path/{field_path:path}")
-def create_field_by_path(field_path: str, data: dict = Body(...), db: Session = Depends(deps.get_db)):
+def create_field_by_path(field_path: str, data: dict = Body(...),
+                         delta_table_id: Optional[int] = DELTA_TABLE_QUERY, since: Optional[int] = SINCE_QUERY,
+                         db: Session = Depends(deps.get_db)):
     # field_path: cluster/database/table/field1/field2/...
     parts = field_path.split('/')
     if len(parts) < 3:
@@ -276,21 +475,20 @@ def create_field_by_path(field_path: str, data: dict = Body(...), db: Session =
     # Create the field
     from . import schemas
     field_create = schemas.FieldCreate(name=field_names[-1], parent_id=parent_id, meta=data)
-    field = db.query(crud.models.Field).filter(
-        crud.models.Field.name == field_names[-1],
-        crud.models.Field.table_id == table_id,
-        crud.models.Field.parent_id == parent_id
-    ).first()
-    if field:
+    new_field, created = crud.get_or_create_field(db, table_id, field_create)
+    if not created:
         raise HTTPException(status_code=400, detail="Field already exists at this path")
-    new_field = crud.create_field(db, table_id, field_create)
+    if delta_table_id is not None and since is not None:
+        return _with_graph_delta(db, schemas.FieldRead.model_validate(new_field).model_dump(), delta_table_id, since)
     return new_field
 
 @router.delete("/fields/{field_id}")
-def delete_field_endpoint(field_id: int, db: Session = Depends(deps.get_db)):
+def delete_field_endpoint(field_id: int,
+                          delta_table_id: Optional[int] = DELTA_TABLE_QUERY, since: Optional[int] = SINCE_QUERY,
+                          db: Session = Depends(deps.get_db)):
     from .crud import delete_field
     delete_field(db, field_id)
-    return {"success": True}
+    return _with_graph_delta(db, {"success": True}, delta_table_id, since)
 
 @router.delete("/tables/{table_id}")
 def delete_table_endpoint(table_id: int, db: Session = Depends(deps.get_db)):
@@ -310,10 +508,131 @@ def delete_cluster_endpoint(cluster_id: int, db: Session = Depends(deps.get_db))
     delete_cluster(db, cluster_id)
     return {"success": True}
 
+def _rename(db: Session, model, obj_id: int, data: dict, label: str):
+    obj = db.query(model).filter(model.id == obj_id).first()
+    if not obj:
+        raise HTTPException(status_code=404, detail=f"{label} not found")
+    if 'name' in data:
+        obj.name = data['name']
+    try:
+        db.commit()
+    except IntegrityError:
+        # Names are unique among siblings (per database and per table, clusters globally)
+        db.rollback()
+        raise HTTPException(status_code=409, detail=f"{label} named '{data['name']}' already exists here")
+    db.refresh(obj)
+    return obj
+
+@router.patch("/clusters/{cluster_id}", response_model=schemas.ClusterRead)
+def update_cluster(cluster_id: int, data: dict = Body(...), db: Session = Depends(deps.get_db)):
+    return _rename(db, crud.models.Cluster, cluster_id, data, "Cluster")
+
+@router.patch("/databases/{database_id}", response_model=schemas.DatabaseRead)
+def update_database(database_id: int, data: dict = Body(...), db: Session = Depends(deps.get_db)):
+    return _rename(db, crud.models.Database, database_id, data, "Database")
+
+@router.patch("/tables/{table_id}", response_model=schemas.TableRead)
+def update_table(table_id: int, data: dict = Body(...), db: Session = Depends(deps.get_db)):
+    return _rename(db, crud.models.Table, table_id, data, "Table")
+
+@router.get("/tables/graph/")
+def get_tables_graph(
+    table_ids: Optional[List[int]] = Query(None, description="Tables to merge into one graph; the first one is the primary table"),
+    seed_table_id: Optional[int] = Query(None, description="Expand around this table instead of listing table_ids"),
+    radius: int = Query(1, ge=0, le=5, description="Number of table hops to expand around the seed table"),
+    edge_types: Optional[List[str]] = Query(None, description="Edge types followed when expanding around the seed"),
+    max_tables: int = Query(50, ge=1, le=500, description="Maximum number of tables in the merged graph"),
+    db: Session = Depends(deps.get_db)):
+    """Get one merged graph for a set of tables, or for the neighborhood of a seed table."""
+    if seed_table_id is not None:
+        ids = graph.table_graph.neighborhood(db, seed_table_id, radius, edge_types=edge_types, max_tables=max_tables)
+    elif table_ids:
+        ids = table_ids[:max_tables]
+    else:
+        raise HTTPException(status_code=400, detail="Provide table_ids or seed_table_id")
+    data = crud.get_tables_graph_data(db, ids)
+    if not data["tables"]:
+        raise HTTPException(status_code=404, detail="Table not found")
+    return data
+
 @router.get("/tables/{table_id}/graph/")
-def get_table_graph(table_id: int, db: Session = Depends(deps.get_db)):
-    """Get graph data for a table including all fields and their edges."""
-    return crud.get_table_graph_data(db, table_id)
+def get_table_graph(
+    table_id: int,
+    parent_id: Optional[int] = Query(None, description="Only return the subtree below this field"),
+    depth: Optional[int] = Query(None, ge=1, description="Number of field levels to return; nodes then carry child_count"),
+    format: str = Query("json", pattern="^(json|ndjson|columnar)$", description="json, ndjson (one record per line) or columnar"),
+    db: Session = Depends(deps.get_db)):
+    """Get graph data for a table including all fields and their edges, tagged with its revision."""
+    if format == "ndjson":
+        if db.query(crud.models.Table).filter(crud.models.Table.id == table_id).first() is None:
+            raise HTTPException(status_code=404, detail="Table not found")
+        records = crud.iter_table_graph_records(db, table_id, parent_id=parent_id, depth=depth)
+        return StreamingResponse((json.dumps(record) + "\n" for record in records), media_type="application/x-ndjson")
+    if format == "columnar":
+        return crud.get_table_graph_columns(db, table_id, parent_id=parent_id, depth=depth)
+    if parent_id is not None or depth is not None:
+        return crud.get_table_subtree_graph_data(db, table_id, parent_id=parent_id, depth=depth)
+    data = graph.table_graph_snapshot(db, table_id)
+    if data is None:
+        return {"nodes": [], "edges": []}
+    return data
+
+@router.get("/tables/{table_id}/layout/")
+async def get_table_layout(
+    table_id: int,
+    mode: str = Query("tree", pattern="^(tree|force)$", description="Layered tree layout or force-directed refinement"),
+    lod: Optional[int] = Query(None, ge=1, description="Collapse fields deeper than this many levels into their ancestor"),
+    max_nodes: Optional[int] = Query(None, ge=1, description="Pick the deepest level of detail with at most this many nodes"),
+    db: Session = Depends(deps.get_db)):
+    """Get precomputed node coordinates for a table graph, computed in a worker process and cached per table revision."""
+    key = (table_id, mode, lod, max_nodes)
+    await run_in_threadpool(graph.sync_external_changes, db)
+    revision = graph.table_revision(table_id)
+    cached = graph.layout_cache.get(key, revision)
+    if cached is not None:
+        return cached
+    inputs = await run_in_threadpool(crud.get_table_layout_inputs, db, table_id)
+    if inputs is None:
+        raise HTTPException(status_code=404, detail="Table not found")
+    result = await asyncio.wrap_future(layout.layout_pool.submit(key + (revision,), *inputs, mode, lod, max_nodes))
+    result = {"table_id": table_id, "revision": revision, **result}
+    graph.layout_cache.put(key, revision, result)
+    return result
+
+@router.get("/tables/{table_id}/graph/delta")
+def get_table_graph_delta(
+    table_id: int,
+    since: int = Query(..., description="Revision of the table graph the caller currently holds"),
+    db: Session = Depends(deps.get_db)):
+    """Get the nodes, edges and external connections added, removed or changed since a revision."""
+    delta = graph.table_graph_delta(db, table_id, since)
+    if delta is None:
+        raise HTTPException(status_code=404, detail="Table not found")
+    return delta
+
+@router.get("/databases/{database_id}/graph/")
+def get_database_graph(
+    database_id: int,
+    min_weight: int = Query(1, ge=1, description="Hide table links with fewer field edges than this, and above 1 the tables left without links"),
+    edge_types: Optional[List[str]] = Query(None, description="Only count edges of these types (default: all)"),
+    db: Session = Depends(deps.get_db)):
+    """Get the table-to-table relationship graph of a database, with edge counts per type."""
+    data = graph.get_database_graph_data(db, database_id, min_weight=min_weight, edge_types=edge_types)
+    if data is None:
+        raise HTTPException(status_code=404, detail="Database not found")
+    return data
+
+@router.get("/clusters/{cluster_id}/graph/")
+def get_cluster_graph(
+    cluster_id: int,
+    min_weight: int = Query(1, ge=1, description="Hide database links with fewer field edges than this, and above 1 the databases left without links"),
+    edge_types: Optional[List[str]] = Query(None, description="Only count edges of these types (default: all)"),
+    db: Session = Depends(deps.get_db)):
+    """Get the database-to-database relationship graph of a cluster, with edge counts per type."""
+    data = graph.get_cluster_graph_data(db, cluster_id, min_weight=min_weight, edge_types=edge_types)
+    if data is None:
+        raise HTTPException(status_code=404, detail="Cluster not found")
+    return data
 
 @router.get("/fields/by-table-path/{cluster}/{database}/{table}")
 def list_fields_by_table_path(cluster: str, database: str, table: str, db: Session = Depends(deps.get_db)):
@@ -325,6 +644,21 @@ def list_fields_by_table_path(cluster: str, database: str, table: str, db: Sessi
         raise HTTPException(status_code=404, detail="Table not found or no fields present")
     return {"paths": paths}
 
+@router.post("/fields/by-table-path/{cluster}/{database}/{table}")
+def create_fields_by_table_path(cluster: str, database: str, table: str, request: schemas.FieldBatchCreateRequest,
+                                db: Session = Depends(deps.get_db)):
+    """
+    Create many fields and subfields of one table, by paths relative to it, in one
+    transaction; report a status per field. Existing fields are left as they are.
+    """
+    if len(request.fields) > MAX_BATCH_ITEMS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_ITEMS} fields per request")
+    table_id = _container_ids(db, [cluster, database, table])[2]
+    results = crud.create_fields_in_table(db, table_id, [item.model_dump() for item in request.fields])
+    created = sum(1 for r in results if r["status"] == "created")
+    existing = sum(1 for r in results if r["status"] == "exists")
+    return {"created": created, "existing": existing, "failed": len(results) - created - existing, "results": results}
+
 @router.get("/fields/by-table-path/{cluster}/{database}/{table}/empty-description")
 def list_fields_with_empty_description_by_table_path(cluster: str, database: str, table: str, db: Session = Depends(deps.get_db)):
     """
@@ -369,6 +703,80 @@ def get_field_info_by_path(field_path: str, db: Session = Depends(deps.get_db)):
     }
     return info 
 
+# --- Name to id lookup ---
+def _container_ids(db: Session, parts: List[str]) -> tuple:
+    """Ids of a cluster[/database[/table]] path given as its parts; 404 naming the first missing level."""
+    ids = crud.get_container_ids_by_path(db, *parts)
+    if ids is None:
+        raise HTTPException(status_code=404, detail=f"Cluster '{parts[0]}' not found")
+    if len(parts) > 1 and ids[1] is None:
+        raise HTTPException(status_code=404, detail=f"Database '{parts[1]}' not found in cluster '{parts[0]}'")
+    if len(parts) > 2 and ids[2] is None:
+        raise HTTPException(status_code=404, detail=f"Table '{parts[2]}' not found in database '{parts[0]}/{parts[1]}'")
+    return ids[:len(parts)]
+
+@router.get("/ids/by-path/{path:path}", response_model=schemas.ContainerIds, response_model_exclude_none=True)
+def get_ids_by_path(path: str, db: Session = Depends(deps.get_db)):
+    """Ids of a cluster[/database[/table]] path, without loading the objects under it."""
+    parts = path.split('/')
+    if len(parts) > 3 or not all(parts):
+        raise HTTPException(status_code=400, detail="Path must be cluster[/database[/table]]")
+    return schemas.ContainerIds(**dict(zip(("cluster_id", "database_id", "table_id"), _container_ids(db, parts))))
+
+# --- Paged path listings ---
+PAGE_LIMIT_QUERY = Query(1000, ge=1, le=MAX_PAGE_ITEMS, description="Paths per page at most")
+PAGE_BYTES_QUERY = Query(None, ge=1, description="Stop the page once its paths take about this many bytes of JSON")
+CURSOR_QUERY = Query(None, description="next_cursor of the previous page")
+
+def _field_scope(db: Session, path: str, meta_filter: Optional[str]) -> dict:
+    """crud._scoped_fields arguments for a cluster[/database[/table[/field...]]] path and a JSON meta filter."""
+    parts = path.split('/') if path else []
+    if not all(parts):
+        raise HTTPException(status_code=400, detail="Path must be cluster[/database[/table[/field...]]]")
+    scope: Dict[str, Any] = {}
+    if parts:
+        scope.update(zip(("cluster_id", "database_id", "table_id"), _container_ids(db, parts[:3])))
+    if len(parts) > 3:
+        scope["field_id"] = get_field_id_by_path(db, *parts)
+        if scope["field_id"] is None:
+            raise HTTPException(status_code=404, detail="Field not found for path")
+    if meta_filter:
+        try:
+            scope["meta_filter"] = json.loads(meta_filter)
+        except json.JSONDecodeError:
+            scope["meta_filter"] = None
+        if not isinstance(scope["meta_filter"], dict):
+            raise HTTPException(status_code=400, detail="filter must be a JSON object of meta keys and values")
+    return scope
+
+@router.get("/fields/paths/", response_model=schemas.PathPage)
+def list_field_paths(path: str = Query("", description="Only fields under this cluster[/database[/table[/field...]]]"),
+                     filter: Optional[str] = Query(None, description="JSON object of meta key/value pairs the fields must have"),
+                     cursor: Optional[int] = CURSOR_QUERY, limit: int = PAGE_LIMIT_QUERY,
+                     max_bytes: Optional[int] = PAGE_BYTES_QUERY, db: Session = Depends(deps.get_db)):
+    """One page of field paths in a stable order; pass next_cursor back as cursor until it is null."""
+    paths, next_cursor = crud.list_field_paths_page(db, after=cursor, limit=limit, max_bytes=max_bytes,
+                                                    **_field_scope(db, path, filter))
+    return {"paths": paths, "next_cursor": next_cursor}
+
+@router.get("/fields/paths/summary", response_model=schemas.FieldPathSummary)
+def summarize_field_paths(path: str = Query("", description="Only fields under this cluster[/database[/table[/field...]]]"),
+                          filter: Optional[str] = Query(None, description="JSON object of meta key/value pairs the fields must have"),
+                          sample: int = Query(20, ge=0, le=MAX_PAGE_ITEMS, description="First field paths to include"),
+                          max_tables: int = Query(100, ge=0, le=MAX_PAGE_ITEMS, description="Tables to list counts for"),
+                          db: Session = Depends(deps.get_db)):
+    """Field counts in total and per table, with the first few paths, instead of every path."""
+    return crud.summarize_field_paths(db, sample=sample, max_tables=max_tables, **_field_scope(db, path, filter))
+
+@router.get("/databases/paths/", response_model=schemas.PathPage)
+def list_database_paths(cluster: Optional[List[str]] = Query(None, description="Only databases of these clusters"),
+                        cursor: Optional[int] = CURSOR_QUERY, limit: int = PAGE_LIMIT_QUERY,
+                        max_bytes: Optional[int] = PAGE_BYTES_QUERY, db: Session = Depends(deps.get_db)):
+    """One page of cluster/database paths; pass next_cursor back as cursor until it is null."""
+    paths, next_cursor = crud.list_database_paths_page(db, clusters=cluster, after=cursor, limit=limit,
+                                                       max_bytes=max_bytes)
+    return {"paths": paths, "next_cursor": next_cursor}
+
 # --- CLUSTER by-path GET and DELETE ---
 @router.get("/clusters/by-path/{cluster_path}", response_model=schemas.ClusterRead)
 def get_cluster_by_path(cluster_path: str, db: Session = Depends(deps.get_db)):
@@ -439,15 +847,15 @@ def create_database_by_path(cluster: str, database: str, db: Session = Depends(d
 # --- TABLE by-path POST ---
 @router.post("/tables/by-path/{cluster}/{database}/{table}", response_model=schemas.TableRead)
 def create_table_by_path(cluster: str, database: str, table: str, db: Session = Depends(deps.get_db)):
-    table_id = get_table_id_by_path(db, cluster, database, table)
-    if table_id is not None:
-        raise HTTPException(status_code=400, detail="Table already exists at this path")
     db_id = get_database_id_by_path(db, cluster, database)
     if db_id is None:
         raise HTTPException(status_code=404, detail="Database not found for path")
     # Use schemas.TableCreate for validation
     table_create = schemas.TableCreate(name=table)
-    return crud.create_table(db, db_id, table_create) 
+    new_table, created = crud.get_or_create_table(db, db_id, table_create)
+    if not created:
+        raise HTTPException(status_code=400, detail="Table already exists at this path")
+    return new_table
 
 # --- FIELD by-path GET ---
 @router.get("/fields/by-path/{field_path:path}", response_model=schemas.FieldRead)
@@ -463,9 +871,28 @@ def get_field_by_path(field_path: str, db: Session = Depends(deps.get_db)):
         raise HTTPException(status_code=404, detail="Field not found")
     return field 
 
+# Declared after the by-path field route so fields named "lineage" stay reachable there
+@router.get("/fields/{field_path:path}/lineage/{direction}")
+def get_field_lineage(
+    field_path: str,
+    direction: str,
+    max_depth: Optional[int] = Query(None, ge=1, le=100, description="Stop after this many edges (default: whole closure, without depths)"),
+    limit: int = Query(10000, ge=1, le=1000000, description="Maximum number of fields returned"),
+    include_paths: bool = Query(True, description="Resolve field paths (slower for very large results)"),
+    db: Session = Depends(deps.get_db)):
+    """Fields upstream or downstream of a field in the lineage graph."""
+    if direction not in lineage.DIRECTIONS:
+        raise HTTPException(status_code=404, detail="Direction must be upstream or downstream")
+    field_id = _field_id_by_path(db, field_path)
+    if field_id is None:
+        raise HTTPException(status_code=404, detail="Field not found for path")
+    return lineage.traverse(db, field_id, direction, max_depth=max_depth, limit=limit, include_paths=include_paths)
+
 # --- FIELD by-path DELETE ---
 @router.delete("/fields/by-path/{field_path:path}")
-def delete_field_by_path(field_path: str, db: Session = Depends(deps.get_db)):
+def delete_field_by_path(field_path: str,
+                         delta_table_id: Optional[int] = DELTA_TABLE_QUERY, since: Optional[int] = SINCE_QUERY,
+                         db: Session = Depends(deps.get_db)):
     parts = field_path.split('/')
     if len(parts) < 4:
         raise HTTPException(status_code=400, detail="Field path must include at least cluster/database/table/field")
@@ -474,6 +901,80 @@ def delete_field_by_path(field_path: str, db: Session = Depends(deps.get_db)):
         raise HTTPException(status_code=404, detail="Field not found for path")
     from .crud import delete_field
     delete_field(db, field_id)
-    return {"success": True}
-
-# PATCH /fields/by-path/{field_path}/meta should return only the meta dict (already implemented as return {**field.meta}) 
\ No newline at end of file
+    return _with_graph_delta(db, {"success": True}, delta_table_id, since)
+
+# PATCH /fields/by-path/{field_path}/meta should return only the meta dict (already implemented as return {**field.meta}) 
+
+# --- Batch ---
+def _split_path(path: str, parts: int) -> List[str]:
+    names = path.split('/')
+    if len(names) != parts:
+        raise HTTPException(status_code=400, detail=f"Path must have {parts} parts")
+    return names
+
+# Sub-operations accepted by /batch: name -> (handler(db, args), response model of the mirrored route)
+BATCH_OPERATIONS = {
+    "create_database": (lambda db, a: create_database_by_path(*_split_path(a["path"], 2), db=db), schemas.DatabaseRead),
+    "create_table": (lambda db, a: create_table_by_path(*_split_path(a["path"], 3), db=db), schemas.TableRead),
+    "create_field": (lambda db, a: create_field_by_path(a["path"], a.get("meta") or {}, delta_table_id=None, since=None, db=db), None),
+    "delete_field": (lambda db, a: delete_field_by_path(a["path"], delta_table_id=None, since=None, db=db), None),
+    "get_field": (lambda db, a: get_field_by_path(a["path"], db=db), schemas.FieldRead),
+    "get_meta": (lambda db, a: get_field_meta_by_path(a["path"], db=db), None),
+    "patch_meta": (lambda db, a: update_field_meta_by_path(a["path"], a["meta"], mode=a.get("mode", "replace"),
+                                                           delta_table_id=None, since=None, db=db), None),
+    "resolve_fields": (lambda db, a: resolve_fields(schemas.FieldResolveRequest(**a), db=db), None),
+    "add_equivalence": (lambda db, a: add_equivalence_edge(a["from_path"], a["to_path"], delta_table_id=None, since=None, db=db), None),
+    "remove_equivalence": (lambda db, a: remove_equivalence_edge(a["from_path"], a["to_path"], delta_table_id=None, since=None, db=db), None),
+    "get_equivalents": (lambda db, a: get_equivalent_fields(a["path"], db=db), None),
+    "add_possibly_equivalence": (lambda db, a: add_possibly_equivalence_edge(a["from_path"], a["to_path"], delta_table_id=None, since=None, db=db), None),
+    "remove_possibly_equivalence": (lambda db, a: remove_possibly_equivalence_edge(a["from_path"], a["to_path"], delta_table_id=None, since=None, db=db), None),
+    "get_possibly_equivalents": (lambda db, a: get_possibly_equivalent_fields(a["path"], db=db), None),
+    "add_lineage": (lambda db, a: add_lineage_edge(a["from_path"], a["to_path"], delta_table_id=None, since=None, db=db), None),
+    "remove_lineage": (lambda db, a: remove_lineage_edge(a["from_path"], a["to_path"], delta_table_id=None, since=None, db=db), None),
+}
+
+class _BatchFailed(Exception):
+    pass
+
+def _run_batch(db: Session, operations: List[schemas.BatchOperation], stop_on_error: bool) -> List[dict]:
+    results = []
+    for index, operation in enumerate(operations):
+        result: Dict[str, Any] = {"index": index, "op": operation.op}
+        handler = BATCH_OPERATIONS.get(operation.op)
+        try:
+            if handler is None:
+                raise HTTPException(status_code=400, detail=f"Unknown operation '{operation.op}'")
+            run, model = handler
+            value = run(db, operation.args)
+            result.update(status=200, result=model.model_validate(value).model_dump() if model else jsonable_encoder(value))
+        except HTTPException as e:
+            db.rollback()
+            result.update(status=e.status_code, error=e.detail)
+        except (KeyError, TypeError, ValueError, IntegrityError) as e:
+            db.rollback()
+            result.update(status=400, error=f"Invalid operation: {e}")
+        results.append(result)
+        if stop_on_error and result["status"] >= 400:
+            break
+    return results
+
+@router.post("/batch")
+def run_batch(request: schemas.BatchRequest, db: Session = Depends(deps.get_db)):
+    """
+    Run many sub-operations, in order, against one session and return all results.
+    With atomic=true they share one transaction that is rolled back at the first error;
+    otherwise every operation commits on its own and errors do not stop the batch.
+    """
+    if len(request.operations) > MAX_BATCH_ITEMS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_ITEMS} operations per request")
+    if not request.atomic:
+        return {"committed": True, "results": _run_batch(db, request.operations, stop_on_error=False)}
+    results: List[dict] = []
+    try:
+        with atomic_session() as session:
+            results = _run_batch(session, request.operations, stop_on_error=True)
+            if results and results[-1]["status"] >= 400:
+                raise _BatchFailed()
+    except _BatchFailed:
+        return {"committed": False, "results": results}
+    return {"committed": True, "results": results}
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field as PydanticField
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Union
 
 class FieldBase(BaseModel):
     name: str
@@ -64,4 +64,68 @@ class EdgeCreate(EdgeBase):
 class EdgeRead(EdgeBase):
     id: int
     class Config:
-        from_attributes = True 
\ No newline at end of file
+        from_attributes = True 
+
+class EdgeTypeCreate(BaseModel):
+    name: str
+    directed: bool = True
+
+class EdgeTypeRead(EdgeTypeCreate):
+    id: int
+
+class EdgeBulkItem(BaseModel):
+    # Field id or field path (cluster/database/table/field...)
+    from_: Union[int, str] = PydanticField(alias="from")
+    to: Union[int, str]
+    type: Optional[str] = None
+
+class EdgeBulkRequest(BaseModel):
+    type: Optional[str] = None
+    edges: List[EdgeBulkItem]
+
+class FieldResolveRequest(BaseModel):
+    paths: List[str]
+    include_meta: bool = False
+
+class MetaPatchOperation(BaseModel):
+    path: Optional[str] = None
+    id: Optional[int] = None
+    patch: Dict[str, Any]
+
+class FieldMetaBatchRequest(BaseModel):
+    operations: List[MetaPatchOperation]
+    return_meta: bool = False
+
+class FieldBatchItem(BaseModel):
+    path: str
+    meta: Dict[str, Any] = {}
+
+class FieldBatchCreateRequest(BaseModel):
+    fields: List[FieldBatchItem]
+
+class BatchOperation(BaseModel):
+    op: str
+    args: Dict[str, Any] = {}
+
+class BatchRequest(BaseModel):
+    operations: List[BatchOperation]
+    atomic: bool = False
+
+class ContainerIds(BaseModel):
+    cluster_id: int
+    database_id: Optional[int] = None
+    table_id: Optional[int] = None
+
+class PathPage(BaseModel):
+    paths: List[str]
+    next_cursor: Optional[int] = None
+
+class TableFieldCount(BaseModel):
+    path: str
+    fields: int
+
+class FieldPathSummary(BaseModel):
+    total: int
+    table_count: int
+    tables: List[TableFieldCount]
+    paths: List[str]
@@ -1,6 +1,6 @@
 import React, { useEffect, useState } from 'react';
 import './App.css';
-import { Cluster, Database, Table, Field, fetchClusters, fetchDatabases, fetchTables, fetchFields, fetchEquivalents, addEquivalence, removeEquivalence, EquivalentNode, updateFieldMetaByPath, fetchPossiblyEquivalents, addPossiblyEquivalence, removePossiblyEquivalence, fetchTableGraph, TableGraphData, fetchFieldByPath } from './api';
+import { Cluster, Database, Table, Field, fetchClusters, fetchDatabases, fetchTables, fetchFields, fetchEquivalents, addEquivalence, removeEquivalence, EquivalentNode, updateFieldMetaByPath, fetchPossiblyEquivalents, addPossiblyEquivalence, removePossiblyEquivalence, fetchTableGraph, fetchTablesGraph, TableGraphData, fetchFieldByPath } from './api';
 import { GraphView } from './GraphView';
 import ReactMarkdown from 'react-markdown';
 import { Prism as SyntaxHighlighter } from 'react-syntax-highlighter';
@@ -387,86 +387,10 @@ function App() {
     
     setGraphLoading(true);
     try {
-      // Fetch the new table's graph data
-      const newTableData = await fetchTableGraph(tableId);
-      
-      // Merge the data
-      if (graphData) {
-        // Create a new table node ID for the new table to avoid conflicts
-        const newTableNodeId = -(Math.max(...graphData.nodes.map(n => Math.abs(n.id))) + 1);
-        
-        // Update the new table's nodes to use the new table node ID
-        const updatedNewNodes = newTableData.nodes.map(node => {
-          if (node.id === -1) { // This is the table node
-            return { ...node, id: newTableNodeId };
-          } else if (node.parent_id === -1) { // This is a root field that should connect to the new table node
-            return { ...node, parent_id: newTableNodeId };
-          }
-          return node;
-        });
-        
-        // Update the new table's edges to use the new table node ID
-        const updatedNewEdges = newTableData.edges.map(edge => {
-          if (edge.from === -1) {
-            return { ...edge, from: newTableNodeId };
-          }
-          if (edge.to === -1) {
-            return { ...edge, to: newTableNodeId };
-          }
-          return edge;
-        });
-
-        // Find cross-table equivalence edges from external connections
-        const crossTableEdges = [];
-        for (const extConn of graphData.external_connections) {
-          if (extConn.from_table.id === tableId || extConn.to_table.id === tableId) {
-            // This external connection involves the table we're adding
-            // Use the field IDs from the external connection
-            const fromFieldId = extConn.from_field_id;
-            const toFieldId = extConn.to_field_id;
-            
-            // Determine which field belongs to the new table and which belongs to the existing graph
-            let newTableFieldId: number, existingFieldId: number;
-            if (extConn.from_table.id === tableId) {
-              newTableFieldId = fromFieldId;
-              existingFieldId = toFieldId;
-            } else {
-              newTableFieldId = toFieldId;
-              existingFieldId = fromFieldId;
-            }
-            
-            // Check if the existing field is in the current graph
-            const existingField = graphData.nodes.find(node => node.id === existingFieldId);
-            
-            if (existingField) {
-              // Find the new table field to get its path
-              const newTableField = updatedNewNodes.find(node => node.id === newTableFieldId);
-              
-              if (newTableField) {
-                // Create the cross-table equivalence edge
-                crossTableEdges.push({
-                  id: -(Math.max(...graphData.nodes.map(n => Math.abs(n.id))) + crossTableEdges.length + 1),
-                  from: newTableFieldId,
-                  to: existingFieldId,
-                  from_path: newTableField.path,
-                  to_path: existingField.path,
-                  type: extConn.type
-                });
-              }
-            }
-          }
-        }
-        
-        const mergedData: TableGraphData = {
-          table: graphData.table, // Keep the original table as primary
-          nodes: [...graphData.nodes, ...updatedNewNodes],
-          edges: [...graphData.edges, ...updatedNewEdges, ...crossTableEdges],
-          external_connections: [...graphData.external_connections, ...newTableData.external_connections]
-        };
-        
-        setGraphData(mergedData);
-        setIncludedTables(prev => new Set(Array.from(prev).concat(tableId)));
-      }
+      // Fetch one merged graph for every included table; the primary table stays first
+      const mergedData = await fetchTablesGraph([...Array.from(includedTables), tableId]);
+      setGraphData(mergedData);
+      setIncludedTables(prev => new Set(Array.from(prev).concat(tableId)));
     } catch (error) {
       console.error('Failed to add table to graph:', error);
     } finally {
@@ -478,8 +402,11 @@ function App() {
     if (!includedTables.has(tableId) || !graphData) return;
 
     // Remove all nodes belonging to the table
+    const listedTable = graphData.tables?.find(t => t.id === tableId);
     const nodesToRemove = new Set(
       graphData.nodes.filter(node => {
+        // Merged graphs list each table's path
+        if (listedTable) return node.path === listedTable.path || node.path.startsWith(`${listedTable.path}/`);
         // Table node: id === -1 or negative and path includes table name
         if (node.id === -1 && graphData.table.id === tableId) return true;
         // For merged graphs, table node id is negative and matches tableId
@@ -546,7 +546,10 @@ export function GraphView({ graphData, onClose, onRemoveField, onAddTable, inclu
     // Find the table path from external_connections
     let tablePath = '';
     const extConn = graphData.external_connections.find(conn => conn.from_table.id === tableId || conn.to_table.id === tableId);
-    if (extConn) {
+    const listedTable = graphData.tables?.find(t => t.id === tableId);
+    if (listedTable) {
+      tablePath = listedTable.path;
+    } else if (extConn) {
       tablePath = extConn.from_table.id === tableId ? extConn.from_table.path : extConn.to_table.path;
     } else {
       const tableNode = graphData.nodes.find(n => n.meta && n.meta.type === 'table' && n.id < 0 && (n.path || '').length > 0 && (n.path.split('/')[2] === String(tableId) || n.name.endsWith(String(tableId))));
@@ -629,6 +632,9 @@ export function GraphView({ graphData, onClose, onRemoveField, onAddTable, inclu
     const finalTableIds = new Set<number>();
     for (const node of finalNodes) {
       if (node.meta && node.meta.type === 'table') {
+        for (const t of graphData.tables || []) {
+          if (t.path === node.path) finalTableIds.add(t.id);
+        }
         for (const conn of newExternalConnections) {
           if (conn.from_table.path === node.path) finalTableIds.add(conn.from_table.id);
           if (conn.to_table.path === node.path) finalTableIds.add(conn.to_table.id);
@@ -35,6 +35,7 @@ export interface GraphNode {
   path: string;
   parent_id: number | null;
   meta: Record<string, any>;
+  child_count?: number;
 }
 
 export interface GraphEdge {
@@ -72,9 +73,68 @@ export interface TableGraphData {
     id: number;
     name: string;
   };
+  tables?: {
+    id: number;
+    name: string;
+    path: string;
+    node_id: number;
+  }[];
   nodes: GraphNode[];
   edges: GraphEdge[];
   external_connections: ExternalConnection[];
+  revision?: number;
+}
+
+export interface GraphDiff<T, K> {
+  added: T[];
+  removed: K[];
+  changed: T[];
+}
+
+export interface TableGraphDelta {
+  table_id: number;
+  since: number;
+  revision: number;
+  full: boolean;
+  graph?: TableGraphData;
+  nodes?: GraphDiff<GraphNode, number>;
+  edges?: GraphDiff<GraphEdge, number | string>;
+  external_connections?: GraphDiff<ExternalConnection, number>;
+}
+
+export interface AggregateGraphNode {
+  id: number;
+  name: string;
+  path: string;
+  external: boolean;
+}
+
+export interface AggregateGraphLink {
+  source: number;
+  target: number;
+  weight: number;
+  counts: Record<string, number>;
+}
+
+export interface AggregateGraphData {
+  revision: number;
+  nodes: AggregateGraphNode[];
+  links: AggregateGraphLink[];
+}
+
+export interface TableLayout {
+  table_id: number;
+  revision: number;
+  mode: 'tree' | 'force';
+  lod: number;
+  max_depth: number;
+  hidden: number;
+  nodes: {
+    id: number[];
+    x: number[];
+    y: number[];
+    collapsed_count: number[];
+  };
 }
 
 const API_URL = 'http://localhost:8000';
@@ -191,6 +251,69 @@ export async function fetchTableGraph(tableId: number): Promise<TableGraphData>
   return res.json();
 }
 
+export async function fetchTableGraphPage(tableId: number, parentId: number | null = null, depth = 1): Promise<TableGraphData> {
+  const parent = parentId !== null ? `&parent_id=${parentId}` : '';
+  const res = await fetch(`${API_URL}/tables/${tableId}/graph/?depth=${depth}${parent}`);
+  if (!res.ok) throw new Error('Failed to fetch table graph page');
+  return res.json();
+}
+
+export async function fetchTableLayout(tableId: number, mode: 'tree' | 'force' = 'tree', maxNodes?: number): Promise<TableLayout> {
+  const limit = maxNodes !== undefined ? `&max_nodes=${maxNodes}` : '';
+  const res = await fetch(`${API_URL}/tables/${tableId}/layout/?mode=${mode}${limit}`);
+  if (!res.ok) throw new Error('Failed to fetch table layout');
+  return res.json();
+}
+
+export async function fetchTableGraphDelta(tableId: number, since: number): Promise<TableGraphDelta> {
+  const res = await fetch(`${API_URL}/tables/${tableId}/graph/delta?since=${since}`);
+  if (!res.ok) throw new Error('Failed to fetch table graph delta');
+  return res.json();
+}
+
+function applyDiff<T, K>(items: T[], diff: GraphDiff<T, K> | undefined, key: (item: T) => K): T[] {
+  if (!diff) return items;
+  const removed = new Set<K>(diff.removed);
+  diff.changed.forEach(item => removed.add(key(item)));
+  return items.filter(item => !removed.has(key(item))).concat(diff.changed, diff.added);
+}
+
+export function applyGraphDelta(graph: TableGraphData, delta: TableGraphDelta): TableGraphData {
+  if (delta.full && delta.graph) return { ...delta.graph, revision: delta.revision };
+  return {
+    ...graph,
+    nodes: applyDiff(graph.nodes, delta.nodes, node => node.id),
+    edges: applyDiff<GraphEdge, number | string>(graph.edges, delta.edges, edge => edge.id),
+    external_connections: applyDiff(graph.external_connections, delta.external_connections, conn => conn.edge_id),
+    revision: delta.revision,
+  };
+}
+
+export async function fetchTablesGraph(tableIds: number[]): Promise<TableGraphData> {
+  const params = tableIds.map(id => `table_ids=${id}`).join('&');
+  const res = await fetch(`${API_URL}/tables/graph/?${params}&max_tables=${Math.max(tableIds.length, 1)}`);
+  if (!res.ok) throw new Error('Failed to fetch tables graph');
+  return res.json();
+}
+
+export async function fetchTableNeighborhoodGraph(tableId: number, radius = 1): Promise<TableGraphData> {
+  const res = await fetch(`${API_URL}/tables/graph/?seed_table_id=${tableId}&radius=${radius}`);
+  if (!res.ok) throw new Error('Failed to fetch table neighborhood graph');
+  return res.json();
+}
+
+export async function fetchDatabaseGraph(databaseId: number, minWeight = 1): Promise<AggregateGraphData> {
+  const res = await fetch(`${API_URL}/databases/${databaseId}/graph/?min_weight=${minWeight}`);
+  if (!res.ok) throw new Error('Failed to fetch database graph');
+  return res.json();
+}
+
+export async function fetchClusterGraph(clusterId: number, minWeight = 1): Promise<AggregateGraphData> {
+  const res = await fetch(`${API_URL}/clusters/${clusterId}/graph/?min_weight=${minWeight}`);
+  if (!res.ok) throw new Error('Failed to fetch cluster graph');
+  return res.json();
+}
+
 export async function fetchFieldByPath(fieldPath: string): Promise<Field> {
   const res = await fetch(`${API_URL}/fields/by-path/${encodeURIComponent(fieldPath)}`);
   if (!res.ok) throw new Error('Failed to fetch field');
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Benchmark for edge storage with registered edge type codes.
+
+Loads the same random edge set into the previous layout (type names as text, one
+index per column plus composites) and into the current one (integer type codes,
+per-type partial indexes), then compares table and index sizes from dbstat and the
+latency of one-type neighbor lookups. Finally migrates the legacy copy with init_db's
+migration and checks it matches.
+
+Usage:
+    python tests/benchmarks/edge_storage_bench.py --fields 200000 --edges 1000000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from sqlalchemy import create_engine
+from backend.models import Base
+from backend.database import _set_aside_legacy_edges, _migrate_legacy_edges
+
+# (code, name, share of edges)
+TYPES = [(1, "equivalence", 0.45), (2, "possibly_equivalence", 0.45), (3, "lineage", 0.10)]
+
+LEGACY_EDGES_DDL = [
+    "CREATE TABLE edges (id INTEGER PRIMARY KEY, from_field_id INTEGER REFERENCES fields (id), "
+    "to_field_id INTEGER REFERENCES fields (id), type VARCHAR NOT NULL)",
+    "CREATE INDEX idx_edge_from_field_id ON edges (from_field_id)",
+    "CREATE INDEX idx_edge_to_field_id ON edges (to_field_id)",
+    "CREATE INDEX idx_edge_type ON edges (type)",
+    "CREATE INDEX idx_edge_from_to_type ON edges (from_field_id, to_field_id, type)",
+    "CREATE UNIQUE INDEX uq_edge_type_from_to ON edges (type, from_field_id, to_field_id)",
+]
+
+
+def make_edges(n_fields: int, n_edges: int, seed: int) -> list:
+    rng = random.Random(seed)
+    codes = [code for code, _, _ in TYPES]
+    weights = [share for _, _, share in TYPES]
+    edges, seen = [], set()
+    while len(edges) < n_edges:
+        code = rng.choices(codes, weights)[0]
+        a, b = rng.randint(1, n_fields), rng.randint(1, n_fields)
+        if code != 3:
+            a, b = min(a, b), max(a, b)
+        if (code, a, b) not in seen:
+            seen.add((code, a, b))
+            edges.append((len(edges) + 1, a, b, code))
+    return edges
+
+
+def sizes(conn) -> dict:
+    return dict(conn.exec_driver_sql(
+        "SELECT name, SUM(pgsize) FROM dbstat WHERE name = 'edges' OR name IN "
+        "(SELECT name FROM sqlite_master WHERE tbl_name = 'edges' AND type = 'index') GROUP BY name"
+    ).all())
+
+
+def lookup_ms(conn, type_literal: str, probes: list) -> float:
+    sql = f"SELECT to_field_id, from_field_id, id FROM edges WHERE to_field_id IN ({','.join('?' * len(probes[0]))}) AND type = {type_literal}"
+    start = time.perf_counter()
+    for chunk in probes:
+        conn.exec_driver_sql(sql, tuple(chunk)).all()
+    return (time.perf_counter() - start) * 1000 / len(probes)
+
+
+def report(title: str, layout: dict):
+    print(f"{title}:")
+    for name, size in sorted(layout.items(), key=lambda item: -item[1]):
+        print(f"  {name:<36} {size / 2**20:8.1f} MiB")
+    print(f"  {'total':<36} {sum(layout.values()) / 2**20:8.1f} MiB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--fields', type=int, default=200000)
+    parser.add_argument('--edges', type=int, default=1000000)
+    parser.add_argument('--seed', type=int, default=3)
+    args = parser.parse_args()
+
+    edges = make_edges(args.fields, args.edges, args.seed)
+    names = {code: name for code, name, _ in TYPES}
+    rng = random.Random(args.seed + 1)
+    probes = [[rng.randint(1, args.fields) for _ in range(50)] for _ in range(200)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy = create_engine(f"sqlite:///{os.path.join(tmp, 'legacy.db')}")
+        current = create_engine(f"sqlite:///{os.path.join(tmp, 'current.db')}")
+        with legacy.begin() as conn:
+            for ddl in LEGACY_EDGES_DDL:
+                conn.exec_driver_sql(ddl)
+            conn.exec_driver_sql("INSERT INTO edges (id, from_field_id, to_field_id, type) VALUES (?, ?, ?, ?)",
+                                 [(i, a, b, names[code]) for i, a, b, code in edges])
+            conn.exec_driver_sql("ANALYZE")
+        Base.metadata.create_all(bind=current)
+        with current.begin() as conn:
+            conn.exec_driver_sql("INSERT INTO edges (id, from_field_id, to_field_id, type) VALUES (?, ?, ?, ?)", edges)
+            conn.exec_driver_sql("ANALYZE")
+
+        with legacy.connect() as conn:
+            legacy_sizes = sizes(conn)
+            legacy_ms = lookup_ms(conn, "'equivalence'", probes)
+        with current.connect() as conn:
+            current_sizes = sizes(conn)
+            current_ms = lookup_ms(conn, "1", probes)
+        report(f"Type names as text ({len(edges)} edges)", legacy_sizes)
+        report("Type codes with per-type partial indexes", current_sizes)
+        saved = 1 - sum(current_sizes.values()) / sum(legacy_sizes.values())
+        print(f"Edge storage reduced by {saved:.0%}")
+        print(f"Equivalence lookups into 50 fields: {legacy_ms:.2f} ms -> {current_ms:.2f} ms")
+
+        start = time.perf_counter()
+        with legacy.begin() as conn:
+            _set_aside_legacy_edges(conn)
+            Base.metadata.create_all(bind=conn)
+            _migrate_legacy_edges(conn)
+        print(f"Migrated the legacy copy in {time.perf_counter() - start:.1f}s")
+        with legacy.connect() as conn:
+            migrated = conn.exec_driver_sql("SELECT id, from_field_id, to_field_id, type FROM edges ORDER BY id").all()
+        assert [tuple(row) for row in migrated] == edges, "migrated edges differ"
+        legacy.dispose()
+        current.dispose()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the table join-path planner behind GET /join-path/.
+
+Builds a throwaway catalog of tables linked by equivalence edges, then times
+the cold table-graph build and warm join-path queries.
+
+Usage:
+    python tests/benchmarks/join_path_bench.py --tables 100000 --edges 300000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from backend.models import Base
+from backend.graph import plan_join_path, table_graph
+
+FIELDS_PER_TABLE = 4
+
+
+def build_catalog(engine, n_tables: int, n_edges: int, seed: int):
+    rng = random.Random(seed)
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO clusters (id, name) VALUES (1, 'bench')"))
+        conn.exec_driver_sql(
+            "INSERT INTO databases (id, name, cluster_id) VALUES (?, ?, 1)",
+            [(i, f"db{i}") for i in range(1, n_tables // 1000 + 2)],
+        )
+        conn.exec_driver_sql(
+            "INSERT INTO tables (id, name, database_id) VALUES (?, ?, ?)",
+            [(i, f"t{i}", i // 1000 + 1) for i in range(1, n_tables + 1)],
+        )
+        conn.exec_driver_sql(
+            "INSERT INTO fields (id, name, table_id, parent_id, meta) VALUES (?, ?, ?, NULL, '{}')",
+            [((t - 1) * FIELDS_PER_TABLE + k + 1, f"c{k}", t) for t in range(1, n_tables + 1) for k in range(FIELDS_PER_TABLE)],
+        )
+        n_fields = n_tables * FIELDS_PER_TABLE
+        # Type code 1 is equivalence, stored as (min, max); duplicate pairs are skipped
+        conn.exec_driver_sql(
+            "INSERT OR IGNORE INTO edges (id, from_field_id, to_field_id, type) VALUES (?, ?, ?, 1)",
+            [(i, *sorted((rng.randint(1, n_fields), rng.randint(1, n_fields)))) for i in range(1, n_edges + 1)],
+        )
+        conn.execute(text("ANALYZE"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tables', type=int, default=100000)
+    parser.add_argument('--edges', type=int, default=300000)
+    parser.add_argument('--queries', type=int, default=100)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        start = time.perf_counter()
+        build_catalog(engine, args.tables, args.edges, args.seed)
+        print(f"Built {args.tables} tables / {args.edges} edges in {time.perf_counter() - start:.1f}s")
+
+        Session = sessionmaker(bind=engine)
+        rng = random.Random(args.seed + 1)
+        with Session() as db:
+            start = time.perf_counter()
+            table_graph.neighbors(db, 1)
+            print(f"Cold table-graph build: {(time.perf_counter() - start) * 1000:.0f} ms")
+            timings, hops = [], []
+            for _ in range(args.queries):
+                a, b = rng.randint(1, args.tables), rng.randint(1, args.tables)
+                start = time.perf_counter()
+                result = plan_join_path(db, a, b, max_hops=12)
+                timings.append((time.perf_counter() - start) * 1000)
+                if result["found"]:
+                    hops.append(result["hops"])
+        timings.sort()
+        print(f"Queries: {args.queries}, found: {len(hops)}, mean hops: {sum(hops) / max(len(hops), 1):.2f}")
+        print(f"Latency ms: p50 {timings[len(timings) // 2]:.1f}, p95 {timings[int(len(timings) * 0.95) - 1]:.1f}, max {timings[-1]:.1f}")
+        engine.dispose()
+
+
+if __name__ == '__main__':
+    main()
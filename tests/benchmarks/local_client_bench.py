@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Benchmark of PathClient over HTTP against the in-process LocalPathClient.
+
+Runs the same ETL-style job (create fields, set descriptions, read meta back) through
+both clients on the database file of a local backend, which must be running from the
+repository root.
+
+Usage:
+    uvicorn backend.main:app --port 8000 &
+    python tests/benchmarks/local_client_bench.py --fields 500
+"""
+import argparse
+import os
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from api.local_client import LocalPathClient
+from api.path_client import PathClient
+
+
+def run_job(client, cluster: str, n_fields: int) -> dict:
+    timings = {}
+    client.create_cluster(cluster)
+    client.create_database(f"{cluster}/db")
+    client.create_table(f"{cluster}/db/t")
+    paths = [f"{cluster}/db/t/f{i}" for i in range(n_fields)]
+    for step, call in (
+        ("create", lambda p: client.create_field(p, meta={"type": "int"})),
+        ("describe", lambda p: client.edit_field_description(p, "bench")),
+        ("read", lambda p: client.get_field_metadata(p)),
+    ):
+        start = time.perf_counter()
+        for path in paths:
+            call(path)
+        timings[step] = time.perf_counter() - start
+    client.delete_cluster(cluster)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--fields', type=int, default=500)
+    parser.add_argument('--url', default='http://localhost:8000')
+    args = parser.parse_args()
+
+    local = LocalPathClient()
+    modes = {
+        "http": lambda name: run_job(PathClient(args.url), name, args.fields),
+        "local": lambda name: run_job(local, name, args.fields),
+    }
+
+    def batched(name):
+        with local.batch():
+            return run_job(local, name, args.fields)
+    modes["local, one transaction"] = batched
+
+    print(f"{args.fields} fields, ms per call")
+    for mode, job in modes.items():
+        timings = job(f"bench_{uuid.uuid4().hex[:8]}")
+        print(f"  {mode:24s}" + "".join(f"  {step} {t / args.fields * 1000:6.2f}" for step, t in timings.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Benchmark of MCP tool calls through the HTTP bridge against the in-process mode.
+
+Calls the MCP tools with the bridge's clients pointed at a local backend over HTTP
+(api/mcp_server.py run on its own) and at the crud layer directly (the tools mounted in
+the backend with DBDESC_MCP_IN_PROCESS=1). Both use fastmcp's in-memory transport, so
+the difference is the hop from the tools to the backend. The backend must be running
+from the repository root.
+
+Usage:
+    uvicorn backend.main:app --port 8000 &
+    python tests/benchmarks/mcp_mode_bench.py --fields 200
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from fastmcp import Client
+from api import mcp_server
+from api.async_path_client import AsyncPathClient
+from api.local_client import AsyncLocalPathClient, LocalPathClient
+
+
+async def run_calls(clients, cluster: str, n_fields: int, repeat: int) -> dict:
+    mcp_server.client, mcp_server.bulk_client = clients
+    paths = [f"{cluster}/db/t/f{i}" for i in range(n_fields)]
+    calls = {
+        "get_field_metadata": [("get_field_metadata", {"path": p}) for p in paths],
+        "edit_field_description": [("edit_field_description", {"path": p, "description": "bench"}) for p in paths],
+        "list_fields (table)": [("list_fields", {"path": f"{cluster}/db/t"})] * repeat,
+        "list_database": [("list_database", {"clusters": cluster})] * repeat,
+    }
+    timings = {}
+    async with Client(mcp_server.mcp) as mcp_client:
+        for name, batch in calls.items():
+            start = time.perf_counter()
+            for tool, args in batch:
+                await mcp_client.call_tool(tool, args)
+            timings[name] = (time.perf_counter() - start) / len(batch)
+    for client in set(clients):
+        await client.aclose()
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--fields', type=int, default=200)
+    parser.add_argument('--repeat', type=int, default=20, help="calls of the listing tools")
+    parser.add_argument('--url', default='http://localhost:8000')
+    args = parser.parse_args()
+
+    cluster = f"mcpbench_{uuid.uuid4().hex[:8]}"
+    local = LocalPathClient()
+    with local.batch():
+        local.create_cluster(cluster)
+        local.create_database(f"{cluster}/db")
+        local.create_table(f"{cluster}/db/t")
+        for i in range(args.fields):
+            local.create_field(f"{cluster}/db/t/f{i}", meta={"type": "int"})
+    in_process = AsyncLocalPathClient(local)
+    modes = {
+        "http bridge": lambda: (AsyncPathClient(args.url), AsyncPathClient(args.url, pool_size=16)),
+        "in-process": lambda: (in_process, in_process),
+    }
+    try:
+        print(f"{args.fields} fields, ms per tool call")
+        results = {mode: asyncio.run(run_calls(clients(), cluster, args.fields, args.repeat))
+                   for mode, clients in modes.items()}
+        print(f"  {'tool':24s}" + "".join(f"{mode:>14s}" for mode in results))
+        for name in results["http bridge"]:
+            print(f"  {name:24s}" + "".join(f"{timings[name] * 1000:14.2f}" for timings in results.values()))
+    finally:
+        local.delete_cluster(cluster)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Benchmark of PathClient's concurrent fan-out against a local backend.
+
+Builds a synthetic catalog (by default 5 databases of 20 tables, 10 fields each, with
+equivalence edges between databases) in the backend's database file, then times the
+multi-request methods with concurrency 1 (one request after another) and higher.
+The backend must be running from the repository root.
+
+Usage:
+    uvicorn backend.main:app --port 8000 &
+    python tests/benchmarks/path_client_fanout_bench.py --databases 5 --tables 20
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from api.local_client import LocalPathClient
+from api.path_client import PathClient
+
+
+def build_catalog(cluster: str, n_databases: int, n_tables: int, n_fields: int, seed: int):
+    rng = random.Random(seed)
+    local = LocalPathClient()
+    paths = []
+    with local.batch():
+        local.create_cluster(cluster)
+        for d in range(n_databases):
+            local.create_database(f"{cluster}/db{d}")
+            for t in range(n_tables):
+                local.create_table(f"{cluster}/db{d}/t{t}")
+                for f in range(n_fields):
+                    path = f"{cluster}/db{d}/t{t}/f{f}"
+                    local.create_field(path, meta={"type": "str" if f == 0 else "int"})
+                    paths.append(path)
+        local.add_edges([(rng.choice(paths), rng.choice(paths)) for _ in range(len(paths) // 4)])
+    return local
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--databases', type=int, default=5)
+    parser.add_argument('--tables', type=int, default=20, help="tables per database")
+    parser.add_argument('--fields', type=int, default=10, help="fields per table")
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 8, 16])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--url', default='http://localhost:8000')
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    cluster = f"fanout_{uuid.uuid4().hex[:8]}"
+    local = build_catalog(cluster, args.databases, args.tables, args.fields, args.seed)
+    calls = {
+        "list_database": lambda c: c.list_database(cluster),
+        "list_fields": lambda c: c.list_fields(cluster),
+        "get_hierarchy": lambda c: c.get_hierarchy(cluster, filter=[("type", "str")]),
+        "get_connected_databases": lambda c: c.get_connected_databases(f"{cluster}/db0"),
+    }
+    try:
+        print(f"{args.databases * args.tables} tables, {args.databases * args.tables * args.fields} fields; "
+              f"best of {args.repeat}, ms")
+        print(f"  {'concurrency':24s}" + "".join(f"{n:>8d}" for n in args.concurrency))
+        expected = {}
+        for name, call in calls.items():
+            row = []
+            for n in args.concurrency:
+                client = PathClient(args.url, concurrency=n, pool_size=max(n, 10))
+                best = float("inf")
+                for _ in range(args.repeat):
+                    start = time.perf_counter()
+                    result = call(client)
+                    best = min(best, time.perf_counter() - start)
+                    assert expected.setdefault(name, result) == result, f"{name} changed with concurrency {n}"
+                client.client.close()
+                row.append(best * 1000)
+            print(f"  {name:24s}" + "".join(f"{ms:8.0f}" for ms in row))
+    finally:
+        local.delete_cluster(cluster)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the bidirectional BFS behind GET /shortest-path/.
+
+Builds a throwaway SQLite database with a random field graph and times
+shortest-path queries between random field pairs.
+
+Usage:
+    python tests/benchmarks/shortest_path_bench.py --fields 1000000 --edges 2000000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from backend.models import Base
+from backend.graph import shortest_field_path
+
+
+def build_graph(engine, n_fields: int, n_edges: int, seed: int):
+    rng = random.Random(seed)
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO clusters (id, name) VALUES (1, 'bench')"))
+        conn.execute(text("INSERT INTO databases (id, name, cluster_id) VALUES (1, 'bench', 1)"))
+        conn.execute(text("INSERT INTO tables (id, name, database_id) VALUES (1, 'bench', 1)"))
+        conn.exec_driver_sql(
+            "INSERT INTO fields (id, name, table_id, parent_id, meta) VALUES (?, ?, 1, NULL, '{}')",
+            [(i, f"f{i}") for i in range(1, n_fields + 1)],
+        )
+        # Type codes of equivalence and possibly_equivalence; both are undirected and stored as (min, max)
+        types = [1, 2]
+        batch = []
+        for i in range(1, n_edges + 1):
+            a, b = rng.randint(1, n_fields), rng.randint(1, n_fields)
+            batch.append((i, min(a, b), max(a, b), types[i % 2]))
+            if len(batch) == 100000:
+                conn.exec_driver_sql("INSERT OR IGNORE INTO edges (id, from_field_id, to_field_id, type) VALUES (?, ?, ?, ?)", batch)
+                batch = []
+        if batch:
+            conn.exec_driver_sql("INSERT OR IGNORE INTO edges (id, from_field_id, to_field_id, type) VALUES (?, ?, ?, ?)", batch)
+        conn.execute(text("ANALYZE"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--fields', type=int, default=1000000)
+    parser.add_argument('--edges', type=int, default=2000000)
+    parser.add_argument('--queries', type=int, default=50)
+    parser.add_argument('--max-depth', type=int, default=16)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        start = time.perf_counter()
+        build_graph(engine, args.fields, args.edges, args.seed)
+        print(f"Built {args.fields} fields / {args.edges} edges in {time.perf_counter() - start:.1f}s")
+
+        Session = sessionmaker(bind=engine)
+        rng = random.Random(args.seed + 1)
+        timings, lengths, visited = [], [], []
+        with Session() as db:
+            for _ in range(args.queries):
+                a, b = rng.randint(1, args.fields), rng.randint(1, args.fields)
+                start = time.perf_counter()
+                result = shortest_field_path(db, a, b, max_depth=args.max_depth, time_budget=10.0)
+                timings.append((time.perf_counter() - start) * 1000)
+                visited.append(result["visited"])
+                if result["found"]:
+                    lengths.append(result["length"])
+        timings.sort()
+        print(f"Queries: {args.queries}, found: {len(lengths)}, mean length: {statistics.mean(lengths) if lengths else 0:.2f}")
+        print(f"Visited fields per query: mean {statistics.mean(visited):.0f}, max {max(visited)}")
+        print(f"Latency ms: p50 {timings[len(timings) // 2]:.1f}, p95 {timings[int(len(timings) * 0.95) - 1]:.1f}, max {timings[-1]:.1f}")
+        engine.dispose()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+import asyncio
+import uuid
+import httpx
+from api.async_client import AsyncDBDescClient
+from api.async_path_client import AsyncPathClient
+from api.path_client import PathClient
+from api.client import APIClientError
+
+def unique_name(prefix):
+    return f"{prefix}_{uuid.uuid4().hex[:8]}"
+
+sync_client = PathClient()
+
+def run(coro_fn, **client_options):
+    """Run coro_fn(client) on a fresh AsyncPathClient and close it afterwards."""
+    async def main():
+        async with AsyncPathClient(**client_options) as client:
+            return await coro_fn(client)
+    return asyncio.run(main())
+
+def test_async_hierarchy_and_metadata():
+    cname = unique_name('cluster')
+    async def scenario(client):
+        await client.create_cluster(cname)
+        await client.create_database(f"{cname}/db")
+        await client.create_table(f"{cname}/db/t")
+        # Creating an existing table returns it, like the sync client
+        table = await client.create_table(f"{cname}/db/t")
+        assert table['name'] == 't'
+        field = await client.create_field(f"{cname}/db/t/f", meta={"type": "int"})
+        assert field['name'] == 'f'
+        await client.edit_field_description(f"{cname}/db/t/f", "desc")
+        await client.add_field_metadata(f"{cname}/db/t/f", {"unit": "kg"})
+        await client.remove_field_metadata(f"{cname}/db/t/f", ["unit"])
+        return await client.get_field_metadata(f"{cname}/db/t/f")
+    meta = run(scenario)
+    assert meta == {"type": "int", "description": "desc"}
+    assert sync_client.get_field_metadata(f"{cname}/db/t/f") == meta
+    sync_client.delete_cluster(cname)
+
+def test_async_fan_out_matches_sync_client():
+    cname = unique_name('cluster')
+    sync_client.create_cluster(cname)
+    paths = []
+    for d in range(3):
+        sync_client.create_database(f"{cname}/db{d}")
+        for t in range(4):
+            sync_client.create_table(f"{cname}/db{d}/t{t}")
+            for f in range(3):
+                path = f"{cname}/db{d}/t{t}/f{f}"
+                sync_client.create_field(path, meta={"type": "int" if f else "str", "n": f})
+                paths.append(path)
+    async def scenario(client):
+        return await asyncio.gather(
+            client.list_database(cname),
+            client.list_fields(cname),
+            client.get_hierarchy(cname, filter=[("type", "str")]),
+            client.gather_meta(paths + [f"{cname}/db0/t0/missing"]),
+        )
+    databases, fields, filtered, metas = run(scenario, max_concurrency=4)
+    assert databases == sync_client.list_database(cname)
+    assert sorted(fields) == sorted(paths) == sorted(sync_client.list_fields(cname))
+    assert sorted(filtered) == sorted(sync_client.get_hierarchy(cname, filter=[("type", "str")]))
+    assert len(filtered) == 12
+    assert metas[f"{cname}/db1/t2/f1"] == {"type": "int", "n": 1}
+    assert metas[f"{cname}/db0/t0/missing"] is None
+    sync_client.delete_cluster(cname)
+
+def test_async_edges_and_connected_databases():
+    cname = unique_name('cluster')
+    sync_client.create_cluster(cname)
+    for path in (f"{cname}/a/t/x", f"{cname}/b/t/y", f"{cname}/c/t/z"):
+        sync_client.create_database(path.split("/t/")[0])
+        sync_client.create_table(path.rsplit("/", 1)[0])
+        sync_client.create_field(path, meta={"type": "int"})
+    async def scenario(client):
+        await client.add_edge(f"{cname}/a/t/x", f"{cname}/b/t/y")
+        await client.add_edges([(f"{cname}/b/t/y", f"{cname}/c/t/z")])
+        connected = await client.get_connected_databases(f"{cname}/b")
+        path = await client.get_shortest_path(f"{cname}/a/t/x", f"{cname}/c/t/z")
+        await client.remove_edge(f"{cname}/a/t/x", f"{cname}/b/t/y")
+        edges = await client.get_edges(f"{cname}/a/t/x")
+        return connected, path, edges
+    connected, path, edges = run(scenario)
+    assert connected == [f"{cname}/a", f"{cname}/c"]
+    assert path['found'] and path['length'] == 2
+    assert edges == []
+    sync_client.delete_cluster(cname)
+
+def test_async_errors():
+    async def scenario(client):
+        try:
+            await client.get_field(f"{unique_name('missing')}/db/t/f")
+        except APIClientError as e:
+            return str(e)
+    assert "404" in run(scenario)
+    async def bad_cluster(client):
+        try:
+            await client.list_database([unique_name('missing')])
+        except APIClientError as e:
+            return str(e)
+    assert "not found" in run(bad_cluster)
+
+def test_async_concurrency_is_bounded():
+    cname = unique_name('cluster')
+    sync_client.create_cluster(cname)
+    sync_client.create_database(f"{cname}/db")
+    sync_client.create_table(f"{cname}/db/t")
+    async def scenario(client):
+        results = await asyncio.gather(*[
+            client.create_field(f"{cname}/db/t/f{i}", meta={"type": "int"}) for i in range(50)
+        ])
+        # Every slot is handed back once the gather completes
+        return results, client.client._slots._value
+    results, free_slots = run(scenario, pool_size=4, max_concurrency=2)
+    assert len({r['id'] for r in results}) == 50
+    assert free_slots == 2
+    assert len(sync_client.list_fields(f"{cname}/db/t")) == 50
+    sync_client.delete_cluster(cname)
+
+def test_async_retries_once_per_attempt():
+    attempts = []
+    def refuse(request):
+        attempts.append(request.method)
+        if request.method == "GET":
+            raise httpx.ReadError("connection reset")
+        raise httpx.ConnectError("connection refused")
+    async def main():
+        http = httpx.AsyncClient(transport=httpx.MockTransport(refuse))
+        async with AsyncDBDescClient("http://backend", retries=2, backoff_factor=0, http=http) as client:
+            # POSTs are retried only when the connection could not be opened
+            for call in (client.create_cluster("c"), client.get_clusters()):
+                try:
+                    await call
+                except httpx.TransportError:
+                    pass
+        await http.aclose()
+    asyncio.run(main())
+    assert attempts == ["POST"] * 3 + ["GET"] * 3
+
+if __name__ == "__main__":
+    test_async_hierarchy_and_metadata()
+    test_async_fan_out_matches_sync_client()
+    test_async_edges_and_connected_databases()
+    test_async_errors()
+    test_async_concurrency_is_bounded()
+    test_async_retries_once_per_attempt()
+    print("All AsyncPathClient tests passed.")
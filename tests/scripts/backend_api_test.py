@@ -1,3 +1,4 @@
+import json
 import requests
 import time
 
@@ -374,6 +375,602 @@ def test_delete_field_removes_edges():
     requests.delete(f'{BASE_URL}/databases/by-path/{cname}/{dname}')
     requests.delete(f'{BASE_URL}/clusters/by-path/{cname}')
 
+# --- SHORTEST PATH TESTS ---
+def test_shortest_path():
+    cname = 'testcluster_sp'
+    dname = 'testdb_sp'
+    requests.delete(f'{BASE_URL}/clusters/by-path/{cname}')
+    requests.post(f'{BASE_URL}/clusters/', json={'name': cname})
+    requests.post(f'{BASE_URL}/databases/by-path/{cname}/{dname}')
+    for tname in ('t1', 't2', 't3'):
+        requests.post(f'{BASE_URL}/tables/by-path/{cname}/{dname}/{tname}')
+        requests.post(f'{BASE_URL}/fields/by-path/{cname}/{dname}/{tname}/id', json={"type": "int"})
+    p1, p2, p3 = (f'{cname}/{dname}/{t}/id' for t in ('t1', 't2', 't3'))
+    requests.post(f'{BASE_URL}/equivalence/?from_path={p1}&to_path={p2}')
+    requests.post(f'{BASE_URL}/possibly-equivalence/?from_path={p3}&to_path={p2}')
+    # Two hops over mixed edge types
+    resp = requests.get(f'{BASE_URL}/shortest-path/', params={'from_path': p1, 'to_path': p3})
+    assert resp.status_code == 200, resp.text
+    data = resp.json()
+    assert data['found'] and data['length'] == 2
+    assert [n['path'] for n in data['nodes']] == [p1, p2, p3]
+    assert [e['type'] for e in data['edges']] == ['equivalence', 'possibly_equivalence']
+    # Restricting the edge type breaks the chain
+    resp = requests.get(f'{BASE_URL}/shortest-path/', params={'from_path': p1, 'to_path': p3, 'edge_types': ['equivalence']})
+    assert resp.status_code == 200 and not resp.json()['found']
+    # Depth limit
+    resp = requests.get(f'{BASE_URL}/shortest-path/', params={'from_path': p1, 'to_path': p3, 'max_depth': 1})
+    assert not resp.json()['found']
+    resp = requests.get(f'{BASE_URL}/shortest-path/', params={'from_path': p1, 'to_path': f'{cname}/{dname}/t3/missing'})
+    assert resp.status_code == 404
+    # Paths too short to name a field
+    for short in (f'{cname}/{dname}', f'{cname}/{dname}/t3/', 'a//b/c'):
+        resp = requests.get(f'{BASE_URL}/shortest-path/', params={'from_path': p1, 'to_path': short})
+        assert resp.status_code == 400, resp.text
+    assert requests.post(f'{BASE_URL}/lineage/', params={'from_path': 'a/b', 'to_path': p1}).status_code == 400
+    assert requests.get(f'{BASE_URL}/lineage/order', params={'path': 'a/b'}).status_code == 400
+    assert requests.get(f'{BASE_URL}/fields/a/b/lineage/upstream').status_code == 400
+    requests.delete(f'{BASE_URL}/clusters/by-path/{cname}')
+
+def test_join_path():
+    cname = 'testcluster_jp'
+    requests.delete(f'{BASE_URL}/clusters/by-path/{cname}')
+    requests.post(f'{BASE_URL}/clusters/', json={'name': cname})
+    for dname in ('sales', 'crm'):
+        requests.post(f'{BASE_URL}/databases/by-path/{cname}/{dname}')
+    tables = [f'{cname}/sales/orders', f'{cname}/sales/customers', f'{cname}/crm/accounts']
+    for t in tables:
+        requests.post(f'{BASE_URL}/tables/by-path/{t}')
+        requests.post(f'{BASE_URL}/fields/by-path/{t}/id', json={"type": "int"})
+    requests.post(f'{BASE_URL}/fields/by-path/{tables[0]}/customer_id', json={"type": "int"})
+    # Prime the table graph cache, then check that new edges are picked up
+    resp = requests.get(f'{BASE_URL}/join-path/', params={'from_table': tables[0], 'to_table': tables[2]})
+    assert resp.status_code == 200 and not resp.json()['found']
+    requests.post(f'{BASE_URL}/equivalence/?from_path={tables[0]}/customer_id&to_path={tables[1]}/id')
+    requests.post(f'{BASE_URL}/equivalence/?from_path={tables[2]}/id&to_path={tables[1]}/id')
+    resp = requests.get(f'{BASE_URL}/join-path/', params={'from_table': tables[0], 'to_table': tables[2]})
+    assert resp.status_code == 200, resp.text
+    data = resp.json()
+    assert data['found'] and data['hops'] == 2
+    assert [t['path'] for t in data['tables']] == tables
+    assert data['joins'][0]['pairs'][0]['from_path'] == f'{tables[0]}/customer_id'
+    assert data['joins'][1]['pairs'][0]['to_path'] == f'{tables[2]}/id'
+    # Removing an edge updates the cached graph
+    requests.delete(f'{BASE_URL}/equivalence/?from_path={tables[2]}/id&to_path={tables[1]}/id')
+    resp = requests.get(f'{BASE_URL}/join-path/', params={'from_table': tables[0], 'to_table': tables[2]})
+    assert not resp.json()['found']
+    requests.delete(f'{BASE_URL}/clusters/by-path/{cname}')
+
+def test_database_and_cluster_graph():
+    cname = 'testcluster_agg'
+    other = 'testcluster_agg2'
+    for c in (cname, other):
+        requests.delete(f'{BASE_URL}/clusters/by-path/{c}')
+        requests.post(f'{BASE_URL}/clusters/', json={'name': c})
+    for d in (f'{cname}/db1', f'{cname}/db2', f'{other}/db3'):
+        requests.post(f'{BASE_URL}/databases/by-path/{d}')
+    tables = [f'{cname}/db1/a', f'{cname}/db1/b', f'{cname}/db2/c', f'{other}/db3/d']
+    for t in tables:
+        requests.post(f'{BASE_URL}/tables/by-path/{t}')
+        for f in ('x', 'y'):
+            requests.post(f'{BASE_URL}/fields/by-path/{t}/{f}', json={"type": "int"})
+    a, b, c, d = tables
+    requests.post(f'{BASE_URL}/equivalence/?from_path={a}/x&to_path={b}/x')
+    requests.post(f'{BASE_URL}/equivalence/?from_path={b}/y&to_path={a}/y')
+    requests.post(f'{BASE_URL}/possibly-equivalence/?from_path={a}/x&to_path={c}/x')
+    requests.post(f'{BASE_URL}/equivalence/?from_path={c}/y&to_path={d}/y')
+    db1 = requests.get(f'{BASE_URL}/databases/by-path/{cname}/db1').json()['id']
+    data = requests.get(f'{BASE_URL}/databases/{db1}/graph/').json()
+    paths = {n['id']: n['path'] for n in data['nodes']}
+    links = {(paths[l['source']], paths[l['target']]): l for l in data['links']}
+    assert links[(a, b)]['counts'] == {'equivalence': 2}
+    assert links[(a, c)]['counts'] == {'possibly_equivalence': 1}
+    assert next(n for n in data['nodes'] if n['path'] == c)['external']
+    # Threshold drops the weak link
+    data = requests.get(f'{BASE_URL}/databases/{db1}/graph/', params={'min_weight': 2}).json()
+    assert len(data['links']) == 1
+    # ... and the tables it leaves without links
+    assert sorted(n['path'] for n in data['nodes']) == [a, b]
+    cid = requests.get(f'{BASE_URL}/clusters/by-path/{cname}').json()['id']
+    data = requests.get(f'{BASE_URL}/clusters/{cid}/graph/').json()
+    paths = {n['id']: n['path'] for n in data['nodes']}
+    weights = {tuple(sorted((paths[l['source']], paths[l['target']]))): l['weight'] for l in data['links']}
+    assert weights == {(f'{cname}/db1', f'{cname}/db2'): 1, (f'{cname}/db2', f'{other}/db3'): 1}
+    data = requests.get(f'{BASE_URL}/clusters/{cid}/graph/', params={'min_weight': 2}).json()
+    assert data['links'] == [] and data['nodes'] == []
+    # Cached result is refreshed after a mutation
+    requests.post(f'{BASE_URL}/equivalence/?from_path={b}/x&to_path={c}/x')
+    data = requests.get(f'{BASE_URL}/clusters/{cid}/graph/').json()
+    assert sorted(l['weight'] for l in data['links']) == [1, 2]
+    assert requests.get(f'{BASE_URL}/clusters/999999/graph/').status_code == 404
+    for c in (cname, other):
+        requests.delete(f'{BASE_URL}/clusters/by-path/{c}')
+
+def test_multi_table_graph():
+    cname = 'testcluster_mtg'
+    requests.delete(f'{BASE_URL}/clusters/by-path/{cname}')
+    requests.post(f'{BASE_URL}/clusters/', json={'name': cname})
+    requests.post(f'{BASE_URL}/databases/by-path/{cname}/db')
+    tables = [f'{cname}/db/t{i}' for i in range(4)]
+    ids = []
+    for t in tables:
+        ids.append(requests.post(f'{BASE_URL}/tables/by-path/{t}').json()['id'])
+        requests.post(f'{BASE_URL}/fields/by-path/{t}/k', json={"type": "int"})
+        requests.post(f'{BASE_URL}/fields/by-path/{t}/k/sub', json={"type": "int"})
+    # t0 - t1 - t2 chain, t3 isolated
+    requests.post(f'{BASE_URL}/equivalence/?from_path={tables[0]}/k&to_path={tables[1]}/k')
+    requests.post(f'{BASE_URL}/equivalence/?from_path={tables[1]}/k/sub&to_path={tables[2]}/k')
+    resp = requests.get(f'{BASE_URL}/tables/graph/', params={'table_ids': [ids[0], ids[1]]})
+    assert resp.status_code == 200, resp.text
+    data = resp.json()
+    assert data['table']['id'] == ids[0]
+    assert [t['path'] for t in data['tables']] == tables[:2]
+    table_nodes = [n for n in data['nodes'] if n['meta'].get('type') == 'table']
+    assert len(table_nodes) == 2 and table_nodes[0]['id'] == -1
+    assert len(data['nodes']) == 6 and len({n['id'] for n in data['nodes']}) == 6
+    # The t0-t1 edge is drawn inline, the t1-t2 edge stays external
+    assert any(e['type'] == 'equivalence' and e['from_path'].startswith(tables[0]) for e in data['edges'])
+    assert [c['to_table']['path'] for c in data['external_connections']] == [tables[2]]
+    # Seed + radius expansion
+    data = requests.get(f'{BASE_URL}/tables/graph/', params={'seed_table_id': ids[0], 'radius': 2}).json()
+    assert [t['path'] for t in data['tables']] == tables[:3]
+    assert data['external_connections'] == []
+    assert requests.get(f'{BASE_URL}/tables/graph/').status_code == 400
+    requests.delete(f'{BASE_URL}/clusters/by-path/{cname}')
+
+def test_table_graph_delta():
+    cname = 'testcluster_delta'
+    requests.delete(f'{BASE_URL}/clusters/by-path/{cname}')
+    requests.post(f'{BASE_URL}/clusters/', json={'name': cname})
+    requests.post(f'{BASE_URL}/databases/by-path/{cname}/db')
+    t1, t2 = f'{cname}/db/t1', f'{cname}/db/t2'
+    table_id = requests.post(f'{BASE_URL}/tables/by-path/{t1}').json()['id']
+    requests.post(f'{BASE_URL}/tables/by-path/{t2}')
+    for t in (t1, t2):
+        requests.post(f'{BASE_URL}/fields/by-path/{t}/a', json={"type": "int"})
+    full = requests.get(f'{BASE_URL}/tables/{table_id}/graph/').json()
+    rev = full['revision']
+    # Without delta params the mutation response is unchanged
+    resp = requests.post(f'{BASE_URL}/fields/by-path/{t1}/b', json={"type": "str"})
+    assert 'graph_delta' not in resp.json()
+    delta = requests.get(f'{BASE_URL}/tables/{table_id}/graph/delta', params={'since': rev}).json()
+    assert delta['full'] is False and delta['revision'] > rev
+    assert [n['path'] for n in delta['nodes']['added']] == [f'{t1}/b']
+    assert delta['nodes']['removed'] == [] and delta['nodes']['changed'] == []
+    rev = delta['revision']
+    # External edge added through the mutation route
+    resp = requests.post(f'{BASE_URL}/equivalence/', params={
+        'from_path': f'{t1}/a', 'to_path': f'{t2}/a', 'delta_table_id': table_id, 'since': rev}).json()
+    delta = resp['graph_delta']
+    assert [c['edge_id'] for c in delta['external_connections']['added']] == [resp['edge_id']]
+    assert delta['nodes'] == {'added': [], 'removed': [], 'changed': []}
+    rev = delta['revision']
+    # Meta edit shows up as a changed node
+    resp = requests.patch(f'{BASE_URL}/fields/by-path/{t1}/a/meta', params={'delta_table_id': table_id, 'since': rev},
+                          json={"type": "int", "description": "key"}).json()
+    assert resp['meta']['description'] == 'key'
+    changed = resp['graph_delta']['nodes']['changed']
+    assert len(changed) == 1 and changed[0]['meta']['description'] == 'key'
+    rev = resp['graph_delta']['revision']
+    # Field delete removes the node, its contains edge and the external connection
+    a_id = next(n['id'] for n in full['nodes'] if n['path'] == f'{t1}/a')
+    resp = requests.delete(f'{BASE_URL}/fields/by-path/{t1}/a', params={'delta_table_id': table_id, 'since': rev}).json()
+    delta = resp['graph_delta']
+    assert delta['nodes']['removed'] == [a_id]
+    assert delta['edges']['removed'] == [f'table_field_{a_id}']
+    assert len(delta['external_connections']['removed']) == 1
+    # Unknown revisions fall back to the full graph
+    delta = requests.get(f'{BASE_URL}/tables/{table_id}/graph/delta', params={'since': -5}).json()
+    assert delta['full'] is True and len(delta['graph']['nodes']) == 2
+    assert requests.get(f'{BASE_URL}/tables/999999999/graph/delta', params={'since': 0}).status_code == 404
+    requests.delete(f'{BASE_URL}/clusters/by-path/{cname}')
+
+def test_table_graph_paging_and_formats():
+    cname = 'testcluster_paged'
+    requests.delete(f'{BASE_URL}/clusters/by-path/{cname}')
+    requests.post(f'{BASE_URL}/clusters/', json={'name': cname})
+    requests.post(f'{BASE_URL}/databases/by-path/{cname}/db')
+    t1, t2 = f'{cname}/db/t1', f'{cname}/db/t2'
+    table_id = requests.post(f'{BASE_URL}/tables/by-path/{t1}').json()['id']
+    requests.post(f'{BASE_URL}/tables/by-path/{t2}')
+    for path in ('a', 'a/x', 'a/x/deep', 'a/y', 'b'):
+        requests.post(f'{BASE_URL}/fields/by-path/{t1}/{path}', json={"type": "struct" if path == 'a' else "int"})
+    requests.post(f'{BASE_URL}/fields/by-path/{t2}/z', json={"type": "int"})
+    requests.post(f'{BASE_URL}/equivalence/?from_path={t1}/a/x/deep&to_path={t1}/b')
+    requests.post(f'{BASE_URL}/equivalence/?from_path={t1}/a/y&to_path={t2}/z')
+    requests.post(f'{BASE_URL}/equivalence/?from_path={t1}/a&to_path={t1}/a/x')
+    full = requests.get(f'{BASE_URL}/tables/{table_id}/graph/').json()
+
+    # Root level only, with child counts for lazy expansion
+    page = requests.get(f'{BASE_URL}/tables/{table_id}/graph/', params={'depth': 1}).json()
+    by_path = {n['path']: n for n in page['nodes']}
+    assert set(by_path) == {t1, f'{t1}/a', f'{t1}/b'}
+    assert by_path[f'{t1}/a']['child_count'] == 2 and by_path[f'{t1}/b']['child_count'] == 0
+    # Edges to fields below the cutoff wait for the page that expands them
+    ids = {n['id'] for n in page['nodes']}
+    assert all(e['from'] in ids and e['to'] in ids for e in page['edges'])
+    assert not [e for e in page['edges'] if e['type'] == 'equivalence']
+    resp = requests.get(f'{BASE_URL}/tables/{table_id}/graph/', params={'format': 'ndjson', 'depth': 1})
+    records = [json.loads(line) for line in resp.iter_lines() if line]
+    ids = {r['id'] for r in records if r['kind'] == 'node'}
+    assert all(r['from'] in ids and r['to'] in ids for r in records if r['kind'] == 'edge')
+    # Expand a/, its inline edge to b is reported even though b was loaded earlier
+    page = requests.get(f'{BASE_URL}/tables/{table_id}/graph/', params={'parent_id': by_path[f'{t1}/a']['id'], 'depth': 2}).json()
+    assert {n['path'] for n in page['nodes']} == {f'{t1}/a/x', f'{t1}/a/y', f'{t1}/a/x/deep'}
+    assert {(e['from_path'], e['to_path']) for e in page['edges'] if e['type'] == 'equivalence'} == {
+        (f'{t1}/a/x/deep', f'{t1}/b'), (f'{t1}/a', f'{t1}/a/x')}
+    assert [c['to_table']['path'] for c in page['external_connections']] == [t2]
+
+    # NDJSON stream carries the same graph as the JSON payload
+    resp = requests.get(f'{BASE_URL}/tables/{table_id}/graph/', params={'format': 'ndjson'}, stream=True)
+    assert resp.headers['content-type'].startswith('application/x-ndjson')
+    records = [json.loads(line) for line in resp.iter_lines() if line]
+    assert records[0]['kind'] == 'table' and records[0]['id'] == table_id
+    nodes = {r['id']: {k: v for k, v in r.items() if k != 'kind'} for r in records if r['kind'] == 'node'}
+    assert nodes == {n['id']: n for n in full['nodes']}
+    assert {r['id'] for r in records if r['kind'] == 'edge'} == {e['id'] for e in full['edges']}
+    assert [r['edge_id'] for r in records if r['kind'] == 'external'] == [c['edge_id'] for c in full['external_connections']]
+
+    cols = requests.get(f'{BASE_URL}/tables/{table_id}/graph/', params={'format': 'columnar'}).json()
+    assert sorted(cols['nodes']['id']) == sorted(n['id'] for n in full['nodes'])
+    assert len(cols['nodes']['parent_id']) == len(cols['nodes']['type']) == len(full['nodes'])
+    assert [cols['edge_types'][t] for t in cols['external_connections']['type']] == ['equivalence']
+    assert list(cols['external_tables'].values()) == [t2]
+    assert requests.get(f'{BASE_URL}/tables/999999999/graph/', params={'format': 'ndjson'}).status_code == 404
+    requests.delete(f'{BASE_URL}/clusters/by-path/{cname}')
+
+def test_table_layout():
+    cname = 'testcluster_layout'
+    requests.delete(f'{BASE_URL}/clusters/by-path/{cname}')
+    requests.post(f'{BASE_URL}/clusters/', json={'name': cname})
+    requests.post(f'{BASE_URL}/databases/by-path/{cname}/db')
+    t1, t2 = f'{cname}/db/t1', f'{cname}/db/t2'
+    table_id = requests.post(f'{BASE_URL}/tables/by-path/{t1}').json()['id']
+    requests.post(f'{BASE_URL}/tables/by-path/{t2}')
+    for path in ('a', 'a/x', 'a/x/deep', 'a/y', 'b'):
+        requests.post(f'{BASE_URL}/fields/by-path/{t1}/{path}', json={"type": "int"})
+    layout = requests.get(f'{BASE_URL}/tables/{table_id}/layout/').json()
+    assert layout['mode'] == 'tree' and layout['max_depth'] == 3 and layout['hidden'] == 0
+    nodes = layout['nodes']
+    assert len(nodes['id']) == len(nodes['x']) == len(nodes['y']) == 6
+    y = dict(zip(nodes['id'], nodes['y']))
+    assert y[-1] == 0 and sorted(y.values()) == [0, 1, 1, 2, 2, 3]
+    # Level of detail collapses a/x/y and a/x/deep into a
+    lod = requests.get(f'{BASE_URL}/tables/{table_id}/layout/', params={'lod': 1}).json()
+    assert lod['hidden'] == 3 and len(lod['nodes']['id']) == 3
+    assert max(lod['nodes']['collapsed_count']) == 3
+    assert requests.get(f'{BASE_URL}/tables/{table_id}/layout/', params={'max_nodes': 4}).json()['lod'] == 1
+    force = requests.get(f'{BASE_URL}/tables/{table_id}/layout/', params={'mode': 'force'}).json()
+    assert force['mode'] == 'force' and len(force['nodes']['x']) == 6
+    # Changes to other tables keep the cached layout, changes to this table do not
+    requests.post(f'{BASE_URL}/fields/by-path/{t2}/z', json={"type": "int"})
+    assert requests.get(f'{BASE_URL}/tables/{table_id}/layout/').json()['revision'] == layout['revision']
+    # ... bulk edge loads between other tables included
+    t3 = f'{cname}/db/t3'
+    requests.post(f'{BASE_URL}/tables/by-path/{t3}')
+    requests.post(f'{BASE_URL}/fields/by-path/{t3}/z', json={"type": "int"})
+    resp = requests.post(f'{BASE_URL}/edges/bulk', json={'type': 'equivalence', 'edges': [{'from': f'{t2}/z', 'to': f'{t3}/z'}]})
+    assert resp.json()['inserted'] == 1
+    assert requests.get(f'{BASE_URL}/tables/{table_id}/layout/').json()['revision'] == layout['revision']
+    requests.post(f'{BASE_URL}/fields/by-path/{t1}/c', json={"type": "int"})
+    updated = requests.get(f'{BASE_URL}/tables/{table_id}/layout/').json()
+    assert updated['revision'] > layout['revision'] and len(updated['nodes']['id']) == 7
+    assert requests.get(f'{BASE_URL}/tables/999999999/layout/').status_code == 404
+    requests.delete(f'{BASE_URL}/clusters/by-path/{cname}')
+
+def test_meta_merge_patch():
+    import threading
+    cname = 'testcluster_merge'
+    requests.delete(f'{BASE_URL}/clusters/by-path/{cname}')
+    requests.post(f'{BASE_URL}/clusters/', json={'name': cname})
+    requests.post(f'{BASE_URL}/databases/by-path/{cname}/db')
+    requests.post(f'{BASE_URL}/tables/by-path/{cname}/db/t')
+    path = f'{cname}/db/t/f'
+    field_id = requests.post(f'{BASE_URL}/fields/by-path/{path}',
+                             json={"type": "int", "props": {"a": 1, "b": 2}, "old": "x"}).json()['id']
+    url = f'{BASE_URL}/fields/by-path/{path}/meta'
+    # Body without 'type' is fine in merge mode; nested objects merge and null removes keys
+    resp = requests.patch(url, params={'mode': 'merge'}, json={"props": {"b": None, "c": 3}, "old": None, "unit": "kg"})
+    assert resp.status_code == 200, resp.text
+    assert resp.json() == {"type": "int", "props": {"a": 1, "c": 3}, "unit": "kg"}
+    assert requests.patch(url, params={'mode': 'merge'}, json={"type": None}).status_code == 400
+    assert requests.get(url).json()['type'] == 'int'
+    assert requests.patch(url, json={"unit": "g"}).status_code == 400  # replace mode still requires type
+    resp = requests.patch(f'{BASE_URL}/fields/{field_id}/meta', params={'mode': 'merge'}, json={"unit": "g"})
+    assert resp.json()['meta']['unit'] == 'g'
+    assert requests.patch(f'{BASE_URL}/fields/999999999/meta', params={'mode': 'merge'}, json={}).status_code == 404
+    # Concurrent patches to different keys are all kept
+    def patch(i):
+        requests.patch(url, params={'mode': 'merge'}, json={f"k{i}": i})
+    threads = [threading.Thread(target=patch, args=(i,)) for i in range(10)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    meta = requests.get(url).json()
+    assert all(meta[f"k{i}"] == i for i in range(10))
+    requests.delete(f'{BASE_URL}/clusters/by-path/{cname}')
+
+def test_batch_endpoint():
+    cname = 'testcluster_batch'
+    requests.delete(f'{BASE_URL}/clusters/by-path/{cname}')
+    requests.post(f'{BASE_URL}/clusters/', json={'name': cname})
+    ops = [
+        {"op": "create_database", "args": {"path": f"{cname}/db"}},
+        {"op": "create_table", "args": {"path": f"{cname}/db/t"}},
+        {"op": "create_field", "args": {"path": f"{cname}/db/t/a", "meta": {"type": "int"}}},
+        {"op": "create_field", "args": {"path": f"{cname}/db/t/b", "meta": {"type": "int"}}},
+        {"op": "get_field", "args": {"path": f"{cname}/db/t/missing"}},
+        {"op": "add_equivalence", "args": {"from_path": f"{cname}/db/t/a", "to_path": f"{cname}/db/t/b"}},
+        {"op": "patch_meta", "args": {"path": f"{cname}/db/t/a", "meta": {"unit": "kg"}, "mode": "merge"}},
+        {"op": "get_equivalents", "args": {"path": f"{cname}/db/t/a"}},
+        {"op": "no_such_op", "args": {}},
+    ]
+    resp = requests.post(f'{BASE_URL}/batch', json={"operations": ops})
+    assert resp.status_code == 200, resp.text
+    data = resp.json()
+    assert data['committed'] is True
+    assert [r['status'] for r in data['results']] == [200, 200, 200, 200, 404, 200, 200, 200, 400]
+    assert data['results'][1]['result']['name'] == 't'
+    assert data['results'][6]['result'] == {"type": "int", "unit": "kg"}
+    assert [e['path'] for e in data['results'][7]['result']['equivalents']] == [f"{cname}/db/t/b"]
+    # Atomic batch: the failing operation rolls back everything before it
+    ops = [
+        {"op": "create_field", "args": {"path": f"{cname}/db/t/c", "meta": {"type": "int"}}},
+        {"op": "remove_equivalence", "args": {"from_path": f"{cname}/db/t/a", "to_path": f"{cname}/db/t/b"}},
+        {"op": "create_field", "args": {"path": f"{cname}/db/t/d", "meta": {"no_type": 1}}},
+        {"op": "create_field", "args": {"path": f"{cname}/db/t/e", "meta": {"type": "int"}}},
+    ]
+    data = requests.post(f'{BASE_URL}/batch', json={"operations": ops, "atomic": True}).json()
+    assert data['committed'] is False
+    assert [r['status'] for r in data['results']] == [200, 200, 400]
+    assert requests.get(f'{BASE_URL}/fields/by-path/{cname}/db/t/c').status_code == 404
+    equivalents = requests.get(f'{BASE_URL}/fields/{cname}/db/t/a/equivalence/').json()['equivalents']
+    assert [e['path'] for e in equivalents] == [f"{cname}/db/t/b"]
+    data = requests.post(f'{BASE_URL}/batch', json={"operations": ops[:2], "atomic": True}).json()
+    assert data['committed'] is True
+    assert requests.get(f'{BASE_URL}/fields/by-path/{cname}/db/t/c').status_code == 200
+    requests.delete(f'{BASE_URL}/clusters/by-path/{cname}')
+
+def test_bulk_edges():
+    cname = 'testcluster_bulk_edges'
+    requests.delete(f'{BASE_URL}/clusters/by-path/{cname}')
+    requests.post(f'{BASE_URL}/clusters/', json={'name': cname})
+    requests.post(f'{BASE_URL}/databases/by-path/{cname}/db')
+    requests.post(f'{BASE_URL}/tables/by-path/{cname}/db/t1')
+    requests.post(f'{BASE_URL}/tables/by-path/{cname}/db/t2')
+    ids = {}
+    for name in ('a', 'b', 'c'):
+        for table in ('t1', 't2'):
+            path = f'{cname}/db/{table}/{name}'
+            ids[path] = requests.post(f'{BASE_URL}/fields/by-path/{path}', json={"type": "int"}).json()['id']
+    a1, a2, b1, b2 = (f'{cname}/db/{t}/{n}' for n in ('a', 'b') for t in ('t1', 't2'))
+    # Undirected edges are stored once per pair, whichever way round they are added
+    first = requests.post(f'{BASE_URL}/equivalence/', params={'from_path': a2, 'to_path': a1}).json()['edge_id']
+    again = requests.post(f'{BASE_URL}/equivalence/', params={'from_path': a1, 'to_path': a2}).json()['edge_id']
+    assert first == again
+    edge = requests.post(f'{BASE_URL}/edges/', json={'from_field_id': ids[a2], 'to_field_id': ids[a1], 'type': 'equivalence'}).json()
+    assert edge['id'] == first and (edge['from_field_id'], edge['to_field_id']) == (ids[a1], ids[a2])
+    resp = requests.post(f'{BASE_URL}/edges/bulk', json={'type': 'equivalence', 'edges': [
+        {'from': ids[b1], 'to': ids[b2]},
+        {'from': b2, 'to': b1},
+        {'from': a1, 'to': a2},
+        {'from': a1, 'to': b2, 'type': 'possibly_equivalence'},
+        {'from': a1, 'to': f'{cname}/db/t1/missing'},
+        {'from': 999999999, 'to': ids[a1]},
+    ]})
+    assert resp.status_code == 200, resp.text
+    report = resp.json()
+    assert (report['received'], report['inserted'], report['existing']) == (6, 2, 2)
+    assert [e['index'] for e in report['errors']] == [4, 5]
+    equivalents = requests.get(f'{BASE_URL}/fields/{b1}/equivalence/').json()['equivalents']
+    assert [e['path'] for e in equivalents] == [b2]
+    assert [e['path'] for e in requests.get(f'{BASE_URL}/fields/{b2}/possibly-equivalence/').json()['equivalents']] == [a1]
+    csv_body = f"from,to,type\n{cname}/db/t1/c,{cname}/db/t2/c,\n{ids[b1]},{ids[a2]},lineage\n"
+    resp = requests.post(f'{BASE_URL}/edges/bulk', params={'type': 'equivalence'}, data=csv_body,
+                         headers={'Content-Type': 'text/csv'})
+    assert resp.json()['inserted'] == 2, resp.text
+    lineage = [e for e in requests.get(f'{BASE_URL}/fields/{ids[b1]}/edges/').json() if e['type'] == 'lineage']
+    assert [(e['from_field_id'], e['to_field_id']) for e in lineage] == [(ids[b1], ids[a2])]
+    # Strict loads are all or nothing
+    resp = requests.post(f'{BASE_URL}/edges/bulk', params={'strict': True}, json={'type': 'equivalence', 'edges': [
+        {'from': ids[a1], 'to': ids[b1]}, {'from': ids[a1], 'to': 999999999}]})
+    assert resp.status_code == 400
+    assert requests.post(f'{BASE_URL}/edges/bulk', data="x,y\n1,2\n", headers={'Content-Type': 'text/csv'}).status_code == 400
+    assert all(e['path'] != b1 for e in requests.get(f'{BASE_URL}/fields/{a1}/equivalence/').json()['equivalents'])
+    # Table graph picks up the bulk-loaded edges
+    table_id = requests.get(f'{BASE_URL}/tables/by-path/{cname}/db/t1').json()['id']
+    graph = requests.get(f'{BASE_URL}/tables/{table_id}/graph/').json()
+    assert len([e for e in graph['external_connections'] if e['type'] == 'equivalence']) == 3
+    requests.delete(f'{BASE_URL}/clusters/by-path/{cname}')
+
+def test_edge_types():
+    cname = 'testcluster_edge_types'
+    requests.delete(f'{BASE_URL}/clusters/by-path/{cname}')
+    requests.post(f'{BASE_URL}/clusters/', json={'name': cname})
+    requests.post(f'{BASE_URL}/databases/by-path/{cname}/db')
+    requests.post(f'{BASE_URL}/tables/by-path/{cname}/db/t')
+    a, b = (requests.post(f'{BASE_URL}/fields/by-path/{cname}/db/t/{n}', json={"type": "int"}).json()['id'] for n in 'ab')
+    types = {t['name']: t for t in requests.get(f'{BASE_URL}/edge-types/').json()}
+    assert not types['equivalence']['directed'] and types['lineage']['directed']
+    resp = requests.post(f'{BASE_URL}/edge-types/', json={'name': 'same_as_test', 'directed': False})
+    assert resp.status_code == 200 and resp.json()['directed'] is False
+    assert requests.post(f'{BASE_URL}/edge-types/', json={'name': 'same_as_test', 'directed': True}).status_code == 409
+    assert requests.post(f'{BASE_URL}/edge-types/', json={'name': 'same_as_test', 'directed': False}).json()['id'] == resp.json()['id']
+    # Registered undirected types dedupe both directions; unregistered types are directed
+    first = requests.post(f'{BASE_URL}/edges/', json={'from_field_id': b, 'to_field_id': a, 'type': 'same_as_test'}).json()
+    second = requests.post(f'{BASE_URL}/edges/', json={'from_field_id': a, 'to_field_id': b, 'type': 'same_as_test'}).json()
+    assert first['id'] == second['id'] and (first['from_field_id'], first['type']) == (a, 'same_as_test')
+    forward = requests.post(f'{BASE_URL}/edges/', json={'from_field_id': b, 'to_field_id': a, 'type': 'feeds_test'}).json()
+    backward = requests.post(f'{BASE_URL}/edges/', json={'from_field_id': a, 'to_field_id': b, 'type': 'feeds_test'}).json()
+    assert forward['id'] != backward['id'] and forward['type'] == 'feeds_test'
+    assert any(t['name'] == 'feeds_test' and t['directed'] for t in requests.get(f'{BASE_URL}/edge-types/').json())
+    edges = requests.get(f'{BASE_URL}/fields/{a}/edges/').json()
+    assert sorted(e['type'] for e in edges) == ['feeds_test', 'feeds_test', 'same_as_test']
+    # Type filters by name keep working, unknown names match nothing
+    resp = requests.get(f'{BASE_URL}/shortest-path/', params={'from_path': f'{cname}/db/t/a', 'to_path': f'{cname}/db/t/b',
+                                                                'edge_types': ['same_as_test']}).json()
+    assert resp['found'] and resp['edges'][0]['type'] == 'same_as_test'
+    resp = requests.get(f'{BASE_URL}/shortest-path/', params={'from_path': f'{cname}/db/t/a', 'to_path': f'{cname}/db/t/b',
+                                                                'edge_types': ['no_such_type']}).json()
+    assert not resp['found']
+    requests.delete(f'{BASE_URL}/clusters/by-path/{cname}')
+
+def test_lineage():
+    cname = 'testcluster_lineage'
+    requests.delete(f'{BASE_URL}/clusters/by-path/{cname}')
+    requests.post(f'{BASE_URL}/clusters/', json={'name': cname})
+    requests.post(f'{BASE_URL}/databases/by-path/{cname}/db')
+    requests.post(f'{BASE_URL}/tables/by-path/{cname}/db/t')
+    names = ['a', 'b', 'c', 'd'] + [f'f{i}' for i in range(20)]
+    ids = {n: requests.post(f'{BASE_URL}/fields/by-path/{cname}/db/t/{n}', json={"type": "int"}).json()['id'] for n in names}
+    path = {n: f'{cname}/db/t/{n}' for n in names}
+    for up, down in (('a', 'b'), ('b', 'c'), ('a', 'd')):
+        resp = requests.post(f'{BASE_URL}/lineage/', params={'from_path': path[up], 'to_path': path[down]})
+        assert resp.status_code == 200, resp.text
+    upstream = requests.get(f'{BASE_URL}/fields/{path["c"]}/lineage/upstream', params={'max_depth': 5}).json()
+    assert [(n['path'], n['depth']) for n in upstream['nodes']] == [(path['b'], 1), (path['a'], 2)]
+    downstream = requests.get(f'{BASE_URL}/fields/{path["a"]}/lineage/downstream').json()
+    assert sorted(n['path'] for n in downstream['nodes']) == [path['b'], path['c'], path['d']]
+    assert downstream['count'] == 3 and not downstream['truncated']
+    assert requests.get(f'{BASE_URL}/fields/{path["a"]}/lineage/sideways').status_code == 404
+    # Edges closing a cycle are rejected whichever endpoint adds them
+    resp = requests.post(f'{BASE_URL}/lineage/', params={'from_path': path['c'], 'to_path': path['a']})
+    assert resp.status_code == 409 and resp.json()['detail']['cycle'] == [path['a'], path['b'], path['c']]
+    assert requests.post(f'{BASE_URL}/lineage/', params={'from_path': path['a'], 'to_path': path['a']}).status_code == 409
+    resp = requests.post(f'{BASE_URL}/edges/', json={'from_field_id': ids['c'], 'to_field_id': ids['a'], 'type': 'lineage'})
+    assert resp.status_code == 409
+    chain = [{'from': path[f'f{i}'], 'to': path[f'f{i + 1}']} for i in range(19)]
+    resp = requests.post(f'{BASE_URL}/edges/bulk', json={'type': 'lineage', 'edges': chain + [{'from': path['f19'], 'to': path['f0']}]})
+    assert resp.status_code == 409 and len(resp.json()['detail']['cycle']) == 20
+    assert requests.get(f'{BASE_URL}/fields/{path["f0"]}/lineage/downstream').json()['count'] == 0
+    assert requests.post(f'{BASE_URL}/edges/bulk', json={'type': 'lineage', 'edges': chain}).json()['inserted'] == 19
+    # Topological order groups fields into levels
+    order = requests.get(f'{BASE_URL}/lineage/order', params={'path': path['a']}).json()
+    assert [(n['path'], n['level']) for n in order['nodes']] == [(path['a'], 0), (path['b'], 1), (path['d'], 1), (path['c'], 2)]
+    assert requests.get(f'{BASE_URL}/lineage/order', params={'path': path['f0']}).json()['levels'] == 20
+    upstream_order = requests.get(f'{BASE_URL}/lineage/order', params={'path': path['c'], 'direction': 'upstream'}).json()
+    assert [n['path'] for n in upstream_order['nodes']] == [path['a'], path['b'], path['c']]
+    assert requests.delete(f'{BASE_URL}/lineage/', params={'from_path': path['a'], 'to_path': path['b']}).status_code == 200
+    assert requests.delete(f'{BASE_URL}/lineage/', params={'from_path': path['a'], 'to_path': path['b']}).status_code == 404
+    assert [n['path'] for n in requests.get(f'{BASE_URL}/fields/{path["a"]}/lineage/downstream').json()['nodes']] == [path['d']]
+    requests.delete(f'{BASE_URL}/clusters/by-path/{cname}')
+
+def test_concurrent_creates_are_idempotent():
+    from concurrent.futures import ThreadPoolExecutor
+    cname = 'testcluster_upsert'
+    requests.delete(f'{BASE_URL}/clusters/by-path/{cname}')
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        clusters = list(pool.map(lambda _: requests.post(f'{BASE_URL}/clusters/', json={'name': cname}).json(), range(8)))
+        assert len({c['id'] for c in clusters}) == 1
+        dbs = list(pool.map(lambda _: requests.post(f'{BASE_URL}/databases/by-path/{cname}/db').json(), range(8)))
+        assert len({d['id'] for d in dbs}) == 1
+        tables = list(pool.map(lambda _: requests.post(f'{BASE_URL}/tables/by-path/{cname}/db/t').status_code, range(8)))
+        assert sorted(tables) == [200] + [400] * 7
+        table_id = requests.get(f'{BASE_URL}/tables/by-path/{cname}/db/t').json()['id']
+        # Root fields (no parent) are unique per table too
+        fields = list(pool.map(lambda _: requests.post(f'{BASE_URL}/tables/{table_id}/fields/',
+                                                       json={'name': 'f', 'meta': {'type': 'int'}}).json(), range(8)))
+        assert len({f['id'] for f in fields}) == 1
+        subfields = list(pool.map(lambda _: requests.post(f'{BASE_URL}/tables/{table_id}/fields/', json={
+            'name': 's', 'parent_id': fields[0]['id'], 'meta': {'type': 'int'}}).json(), range(8)))
+        assert len({f['id'] for f in subfields}) == 1
+    listed = requests.get(f'{BASE_URL}/tables/{table_id}/fields/').json()
+    assert [(f['name'], [s['name'] for s in f['subfields']]) for f in listed] == [('f', ['s'])]
+    # An existing field keeps its meta
+    again = requests.post(f'{BASE_URL}/tables/{table_id}/fields/', json={'name': 'f', 'meta': {'type': 'str'}}).json()
+    assert again['id'] == fields[0]['id'] and again['meta'] == {'type': 'int'} and len(again['subfields']) == 1
+    requests.delete(f'{BASE_URL}/clusters/by-path/{cname}')
+
+def test_ids_by_path_and_rename_by_id():
+    cname = 'ids_cluster'
+    requests.delete(f'{BASE_URL}/clusters/by-path/{cname}')
+    requests.post(f'{BASE_URL}/clusters/', json={'name': cname})
+    requests.post(f'{BASE_URL}/databases/by-path/{cname}/db')
+    table = requests.post(f'{BASE_URL}/tables/by-path/{cname}/db/t').json()
+    ids = requests.get(f'{BASE_URL}/ids/by-path/{cname}/db/t').json()
+    assert ids['table_id'] == table['id'] and set(ids) == {'cluster_id', 'database_id', 'table_id'}
+    assert requests.get(f'{BASE_URL}/ids/by-path/{cname}').json() == {'cluster_id': ids['cluster_id']}
+    missing = requests.get(f'{BASE_URL}/ids/by-path/{cname}/nodb/t')
+    assert missing.status_code == 404 and 'nodb' in missing.json()['detail']
+    assert requests.get(f'{BASE_URL}/ids/by-path/{cname}/db/t/f').status_code == 400
+    # Renames by id keep the ids
+    resp = requests.patch(f'{BASE_URL}/databases/{ids["database_id"]}', json={'name': 'db2'})
+    assert resp.status_code == 200 and resp.json()['name'] == 'db2'
+    resp = requests.patch(f'{BASE_URL}/tables/{ids["table_id"]}', json={'name': 't2'})
+    assert resp.status_code == 200 and resp.json()['name'] == 't2'
+    assert requests.get(f'{BASE_URL}/ids/by-path/{cname}/db2/t2').json() == ids
+    assert requests.patch(f'{BASE_URL}/tables/999999999', json={'name': 'x'}).status_code == 404
+    # Renaming onto a sibling's name is a conflict
+    requests.post(f'{BASE_URL}/databases/by-path/{cname}/db3')
+    requests.post(f'{BASE_URL}/tables/by-path/{cname}/db2/t3')
+    for resp in (
+        requests.patch(f'{BASE_URL}/databases/{ids["database_id"]}', json={'name': 'db3'}),
+        requests.patch(f'{BASE_URL}/databases/by-path/{cname}/db2', json={'name': 'db3'}),
+        requests.patch(f'{BASE_URL}/tables/by-path/{cname}/db2/t2', json={'name': 't3'}),
+    ):
+        assert resp.status_code == 409 and 'already exists' in resp.json()['detail']
+    assert requests.get(f'{BASE_URL}/ids/by-path/{cname}/db2/t2').json() == ids
+    requests.delete(f'{BASE_URL}/clusters/by-path/{cname}')
+
+def test_paged_field_and_database_paths():
+    cname = 'paging_cluster'
+    requests.delete(f'{BASE_URL}/clusters/by-path/{cname}')
+    requests.post(f'{BASE_URL}/clusters/', json={'name': cname})
+    requests.post(f'{BASE_URL}/databases/by-path/{cname}/db')
+    requests.post(f'{BASE_URL}/tables/by-path/{cname}/db/t')
+    metas = [{'type': 'int', 'pk': True}, {'type': 'str', 'tags': ['a', 'b']}, {'type': 'int', 'a"b': 1}, {'type': 'int', 'unit': None}]
+    for i, meta in enumerate(metas):
+        requests.post(f'{BASE_URL}/fields/by-path/{cname}/db/t/f{i}', json=meta)
+    requests.post(f'{BASE_URL}/fields/by-path/{cname}/db/t/f1/sub', json={'type': 'int'})
+    url = f'{BASE_URL}/fields/paths/'
+    first = requests.get(url, params={'path': cname, 'limit': 3}).json()
+    rest = requests.get(url, params={'path': cname, 'limit': 3, 'cursor': first['next_cursor']}).json()
+    assert first['paths'] + rest['paths'] == [f'{cname}/db/t/f{i}' for i in range(4)] + [f'{cname}/db/t/f1/sub']
+    assert rest['next_cursor'] is None
+    # Pages stop at max_bytes, but always hold one path
+    assert len(requests.get(url, params={'path': cname, 'max_bytes': 1}).json()['paths']) == 1
+    # Field paths take the field and its subfields; filters compare JSON values
+    assert requests.get(url, params={'path': f'{cname}/db/t/f1'}).json()['paths'] == [f'{cname}/db/t/f1', f'{cname}/db/t/f1/sub']
+    for meta_filter, expected in (({'type': 'int'}, ['f0', 'f2', 'f3', 'f1/sub']), ({'pk': True}, ['f0']),
+                                  ({'tags': ['a', 'b']}, ['f1']), ({'type': 'int', 'unit': None}, ['f0', 'f2', 'f3', 'f1/sub']),
+                                  # Keys are not parsed as JSON paths
+                                  ({'a"b': 1}, ['f2']), ({'a"b': None}, ['f0', 'f1', 'f3', 'f1/sub'])):
+        paths = requests.get(url, params={'path': f'{cname}/db', 'filter': json.dumps(meta_filter)}).json()['paths']
+        assert paths == [f'{cname}/db/t/{name}' for name in expected], meta_filter
+    assert requests.get(url, params={'path': cname, 'filter': '[1]'}).status_code == 400
+    assert requests.get(url, params={'path': f'{cname}/nodb'}).status_code == 404
+    summary = requests.get(f'{url}summary', params={'path': cname, 'sample': 2}).json()
+    assert summary == {'total': 5, 'table_count': 1, 'tables': [{'path': f'{cname}/db/t', 'fields': 5}],
+                       'paths': [f'{cname}/db/t/f0', f'{cname}/db/t/f1']}
+    databases = requests.get(f'{BASE_URL}/databases/paths/', params={'cluster': [cname]}).json()
+    assert databases == {'paths': [f'{cname}/db'], 'next_cursor': None}
+    requests.delete(f'{BASE_URL}/clusters/by-path/{cname}')
+
+def test_create_fields_by_table_path():
+    cname = 'bulk_fields_cluster'
+    requests.delete(f'{BASE_URL}/clusters/by-path/{cname}')
+    requests.post(f'{BASE_URL}/clusters/', json={'name': cname})
+    requests.post(f'{BASE_URL}/databases/by-path/{cname}/db')
+    requests.post(f'{BASE_URL}/tables/by-path/{cname}/db/t')
+    requests.post(f'{BASE_URL}/fields/by-path/{cname}/db/t/old', json={'type': 'int', 'description': 'kept'})
+    fields = [
+        {'path': 'a', 'meta': {'type': 'struct'}},
+        {'path': 'a/b', 'meta': {'type': 'int'}},
+        {'path': 'old', 'meta': {'type': 'str'}},
+        {'path': 'x/y', 'meta': {'type': 'int'}},
+        {'path': 'c', 'meta': {'description': 'no type'}},
+        {'path': 'a//b', 'meta': {'type': 'int'}},
+        {'path': 'old/sub', 'meta': {'type': 'int'}},
+    ]
+    resp = requests.post(f'{BASE_URL}/fields/by-table-path/{cname}/db/t', json={'fields': fields})
+    assert resp.status_code == 200
+    body = resp.json()
+    assert (body['created'], body['existing'], body['failed']) == (3, 1, 3)
+    assert [r['status'] for r in body['results']] == ['created', 'created', 'exists', 'not_found', 'invalid', 'invalid', 'created']
+    assert requests.get(f'{BASE_URL}/fields/by-path/{cname}/db/t/a/b').json()['id'] == body['results'][1]['id']
+    assert requests.get(f'{BASE_URL}/fields/by-path/{cname}/db/t/old/meta').json() == {'type': 'int', 'description': 'kept'}
+    assert requests.post(f'{BASE_URL}/fields/by-table-path/{cname}/db/missing', json={'fields': fields}).status_code == 404
+    requests.delete(f'{BASE_URL}/clusters/by-path/{cname}')
+
 if __name__ == "__main__":
     import sys
     if len(sys.argv) > 1:
@@ -0,0 +1,95 @@
+import pytest
+import uuid
+from api.local_client import LocalPathClient
+from api.path_client import PathClient
+from api.client import APIClientError
+
+def unique_name(prefix):
+    return f"{prefix}_{uuid.uuid4().hex[:8]}"
+
+# Both clients work on the same database file: run from the repository root
+local = LocalPathClient()
+remote = PathClient()
+
+def test_local_matches_http_shapes():
+    cname = unique_name('cluster')
+    local.create_cluster(cname)
+    local.create_database(f"{cname}/db")
+    table = local.create_table(f"{cname}/db/t")
+    assert local.create_table(f"{cname}/db/t")['id'] == table['id']
+    field = local.create_field(f"{cname}/db/t/f", meta={"type": "int"})
+    local.create_field(f"{cname}/db/t/f/sub", meta={"type": "str"})
+    remote_field = remote.create_field(f"{cname}/db/t/g", meta={"type": "int"})
+    assert set(field) == set(remote_field) and field['table_id'] == remote_field['table_id'] == table['id']
+    assert local.get_field(f"{cname}/db/t/f") == remote.get_field(f"{cname}/db/t/f")
+    local.edit_field_description(f"{cname}/db/t/f", "desc")
+    assert remote.get_field_metadata(f"{cname}/db/t/f") == {"type": "int", "description": "desc"}
+    assert local.list_database(cname) == remote.list_database(cname)
+    assert local.list_fields(cname) == remote.list_fields(cname)
+    assert sorted(local.list_fields(cname)) == [f"{cname}/db/t/f", f"{cname}/db/t/f/sub", f"{cname}/db/t/g"]
+    assert local.get_fields([f"{cname}/db/t/f/sub"]) == remote.get_fields([f"{cname}/db/t/f/sub"])
+    assert local.bulk_edit_metadata({f"{cname}/db/t/f/sub": {"unit": "kg"}}) == {"updated": 1, "failed": {}}
+    local.delete_cluster(cname)
+    assert cname not in remote.list_clusters()
+
+def test_local_errors_match_http():
+    cname = unique_name('cluster')
+    local.create_cluster(cname)
+    local.create_database(f"{cname}/db")
+    local.create_table(f"{cname}/db/t")
+    local.create_field(f"{cname}/db/t/f", meta={"type": "int"})
+    for client in (local, remote):
+        with pytest.raises(APIClientError, match="HTTP 400: Field already exists"):
+            client.create_field(f"{cname}/db/t/f", meta={"type": "int"})
+        with pytest.raises(APIClientError, match="HTTP 404"):
+            client.get_field(f"{cname}/db/t/missing")
+    local.delete_cluster(cname)
+
+def test_local_batch_is_one_transaction():
+    cname = unique_name('cluster')
+    local.create_cluster(cname)
+    local.create_database(f"{cname}/db")
+    local.create_table(f"{cname}/db/t")
+    with pytest.raises(RuntimeError):
+        with local.batch():
+            local.create_field(f"{cname}/db/t/a", meta={"type": "int"})
+            raise RuntimeError("abort")
+    assert local.get_fields([f"{cname}/db/t/a"]) == {f"{cname}/db/t/a": None}
+    with local.batch():
+        local.create_field(f"{cname}/db/t/a", meta={"type": "int"})
+        # A failed call only rolls back itself
+        with pytest.raises(APIClientError):
+            local.create_field(f"{cname}/db/t/a", meta={"type": "int"})
+        local.create_field(f"{cname}/db/t/b", meta={"type": "int"})
+        local.add_edge(f"{cname}/db/t/a", f"{cname}/db/t/b")
+    assert remote.list_fields(f"{cname}/db/t") == [f"{cname}/db/t/a", f"{cname}/db/t/b"]
+    assert [e['path'] for e in local.get_edges(f"{cname}/db/t/a")] == [f"{cname}/db/t/b"]
+    local.delete_cluster(cname)
+
+def test_backend_sees_local_writes():
+    cname = unique_name('cluster')
+    remote.create_cluster(cname)
+    remote.create_database(f"{cname}/db")
+    a, b = f"{cname}/db/t1/a", f"{cname}/db/t2/b"
+    for path in (a, b):
+        remote.create_table(path.rsplit('/', 1)[0])
+        remote.create_field(path, meta={"type": "int"})
+    # Let the backend build its graph caches before this process writes behind its back
+    assert remote.get_join_path(f"{cname}/db/t1", f"{cname}/db/t2")['found'] is False
+    local.add_edges([(a, b)])
+    assert remote.get_join_path(f"{cname}/db/t1", f"{cname}/db/t2")['found'] is True
+    # Edge types registered by this process are known to the backend by name
+    edge_type = unique_name('rel')
+    local.add_edges([(a, b)], edge_type=edge_type)
+    edges = remote.client.get_edges(remote.get_field(a)['id'])
+    assert sorted(e['type'] for e in edges) == sorted(["equivalence", edge_type])
+    assert remote.get_shortest_path(a, b, edge_types=[edge_type])['found'] is True
+    local.delete_cluster(cname)
+    assert cname not in remote.list_clusters()
+
+if __name__ == "__main__":
+    test_local_matches_http_shapes()
+    test_local_errors_match_http()
+    test_local_batch_is_one_transaction()
+    test_backend_sees_local_writes()
+    print("All LocalPathClient tests passed.")
@@ -0,0 +1,299 @@
+import asyncio
+import json
+import threading
+import time
+import uuid
+import pytest
+from fastmcp import Client
+from fastmcp.exceptions import ToolError
+from api import mcp_server
+from api.async_path_client import AsyncPathClient
+from api.local_client import AsyncLocalPathClient
+from api.tool_cache import ToolCache
+from api.path_client import PathClient
+
+BASE_URL = 'http://localhost:8000'
+
+def unique_name(prefix):
+    return f"{prefix}_{uuid.uuid4().hex[:8]}"
+
+def run_tools(scenario, local=False):
+    """
+    Run scenario(mcp_client) against the bridge in-process, with its clients pointed at the
+    local backend, or with local at the crud layer as when it is mounted in the backend.
+    """
+    async def main():
+        mcp_server.cache.clear()
+        if local:
+            # Same database file as the backend: run from the repository root
+            mcp_server.client = AsyncLocalPathClient()
+            mcp_server.bulk_client = AsyncLocalPathClient(mcp_server.client.path_client, max_workers=10)
+        else:
+            mcp_server.client = AsyncPathClient(BASE_URL)
+            mcp_server.bulk_client = AsyncPathClient(BASE_URL, pool_size=16)
+        try:
+            async with Client(mcp_server.mcp) as mcp_client:
+                return await scenario(mcp_client)
+        finally:
+            await mcp_server.client.aclose()
+            await mcp_server.bulk_client.aclose()
+    return asyncio.run(main())
+
+def tool_data(result):
+    # An empty list comes back as no content blocks at all
+    return json.loads(result.content[0].text) if result.content else []
+
+def test_tools_run_on_async_client():
+    cname = unique_name('cluster')
+    sync_client = PathClient(BASE_URL)
+    sync_client.create_cluster(cname)
+    sync_client.create_database(f"{cname}/db")
+    sync_client.create_table(f"{cname}/db/t")
+    async def scenario(mcp_client):
+        await mcp_client.call_tool("create_field", {"path": f"{cname}/db/t/f", "meta": {"type": "int"}})
+        # Expensive and cheap tools in flight together
+        return await asyncio.gather(
+            mcp_client.call_tool("list_fields", {"path": cname}),
+            mcp_client.call_tool("get_hierarchy", {"path": cname, "filter": [["type", "int"]]}),
+            mcp_client.call_tool("get_connected_databases", {"db_path": f"{cname}/db"}),
+            mcp_client.call_tool("get_field_metadata", {"path": f"{cname}/db/t/f"}),
+        )
+    fields, hierarchy, connected, meta = [tool_data(r) for r in run_tools(scenario)]
+    assert fields == hierarchy == {"paths": [f"{cname}/db/t/f"], "next_cursor": None}
+    assert connected == [] and meta == {"type": "int"}
+    sync_client.delete_cluster(cname)
+
+def test_in_process_tools_match_bridge():
+    cname = unique_name('cluster')
+    async def read_back(mcp_client):
+        return [tool_data(await mcp_client.call_tool(name, args)) for name, args in (
+            ("list_database", {"clusters": cname}),
+            ("list_fields", {"path": cname}),
+            ("get_field", {"path": f"{cname}/db/t/a"}),
+            ("get_hierarchy", {"path": f"{cname}/db", "filter": [["type", "int"]]}),
+        )]
+    async def scenario(mcp_client):
+        await mcp_client.call_tool("create_cluster", {"cluster_name": cname})
+        await mcp_client.call_tool("create_database", {"path": f"{cname}/db"})
+        await mcp_client.call_tool("create_table", {"path": f"{cname}/db/t"})
+        for name in ("a", "b"):
+            await mcp_client.call_tool("create_field", {"path": f"{cname}/db/t/{name}", "meta": {"type": "int"}})
+        await mcp_client.call_tool("edit_field_description", {"path": f"{cname}/db/t/a", "description": "desc"})
+        with pytest.raises(ToolError, match="HTTP 400: Field already exists"):
+            await mcp_client.call_tool("create_field", {"path": f"{cname}/db/t/a", "meta": {"type": "int"}})
+        return await read_back(mcp_client)
+    # Written through the crud layer, read back the same through the HTTP bridge
+    local_results = run_tools(scenario, local=True)
+    assert run_tools(read_back) == local_results
+    assert local_results[1]["paths"] == [f"{cname}/db/t/a", f"{cname}/db/t/b"]
+    assert local_results[2]["meta"] == {"type": "int", "description": "desc"}
+    PathClient(BASE_URL).delete_cluster(cname)
+
+def test_listing_tools_page():
+    cname = unique_name('cluster')
+    sync_client = PathClient(BASE_URL)
+    sync_client.create_cluster(cname)
+    for db in ("db1", "db2"):
+        sync_client.create_database(f"{cname}/{db}")
+        sync_client.create_table(f"{cname}/{db}/t")
+    paths = [f"{cname}/db1/t/f{i:02d}" for i in range(25)] + [f"{cname}/db2/t/g{i:02d}" for i in range(5)]
+    for i, path in enumerate(paths):
+        sync_client.create_field(path, meta={"type": "int" if i % 3 else "str"})
+    async def scenario(mcp_client):
+        async def all_pages(tool, args):
+            pages, cursor = [], None
+            while True:
+                page = tool_data(await mcp_client.call_tool(tool, {**args, "cursor": cursor}))
+                pages.append(page["paths"])
+                cursor = page["next_cursor"]
+                if cursor is None:
+                    return pages
+        return (
+            await all_pages("list_fields", {"path": cname, "limit": 7}),
+            await all_pages("get_hierarchy", {"path": f"{cname}/db1", "filter": [["type", "str"]], "limit": 4}),
+            await all_pages("list_database", {"clusters": cname, "limit": 1}),
+            tool_data(await mcp_client.call_tool("list_fields", {"path": cname, "limit": 100000})),
+            tool_data(await mcp_client.call_tool("list_fields", {"path": cname, "summary": True})),
+        )
+    field_pages, str_pages, db_pages, capped, summary = run_tools(scenario)
+    assert [len(page) for page in field_pages] == [7, 7, 7, 7, 2]
+    assert sum(field_pages, []) == paths
+    assert sum(str_pages, []) == [p for i, p in enumerate(paths[:25]) if i % 3 == 0]
+    assert db_pages == [[f"{cname}/db1"], [f"{cname}/db2"]]
+    assert capped["paths"] == paths and capped["next_cursor"] is None
+    assert summary["total"] == 30 and summary["table_count"] == 2
+    assert summary["tables"] == [{"path": f"{cname}/db1/t", "fields": 25}, {"path": f"{cname}/db2/t", "fields": 5}]
+    assert summary["paths"] == paths[:mcp_server.SUMMARY_PATHS]
+    sync_client.delete_cluster(cname)
+
+def test_bulk_tools():
+    for local in (False, True):
+        cname = unique_name('cluster')
+        sync_client = PathClient(BASE_URL)
+        sync_client.create_cluster(cname)
+        sync_client.create_database(f"{cname}/db")
+        sync_client.create_table(f"{cname}/db/t")
+        table = f"{cname}/db/t"
+        async def scenario(mcp_client):
+            fields = {f"f{i}": {"type": "int"} for i in range(50)}
+            fields["f0/sub"] = {"type": "str"}
+            fields["nope/sub"] = {"type": "str"}
+            created = tool_data(await mcp_client.call_tool("bulk_create_fields", {"table_path": table, "fields": fields}))
+            edits = [{"path": f"{table}/f{i}", "description": f"field {i}", "example": str(i)} for i in range(50)]
+            edits += [{"path": f"{table}/f0/sub", "type": "uuid", "metadata": {"pii": True}}, {"path": f"{table}/missing"}]
+            edited = tool_data(await mcp_client.call_tool("bulk_edit_fields", {"edits": edits}))
+            edges = [[f"{table}/f{i}", f"{table}/f{i + 1}"] for i in range(10)] + [[f"{table}/f0", f"{table}/missing"]]
+            linked = tool_data(await mcp_client.call_tool("bulk_add_edges", {"edges": edges}))
+            relinked = tool_data(await mcp_client.call_tool("bulk_add_edges", {"edges": edges[:3]}))
+            with pytest.raises(ToolError, match="At most"):
+                await mcp_client.call_tool("bulk_edit_fields", {"edits": [{"path": table}] * (mcp_server.MAX_BULK_ITEMS + 1)})
+            return created, edited, linked, relinked
+        created, edited, linked, relinked = run_tools(scenario, local=local)
+        assert (created["created"], created["failed"]) == (51, 1) and created["results"][-1]["status"] == "not_found"
+        assert (edited["updated"], edited["failed"]) == (51, 1)
+        assert edited["results"][-1] == {"index": 51, "path": f"{table}/missing", "status": "not_found"}
+        assert sync_client.get_field_metadata(f"{table}/f7") == {"type": "int", "description": "field 7", "example": "7"}
+        assert sync_client.get_field_metadata(f"{table}/f0/sub") == {"type": "uuid", "pii": True}
+        assert (linked["inserted"], linked["failed"]) == (10, 1) and linked["results"][10]["status"] == "error"
+        assert (relinked["inserted"], relinked["existing"]) == (0, 3)
+        sync_client.delete_cluster(cname)
+
+def test_tool_cache_lru_ttl_and_invalidation():
+    cache = ToolCache(max_entries=3, ttl=0.2)
+    for key, path in ((("meta", "c/d/t/f"), "c/d/t/f"), (("meta", "c/d/t/g"), "c/d/t/g"), (("dbs", "c"), "c")):
+        cache.put(key, path, key[1], cache.generation)
+    assert cache.get(("meta", "c/d/t/f")) == (True, "c/d/t/f")
+    cache.put(("clusters",), "", ["c"], cache.generation)
+    # The least recently used entry goes first
+    assert cache.get(("meta", "c/d/t/g")) == (False, None) and cache.evictions == 1
+    # Edits drop the path and what is under it; creates and deletes also drop the ancestors' listings
+    assert cache.invalidate("c/d/t/f") == 1
+    assert cache.get(("dbs", "c"))[0] and cache.get(("clusters",))[0]
+    cache.put(("meta", "c/d/t/f"), "c/d/t/f", {}, cache.generation)
+    assert cache.invalidate("c/d", structural=True) == 3 and cache.stats()["entries"] == 0
+    # A result fetched across an invalidation is not stored
+    generation = cache.generation
+    cache.invalidate("x")
+    cache.put(("dbs", "c"), "c", [], generation)
+    assert cache.get(("dbs", "c")) == (False, None)
+    cache.put(("dbs", "c"), "c", [], cache.generation)
+    time.sleep(0.25)
+    assert cache.get(("dbs", "c")) == (False, None) and cache.expirations == 1
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["invalidations"]) == (3, 3, 4)
+
+def test_read_tools_cached_until_mutated():
+    cname = unique_name('cluster')
+    sync_client = PathClient(BASE_URL)
+    sync_client.create_cluster(cname)
+    sync_client.create_database(f"{cname}/db")
+    sync_client.create_table(f"{cname}/db/t")
+    sync_client.create_field(f"{cname}/db/t/f", meta={"type": "int"})
+    sync_client.create_field(f"{cname}/db/t/g", meta={"type": "int"})
+    field = f"{cname}/db/t/f"
+    async def scenario(mcp_client):
+        async def call(tool, **args):
+            return tool_data(await mcp_client.call_tool(tool, args))
+        before = await call("cache_stats")
+        seen = [await call("get_field_metadata", path=field), await call("get_field_metadata", path=field)]
+        await call("edit_field_description", path=field, description="desc")
+        seen.append(await call("get_field_metadata", path=field))
+        seen.append(await call("list_database", clusters=cname))
+        await call("create_database", path=f"{cname}/db2")
+        seen.append(await call("list_database", clusters=cname))
+        seen.append(await call("get_edges", path=field))
+        await call("bulk_add_edges", edges=[[field, f"{cname}/db/t/g"]])
+        seen.append(await call("get_edges", path=field))
+        # Changes made by other clients show once the entry expires
+        sync_client.edit_field_example(field, "e")
+        seen.append(await call("get_field_metadata", path=field))
+        mcp_server.cache.clear()
+        seen.append(await call("get_field_metadata", path=field))
+        after = await call("cache_stats")
+        return seen, {key: after[key] - before[key] for key in ("hits", "misses")}, after["entries"]
+    seen, counts, entries = run_tools(scenario)
+    assert seen[0] == seen[1] == {"type": "int"}
+    assert seen[2] == {"type": "int", "description": "desc"}
+    assert seen[3]["paths"] == [f"{cname}/db"] and seen[4]["paths"] == [f"{cname}/db", f"{cname}/db2"]
+    assert seen[5] == [] and [edge["path"] for edge in seen[6]] == [f"{cname}/db/t/g"]
+    assert seen[7] == seen[2] and seen[8]["example"] == "e"
+    assert counts == {"hits": 2, "misses": 7} and entries == 1
+    sync_client.delete_cluster(cname)
+
+def test_expensive_tools_are_bounded():
+    running, peak = 0, 0
+    class SlowClient:
+        async def list_fields_page(self, path, **page):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.05)
+            running -= 1
+            return [path]
+        async def aclose(self):
+            pass
+    async def scenario(mcp_client):
+        mcp_server.bulk_client = SlowClient()
+        start = time.perf_counter()
+        results = await asyncio.gather(*[mcp_client.call_tool("list_fields", {"path": str(i)}) for i in range(12)])
+        return results, time.perf_counter() - start
+    results, elapsed = run_tools(scenario)
+    limit = mcp_server.TOOL_LIMITS["list_fields"][0]
+    assert [tool_data(r) for r in results] == [[str(i)] for i in range(12)]
+    assert peak == limit and elapsed >= 0.05 * 12 / limit
+
+def test_in_process_clients_have_own_threads():
+    release = threading.Event()
+    class BlockingClient:
+        def list_fields(self, path):
+            release.wait(5)
+            return [path]
+        def get_field(self, path):
+            return {"path": path}
+    bulk = AsyncLocalPathClient(BlockingClient(), max_workers=2)
+    cheap = AsyncLocalPathClient(BlockingClient(), max_workers=2)
+    async def scenario():
+        busy = [asyncio.ensure_future(bulk.list_fields(str(i))) for i in range(4)]
+        # Served while every thread of the other client is blocked
+        field = await asyncio.wait_for(cheap.get_field("x"), 1)
+        release.set()
+        return field, await asyncio.gather(*busy)
+    try:
+        assert asyncio.run(scenario()) == ({"path": "x"}, [[str(i)] for i in range(4)])
+    finally:
+        release.set()
+
+def test_tool_timeout():
+    mcp_server.TOOL_LIMITS["slow_tool"] = (1, 0.1)
+    @mcp_server.limited
+    async def slow_tool(seconds: float) -> float:
+        await asyncio.sleep(seconds)
+        return seconds
+    async def scenario():
+        assert await slow_tool(0.01) == 0.01
+        with pytest.raises(ToolError, match="slow_tool did not finish within 0.1s"):
+            await slow_tool(0.25)
+        # The abandoned call holds its slot until it is done
+        with pytest.raises(ToolError):
+            await slow_tool(0.01)
+        await asyncio.sleep(0.1)
+        assert await slow_tool(0.01) == 0.01
+        # Time spent waiting for a slot counts toward the timeout
+        outcomes = await asyncio.gather(slow_tool(0.08), slow_tool(0.08), return_exceptions=True)
+        assert outcomes[0] == 0.08 and isinstance(outcomes[1], ToolError)
+    try:
+        asyncio.run(scenario())
+    finally:
+        del mcp_server.TOOL_LIMITS["slow_tool"]
+
+if __name__ == "__main__":
+    test_tools_run_on_async_client()
+    test_in_process_tools_match_bridge()
+    test_listing_tools_page()
+    test_bulk_tools()
+    test_tool_cache_lru_ttl_and_invalidation()
+    test_read_tools_cached_until_mutated()
+    test_expensive_tools_are_bounded()
+    test_in_process_clients_have_own_threads()
+    test_tool_timeout()
+    print("All MCP server tests passed.")
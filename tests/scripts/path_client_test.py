@@ -1,5 +1,7 @@
 import pytest
 from api.path_client import PathClient
+from api.client import APIClientError
+from api.transport import HTTPTransport
 import uuid
 import threading
 import time
@@ -55,6 +57,10 @@ def test_metadata_editing():
     client.edit_field_metadata(f"{cname}/{dname}/{tname}/{fname}", {"unit": "g"})
     meta = client.get_field_metadata(f"{cname}/{dname}/{tname}/{fname}")
     assert meta is not None and meta['unit'] == "g" and meta['description'] == "desc1"
+    # Remove a key
+    client.remove_field_metadata(f"{cname}/{dname}/{tname}/{fname}", ["unit"])
+    meta = client.get_field_metadata(f"{cname}/{dname}/{tname}/{fname}")
+    assert meta is not None and 'unit' not in meta and meta['type'] == "int"
     # Clean up
     client.delete_field(f"{cname}/{dname}/{tname}/{fname}")
     client.delete_table(f"{cname}/{dname}/{tname}")
@@ -467,7 +473,10 @@ def test_simultaneous_creation():
     for t in threads: t.start()
     for t in threads: t.join()
     print("Results:", results)
-    assert results.count("success") == 2
+    # Exactly one request creates the field; the other sees it already exists
+    assert results.count("success") == 1
+    assert any("already exists" in r for r in results if r != "success")
+    assert client.list_fields(f"{cname}/{dname}/{tname}").count(base) == 1
     client.delete_field(base)
     client.delete_table(f"{cname}/{dname}/{tname}")
     client.delete_database(f"{cname}/{dname}")
@@ -681,6 +690,162 @@ def test_bulk_deletion_under_load():
     except Exception:
         pass
 
+# --- Bulk Path Resolution ---
+def test_get_fields():
+    cname = unique_name('cluster')
+    base = f"{cname}/db/table"
+    client.create_cluster(cname)
+    client.create_database(f"{cname}/db")
+    client.create_table(base)
+    client.create_field(f"{base}/a", meta={"type": "struct"})
+    client.create_field(f"{base}/a/b", meta={"type": "int", "description": "nested"})
+    client.create_field(f"{base}/c", meta={"type": "int"})
+    paths = [f"{base}/a/b", f"{base}/missing", f"{base}/c", f"{base}/a", f"{cname}/db/other/a", "short/path"]
+    fields = client.get_fields(paths)
+    assert list(fields) == paths
+    assert fields[f"{base}/a/b"]['parent_id'] == fields[f"{base}/a"]['id']
+    assert fields[f"{base}/a/b"]['meta'] == {"type": "int", "description": "nested"}
+    assert fields[f"{base}/a"]['parent_id'] is None
+    assert fields[f"{base}/c"]['table_id'] == fields[f"{base}/a"]['table_id']
+    assert fields[f"{base}/missing"] is None and fields[f"{cname}/db/other/a"] is None and fields["short/path"] is None
+    results = client.client.resolve_field_paths([f"{base}/c", f"{base}/c"])
+    assert [r['id'] for r in results] == [fields[f"{base}/c"]['id']] * 2 and 'meta' not in results[0]
+    client.delete_cluster(cname)
+
+# --- Bulk Metadata Editing ---
+def test_bulk_edit_metadata():
+    cname = unique_name('cluster')
+    base = f"{cname}/db/table"
+    client.create_cluster(cname)
+    client.create_database(f"{cname}/db")
+    client.create_table(base)
+    paths = [f"{base}/f{i}" for i in range(25)]
+    for path in paths:
+        client.create_field(path, meta={"type": "int"})
+    edits = {path: {"description": f"field {i}"} for i, path in enumerate(paths)}
+    edits[f"{base}/missing"] = {"description": "nope"}
+    edits[paths[0]] = {"type": None}
+    summary = client.bulk_edit_metadata(edits, batch_size=10)
+    assert summary["updated"] == 24
+    assert summary["failed"] == {f"{base}/missing": "not_found", paths[0]: "meta must contain a 'type' key"}
+    fields = client.get_fields(paths)
+    assert fields[paths[3]]['meta'] == {"type": "int", "description": "field 3"}
+    assert fields[paths[0]]['meta'] == {"type": "int"}
+    # Mixed id/path operations with per-item results
+    response = client.client.batch_merge_field_meta(
+        [{"id": fields[paths[1]]['id'], "patch": {"unit": "kg"}}, {"path": paths[2], "patch": {"unit": "g"}}],
+        return_meta=True, commit_every=1)
+    assert [r['meta']['unit'] for r in response['results']] == ["kg", "g"]
+    client.delete_cluster(cname)
+
+def test_client_batch():
+    cname = unique_name('cluster')
+    base = f"{cname}/db/table"
+    client.create_cluster(cname)
+    with client.client.batch() as batch:
+        batch.create_database_by_path(f"{cname}/db")
+        batch.create_table_by_path(base)
+        created = batch.create_field_by_path(f"{base}/f", {"type": "int"})
+        missing = batch.get_field_by_path(f"{base}/missing")
+        merged = batch.merge_field_meta_by_path(f"{base}/f", {"unit": "kg"})
+        with pytest.raises(APIClientError):
+            created.value
+    assert created.value['name'] == 'f'
+    assert merged.value == {"type": "int", "unit": "kg"}
+    with pytest.raises(APIClientError):
+        missing.value
+    with pytest.raises(APIClientError):
+        with client.client.batch(atomic=True) as batch:
+            first = batch.create_field_by_path(f"{base}/g", {"type": "int"})
+            batch.create_field_by_path(f"{base}/h", {"no_type": 1})
+            never = batch.create_field_by_path(f"{base}/i", {"type": "int"})
+    assert batch.committed is False
+    with pytest.raises(APIClientError):
+        first.value
+    with pytest.raises(APIClientError):
+        never.value
+    assert client.get_fields([f"{base}/g"])[f"{base}/g"] is None
+    client.delete_cluster(cname)
+
+def test_shared_transport():
+    transport = HTTPTransport(pool_size=4)
+    first, second = PathClient(transport=transport), PathClient(transport=transport)
+    cname = unique_name('cluster')
+    first.create_cluster(cname)
+    first.create_database(f"{cname}/db")
+    second.create_table(f"{cname}/db/t")
+    for i in range(10):
+        (first if i % 2 else second).create_field(f"{cname}/db/t/f{i}", meta={"type": "int"})
+    assert len(first.list_fields(f"{cname}/db/t")) == 10
+    # Sequential calls from both clients reuse one keep-alive connection
+    pools = transport.session.get_adapter(first.client.base_url).poolmanager.pools
+    assert [pools[key].num_connections for key in pools.keys()] == [1]
+    threads = [threading.Thread(target=second.get_fields, args=([f"{cname}/db/t/f{i}"],)) for i in range(8)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    second.delete_cluster(cname)
+    transport.close()
+
+def test_id_cache():
+    cname = unique_name('cluster')
+    local = PathClient()
+    local.create_cluster(cname)
+    local.create_database(f"{cname}/db")
+    local.create_table(f"{cname}/db/t")
+    api = local.client
+    assert api.get_tables_by_database_name(cname, "db")[0]['name'] == "t"
+    db_id = api.ids.get((cname, "db"))
+    assert db_id is not None and api.ids.get((cname,)) is not None
+    # Renaming through the client drops the old name; the id itself is unchanged
+    api.update_database(db_id, "db2")
+    assert api.ids.get((cname, "db")) is None
+    with pytest.raises(APIClientError):
+        api.get_tables_by_database_name(cname, "db")
+    assert api.resolve_ids(cname, "db2") == db_id
+    # Deleting through the client drops the entry and everything below it
+    api.resolve_ids(cname, "db2", "t")
+    local.delete_database(f"{cname}/db2")
+    assert api.ids.get((cname, "db2")) is None and api.ids.get((cname, "db2", "t")) is None
+    # Entries expire after the TTL
+    api.ids.clear()
+    api.ids.ttl = 0.05
+    api.resolve_ids(cname)
+    assert api.ids.get((cname,)) is not None
+    time.sleep(0.1)
+    assert api.ids.get((cname,)) is None
+    local.delete_cluster(cname)
+    local.client.close()
+
+def test_concurrent_fan_out():
+    cname = unique_name('cluster')
+    client.create_cluster(cname)
+    for d in range(3):
+        client.create_database(f"{cname}/db{d}")
+        for t in range(3):
+            client.create_table(f"{cname}/db{d}/t{t}")
+            client.create_field(f"{cname}/db{d}/t{t}/a", meta={"type": "str"})
+            client.create_field(f"{cname}/db{d}/t{t}/b", meta={"type": "int"})
+    client.add_edge(f"{cname}/db0/t0/a", f"{cname}/db1/t2/b")
+    client.add_edge(f"{cname}/db0/t1/a", f"{cname}/db2/t0/a")
+    sequential, concurrent = PathClient(concurrency=1), PathClient(concurrency=8)
+    for c in (sequential, concurrent):
+        assert c.list_database(cname) == [f"{cname}/db{d}" for d in range(3)]
+    assert sequential.list_fields(cname) == concurrent.list_fields(cname)
+    assert len(concurrent.list_fields(cname)) == 18
+    assert sequential.get_hierarchy(cname, [("type", "str")]) == concurrent.get_hierarchy(cname, [("type", "str")])
+    assert concurrent.get_connected_databases(f"{cname}/db0") == [f"{cname}/db1", f"{cname}/db2"]
+    # Errors propagate: the first failing item in input order wins
+    with pytest.raises(APIClientError, match="missing_1"):
+        concurrent.list_database([cname, unique_name('missing_1'), unique_name('missing_2')])
+    def fail_on_odd(n):
+        if n % 2:
+            raise ValueError(n)
+        return n
+    with pytest.raises(ValueError, match="^1$"):
+        concurrent._map(fail_on_odd, range(20))
+    assert concurrent._map(lambda n: n * n, range(50)) == [n * n for n in range(50)]
+    client.delete_cluster(cname)
+
 if __name__ == "__main__":
     test_create_and_delete_hierarchy()
     test_metadata_editing()
@@ -708,4 +873,10 @@ if __name__ == "__main__":
     test_delete_parent_with_edges()
     test_circular_edge()
     test_bulk_deletion_under_load()
-    print("All PathClient tests passed.") 
\ No newline at end of file
+    test_get_fields()
+    test_bulk_edit_metadata()
+    test_client_batch()
+    test_shared_transport()
+    test_id_cache()
+    test_concurrent_fan_out()
+    print("All PathClient tests passed.") 